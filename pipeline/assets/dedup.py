@@ -0,0 +1,388 @@
+"""Theme-wide near-duplicate detection of asset rasters.
+
+Every ``(asset_key, size_px)`` raster gets an exact digest of its RGBA
+bytes, a 64-bit difference hash and a small premultiplied thumbnail.
+Exact digests collapse identical exports first; the remaining rasters are
+bucketed by the bands of their hash (with ``max_distance + 1`` bands, any
+two hashes within ``max_distance`` bits share at least one band) and by
+the cell of their thumbnail's alpha bounding box, so sparse rasters whose
+hashes are mostly zero only meet the ones drawn in the same place. Each
+raster pairs with at most ``MAX_FANOUT`` bucket mates, and the pairs are
+compared in vectorized NumPy chunks of ``COMPARE_CHUNK``. Two asset keys
+merge when they match at every size they share; clusters are joined with
+union-find and collapse onto the key the specs use most.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+import hashlib
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Sequence
+
+from pipeline.spec.model import Asset, Spec
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+THUMB_PX = 32
+HASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 4
+# Mean absolute difference of premultiplied thumbnail channels (0..255).
+DEFAULT_TOLERANCE = 2.0
+# Thumbnail alpha at or below this is left out of the bounding box.
+ALPHA_FLOOR = 16
+# Bounding boxes of near-duplicates differ by at most this many thumbnail pixels per edge.
+BBOX_SLACK = 1
+BBOX_CELL = 4
+MAX_FANOUT = 32
+COMPARE_CHUNK = 4096
+# Cells paired with a bucket's own cell; the other neighbours pair with it from their side.
+_FORWARD_CELLS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+
+@dataclass(frozen=True, slots=True)
+class RasterFingerprint:
+    asset_key: str
+    size_px: int
+    digest: bytes
+    dhash: int
+    thumb: bytes
+    file_size: int = 0
+    # Alpha bounding box of the thumbnail, ``(0, 0, 0, 0)`` when empty.
+    bbox: tuple[int, int, int, int] = (0, 0, 0, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class AssetMerge:
+    source: str
+    target: str
+    sizes: tuple[int, ...]
+    distance: int
+    mean_diff: float
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "target": self.target,
+            "sizes": list(self.sizes),
+            "distance": self.distance,
+            "mean_diff": round(self.mean_diff, 3),
+        }
+
+
+@dataclass(slots=True)
+class DedupReport:
+    rasters: int
+    merges: list[AssetMerge] = field(default_factory=list)
+    saved_bytes: int = 0
+
+    @property
+    def mapping(self) -> dict[str, str]:
+        return {merge.source: merge.target for merge in self.merges}
+
+    def to_dict(self) -> dict:
+        return {
+            "rasters": self.rasters,
+            "saved_bytes": self.saved_bytes,
+            "merges": [merge.to_dict() for merge in self.merges],
+        }
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("NumPy required for raster dedup")
+
+
+def load_raster(path: Path, size_px: int) -> "Image.Image":
+    """Load an asset payload as RGBA: PNG, LVGL ``.bin`` or raw ``.rgba``."""
+    from PIL import Image
+
+    from pipeline.pack.decode import decode_lvgl_bin, decode_raw_rgba
+
+    suffix = path.suffix.lower()
+    if suffix == ".bin":
+        return decode_lvgl_bin(path.read_bytes())
+    if suffix in (".rgba", ".raw"):
+        return decode_raw_rgba(path.read_bytes(), size_px)
+    with Image.open(path) as image:
+        return image.convert("RGBA")
+
+
+def raster_fingerprint(
+    image: "Image.Image", asset_key: str = "", size_px: int = 0, file_size: int = 0
+) -> RasterFingerprint:
+    from PIL import Image
+
+    rgba = image.convert("RGBA")
+    digest = hashlib.sha1(
+        f"{rgba.width}x{rgba.height}:".encode("ascii") + rgba.tobytes()
+    ).digest()
+    # Premultiplied, so fully transparent pixels compare equal whatever their colour.
+    premul = rgba.convert("RGBa").resize((THUMB_PX, THUMB_PX), Image.Resampling.BOX)
+    # Luma + alpha keeps dark shapes on transparency distinguishable.
+    red, green, blue, alpha = premul.split()
+    luma = Image.merge("RGB", (red, green, blue)).convert("L")
+    gray = Image.blend(luma, alpha, 0.5).resize((9, 8), Image.Resampling.BOX)
+    bbox = alpha.point(lambda value: 255 if value > ALPHA_FLOOR else 0).getbbox()
+    pixels = gray.tobytes()
+    dhash = 0
+    for row in range(8):
+        for col in range(8):
+            dhash = (dhash << 1) | (pixels[row * 9 + col] < pixels[row * 9 + col + 1])
+    return RasterFingerprint(
+        asset_key, size_px, digest, dhash, premul.tobytes(), file_size, bbox or (0, 0, 0, 0)
+    )
+
+
+def _fingerprint_asset(task: tuple[str, int, str]) -> RasterFingerprint | None:
+    asset_key, size_px, path = task
+    try:
+        image = load_raster(Path(path), size_px)
+        file_size = os.path.getsize(path)
+    except (OSError, ValueError):
+        return None
+    return raster_fingerprint(image, asset_key, size_px, file_size)
+
+
+def fingerprint_assets(
+    assets: Iterable[Asset], root: Path, *, workers: int | None = 1
+) -> list[RasterFingerprint]:
+    """Fingerprint every readable asset payload; unreadable ones are skipped."""
+    tasks = [(asset.asset_key, asset.size_px, str(root / asset.path)) for asset in assets]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < 2:
+        results = [_fingerprint_asset(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fingerprint_asset, tasks, chunksize=32))
+    return [result for result in results if result is not None]
+
+
+def _bands(max_distance: int) -> list[tuple[int, int]]:
+    count = max(1, min(HASH_BITS, max_distance + 1))
+    width = HASH_BITS // count
+    bands = []
+    for index in range(count):
+        shift = index * width
+        bits = HASH_BITS - shift if index == count - 1 else width
+        bands.append((shift, (1 << bits) - 1))
+    return bands
+
+
+def _bbox_close(first: tuple[int, ...], second: tuple[int, ...]) -> bool:
+    return all(abs(a - b) <= BBOX_SLACK for a, b in zip(first, second))
+
+
+def _candidate_pairs(
+    prints: Sequence[RasterFingerprint], max_distance: int
+) -> set[tuple[int, int]]:
+    """Pairs sharing a hash band and a bounding-box neighbourhood, ``MAX_FANOUT`` per raster."""
+    pairs: set[tuple[int, int]] = set()
+    for shift, mask in _bands(max_distance):
+        buckets: dict[tuple[int, int, int], list[int]] = {}
+        for index, fp in enumerate(prints):
+            left, top = fp.bbox[0] // BBOX_CELL, fp.bbox[1] // BBOX_CELL
+            buckets.setdefault(((fp.dhash >> shift) & mask, left, top), []).append(index)
+        for (band, left, top), members in buckets.items():
+            mates = list(members)
+            for d_left, d_top in _FORWARD_CELLS:
+                mates += buckets.get((band, left + d_left, top + d_top), [])
+            mates.sort(key=lambda index: prints[index].bbox)
+            lefts = [prints[index].bbox[0] for index in mates]
+            for first in members:
+                bbox = prints[first].bbox
+                start = bisect_left(lefts, bbox[0] - BBOX_SLACK)
+                stop = bisect_right(lefts, bbox[0] + BBOX_SLACK)
+                taken = 0
+                for second in mates[start:stop]:
+                    if second == first or not _bbox_close(bbox, prints[second].bbox):
+                        continue
+                    pairs.add((min(first, second), max(first, second)))
+                    taken += 1
+                    if taken >= MAX_FANOUT:
+                        break
+    return pairs
+
+
+def _popcount(values: "np.ndarray") -> "np.ndarray":
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self._parent: dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        root = self._parent.setdefault(item, item)
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while item != root:
+            item, self._parent[item] = self._parent[item], root
+        return root
+
+    def union(self, first: str, second: str) -> None:
+        root_first = self.find(first)
+        root_second = self.find(second)
+        if root_first != root_second:
+            self._parent[max(root_first, root_second)] = min(root_first, root_second)
+
+    def groups(self) -> list[list[str]]:
+        grouped: dict[str, list[str]] = {}
+        for item in self._parent:
+            grouped.setdefault(self.find(item), []).append(item)
+        return [sorted(members) for members in grouped.values() if len(members) > 1]
+
+
+def _compare(
+    size_prints: list[RasterFingerprint], pairs: list[tuple[int, int]]
+) -> Iterator[tuple[tuple[int, int], int, float]]:
+    """Hamming distance and mean thumbnail difference of each pair, ``COMPARE_CHUNK`` at a time."""
+    if not pairs:
+        return
+    hashes = np.array([fp.dhash for fp in size_prints], dtype=np.uint64)
+    thumbs = np.frombuffer(b"".join(fp.thumb for fp in size_prints), dtype=np.uint8)
+    thumbs = thumbs.reshape(len(size_prints), -1)
+    for start in range(0, len(pairs), COMPARE_CHUNK):
+        chunk = pairs[start : start + COMPARE_CHUNK]
+        first = np.array([pair[0] for pair in chunk])
+        second = np.array([pair[1] for pair in chunk])
+        distances = _popcount(hashes[first] ^ hashes[second])
+        diffs = np.abs(
+            thumbs[first].astype(np.int16) - thumbs[second].astype(np.int16)
+        ).mean(axis=1)
+        yield from zip(chunk, distances.tolist(), diffs.tolist())
+
+
+def find_duplicates(
+    prints: Sequence[RasterFingerprint],
+    *,
+    usage: Mapping[str, int] | None = None,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> DedupReport:
+    """Propose ``source -> target`` asset merges for near-duplicate rasters.
+
+    A merge renames the source at every size, so the target must exist at
+    all of the source's sizes. Each cluster's canonical key is the one
+    exported at the most sizes, then the most used (``usage``: layer
+    references per key), then the shortest and smallest key.
+    """
+    _require_numpy()
+    if max_distance < 0 or tolerance < 0:
+        raise ValueError("max_distance and tolerance must be >= 0")
+    usage = usage or {}
+    sizes_by_key: dict[str, set[int]] = {}
+    for fp in prints:
+        sizes_by_key.setdefault(fp.asset_key, set()).add(fp.size_px)
+
+    # (key, key) -> {size: (distance, diff)} for every size the two keys matched at.
+    matched: dict[tuple[str, str], dict[int, tuple[int, float]]] = {}
+
+    def _match(first: str, second: str, size_px: int, distance: int, diff: float) -> None:
+        if first != second:
+            pair = (min(first, second), max(first, second))
+            matched.setdefault(pair, {})[size_px] = (distance, diff)
+
+    by_size: dict[int, list[RasterFingerprint]] = {}
+    for fp in prints:
+        by_size.setdefault(fp.size_px, []).append(fp)
+    for size_px, size_prints in by_size.items():
+        # Exact copies first: one representative per digest enters the hash buckets.
+        copies: dict[bytes, list[str]] = {}
+        unique: list[RasterFingerprint] = []
+        for fp in size_prints:
+            keys = copies.get(fp.digest)
+            if keys is None:
+                copies[fp.digest] = [fp.asset_key]
+                unique.append(fp)
+                continue
+            for key in keys:
+                _match(key, fp.asset_key, size_px, 0, 0.0)
+            keys.append(fp.asset_key)
+        pairs = sorted(_candidate_pairs(unique, max_distance))
+        for (first, second), distance, diff in _compare(unique, pairs):
+            if distance > max_distance or diff > tolerance:
+                continue
+            for left in copies[unique[first].digest]:
+                for right in copies[unique[second].digest]:
+                    _match(left, right, size_px, distance, diff)
+
+    union = _UnionFind()
+    for (first, second), per_size in matched.items():
+        first_sizes, second_sizes = sizes_by_key[first], sizes_by_key[second]
+        nested = first_sizes <= second_sizes or second_sizes <= first_sizes
+        common = first_sizes & second_sizes
+        if nested and common and common <= per_size.keys():
+            union.union(first, second)
+
+    file_sizes = {(fp.asset_key, fp.size_px): fp.file_size for fp in prints}
+    report = DedupReport(rasters=len(prints))
+    for members in union.groups():
+        target = min(
+            members,
+            key=lambda key: (-len(sizes_by_key[key]), -usage.get(key, 0), len(key), key),
+        )
+        for source in members:
+            if source == target:
+                continue
+            pair = (min(source, target), max(source, target))
+            per_size = matched.get(pair, {})
+            common = sizes_by_key[source] & sizes_by_key[target]
+            if not common or not common <= per_size.keys():
+                # Only chained to the target through other members: too far to merge.
+                continue
+            if common != sizes_by_key[source]:
+                # The target lacks some of the source's sizes: renaming would lose them.
+                continue
+            report.merges.append(
+                AssetMerge(
+                    source=source,
+                    target=target,
+                    sizes=tuple(sorted(common)),
+                    distance=max(per_size[size][0] for size in common),
+                    mean_diff=max(per_size[size][1] for size in common),
+                )
+            )
+            report.saved_bytes += sum(file_sizes.get((source, size), 0) for size in common)
+    report.merges.sort(key=lambda merge: (merge.target, merge.source))
+    return report
+
+
+def asset_usage(specs: Iterable[Spec]) -> dict[str, int]:
+    usage: dict[str, int] = {}
+    for spec in specs:
+        for layer in spec.layers:
+            usage[layer.asset] = usage.get(layer.asset, 0) + 1
+    return usage
+
+
+def apply_merges(specs: Iterable[Spec], mapping: Mapping[str, str]) -> tuple[list[Spec], int]:
+    """Copies of ``specs`` with merged layer assets renamed; also returns the layer count changed."""
+    result: list[Spec] = []
+    changed = 0
+    for spec in specs:
+        layers = []
+        for layer in spec.layers:
+            target = mapping.get(layer.asset)
+            if target is None:
+                layers.append(layer)
+                continue
+            layers.append(replace(layer, asset=target))
+            changed += 1
+        result.append(replace(spec, layers=layers))
+    return result, changed
+
+
+def merge_manifest(assets: Iterable[Asset], mapping: Mapping[str, str]) -> list[Asset]:
+    """Manifest assets without the merged-away keys."""
+    return [asset for asset in assets if asset.asset_key not in mapping]
@@ -0,0 +1,220 @@
+"""Asset manifest generation and stat-based change detection.
+
+The scanned layout follows assets-naming-and-packing.md:
+``<root>/<theme>/<size>/<asset>[_<size>].png|bin``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+from typing import Iterable, Mapping
+import zlib
+
+from pipeline.assets.naming import normalize_asset_key
+from pipeline.spec.model import Asset
+from pipeline.util.jsonl import JsonlWriter, iter_jsonl
+
+MANIFEST_VERSION = 1
+STAMP_VERSION = 1
+ASSET_SUFFIXES = (".bin", ".png")
+_CRC_CHUNK = 1 << 20
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    asset_key: str
+    size_px: int
+    path: str
+    theme: str
+    file_size: int
+    mtime_ns: int
+    crc32: int
+    type: str = "image"
+
+    def to_asset(self) -> Asset:
+        return Asset(asset_key=self.asset_key, size_px=self.size_px, path=self.path, type=self.type)
+
+    def to_dict(self) -> dict:
+        return {
+            "asset_key": self.asset_key,
+            "size_px": self.size_px,
+            "type": self.type,
+            "path": self.path,
+            "theme": self.theme,
+            "file_size": self.file_size,
+            "mtime_ns": self.mtime_ns,
+            "crc32": self.crc32,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ManifestEntry":
+        return cls(
+            asset_key=data["asset_key"],
+            size_px=int(data["size_px"]),
+            path=data["path"],
+            theme=data.get("theme", ""),
+            file_size=int(data.get("file_size", -1)),
+            mtime_ns=int(data.get("mtime_ns", -1)),
+            crc32=int(data.get("crc32", 0)),
+            type=data.get("type", "image"),
+        )
+
+
+def file_crc32(path: Path) -> int:
+    crc = 0
+    with path.open("rb") as handle:
+        while True:
+            chunk = handle.read(_CRC_CHUNK)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+    return crc & 0xFFFFFFFF
+
+
+def _asset_key_from_file(file_path: Path, size_px: int) -> str:
+    stem = file_path.stem
+    suffix = f"_{size_px}"
+    if stem.endswith(suffix):
+        stem = stem[: -len(suffix)]
+    return normalize_asset_key(stem)
+
+
+def scan_asset_tree(
+    root: Path,
+    *,
+    theme: str | None = None,
+    previous: Iterable[ManifestEntry] = (),
+) -> list[ManifestEntry]:
+    """Scan ``root`` and return one entry per asset file, sorted by theme/size/key.
+
+    CRCs of files whose size and mtime match ``previous`` are reused, so a
+    rescan of an unchanged tree only stats files.
+    """
+    known = {entry.path: entry for entry in previous}
+    entries: list[ManifestEntry] = []
+    seen: dict[tuple[str, int, str], str] = {}
+    for theme_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if theme is not None and theme_dir.name != theme:
+            continue
+        for size_dir in sorted(p for p in theme_dir.iterdir() if p.is_dir()):
+            if not size_dir.name.isdigit():
+                continue
+            size_px = int(size_dir.name)
+            for file_path in sorted(size_dir.iterdir()):
+                if file_path.suffix.lower() not in ASSET_SUFFIXES or not file_path.is_file():
+                    continue
+                rel_path = file_path.relative_to(root).as_posix()
+                asset_key = _asset_key_from_file(file_path, size_px)
+                slot = (theme_dir.name, size_px, asset_key)
+                if slot in seen:
+                    raise ValueError(f"duplicate asset {asset_key!r}: {seen[slot]} and {rel_path}")
+                seen[slot] = rel_path
+
+                stat = file_path.stat()
+                prior = known.get(rel_path)
+                if (
+                    prior is not None
+                    and prior.file_size == stat.st_size
+                    and prior.mtime_ns == stat.st_mtime_ns
+                ):
+                    crc32 = prior.crc32
+                else:
+                    crc32 = file_crc32(file_path)
+                entries.append(
+                    ManifestEntry(
+                        asset_key=asset_key,
+                        size_px=size_px,
+                        path=rel_path,
+                        theme=theme_dir.name,
+                        file_size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                        crc32=crc32,
+                    )
+                )
+    return entries
+
+
+def write_manifest(entries: Iterable[ManifestEntry], path: Path) -> None:
+    """Write a JSON manifest, or a JSONL manifest when ``path`` ends in ``.jsonl``."""
+    if path.suffix == ".jsonl":
+        with JsonlWriter(path, key=lambda r: f"{r['theme']}/{r['asset_key']}:{r['size_px']}") as writer:
+            for entry in entries:
+                writer.write(entry.to_dict())
+        return
+    data = {"version": MANIFEST_VERSION, "assets": [entry.to_dict() for entry in entries]}
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def load_manifest_entries(path: Path) -> list[ManifestEntry]:
+    if path.suffix == ".jsonl":
+        return [ManifestEntry.from_dict(record) for record in iter_jsonl(path)]  # type: ignore[arg-type]
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [ManifestEntry.from_dict(record) for record in data.get("assets", [])]
+
+
+def stamp_path_for(output: Path) -> Path:
+    return output.with_name(output.name + ".stamp.json")
+
+
+def _fingerprint(path: Path, prior: list | None) -> list:
+    stat = path.stat()
+    if prior is not None and prior[0] == stat.st_size and prior[1] == stat.st_mtime_ns:
+        return prior
+    return [stat.st_size, stat.st_mtime_ns, file_crc32(path)]
+
+
+def build_is_current(
+    output: Path, inputs: Iterable[Path], options: Mapping[str, object] | None = None
+) -> bool:
+    """Return True when ``output`` was built from exactly these, unchanged, inputs.
+
+    Inputs are compared by size and mtime first; only files whose stat
+    changed are re-read to compare CRCs, so touched-but-identical files do
+    not trigger a rebuild. ``options`` (build flags that change the output)
+    must also match the ones recorded.
+    """
+    stamp_path = stamp_path_for(output)
+    if not output.exists() or not stamp_path.exists():
+        return False
+    stamp = json.loads(stamp_path.read_text(encoding="utf-8"))
+    if stamp.get("version") != STAMP_VERSION:
+        return False
+    if stamp.get("output_size") != output.stat().st_size:
+        return False
+    if stamp.get("options", {}) != dict(options or {}):
+        return False
+    recorded: dict[str, list] = stamp.get("inputs", {})
+    keys = [str(path) for path in inputs]
+    if set(keys) != set(recorded):
+        return False
+    for key in keys:
+        path = Path(key)
+        if not path.exists():
+            return False
+        prior = recorded[key]
+        stat = path.stat()
+        if prior[0] == stat.st_size and prior[1] == stat.st_mtime_ns:
+            continue
+        if prior[0] != stat.st_size or prior[2] != file_crc32(path):
+            return False
+    return True
+
+
+def write_build_stamp(
+    output: Path, inputs: Iterable[Path], options: Mapping[str, object] | None = None
+) -> None:
+    """Record the fingerprint of every input next to ``output``."""
+    stamp_path = stamp_path_for(output)
+    recorded: dict[str, list] = {}
+    if stamp_path.exists():
+        recorded = json.loads(stamp_path.read_text(encoding="utf-8")).get("inputs", {})
+    data = {
+        "version": STAMP_VERSION,
+        "output_size": output.stat().st_size,
+        "inputs": {str(path): _fingerprint(path, recorded.get(str(path))) for path in inputs},
+    }
+    if options:
+        data["options"] = dict(options)
+    stamp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
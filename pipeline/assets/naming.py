@@ -11,3 +11,8 @@ def normalize_asset_key(key: str) -> str:
     if not _ASSET_KEY_RE.match(normalized):
         raise ValueError(f"invalid asset_key: {key!r}")
     return normalized
+
+
+def default_asset_path(asset_key: str, size_px: int) -> str:
+    """Raster file name ``<asset>_<size>.png``."""
+    return f"{asset_key}_{size_px}.png"
@@ -0,0 +1,198 @@
+"""Bulk loading and JSON-lines catalogs for wx.spec v1 specs and asset manifests."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from pipeline.assets.naming import normalize_asset_key
+from pipeline.spec.model import Asset, Spec
+from pipeline.util.jsonl import (
+    JsonlWriter,
+    build_jsonl_index,
+    iter_jsonl,
+    iter_jsonl_lines,
+    load_jsonl_index,
+    read_jsonl_record,
+)
+from pipeline.wxspec import parse_spec_dict, spec_to_dict
+
+_DEFAULT_BATCH_SIZE = 64
+
+
+@dataclass(slots=True)
+class SpecLoadResult:
+    """Outcome of loading one spec: ``spec`` on success, ``error`` otherwise."""
+
+    source: str
+    spec: Spec | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# A task is (source label, JSON text or None to read the source file).
+_Task = tuple[str, str | None]
+
+
+def _iter_tasks(path: Path) -> Iterator[_Task]:
+    if path.is_dir():
+        for file_path in sorted(path.rglob("*.json")):
+            yield str(file_path), None
+        return
+    if path.suffix == ".jsonl":
+        for line_no, line in iter_jsonl_lines(path):
+            yield f"{path}:{line_no}", line
+        return
+    yield str(path), None
+
+
+def _load_task(task: _Task, compact: bool) -> SpecLoadResult:
+    source, text = task
+    try:
+        if text is None:
+            text = Path(source).read_text(encoding="utf-8")
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("root JSON must be an object")
+        return SpecLoadResult(source=source, spec=parse_spec_dict(data, compact=compact))
+    except Exception as exc:  # noqa: BLE001 - failures are reported per source
+        return SpecLoadResult(source=source, error=f"{type(exc).__name__}: {exc}")
+
+
+def _load_batch(batch: list[_Task], compact: bool) -> list[SpecLoadResult]:
+    return [_load_task(task, compact) for task in batch]
+
+
+def _batched(tasks: Iterable[_Task], size: int) -> Iterator[list[_Task]]:
+    iterator = iter(tasks)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_specs(
+    source: Path | str,
+    *,
+    workers: int | None = None,
+    batch_size: int = _DEFAULT_BATCH_SIZE,
+    compact: bool = False,
+) -> Iterator[SpecLoadResult]:
+    """Stream specs from a directory of ``*.json`` files or a ``.jsonl`` catalog.
+
+    Decoding and validation run in a process pool (``workers`` processes,
+    default ``os.cpu_count()``; ``workers=1`` stays in-process). Results are
+    yielded in source order and at most ``2 * workers`` batches are in
+    flight, so memory does not grow with the catalog size.
+    """
+    tasks = _iter_tasks(Path(source))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for task in tasks:
+            yield _load_task(task, compact)
+        return
+
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[list[SpecLoadResult]]] = deque()
+        for batch in _batched(tasks, batch_size):
+            pending.append(pool.submit(_load_batch, batch, compact))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def load_specs(
+    source: Path | str,
+    *,
+    workers: int | None = None,
+    compact: bool = False,
+) -> tuple[list[Spec], dict[str, str]]:
+    """Load a whole catalog; return ``(specs, failures)`` with failures per source."""
+    specs: list[Spec] = []
+    failures: dict[str, str] = {}
+    for result in iter_specs(source, workers=workers, compact=compact):
+        if result.spec is not None:
+            specs.append(result.spec)
+        else:
+            failures[result.source] = result.error or "unknown error"
+    return specs, failures
+
+
+def _spec_index_key(record: dict) -> str:
+    return str(record["name"])
+
+
+def write_spec_catalog(specs: Iterable[Spec], path: Path) -> int:
+    """Write validated specs to a JSONL catalog plus its offset index; return the count."""
+    count = 0
+    with JsonlWriter(path, key=_spec_index_key) as writer:
+        for spec in specs:
+            writer.write(spec_to_dict(spec))
+            count += 1
+    return count
+
+
+def read_catalog_spec(path: Path, name: str, *, compact: bool = False) -> Spec:
+    """Load one spec by name from a JSONL catalog, seeking via the sidecar index.
+
+    A missing or stale index is rebuilt with a single scan of the catalog.
+    """
+    index = load_jsonl_index(path)
+    if index is None:
+        index = build_jsonl_index(path, _spec_index_key)
+    entry = index.get(normalize_asset_key(name))
+    if entry is None:
+        raise KeyError(f"spec not found in catalog: {name!r}")
+    data = read_jsonl_record(path, *entry)
+    if not isinstance(data, dict):
+        raise ValueError("catalog record must be an object")
+    return parse_spec_dict(data, compact=compact)
+
+
+def _asset_from_entry(entry: dict) -> Asset:
+    return Asset(
+        asset_key=entry["asset_key"],
+        size_px=entry["size_px"],
+        type=entry.get("type", "image"),
+        path=entry["path"],
+    )
+
+
+def iter_manifest_assets(path: Path) -> Iterator[Asset]:
+    """Yield assets from a JSON manifest (``{"assets": [...]}``) or a JSONL manifest."""
+    if path.suffix == ".jsonl":
+        for entry in iter_jsonl(path):
+            if not isinstance(entry, dict):
+                raise ValueError(f"{path}: manifest line must be an object")
+            yield _asset_from_entry(entry)
+        return
+    with path.open("r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    for entry in data.get("assets", []):
+        yield _asset_from_entry(entry)
+
+
+def _asset_index_key(record: dict) -> str:
+    return f"{record['asset_key']}:{record['size_px']}"
+
+
+def write_manifest_catalog(assets: Iterable[Asset], path: Path) -> int:
+    """Write assets to a JSONL manifest indexed by ``<asset_key>:<size_px>``."""
+    count = 0
+    with JsonlWriter(path, key=_asset_index_key) as writer:
+        for asset in assets:
+            writer.write(asset.to_dict())
+            count += 1
+    return count
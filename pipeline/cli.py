@@ -5,12 +5,49 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pipeline.mapping import map_svg_to_spec
+from pipeline.assets.manifest import (
+    MANIFEST_VERSION,
+    build_is_current,
+    load_manifest_entries,
+    scan_asset_tree,
+    write_build_stamp,
+    write_manifest,
+)
+from pipeline.assets.dedup import (
+    DEFAULT_MAX_DISTANCE,
+    DEFAULT_TOLERANCE,
+    apply_merges,
+    asset_usage,
+    find_duplicates,
+    fingerprint_assets,
+    merge_manifest,
+)
+from pipeline.catalog import (
+    iter_manifest_assets,
+    iter_specs,
+    write_manifest_catalog,
+    write_spec_catalog,
+)
+from pipeline.config import DEFAULT_TICK_MS
+from pipeline.fx.quantize import QuantizeReport, quantize_specs
+from pipeline.mapping import map_svg_to_sizes, map_svg_to_spec, shared_asset_count
+from pipeline.svg.pivot import DEFAULT_TOLERANCE_PX, apply_pivots, solve_pivots
+from pipeline.validation.budget import (
+    DeviceProfile,
+    ScreenBudget,
+    budget_errors,
+    estimate_spec_cost,
+    screen_totals,
+)
 from pipeline.wxpk import build_pack_from_files
 from pipeline.wxspec import dumps_spec
 from pipeline.wxspec import parse_spec_dict
-from pipeline.spec.model import Asset
+from pipeline.spec.model import Asset, Spec
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from pipeline.pack.reader import PackReader
 
 
 def _load_spec(path: Path) -> dict:
@@ -19,40 +56,94 @@ def _load_spec(path: Path) -> dict:
 
 
 def _load_manifest(path: Path) -> list[Asset]:
-    with path.open("r", encoding="utf-8") as handle:
-        data = json.load(handle)
-    assets = []
-    for entry in data.get("assets", []):
-        assets.append(
-            Asset(
-                asset_key=entry["asset_key"],
-                size_px=entry["size_px"],
-                type=entry.get("type", "image"),
-                path=entry["path"],
-            )
-        )
+    assets = list(iter_manifest_assets(path))
     if not assets:
         raise ValueError("manifest contains no assets")
     return assets
 
 
+def _pack_inputs(source: Path, manifest_path: Path, assets: list[Asset], root: Path) -> list[Path]:
+    return [source, manifest_path] + [root / asset.path for asset in assets]
+
+
 def _cmd_pack(args: argparse.Namespace) -> int:
-    spec_path = Path(args.spec)
-    if not spec_path.exists():
-        raise FileNotFoundError(f"spec not found: {spec_path}")
+    spec_paths = [Path(raw) for raw in args.spec]
+    for spec_path in spec_paths:
+        if not spec_path.exists():
+            raise FileNotFoundError(f"spec not found: {spec_path}")
 
-    assets_root = Path(args.assets_root) if args.assets_root else spec_path.parent
-    spec_dict = _load_spec(spec_path)
-    spec = parse_spec_dict(spec_dict)
+    assets_root = Path(args.assets_root) if args.assets_root else spec_paths[0].parent
     manifest_path = Path(args.manifest)
     assets = _load_manifest(manifest_path)
-
-    pack = build_pack_from_files([spec], assets, assets_root)
     output_path = Path(args.output)
+    inputs = spec_paths[1:] + _pack_inputs(spec_paths[0], manifest_path, assets, assets_root)
+    options = {"shared_timers": args.shared_timers}
+    if not args.force and build_is_current(output_path, inputs, options):
+        write_build_stamp(output_path, inputs, options)
+        print(f"pack up to date: {output_path}")
+        return 0
+
+    specs = [parse_spec_dict(_load_spec(spec_path)) for spec_path in spec_paths]
+    pack = build_pack_from_files(
+        specs, assets, assets_root, shared_timers=args.shared_timers
+    )
     output_path.write_bytes(pack)
+    write_build_stamp(output_path, inputs, options)
     return 0
 
 
+def _print_quantize_report(report: QuantizeReport) -> None:
+    print(
+        f"{len(report.changes)} timing value(s) moved to the {report.tick_ms} ms tick, "
+        f"{report.timer_count} shared period(s); max deviation "
+        f"{report.max_deviation_ms} ms ({report.max_deviation_ratio:.1%})"
+    )
+
+
+def _quantize_mapped(spec, args: argparse.Namespace):
+    if not args.tick_ms:
+        return spec
+    (spec,), report = quantize_specs([spec], tick_ms=args.tick_ms)
+    _print_quantize_report(report)
+    return spec
+
+
+def _print_shared_assets(spec: Spec) -> None:
+    saved = shared_asset_count(spec)
+    if saved:
+        assets = len(spec.layers) - saved
+        print(f"{len(spec.layers)} layer(s) share {assets} asset(s): {saved} asset(s) saved")
+
+
+def _flatten_mapped(spec: Spec, svg_path: Path, args: argparse.Namespace) -> Spec:
+    """Merge static layer runs; bake their rasters from the SVG into ``--bake-dir``."""
+    from pipeline.preview.source import SvgLayerSource, default_asset_path, infer_svg_size
+    from pipeline.spec.flatten import flatten_static_layers
+
+    result = flatten_static_layers(spec)
+    if not result.baked:
+        return spec
+    size_px = args.size_px or infer_svg_size(svg_path) or 64
+    before = estimate_spec_cost(spec, size_px=size_px).blend_px
+    after = estimate_spec_cost(result.spec, size_px=size_px).blend_px
+    print(
+        f"flattened {result.layers_before} layer(s) to {len(result.spec.layers)}: "
+        f"{result.assets_saved} asset(s) and {before - after} blended px/frame saved"
+    )
+    if args.bake_dir:
+        source = SvgLayerSource.load(svg_path)
+        if source is None or len(source) != result.layers_before:
+            raise ValueError("cannot bake: spec layers do not match the SVG's auto layers")
+        bake_dir = Path(args.bake_dir)
+        bake_dir.mkdir(parents=True, exist_ok=True)
+        for baked in result.baked:
+            png = source.bake(size_px, baked.sources)
+            if png is None:
+                raise RuntimeError("no SVG rasterizer available (cairosvg or rsvg-convert)")
+            (bake_dir / default_asset_path(baked.asset, size_px)).write_bytes(png)
+    return result.spec
+
+
 def _cmd_map(args: argparse.Namespace) -> int:
     svg_path = Path(args.svg)
     if not svg_path.exists():
@@ -63,6 +154,10 @@ def _cmd_map(args: argparse.Namespace) -> int:
         spec_id=args.spec_id,
         size_px=args.size_px,
     )
+    _print_shared_assets(spec)
+    if args.flatten:
+        spec = _flatten_mapped(spec, svg_path, args)
+    spec = _quantize_mapped(spec, args)
     output_path = Path(args.output)
     output_path.write_text(dumps_spec(spec, indent=2), encoding="utf-8")
     return 0
@@ -73,21 +168,555 @@ def _cmd_map_pack(args: argparse.Namespace) -> int:
     if not svg_path.exists():
         raise FileNotFoundError(f"svg not found: {svg_path}")
 
+    assets_root = Path(args.assets_root) if args.assets_root else svg_path.parent
+    manifest_path = Path(args.manifest)
+    assets = _load_manifest(manifest_path)
+    output_path = Path(args.output)
+    inputs = _pack_inputs(svg_path, manifest_path, assets, assets_root)
+    options = {
+        "spec_id": args.spec_id,
+        "size_px": args.size_px,
+        "tick_ms": args.tick_ms,
+        "shared_timers": args.shared_timers,
+    }
+    if not args.force and build_is_current(output_path, inputs, options):
+        write_build_stamp(output_path, inputs, options)
+        print(f"pack up to date: {output_path}")
+        return 0
+
     spec = map_svg_to_spec(
         svg_path,
         spec_id=args.spec_id,
         size_px=args.size_px,
     )
+    _print_shared_assets(spec)
+    spec = _quantize_mapped(spec, args)
+    pack = build_pack_from_files(
+        [spec], assets, assets_root, shared_timers=args.shared_timers
+    )
+    output_path.write_bytes(pack)
+    write_build_stamp(output_path, inputs, options)
+    return 0
+
+
+def _cmd_map_sizes(args: argparse.Namespace) -> int:
+    from pipeline.mapping_raster import rasterize_sizes
+
+    svg_path = Path(args.svg)
+    if not svg_path.exists():
+        raise FileNotFoundError(f"svg not found: {svg_path}")
+
+    mapping = map_svg_to_sizes(svg_path, args.size_px, spec_id=args.spec_id)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for size_px, spec in mapping.specs.items():
+        stem = output_dir / f"{spec.name}_{size_px}"
+        stem.with_suffix(".json").write_text(dumps_spec(spec, indent=2), encoding="utf-8")
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "assets": [asset.to_dict() for asset in spec.assets],
+        }
+        stem.with_suffix(".manifest.json").write_text(
+            json.dumps(manifest, indent=2), encoding="utf-8"
+        )
+    if args.assets_dir:
+        written = rasterize_sizes(mapping, Path(args.assets_dir), workers=args.workers)
+        print(f"{len(written)} asset(s) rendered at {len(mapping.specs)} size(s)")
+    return 0
+
+
+def _cmd_split_base(args: argparse.Namespace) -> int:
+    from pipeline.preview.source import SvgLayerSource, default_asset_path, infer_svg_size
+    from pipeline.svg.split import render_split, split_base, split_spec
+
+    svg_path = Path(args.svg)
+    if not svg_path.exists():
+        raise FileNotFoundError(f"svg not found: {svg_path}")
+    source = SvgLayerSource.load(svg_path)
+    if source is None:
+        raise ValueError(f"invalid svg: {svg_path}")
+
+    sizes = args.size_px or [infer_svg_size(svg_path) or 64]
+    spec = map_svg_to_spec(svg_path, spec_id=args.spec_id, size_px=sizes[0])
+    animated = [index for index, layer in enumerate(spec.layers) if layer.fx]
+    split = split_base(source, animated=animated, strict=args.strict)
+    split_result, plan = split_spec(spec, split)
+    before = estimate_spec_cost(spec, size_px=sizes[0]).blend_px
+    after = estimate_spec_cost(split_result, size_px=sizes[0]).blend_px
+    position = split.z_order.base_position if split.z_order else "none"
+    print(
+        f"split {len(spec.layers)} layer(s) into {len(split_result.layers)} "
+        f"(base {position}): {before - after} blended px/frame saved"
+    )
+    if args.assets_dir:
+        assets_dir = Path(args.assets_dir)
+        assets_dir.mkdir(parents=True, exist_ok=True)
+        for size_px in sizes:
+            for asset, png in render_split(source, plan, size_px).items():
+                (assets_dir / default_asset_path(asset, size_px)).write_bytes(png)
+    if args.report:
+        report = split.to_dict()
+        report["plan"] = {asset: list(indices) for asset, indices in plan.items()}
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    Path(args.output).write_text(dumps_spec(split_result, indent=2), encoding="utf-8")
+    return 0
+
+
+def _cmd_overlays(args: argparse.Namespace) -> int:
+    from pipeline.svg.overlays import write_overlays, write_overlays_dir
+
+    source = Path(args.svg)
+    if not source.exists():
+        raise FileNotFoundError(f"svg not found: {source}")
+    options = {
+        "size_px": args.size_px,
+        "allow_path_overlay": args.allow_path_overlay,
+        "strict": args.strict,
+    }
+    if not source.is_dir():
+        document = write_overlays(source, Path(args.output), **options)
+        print(f"{source}: {len(document['overlays'])} overlay(s)")
+        return 0
+
+    failed = 0
+    results = write_overlays_dir(source, Path(args.output), workers=args.workers, **options)
+    for svg_path, count, error in results:
+        if error is not None:
+            failed += 1
+            print(f"{svg_path}: {error}")
+    print(f"{len(results) - failed} overlays.json written to {args.output}, {failed} failed")
+    return 1 if failed else 0
+
+
+def _cmd_pivots(args: argparse.Namespace) -> int:
+    import xml.etree.ElementTree as ET
+
+    from pipeline.preview.source import default_asset_path, infer_svg_size
+    from pipeline.raster import load_pil_image
+
+    svg_path = Path(args.svg)
+    if not svg_path.exists():
+        raise FileNotFoundError(f"svg not found: {svg_path}")
+    sizes = args.size_px or [infer_svg_size(svg_path) or 64]
+    if args.spec:
+        spec = parse_spec_dict(_load_spec(Path(args.spec)))
+    else:
+        spec = map_svg_to_spec(svg_path, spec_id=args.spec_id, size_px=args.spec_size_px)
+
+    bitmaps = {}
+    if args.assets_dir:
+        for layer in spec.layers:
+            path = Path(args.assets_dir) / default_asset_path(layer.asset, max(sizes))
+            image = load_pil_image(path.read_bytes()) if path.exists() else None
+            if image is not None:
+                bitmaps[layer.asset] = image
+
+    report = solve_pivots(
+        ET.parse(svg_path).getroot(),
+        spec,
+        sizes=sizes,
+        bitmaps=bitmaps,
+        tolerance_px=args.tolerance_px,
+        spec_size_px=args.spec_size_px,
+    )
+    for estimate in report.estimates:
+        pivots = ", ".join(f"{size}px {estimate.at(size)}" for size in sizes)
+        print(f"{estimate.layer_id} ({estimate.fx_key}): {pivots}")
+    for warning in report.warnings:
+        print(f"warning: {warning}")
+    if args.report:
+        Path(args.report).write_text(
+            json.dumps(report.to_dict(sizes), indent=2) + "\n", encoding="utf-8"
+        )
+    if args.output:
+        spec = apply_pivots(spec, report, sizes[0])
+        Path(args.output).write_text(dumps_spec(spec, indent=2), encoding="utf-8")
+    return 0
+
+
+def _cmd_manifest(args: argparse.Namespace) -> int:
+    root = Path(args.root)
+    if not root.is_dir():
+        raise FileNotFoundError(f"assets root not found: {root}")
 
-    assets_root = Path(args.assets_root) if args.assets_root else svg_path.parent
-    manifest_path = Path(args.manifest)
-    assets = _load_manifest(manifest_path)
-    pack = build_pack_from_files([spec], assets, assets_root)
     output_path = Path(args.output)
-    output_path.write_bytes(pack)
+    previous = load_manifest_entries(output_path) if output_path.exists() else []
+    entries = scan_asset_tree(root, theme=args.theme, previous=previous)
+    if not entries:
+        raise ValueError(f"no assets found under {root}")
+    write_manifest(entries, output_path)
+    print(f"{len(entries)} asset(s) written to {output_path}")
+    return 0
+
+
+def _cmd_validate(args: argparse.Namespace) -> int:
+    source = Path(args.specs)
+    if not source.exists():
+        raise FileNotFoundError(f"specs not found: {source}")
+
+    ok_count = 0
+    failed = 0
+    for result in iter_specs(source, workers=args.workers):
+        if result.ok:
+            ok_count += 1
+            continue
+        failed += 1
+        print(f"{result.source}: {result.error}")
+    print(f"{ok_count} spec(s) valid, {failed} failed")
+    return 1 if failed else 0
+
+
+def _cmd_catalog(args: argparse.Namespace) -> int:
+    source = Path(args.specs)
+    if not source.exists():
+        raise FileNotFoundError(f"specs not found: {source}")
+
+    failed = 0
+
+    def _valid_specs():
+        nonlocal failed
+        for result in iter_specs(source, workers=args.workers):
+            if result.spec is not None:
+                yield result.spec
+                continue
+            failed += 1
+            print(f"{result.source}: {result.error}")
+
+    count = write_spec_catalog(_valid_specs(), Path(args.output))
+    print(f"{count} spec(s) written to {args.output}, {failed} failed")
+    return 1 if failed else 0
+
+
+def _cmd_budget(args: argparse.Namespace) -> int:
+    assets = _load_manifest(Path(args.manifest)) if args.manifest else []
+    profile = DeviceProfile(color_depth=args.color_depth)
+    budget = ScreenBudget(
+        fps=args.fps,
+        cpu_share=args.cpu_share,
+        max_dirty_px=args.max_dirty_px,
+        max_blend_px=args.max_blend_px,
+        max_rotated_px=args.max_rotated_px,
+        max_ram_bytes=args.max_ram_bytes,
+    )
+
+    costs = []
+    for raw_path in args.spec:
+        spec_path = Path(raw_path)
+        if not spec_path.exists():
+            raise FileNotFoundError(f"spec not found: {spec_path}")
+        spec = parse_spec_dict(_load_spec(spec_path))
+        costs.append(
+            estimate_spec_cost(
+                spec, assets, size_px=args.size_px, fps=args.fps, profile=profile
+            )
+        )
+    total = screen_totals(costs)
+
+    for cost in costs + [total]:
+        print(
+            f"{cost.name}: dirty {cost.dirty_px} px, blend {cost.blend_px} px, "
+            f"rotated {cost.rotated_px} px, {cost.anims} anim(s), "
+            f"ram {cost.ram_bytes} B, ~{cost.frame_us:.0f} us/frame"
+        )
+    errors = budget_errors(total, budget)
+    if args.report:
+        report = {
+            "fps": budget.fps,
+            "frame_budget_us": round(budget.frame_us, 1),
+            "specs": [cost.to_dict() for cost in costs],
+            "screen": total.to_dict(),
+            "errors": errors,
+        }
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    for error in errors:
+        print(f"over budget: {error}")
+    return 1 if errors else 0
+
+
+def _cmd_dirty_rects(args: argparse.Namespace) -> int:
+    from pipeline.fx.dirty import annotate_dirty_rects
+    from pipeline.preview.render import load_asset_bitmaps
+    from pipeline.preview.source import SvgLayerSource, spec_layers
+    from pipeline.raster import has_pillow
+
+    if not has_pillow():
+        raise RuntimeError("dirty-rects requires Pillow")
+    spec_path = Path(args.spec)
+    if not spec_path.exists():
+        raise FileNotFoundError(f"spec not found: {spec_path}")
+    spec = parse_spec_dict(_load_spec(spec_path))
+    assets_root = Path(args.assets_root) if args.assets_root else spec_path.parent
+
+    spec_dict = spec.to_dict()
+    if args.manifest:
+        spec_dict["assets"] = [
+            asset.to_dict()
+            for asset in _load_manifest(Path(args.manifest))
+            if asset.size_px == args.size_px
+        ]
+    svg = SvgLayerSource.load(Path(args.svg)) if args.svg else None
+    layer_index = svg.layer_index_map(spec_layers(spec_dict)) if svg is not None else {}
+    bitmaps = load_asset_bitmaps(spec_dict, assets_root, args.size_px, svg, layer_index)
+
+    count = annotate_dirty_rects(spec, bitmaps, alpha_threshold=args.alpha_threshold)
+    for layer in spec.layers:
+        if layer.dirty is not None:
+            x, y, w, h = layer.dirty
+            print(f"{layer.layer_id}: x={x} y={y} w={w} h={h}")
+        elif layer.asset not in bitmaps and layer.fx:
+            print(f"{layer.layer_id}: no bitmap for {layer.asset}, invalidates whole icon")
+    Path(args.output).write_text(dumps_spec(spec, indent=2), encoding="utf-8")
+    print(f"{count} layer(s) annotated in {args.output}")
+    return 0
+
+
+def _pack_spec(reader: "PackReader", name: str | None) -> dict:
+    """The spec called ``name`` in the pack, or its only spec when ``name`` is None."""
+    if name:
+        spec = reader.spec_by_name(name)
+        if spec is None:
+            raise ValueError(f"spec {name!r} not found in pack")
+        return parse_spec_dict(spec).to_dict()
+    spec_ids = reader.spec_ids()
+    if len(spec_ids) != 1:
+        raise ValueError(f"pack holds {len(spec_ids)} specs; pick one with --name")
+    return parse_spec_dict(reader.spec(spec_ids[0]) or {}).to_dict()
+
+
+def _cmd_render_anim(args: argparse.Namespace) -> int:
+    from pipeline.preview.compose import has_numpy
+    from pipeline.preview.render import (
+        load_asset_bitmaps,
+        percentile,
+        render_frames,
+    )
+    from pipeline.preview.source import SvgLayerSource, infer_svg_size, spec_layers
+    from pipeline.raster import has_pillow
+
+    if not has_numpy() or not has_pillow():
+        raise RuntimeError("render-anim requires NumPy and Pillow")
+    if not args.spec and not args.svg and not args.pack:
+        raise ValueError("render-anim needs --spec, --svg or --pack")
+    if args.frames <= 0:
+        raise ValueError("--frames must be > 0")
+
+    svg_path = Path(args.svg) if args.svg else None
+    if svg_path is not None and not svg_path.exists():
+        raise FileNotFoundError(f"svg not found: {svg_path}")
+    reader = None
+    if args.pack:
+        from pipeline.pack.reader import PackReader, load_pack_bitmaps
+
+        reader = PackReader.open(Path(args.pack))
+        try:
+            spec = _pack_spec(reader, args.name)
+        except Exception:
+            reader.close()
+            raise
+        source_dir = Path(args.pack).parent
+    elif args.spec:
+        spec_path = Path(args.spec)
+        if not spec_path.exists():
+            raise FileNotFoundError(f"spec not found: {spec_path}")
+        spec = parse_spec_dict(_load_spec(spec_path)).to_dict()
+        source_dir = spec_path.parent
+    else:
+        spec = map_svg_to_spec(svg_path, size_px=args.size_px).to_dict()
+        source_dir = svg_path.parent
+    assets_root = Path(args.assets_root) if args.assets_root else source_dir
+
+    size_px = args.size_px or int(spec.get("size_px", 0) or 0)
+    if not size_px and reader is not None:
+        size_px = max(
+            (size for layer in spec_layers(spec) for size in reader.image_sizes(layer["asset"])),
+            default=0,
+        )
+    if not size_px and svg_path is not None:
+        size_px = infer_svg_size(svg_path) or 0
+    size_px = size_px or 64
+
+    svg = SvgLayerSource.load(svg_path) if svg_path is not None else None
+    layer_index = svg.layer_index_map(spec_layers(spec)) if svg is not None else {}
+    anim_kinds = svg.anim_kinds if svg is not None else {}
+    if reader is not None:
+        with reader:
+            bitmaps = load_pack_bitmaps(reader, spec, size_px)
+        if not bitmaps:
+            raise ValueError("pack has no image for the spec's layers")
+    else:
+        bitmaps = load_asset_bitmaps(spec, assets_root, size_px, svg, layer_index)
+    if not bitmaps:
+        raise ValueError("no PNG+alpha assets or SVG rasters available")
+
+    out_dir = Path(args.out_dir) if args.out_dir else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    raw_handle = Path(args.raw).open("wb") if args.raw else None
+    digests: list[str] = []
+    costs: list[float] = []
+    try:
+        for frame in render_frames(
+            (spec, bitmaps, size_px),
+            {
+                "scale": args.scale,
+                "fps": args.fps,
+                "seed": args.seed,
+                "layer_index": layer_index,
+                "anim_kinds": anim_kinds,
+            },
+            args.frames,
+            workers=args.workers,
+            out_dir=out_dir,
+            keep_rgba=raw_handle is not None,
+        ):
+            if raw_handle is not None and frame.rgba is not None:
+                raw_handle.write(frame.rgba)
+            digests.append(frame.digest)
+            costs.append(frame.compose_ms)
+    finally:
+        if raw_handle is not None:
+            raw_handle.close()
+
+    frame_size = size_px * args.scale
+    golden = {
+        "size": frame_size,
+        "fps": args.fps,
+        "seed": args.seed,
+        "frames": digests,
+    }
+    if args.hashes:
+        Path(args.hashes).write_text(json.dumps(golden, indent=2) + "\n", encoding="utf-8")
+    if args.report:
+        report = dict(golden, compose_ms=[round(cost, 3) for cost in costs])
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    mean = sum(costs) / len(costs)
+    print(
+        f"{len(digests)} frame(s) {frame_size}x{frame_size} @ {args.fps:g} fps: "
+        f"compose mean {mean:.2f} ms, p95 {percentile(costs, 0.95):.2f} ms, "
+        f"max {max(costs):.2f} ms"
+    )
+
+    if args.check_hashes:
+        expected = json.loads(Path(args.check_hashes).read_text(encoding="utf-8"))
+        for field_name in ("size", "fps", "seed"):
+            if expected.get(field_name) != golden[field_name]:
+                print(f"golden {field_name} {expected.get(field_name)} != {golden[field_name]}")
+                return 1
+        expected_frames = list(expected.get("frames", []))
+        if len(expected_frames) != len(digests):
+            print(f"golden has {len(expected_frames)} frame(s), rendered {len(digests)}")
+            return 1
+        mismatched = [
+            index
+            for index, digest in enumerate(digests)
+            if expected_frames[index] != digest
+        ]
+        if mismatched:
+            shown = ", ".join(str(index) for index in mismatched[:10])
+            print(f"{len(mismatched)} frame(s) differ from golden hashes: {shown}")
+            return 1
+        print("frames match golden hashes")
     return 0
 
 
+def _load_theme_specs(source: Path, workers: int | None) -> tuple[list[Spec], int]:
+    """Specs of a directory or .jsonl catalog, printing (and counting) the failures."""
+    if not source.exists():
+        raise FileNotFoundError(f"specs not found: {source}")
+    specs = []
+    failed = 0
+    for result in iter_specs(source, workers=workers):
+        if result.spec is None:
+            failed += 1
+            print(f"{result.source}: {result.error}")
+            continue
+        specs.append(result.spec)
+    return specs, failed
+
+
+def _write_theme_specs(specs: list[Spec], output: Path) -> None:
+    """Write specs to a .jsonl catalog, or one ``<name>.json`` each into a directory."""
+    if output.suffix == ".jsonl":
+        write_spec_catalog(specs, output)
+        return
+    output.mkdir(parents=True, exist_ok=True)
+    for spec in specs:
+        (output / f"{spec.name}.json").write_text(dumps_spec(spec, indent=2), encoding="utf-8")
+
+
+def _cmd_quantize(args: argparse.Namespace) -> int:
+    specs, failed = _load_theme_specs(Path(args.specs), args.workers)
+    tolerance = None if args.no_share else args.tolerance
+    quantized, report = quantize_specs(specs, tick_ms=args.tick_ms, tolerance=tolerance)
+
+    _write_theme_specs(quantized, Path(args.output))
+    if args.verbose:
+        for change in report.changes:
+            print(
+                f"{change.spec} {change.fx}.{change.field}: "
+                f"{change.before} -> {change.after} ms"
+            )
+    _print_quantize_report(report)
+    if args.max_deviation_ms is not None and report.max_deviation_ms > args.max_deviation_ms:
+        print(f"max deviation exceeds {args.max_deviation_ms} ms")
+        return 1
+    return 1 if failed else 0
+
+
+def _write_manifest_without(source: Path, output: Path, mapping: dict[str, str]) -> int:
+    """Copy a JSON or JSONL manifest without the merged-away asset keys; return the kept count."""
+    if source.suffix == ".jsonl":
+        kept_assets = merge_manifest(iter_manifest_assets(source), mapping)
+        return write_manifest_catalog(kept_assets, output)
+    data = json.loads(source.read_text(encoding="utf-8"))
+    kept = [entry for entry in data.get("assets", []) if entry.get("asset_key") not in mapping]
+    data["assets"] = kept
+    output.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    return len(kept)
+
+
+def _cmd_dedup_assets(args: argparse.Namespace) -> int:
+    manifest_path = Path(args.manifest)
+    assets = _load_manifest(manifest_path)
+    assets_root = Path(args.assets_root) if args.assets_root else manifest_path.parent
+    specs: list[Spec] = []
+    failed = 0
+    if args.specs:
+        specs, failed = _load_theme_specs(Path(args.specs), args.workers)
+
+    prints = fingerprint_assets(assets, assets_root, workers=args.workers)
+    report = find_duplicates(
+        prints,
+        usage=asset_usage(specs),
+        max_distance=args.max_distance,
+        tolerance=args.tolerance,
+    )
+    for merge in report.merges:
+        print(
+            f"{merge.source} -> {merge.target} (sizes {', '.join(map(str, merge.sizes))}, "
+            f"{merge.distance} bit(s), mean diff {merge.mean_diff:.2f})"
+        )
+    print(
+        f"{len(prints)} raster(s), {len(report.merges)} merge(s), "
+        f"{report.saved_bytes} byte(s) saved"
+    )
+    if args.report:
+        Path(args.report).write_text(json.dumps(report.to_dict(), indent=2) + "\n", encoding="utf-8")
+
+    mapping = report.mapping
+    if args.output:
+        if not args.specs:
+            raise ValueError("--output needs --specs")
+        merged, changed = apply_merges(specs, mapping)
+        _write_theme_specs(merged, Path(args.output))
+        print(f"{changed} layer(s) retargeted in {args.output}")
+    if args.manifest_output:
+        kept = _write_manifest_without(manifest_path, Path(args.manifest_output), mapping)
+        print(f"{kept} asset(s) kept in {args.manifest_output}")
+    return 1 if failed else 0
+
+
 def _cmd_gui_qt(_: argparse.Namespace) -> int:
     from pipeline.gui_qt import main as gui_main
 
@@ -99,13 +728,26 @@ def main() -> int:
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     pack_parser = subparsers.add_parser("pack", help="Build WXPK v1 from JSON spec")
-    pack_parser.add_argument("--spec", required=True, help="Path to wx.spec v1 JSON")
+    pack_parser.add_argument(
+        "--spec",
+        required=True,
+        action="append",
+        help="Path to wx.spec v1 JSON (repeat to pack several specs)",
+    )
     pack_parser.add_argument("--manifest", required=True, help="Path to assets manifest JSON")
     pack_parser.add_argument(
         "--assets-root",
         help="Root directory for asset payloads (defaults to spec directory)",
     )
     pack_parser.add_argument("--output", required=True, help="Output pack file")
+    pack_parser.add_argument(
+        "--force", action="store_true", help="Rebuild even when no input changed"
+    )
+    pack_parser.add_argument(
+        "--shared-timers",
+        action="store_true",
+        help="Add the shared-timer table (WXPK_T_JSON_INDEX) to the pack",
+    )
     pack_parser.set_defaults(func=_cmd_pack)
 
     map_parser = subparsers.add_parser("map", help="Map SVG to wx.spec v1 JSON")
@@ -120,6 +762,17 @@ def main() -> int:
         help="Override size_px (defaults to SVG size)",
     )
     map_parser.add_argument("--output", required=True, help="Output JSON spec file")
+    map_parser.add_argument(
+        "--tick-ms", type=int, help="Snap FX periods/phases to this timer tick (ms)"
+    )
+    map_parser.add_argument(
+        "--flatten",
+        action="store_true",
+        help="Merge runs of consecutive static layers into baked layers",
+    )
+    map_parser.add_argument(
+        "--bake-dir", help="With --flatten: write baked layer PNGs rendered from the SVG here"
+    )
     map_parser.set_defaults(func=_cmd_map)
 
     map_pack_parser = subparsers.add_parser(
@@ -141,8 +794,333 @@ def main() -> int:
     )
     map_pack_parser.add_argument("--manifest", required=True, help="Path to assets manifest JSON")
     map_pack_parser.add_argument("--output", required=True, help="Output pack file")
+    map_pack_parser.add_argument(
+        "--tick-ms", type=int, help="Snap FX periods/phases to this timer tick (ms)"
+    )
+    map_pack_parser.add_argument(
+        "--force", action="store_true", help="Rebuild even when no input changed"
+    )
+    map_pack_parser.add_argument(
+        "--shared-timers",
+        action="store_true",
+        help="Add the shared-timer table (WXPK_T_JSON_INDEX) to the pack",
+    )
     map_pack_parser.set_defaults(func=_cmd_map_pack)
 
+    map_sizes_parser = subparsers.add_parser(
+        "map-sizes", help="Map SVG to one wx.spec and asset list per size from a single parse"
+    )
+    map_sizes_parser.add_argument("--svg", required=True, help="Path to SVG input")
+    map_sizes_parser.add_argument(
+        "--spec-id",
+        help="Spec id value (fallback to SVG data-wx-id or filename)",
+    )
+    map_sizes_parser.add_argument(
+        "--size-px",
+        type=int,
+        action="append",
+        required=True,
+        help="Export size (repeat for several)",
+    )
+    map_sizes_parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="Directory of <name>_<size>.json specs and <name>_<size>.manifest.json asset lists",
+    )
+    map_sizes_parser.add_argument(
+        "--assets-dir", help="Render every <asset>_<size>.png from the SVG here"
+    )
+    map_sizes_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Rasterizer processes (defaults to CPU count, 1 = in-process)",
+    )
+    map_sizes_parser.set_defaults(func=_cmd_map_sizes)
+
+    split_parser = subparsers.add_parser(
+        "split-base",
+        help="Map SVG to one pre-composited static base plus animated overlays",
+    )
+    split_parser.add_argument("--svg", required=True, help="Path to SVG input")
+    split_parser.add_argument(
+        "--spec-id",
+        help="Spec id value (fallback to SVG data-wx-id or filename)",
+    )
+    split_parser.add_argument(
+        "--size-px",
+        type=int,
+        action="append",
+        help="Export size (repeat for several; defaults to SVG size)",
+    )
+    split_parser.add_argument("--output", required=True, help="Output JSON spec file")
+    split_parser.add_argument(
+        "--assets-dir", help="Write the base and overlay PNGs for every size here"
+    )
+    split_parser.add_argument(
+        "--report", help="Write the split (base, overlays, z_order, plan) as JSON"
+    )
+    split_parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Fail when static elements sit between overlays (base_position mixed)",
+    )
+    split_parser.set_defaults(func=_cmd_split_base)
+
+    overlays_parser = subparsers.add_parser(
+        "overlays", help="Generate overlays.json v1.0 from an SVG (or a directory of SVGs)"
+    )
+    overlays_parser.add_argument("--svg", required=True, help="SVG file or directory")
+    overlays_parser.add_argument(
+        "--output",
+        required=True,
+        help="Output JSON file, or directory of <name>.overlays.json for a directory input",
+    )
+    overlays_parser.add_argument(
+        "--size-px", type=int, help="Target size (defaults to SVG size)"
+    )
+    overlays_parser.add_argument(
+        "--allow-path-overlay",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Emit overlays whose target is a <path>",
+    )
+    overlays_parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Fail when static elements sit between overlays (base_position mixed)",
+    )
+    overlays_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for a directory (defaults to CPU count, 1 = in-process)",
+    )
+    overlays_parser.set_defaults(func=_cmd_overlays)
+
+    pivots_parser = subparsers.add_parser(
+        "pivots", help="Solve ROTATE pivots from SVG geometry or raster centroids"
+    )
+    pivots_parser.add_argument("--svg", required=True, help="Path to SVG input")
+    pivots_parser.add_argument(
+        "--spec", help="wx.spec JSON to solve (defaults to mapping the SVG)"
+    )
+    pivots_parser.add_argument(
+        "--spec-id",
+        help="Spec id value when mapping (fallback to SVG data-wx-id or filename)",
+    )
+    pivots_parser.add_argument(
+        "--size-px",
+        type=int,
+        action="append",
+        help="Export size (repeat for several; defaults to SVG size)",
+    )
+    pivots_parser.add_argument(
+        "--spec-size-px",
+        type=int,
+        help="Pixel size the spec's ROTATE pivots are written for (defaults to SVG size)",
+    )
+    pivots_parser.add_argument(
+        "--assets-dir",
+        help="Rasters <asset>_<size>.png (largest size) for the centroid fallback",
+    )
+    pivots_parser.add_argument(
+        "--tolerance-px",
+        type=int,
+        default=DEFAULT_TOLERANCE_PX,
+        help="Warn when declared and detected pivots differ by more (at the largest size)",
+    )
+    pivots_parser.add_argument(
+        "--output", help="Write the spec with pivots in pixels of the first --size-px"
+    )
+    pivots_parser.add_argument("--report", help="Write the per-size pivot table as JSON")
+    pivots_parser.set_defaults(func=_cmd_pivots)
+
+    manifest_parser = subparsers.add_parser(
+        "manifest", help="Scan <theme>/<size>/<asset>.png|bin into an assets manifest"
+    )
+    manifest_parser.add_argument("--root", required=True, help="Assets root directory")
+    manifest_parser.add_argument(
+        "--output", required=True, help="Output manifest (.json or .jsonl)"
+    )
+    manifest_parser.add_argument("--theme", help="Only include this theme directory")
+    manifest_parser.set_defaults(func=_cmd_manifest)
+
+    validate_parser = subparsers.add_parser(
+        "validate", help="Validate a directory or JSONL catalog of wx.spec v1 files"
+    )
+    validate_parser.add_argument(
+        "--specs", required=True, help="Directory of *.json specs or .jsonl catalog"
+    )
+    validate_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for decoding (defaults to CPU count, 1 = in-process)",
+    )
+    validate_parser.set_defaults(func=_cmd_validate)
+
+    catalog_parser = subparsers.add_parser(
+        "catalog", help="Write specs to an indexed JSON-lines catalog"
+    )
+    catalog_parser.add_argument(
+        "--specs", required=True, help="Directory of *.json specs or .jsonl catalog"
+    )
+    catalog_parser.add_argument("--output", required=True, help="Output .jsonl catalog")
+    catalog_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for decoding (defaults to CPU count, 1 = in-process)",
+    )
+    catalog_parser.set_defaults(func=_cmd_catalog)
+
+    budget_parser = subparsers.add_parser(
+        "budget", help="Estimate per-frame device cost of specs shown on one screen"
+    )
+    budget_parser.add_argument(
+        "--spec", required=True, action="append", help="wx.spec v1 JSON (repeat per icon)"
+    )
+    budget_parser.add_argument("--manifest", help="Assets manifest for sizes and types")
+    budget_parser.add_argument("--size-px", type=int, help="Render size of every layer")
+    budget_parser.add_argument("--fps", type=float, default=30.0, help="Target frame rate")
+    budget_parser.add_argument(
+        "--cpu-share",
+        type=float,
+        default=0.5,
+        help="Fraction of each frame available for drawing",
+    )
+    budget_parser.add_argument(
+        "--color-depth", type=int, choices=(16, 32), default=16, help="LV_COLOR_DEPTH"
+    )
+    budget_parser.add_argument("--max-dirty-px", type=int, help="Per-frame invalidated area")
+    budget_parser.add_argument("--max-blend-px", type=int, help="Per-frame blended pixels")
+    budget_parser.add_argument("--max-rotated-px", type=int, help="Per-frame rotated pixels")
+    budget_parser.add_argument("--max-ram-bytes", type=int, help="Decoded image RAM")
+    budget_parser.add_argument("--report", help="Write the budget report (JSON)")
+    budget_parser.set_defaults(func=_cmd_budget)
+
+    dirty_parser = subparsers.add_parser(
+        "dirty-rects", help="Store tight per-layer invalidation rectangles in a spec"
+    )
+    dirty_parser.add_argument("--spec", required=True, help="Path to wx.spec v1 JSON")
+    dirty_parser.add_argument("--manifest", help="Assets manifest (defaults to <asset>_<size>.png)")
+    dirty_parser.add_argument(
+        "--assets-root",
+        help="Root directory for asset PNGs (defaults to spec directory)",
+    )
+    dirty_parser.add_argument("--svg", help="SVG source used to rasterize missing assets")
+    dirty_parser.add_argument(
+        "--size-px", type=int, default=64, help="Asset size matching the spec's px params"
+    )
+    dirty_parser.add_argument(
+        "--alpha-threshold", type=int, default=0, help="Ignore pixels with alpha <= this"
+    )
+    dirty_parser.add_argument("--output", required=True, help="Output JSON spec file")
+    dirty_parser.set_defaults(func=_cmd_dirty_rects)
+
+    render_parser = subparsers.add_parser(
+        "render-anim", help="Render animation frames headlessly (PNG sequence or raw RGBA)"
+    )
+    render_parser.add_argument("--spec", help="Path to wx.spec v1 JSON")
+    render_parser.add_argument(
+        "--svg", help="SVG source (mapped when --spec is absent; rasterizes missing assets)"
+    )
+    render_parser.add_argument(
+        "--pack", help="WXPK pack to take the spec and decoded images from"
+    )
+    render_parser.add_argument("--name", help="Spec name inside --pack")
+    render_parser.add_argument(
+        "--assets-root",
+        help="Root directory for asset PNGs (defaults to spec/SVG directory)",
+    )
+    render_parser.add_argument(
+        "--size-px",
+        type=int,
+        help="Frame size (defaults to spec size_px, the largest pack image or SVG size)",
+    )
+    render_parser.add_argument("--frames", type=int, default=60, help="Number of frames")
+    render_parser.add_argument("--fps", type=float, default=30.0, help="Fixed timestep rate")
+    render_parser.add_argument("--seed", type=int, default=0, help="Seed for JITTER")
+    render_parser.add_argument("--scale", type=int, default=1, help="Integer upscale factor")
+    render_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (defaults to CPU count, 1 = in-process)",
+    )
+    render_parser.add_argument("--out-dir", help="Write frame_NNNNN.png files here")
+    render_parser.add_argument("--raw", help="Write all frames as one raw RGBA stream")
+    render_parser.add_argument("--hashes", help="Write per-frame SHA-256 golden hashes (JSON)")
+    render_parser.add_argument(
+        "--check-hashes", help="Compare against golden hashes; exit 1 on mismatch"
+    )
+    render_parser.add_argument("--report", help="Write per-frame compose cost (JSON)")
+    render_parser.set_defaults(func=_cmd_render_anim)
+
+    quantize_parser = subparsers.add_parser(
+        "quantize", help="Snap FX timing of a theme to a tick and shared periods"
+    )
+    quantize_parser.add_argument(
+        "--specs", required=True, help="Directory of *.json specs or .jsonl catalog"
+    )
+    quantize_parser.add_argument(
+        "--output", required=True, help="Output directory, or .jsonl catalog"
+    )
+    quantize_parser.add_argument(
+        "--tick-ms", type=int, default=DEFAULT_TICK_MS, help="Timer tick (ms)"
+    )
+    quantize_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.05,
+        help="Relative deviation allowed when merging periods",
+    )
+    quantize_parser.add_argument(
+        "--no-share", action="store_true", help="Only snap to the tick, keep distinct periods"
+    )
+    quantize_parser.add_argument(
+        "--max-deviation-ms", type=int, help="Exit 1 when any value moves further than this"
+    )
+    quantize_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for decoding (defaults to CPU count, 1 = in-process)",
+    )
+    quantize_parser.add_argument("--verbose", action="store_true", help="List every change")
+    quantize_parser.set_defaults(func=_cmd_quantize)
+
+    dedup_parser = subparsers.add_parser(
+        "dedup-assets", help="Find near-duplicate asset rasters across a theme and merge them"
+    )
+    dedup_parser.add_argument("--manifest", required=True, help="Assets manifest (JSON or JSONL)")
+    dedup_parser.add_argument(
+        "--assets-root", help="Root directory for asset payloads (defaults to manifest directory)"
+    )
+    dedup_parser.add_argument(
+        "--specs", help="Directory of *.json specs or .jsonl catalog (usage and --output)"
+    )
+    dedup_parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help="Max differing bits of the 64-bit perceptual hash",
+    )
+    dedup_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Max mean channel difference (0-255) of the 32x32 premultiplied thumbnails",
+    )
+    dedup_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (defaults to CPU count, 1 = in-process)",
+    )
+    dedup_parser.add_argument("--report", help="Write the proposed merges (JSON)")
+    dedup_parser.add_argument(
+        "--output", help="Apply merges: write retargeted specs (directory or .jsonl)"
+    )
+    dedup_parser.add_argument(
+        "--manifest-output", help="Apply merges: write the manifest without merged assets"
+    )
+    dedup_parser.set_defaults(func=_cmd_dedup_assets)
+
     gui_parser = subparsers.add_parser("gui", help="Open wx.spec GUI (Qt)")
     gui_parser.set_defaults(func=_cmd_gui_qt)
 
@@ -1,3 +1,5 @@
 """Configuration and default paths for the pipeline."""
 
 DEFAULT_SIZES_PX = (64, 96, 128)
+# LVGL display refresh period (LV_DEF_REFR_PERIOD) used to quantize FX timing.
+DEFAULT_TICK_MS = 30
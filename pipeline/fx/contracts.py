@@ -1,3 +1,58 @@
 """FX contract registry and validation."""
 
-# TODO: implement contract metadata from docs/wx-fx-contracts.md
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+PHASE_MS_MAX_ITEMS = 6
+# Runtime limits on named fx instances ("ROTATE.rays"), see wx_fx.h.
+FX_INSTANCE_MAX = 8
+FX_KEY_MAX_LEN = 31
+
+
+@dataclass(frozen=True, slots=True)
+class FieldContract:
+    """Declarative rule for one fx parameter (see docs/wx-fx-contracts.md)."""
+
+    kind: str
+    unit: str
+    minimum: int | None = None
+    maximum: int | None = None
+
+
+# Single source of truth for fx parameters: order is the wx.spec field order.
+FIELD_CONTRACTS: dict[str, FieldContract] = {
+    "period_ms": FieldContract("int", "ms", minimum=0),
+    "pivot_x": FieldContract("int", "px", minimum=0),
+    "pivot_y": FieldContract("int", "px", minimum=0),
+    "angle_from": FieldContract("int", "angle", minimum=0, maximum=3600),
+    "angle_to": FieldContract("int", "angle", minimum=0, maximum=3600),
+    "angle_now": FieldContract("int", "angle", minimum=0, maximum=3600),
+    "smooth_ms": FieldContract("int", "ms", minimum=0),
+    "fall_dx": FieldContract("int", "px", minimum=0),
+    "fall_dy": FieldContract("int", "px", minimum=0),
+    "amp_x": FieldContract("int", "px", minimum=0),
+    "amp_y": FieldContract("int", "px", minimum=0),
+    "opa_min": FieldContract("int", "opa", minimum=0, maximum=255),
+    "opa_max": FieldContract("int", "opa", minimum=0, maximum=255),
+    "phase_ms": FieldContract("int_list", "ms", minimum=0),
+}
+
+
+# Easing of each periodic FX (docs/wx-fx-contracts.md §1.5); "step" FX jump
+# between values. NEEDLE follows a value, not a period, so it has none.
+FX_EASING: dict[str, str] = {
+    "ROTATE": "linear",
+    "FALL": "linear",
+    "FLOW_X": "linear",
+    "JITTER": "step",
+    "DRIFT": "ease_in_out",
+    "TWINKLE": "ease_in_out",
+    "FLASH": "step",
+    "CROSSFADE": "ease_in_out",
+}
+
+
+def fields_with_unit(unit: str) -> tuple[str, ...]:
+    """Return fx field names whose contract unit is ``unit``."""
+    return tuple(name for name, rule in FIELD_CONTRACTS.items() if rule.unit == unit)
@@ -0,0 +1,158 @@
+"""Tight invalidation rectangles for animated layers.
+
+LVGL invalidates an animated object's whole area every tick. Knowing where
+a layer's opaque pixels can ever land lets the runtime invalidate only that
+region: the alpha bounding box of the asset, swept by the layer's rotation
+about its pivot and by the travel of its translating FX, clipped to the
+icon. Offsets follow the ranges used by ``pipeline.fx.timeline``.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Iterable, Mapping
+
+from pipeline.spec.model import Spec, fx_type
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+# x0, y0, x1, y1 with exclusive x1/y1.
+Box = tuple[float, float, float, float]
+
+ROTATING_FX = frozenset({"ROTATE", "NEEDLE"})
+ANIMATED_FX = ROTATING_FX | {"FALL", "FLOW_X", "JITTER", "DRIFT", "TWINKLE", "FLASH", "CROSSFADE"}
+
+
+def _params(value: object) -> Mapping[str, object]:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()  # type: ignore[no-any-return]
+    if isinstance(value, dict):
+        return value
+    return {}
+
+
+def _int(params: Mapping[str, object], name: str, default: int = 0) -> int:
+    value = params.get(name)
+    return value if isinstance(value, int) else default
+
+
+def alpha_bbox(image: "Image.Image", threshold: int = 0) -> Box | None:
+    """Bounding box of pixels with alpha above ``threshold`` (None if fully clear)."""
+    if "A" not in image.getbands():
+        return (0, 0, image.width, image.height)
+    alpha = image.getchannel("A")
+    if threshold > 0:
+        alpha = alpha.point(lambda value: 255 if value > threshold else 0)
+    return alpha.getbbox()
+
+
+def _rotation_sweep(box: Box, params: Mapping[str, object], width: int, height: int) -> Box:
+    pivot_x = _int(params, "pivot_x", width // 2)
+    pivot_y = _int(params, "pivot_y", height // 2)
+    x0, y0, x1, y1 = box
+    corners = [(x - pivot_x, y - pivot_y) for x in (x0, x1) for y in (y0, y1)]
+
+    angle_from = params.get("angle_from")
+    angle_to = params.get("angle_to")
+    if isinstance(angle_from, int) and isinstance(angle_to, int) and abs(angle_to - angle_from) < 3600:
+        # Partial sweep (0.1 degree units), increasing from angle_from and
+        # wrapping through 0: sample every degree, pad for the chords.
+        start = angle_from
+        end = angle_to if angle_to >= angle_from else angle_to + 3600
+        angles = list(range(start, end, 10)) + [end]
+        xs: list[float] = []
+        ys: list[float] = []
+        for angle in angles:
+            rad = math.radians(angle / 10.0)
+            cos_a = math.cos(rad)
+            sin_a = math.sin(rad)
+            for dx, dy in corners:
+                xs.append(dx * cos_a - dy * sin_a)
+                ys.append(dx * sin_a + dy * cos_a)
+        return (
+            pivot_x + min(xs) - 1,
+            pivot_y + min(ys) - 1,
+            pivot_x + max(xs) + 1,
+            pivot_y + max(ys) + 1,
+        )
+
+    radius = max(math.hypot(dx, dy) for dx, dy in corners)
+    return (pivot_x - radius, pivot_y - radius, pivot_x + radius, pivot_y + radius)
+
+
+def _travel(key: str, params: Mapping[str, object]) -> Box:
+    """Offset range ``(min_dx, min_dy, max_dx, max_dy)`` an FX applies to its layer."""
+    if key == "FALL":
+        return (0, 0, _int(params, "fall_dx"), _int(params, "fall_dy"))
+    if key == "FLOW_X":
+        return (0, 0, _int(params, "amp_x"), 0)
+    if key in ("JITTER", "DRIFT"):
+        amp_x = abs(_int(params, "amp_x"))
+        amp_y = abs(_int(params, "amp_y"))
+        return (-amp_x, -amp_y, amp_x, amp_y)
+    return (0, 0, 0, 0)
+
+
+def layer_dirty_rect(
+    image: "Image.Image",
+    fx_keys: Iterable[str],
+    spec_fx: Mapping[str, object],
+    *,
+    alpha_threshold: int = 0,
+    offset: tuple[int, int] | None = None,
+) -> tuple[int, int, int, int] | None:
+    """Return ``(x, y, w, h)`` the layer can touch while animating, or None.
+
+    ``image`` is the layer's asset at icon size, drawn shifted by the
+    layer ``offset``; the rectangle is in its pixels. Static layers and
+    layers that never show a pixel on the icon get None: a zero-area rect
+    is not part of the spec, whose runtime reads ``dirty_w == 0`` as the
+    whole icon.
+    """
+    keys = [key for key in fx_keys if fx_type(key) in ANIMATED_FX]
+    if not keys:
+        return None
+    width, height = image.size
+    box = alpha_bbox(image, alpha_threshold)
+    if box is None:
+        return None
+
+    for key in keys:
+        if fx_type(key) in ROTATING_FX:
+            box = _rotation_sweep(box, _params(spec_fx.get(key, {})), width, height)
+            break
+    min_dx, min_dy = offset or (0, 0)
+    max_dx, max_dy = min_dx, min_dy
+    for key in keys:
+        low_x, low_y, high_x, high_y = _travel(fx_type(key), _params(spec_fx.get(key, {})))
+        min_dx += low_x
+        min_dy += low_y
+        max_dx += high_x
+        max_dy += high_y
+
+    x0 = max(0, math.floor(box[0] + min_dx))
+    y0 = max(0, math.floor(box[1] + min_dy))
+    x1 = min(width, math.ceil(box[2] + max_dx))
+    y1 = min(height, math.ceil(box[3] + max_dy))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def annotate_dirty_rects(
+    spec: Spec, bitmaps: Mapping[str, "Image.Image"], *, alpha_threshold: int = 0
+) -> int:
+    """Set ``layer.dirty`` on every animated layer with a bitmap; return how many were set."""
+    count = 0
+    for layer in spec.layers:
+        image = bitmaps.get(layer.asset)
+        if image is None:
+            continue
+        rect = layer_dirty_rect(
+            image, layer.fx, spec.fx, alpha_threshold=alpha_threshold, offset=layer.offset
+        )
+        layer.dirty = rect
+        if rect is not None:
+            count += 1
+    return count
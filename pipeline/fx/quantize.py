@@ -0,0 +1,228 @@
+"""Snap FX timing to the LVGL timer tick and to periods shared across a theme.
+
+SMIL durations land in ``period_ms`` unchanged, so a 3333 ms period never
+lines up with a 30 ms refresh and every icon needs its own animation timer.
+``quantize_specs`` rounds every millisecond field (``period_ms``,
+``smooth_ms``, ``phase_ms``) to a multiple of the tick, then merges
+periods that lie within a relative tolerance of each other into one
+canonical period, so icons shown together can be driven by a handful of
+shared timers. Phases keep their place in the cycle when a period moves.
+Every change is recorded with its deviation.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+import math
+from typing import Dict, Iterable, List, Mapping
+
+from pipeline.config import DEFAULT_TICK_MS
+from pipeline.fx.contracts import fields_with_unit
+from pipeline.spec.model import FxParams, Spec
+
+MS_FIELDS = fields_with_unit("ms")
+
+
+@dataclass(frozen=True, slots=True)
+class TimingChange:
+    spec: str
+    fx: str
+    field: str
+    before: int
+    after: int
+
+    @property
+    def deviation_ms(self) -> int:
+        return abs(self.after - self.before)
+
+    @property
+    def deviation_ratio(self) -> float:
+        return self.deviation_ms / self.before if self.before else 0.0
+
+
+@dataclass(slots=True)
+class QuantizeReport:
+    tick_ms: int
+    changes: List[TimingChange] = field(default_factory=list)
+    periods: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def max_deviation_ms(self) -> int:
+        return max((change.deviation_ms for change in self.changes), default=0)
+
+    @property
+    def max_deviation_ratio(self) -> float:
+        return max((change.deviation_ratio for change in self.changes), default=0.0)
+
+    @property
+    def timer_count(self) -> int:
+        """Distinct non-zero periods left after the pass (one shared timer each)."""
+        return len({period for period in self.periods.values() if period > 0})
+
+
+def snap_ms(value: int, tick_ms: int) -> int:
+    """Round ``value`` to the nearest tick multiple; positive values stay >= one tick."""
+    if tick_ms <= 0:
+        raise ValueError("tick_ms must be > 0")
+    if value <= 0:
+        return value
+    return max(tick_ms, int(round(value / tick_ms)) * tick_ms)
+
+
+# Preferred period steps (ms): rounder periods are more likely to be shared,
+# and to be multiples of each other, across icons and themes.
+_ROUND_STEPS_MS = (6000, 3000, 1000, 500, 100, 50, 10, 1)
+
+
+def _candidates(low: int, high: int, tick_ms: int, tolerance: float) -> List[int]:
+    """Tick multiples within ``tolerance`` of both ``low`` and ``high``."""
+    lower = high * (1 - tolerance)
+    upper = low * (1 + tolerance)
+    first = max(1, math.ceil(lower / tick_ms))
+    return [step * tick_ms for step in range(first, math.floor(upper / tick_ms) + 1)]
+
+
+def _pick(candidates: List[int], low: int, high: int) -> int:
+    def _score(value: int) -> tuple[int, float]:
+        roundness = next(step for step in _ROUND_STEPS_MS if value % step == 0)
+        return (-roundness, max(abs(value - low) / low, abs(high - value) / high))
+
+    return min(candidates, key=_score)
+
+
+def shared_periods(
+    periods: Iterable[int], tick_ms: int, tolerance: float = 0.05
+) -> Dict[int, int]:
+    """Map each period to a tick-aligned period shared with its close neighbours.
+
+    Periods are grouped greedily in ascending order while one tick multiple
+    stays within ``tolerance`` (relative) of every member; the group takes
+    the roundest such multiple. A period with no multiple in range is
+    simply snapped to the nearest tick.
+    """
+    if tick_ms <= 0:
+        raise ValueError("tick_ms must be > 0")
+    if tolerance < 0:
+        raise ValueError("tolerance must be >= 0")
+    mapping: Dict[int, int] = {}
+    group: List[int] = []
+
+    def _flush() -> None:
+        if not group:
+            return
+        candidates = _candidates(group[0], group[-1], tick_ms, tolerance)
+        if candidates:
+            target = _pick(candidates, group[0], group[-1])
+        else:
+            target = snap_ms(group[0], tick_ms)
+        for member in group:
+            mapping[member] = target
+        group.clear()
+
+    for period in sorted({value for value in periods if value > 0}):
+        if group and not _candidates(group[0], period, tick_ms, tolerance):
+            _flush()
+        group.append(period)
+    _flush()
+    return mapping
+
+
+def _fx_dict(value: object) -> dict:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()  # type: ignore[no-any-return]
+    if isinstance(value, dict):
+        return dict(value)
+    return {}
+
+
+def _spec_periods(spec: Spec) -> Iterable[int]:
+    for value in spec.fx.values():
+        period = _fx_dict(value).get("period_ms")
+        if isinstance(period, int):
+            yield period
+
+
+def snap_phase_ms(value: int, tick_ms: int, scale: float = 1.0, period_ms: int = 0) -> int:
+    """``value`` scaled by ``scale`` and rounded to the nearest tick, 0 included.
+
+    With a ``period_ms`` the result wraps into ``[0, period_ms)``: a phase
+    that rounds up to the full period starts with the cycle.
+    """
+    if tick_ms <= 0:
+        raise ValueError("tick_ms must be > 0")
+    snapped = int(round(value * scale / tick_ms)) * tick_ms
+    return snapped % period_ms if period_ms > 0 else snapped
+
+
+def quantize_spec(
+    spec: Spec,
+    tick_ms: int,
+    periods: Mapping[int, int] | None = None,
+    report: QuantizeReport | None = None,
+) -> Spec:
+    """Return a copy of ``spec`` with ms fields on the tick (periods via ``periods``).
+
+    Phases follow their FX period: when it moves onto a shared period they
+    are scaled by the same ratio, then rounded to the nearest tick.
+    """
+    new_fx: Dict[str, object] = {}
+    for key, value in spec.fx.items():
+        params = _fx_dict(value)
+        scale = 1.0
+        for name in MS_FIELDS:
+            raw = params.get(name)
+            if name == "phase_ms" or not isinstance(raw, int):
+                continue
+            if name == "period_ms" and periods is not None and raw in periods:
+                snapped = periods[raw]
+            else:
+                snapped = snap_ms(raw, tick_ms)
+            if name == "period_ms":
+                if raw > 0:
+                    scale = snapped / raw
+                if report is not None:
+                    report.periods[raw] = snapped
+            if snapped != raw and report is not None:
+                report.changes.append(TimingChange(spec.name, key, name, raw, snapped))
+            params[name] = snapped
+
+        raw_phases = params.get("phase_ms")
+        if isinstance(raw_phases, (int, list, tuple)):
+            period = params.get("period_ms")
+            period = period if isinstance(period, int) else 0
+            phases = [raw_phases] if isinstance(raw_phases, int) else list(raw_phases)
+            snapped_phases = [
+                snap_phase_ms(item, tick_ms, scale, period) if isinstance(item, int) else item
+                for item in phases
+            ]
+            if report is not None:
+                for before, after in zip(phases, snapped_phases):
+                    if before != after:
+                        report.changes.append(
+                            TimingChange(spec.name, key, "phase_ms", before, after)
+                        )
+            params["phase_ms"] = (
+                snapped_phases[0] if isinstance(raw_phases, int) else snapped_phases
+            )
+        new_fx[key] = FxParams.from_dict(params) if isinstance(value, FxParams) else params
+    return replace(spec, fx=new_fx)
+
+
+def quantize_specs(
+    specs: Iterable[Spec],
+    *,
+    tick_ms: int = DEFAULT_TICK_MS,
+    tolerance: float | None = 0.05,
+) -> tuple[List[Spec], QuantizeReport]:
+    """Quantize a theme; ``tolerance=None`` only snaps to the tick without sharing periods."""
+    spec_list = list(specs)
+    report = QuantizeReport(tick_ms=tick_ms)
+    periods = None
+    if tolerance is not None:
+        periods = shared_periods(
+            (period for spec in spec_list for period in _spec_periods(spec)),
+            tick_ms,
+            tolerance,
+        )
+    quantized = [quantize_spec(spec, tick_ms, periods, report) for spec in spec_list]
+    return quantized, report
@@ -0,0 +1,207 @@
+"""Compiled FX animation plan for previews.
+
+A plan is built once per spec: every layer gets a tuple of small closures,
+one per FX, that update its transform state from the elapsed time. A frame
+then only calls those closures; no dict lookups or parameter parsing happen
+per tick.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import random
+from typing import Callable, Iterable, Mapping, Protocol
+
+from pipeline.spec.model import fx_type
+
+# SMIL animation kind required for an FX to be previewed on an SVG element.
+FX_ANIM_KIND = {
+    "ROTATE": "rotate",
+    "FALL": "translate",
+    "FLOW_X": "translate",
+    "TWINKLE": "opacity",
+    "FLASH": "opacity",
+    "CROSSFADE": "opacity",
+}
+
+
+class _Uniform(Protocol):
+    def uniform(self, a: float, b: float) -> float: ...
+
+
+@dataclass(slots=True)
+class LayerState:
+    """Transform of one layer at a given time (pixels, degrees, 0..1 opacity).
+
+    ``pivot_x``/``pivot_y`` are the rotation pivot in image pixels; None
+    means the image centre. ``base_x``/``base_y`` is the layer's static
+    ``offset``, where FX offsets start from.
+    """
+
+    asset: str
+    svg_index: int | None
+    offset_x: float = 0.0
+    offset_y: float = 0.0
+    rotation: float = 0.0
+    opacity: float = 1.0
+    pivot_x: float | None = None
+    pivot_y: float | None = None
+    base_x: float = 0.0
+    base_y: float = 0.0
+
+    def reset(self) -> None:
+        self.offset_x = self.base_x
+        self.offset_y = self.base_y
+        self.rotation = 0.0
+        self.opacity = 1.0
+
+
+FxTerm = Callable[[LayerState, float, _Uniform], None]
+
+
+def _num(value: dict, name: str, default: float = 0.0) -> float:
+    return float(value.get(name, default) or default)
+
+
+def _compile_term(key: str, value: dict) -> FxTerm | None:
+    period_ms = _num(value, "period_ms")
+    period = period_ms / 1000.0 if period_ms > 0 else 0.0
+    amp_x = _num(value, "amp_x")
+    amp_y = _num(value, "amp_y")
+    opa_min = _num(value, "opa_min") / 255.0
+    opa_max = _num(value, "opa_max", 255.0) / 255.0
+    opa_span = opa_max - opa_min
+    omega = 2 * math.pi / period if period > 0 else 0.0
+
+    if key == "JITTER":
+        def jitter(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.offset_x += rng.uniform(-amp_x, amp_x)
+            state.offset_y += rng.uniform(-amp_y, amp_y)
+
+        return jitter
+    if period <= 0:
+        return None
+    if key == "ROTATE":
+        pivot_x = value.get("pivot_x")
+        pivot_y = value.get("pivot_y")
+
+        def rotate(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.rotation = (t / period) * 360.0
+            state.pivot_x = pivot_x
+            state.pivot_y = pivot_y
+
+        return rotate
+    if key == "FALL":
+        fall_dy = _num(value, "fall_dy")
+
+        def fall(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.offset_y += (t / period) * fall_dy
+
+        return fall
+    if key == "FLOW_X":
+        def flow_x(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.offset_x += (t / period) * amp_x
+
+        return flow_x
+    if key == "DRIFT":
+        def drift(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.offset_x += math.sin(t * omega) * amp_x
+            state.offset_y += math.cos(t * omega) * amp_y
+
+        return drift
+    if key == "TWINKLE":
+        def twinkle(state: LayerState, t: float, rng: _Uniform) -> None:
+            wave = 0.5 + 0.5 * math.sin(t * omega)
+            state.opacity *= opa_min + wave * opa_span
+
+        return twinkle
+    if key == "FLASH":
+        half = period / 2
+
+        def flash(state: LayerState, t: float, rng: _Uniform) -> None:
+            state.opacity *= opa_max if (t % period) < half else opa_min
+
+        return flash
+    if key == "CROSSFADE":
+        def crossfade(state: LayerState, t: float, rng: _Uniform) -> None:
+            wave = 0.5 + 0.5 * math.cos(t * omega)
+            state.opacity *= opa_min + wave * opa_span
+
+        return crossfade
+    return None
+
+
+@dataclass(slots=True)
+class _LayerPlan:
+    state: LayerState
+    terms: tuple[FxTerm, ...]
+
+
+class AnimationPlan:
+    """Per-layer FX closures compiled from a wx.spec dict."""
+
+    __slots__ = ("_layers",)
+
+    def __init__(self, layers: list[_LayerPlan]) -> None:
+        self._layers = layers
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    @property
+    def animated(self) -> bool:
+        return any(plan.terms for plan in self._layers)
+
+    def evaluate(self, elapsed: float, rng: _Uniform = random) -> list[LayerState]:  # type: ignore[assignment]
+        """Return the state of every layer at ``elapsed`` seconds, in draw order.
+
+        The returned states are reused by the next call; copy them to keep them.
+        """
+        states = []
+        for plan in self._layers:
+            state = plan.state
+            state.reset()
+            for term in plan.terms:
+                term(state, elapsed, rng)
+            states.append(state)
+        return states
+
+
+def compile_plan(
+    layers: Iterable[Mapping],
+    fx: Mapping[str, object],
+    *,
+    layer_index: Mapping[str, int] | None = None,
+    anim_kinds: Mapping[int, set[str]] | None = None,
+) -> AnimationPlan:
+    """Compile layers (``{"asset", "fx"}`` dicts) and the spec fx table into a plan.
+
+    ``layer_index`` maps an asset key to its SVG element index and
+    ``anim_kinds`` lists the SMIL kinds animated on that element; an FX is
+    dropped for a layer whose element does not carry the matching kind.
+    """
+    layer_index = layer_index or {}
+    anim_kinds = anim_kinds or {}
+    plans: list[_LayerPlan] = []
+    for layer in layers:
+        asset = layer["asset"]
+        idx = layer_index.get(asset)
+        kinds = anim_kinds.get(idx, set()) if idx is not None else None
+        terms: list[FxTerm] = []
+        for key in layer.get("fx", []):
+            value = fx.get(key, {})
+            if not isinstance(value, dict):
+                continue
+            kind = fx_type(key)
+            required = FX_ANIM_KIND.get(kind)
+            if kinds is not None and required is not None and required not in kinds:
+                continue
+            term = _compile_term(kind, value)
+            if term is not None:
+                terms.append(term)
+        base_x, base_y = layer.get("offset") or (0, 0)
+        state = LayerState(asset=asset, svg_index=idx, base_x=base_x, base_y=base_y)
+        state.reset()
+        plans.append(_LayerPlan(state=state, terms=tuple(terms)))
+    return AnimationPlan(plans)
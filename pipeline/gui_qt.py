@@ -3,19 +3,26 @@
 from __future__ import annotations
 
 import base64
-import io
 import json
-import math
 import os
-import random
-import shutil
-import subprocess
-import tempfile
 import time
-import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from pipeline.fx.timeline import AnimationPlan, LayerState, compile_plan
 from pipeline.mapping import map_svg_to_spec
+from pipeline.pack.reader import PackReader, load_pack_bitmaps, nearest_size
+from pipeline.preview.compose import Compositor, has_numpy, premultiply
+from pipeline.preview.render import composite_states, layer_pivot, load_asset_bitmaps
+from pipeline.preview.source import (
+    DEFAULT_SIZE_PX,
+    BackgroundRasterizer,
+    SvgLayerSource,
+    infer_svg_size,
+    spec_assets,
+    spec_layers,
+)
+from pipeline.preview.sprites import RotationCache
+from pipeline.raster import has_cairosvg, has_pillow, has_rsvg, load_pil_image, png_has_alpha
 from pipeline.wxspec import dumps_spec, parse_spec_dict
 
 try:
@@ -25,7 +32,13 @@ except Exception as exc:  # pragma: no cover - import guard
     raise RuntimeError("PySide6 + QtWebEngine required for gui-qt") from exc
 
 
+PREVIEW_SIZE_PX = 320
+
+
 class WxSpecQtGui(QtWidgets.QMainWindow):
+    # Emitted from raster worker threads; delivered queued on the UI thread.
+    _raster_ready = QtCore.Signal(int, object)
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("WX Spec Inspector (Qt)")
@@ -34,17 +47,23 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
         self._current_path: Path | None = None
         self._current_svg: Path | None = None
         self._current_spec: dict | None = None
-        self._svg_raster_cache: dict[tuple[int, int | None], bytes] = {}
-        self._svg_root: ET.Element | None = None
-        self._svg_paths: list[tuple[int, ...]] = []
-        self._svg_anim_map: dict[int, set[str]] = {}
+        self._svg_layers: SvgLayerSource | None = None
+        self._pack: PackReader | None = None
         self._asset_bitmaps: dict[str, "Image.Image"] = {}
         self._frame_timer = QtCore.QTimer(self)
         self._frame_timer.setInterval(33)
         self._frame_timer.timeout.connect(self._animate_frame)
         self._start_time = time.time()
         self._last_frame_time = self._start_time
-        self._frame_bytes: bytes | None = None
+        self._frame_bytes: object | None = None
+        self._anim_plan: AnimationPlan | None = None
+        self._sprites = RotationCache()
+        self._sprite_arrays = RotationCache(convert=premultiply)
+        self._compositor: Compositor | None = None
+        self._preview_size_px = DEFAULT_SIZE_PX
+        self._rasterizer = BackgroundRasterizer(self._raster_ready.emit)
+        self._raster_ready.connect(self._on_raster_ready)
+        self._assets_refresh_queued = False
 
         self._build_ui()
 
@@ -56,6 +75,10 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
         open_svg_action.triggered.connect(self._open_svg)
         toolbar.addAction(open_svg_action)
 
+        open_pack_action = QtGui.QAction("Open pack", self)
+        open_pack_action.triggered.connect(self._open_pack)
+        toolbar.addAction(open_pack_action)
+
         save_action = QtGui.QAction("Save JSON", self)
         save_action.triggered.connect(self._save_json)
         toolbar.addAction(save_action)
@@ -152,14 +175,56 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
         except Exception as exc:  # noqa: BLE001
             QtWidgets.QMessageBox.critical(self, "SVG conversion failed", str(exc))
             return
+        self._close_pack()
         self._current_svg = svg_path
-        self._svg_raster_cache.clear()
-        self._prepare_svg_layers(svg_path)
+        self._svg_layers = SvgLayerSource.load(svg_path)
+        self._rasterizer.set_source(self._svg_layers)
         self._current_path = None
         self._svg_source.setPlainText(svg_path.read_text(encoding="utf-8"))
         self._text.setPlainText(dumps_spec(spec, indent=2))
         self._refresh()
 
+    def _open_pack(self) -> None:
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Open pack", "", "WXPK packs (*.bin *.wxpk);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            reader = PackReader.open(Path(path))
+            specs = {str(spec.get("name", spec.get("spec_id"))): spec for spec in reader.specs()}
+        except Exception as exc:  # noqa: BLE001
+            QtWidgets.QMessageBox.critical(self, "Pack open failed", str(exc))
+            return
+        if not specs:
+            reader.close()
+            QtWidgets.QMessageBox.critical(self, "Pack open failed", "pack holds no spec")
+            return
+        names = sorted(specs)
+        name = names[0]
+        if len(names) > 1:
+            name, ok = QtWidgets.QInputDialog.getItem(self, "Open pack", "Spec", names, 0, False)
+            if not ok:
+                reader.close()
+                return
+        self._close_pack()
+        self._pack = reader
+        self._current_path = Path(path)
+        self._current_svg = None
+        self._svg_layers = None
+        self._rasterizer.set_source(None)
+        self._svg_source.setPlainText("")
+        self._text.setPlainText(json.dumps(specs[name], indent=2))
+        self._status(f"Opened {path} ({len(reader.entries)} entries)")
+        self._refresh()
+
+    def _close_pack(self) -> None:
+        if self._pack is not None:
+            self._frame_timer.stop()
+            self._asset_bitmaps = {}
+            self._pack.close()
+            self._pack = None
+
     def _save_json(self) -> None:
         path, _ = QtWidgets.QFileDialog.getSaveFileName(
             self, "Save JSON", "", "JSON files (*.json);;All files (*)"
@@ -188,8 +253,10 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
             self._current_spec = spec.to_dict()
         except Exception as exc:  # noqa: BLE001
             self._current_spec = None
+            self._anim_plan = None
             self._status(f"Error: {exc}")
             return
+        self._rebuild_anim_plan()
 
         self._fx_list.clear()
         fx = self._current_spec.get("fx", {})
@@ -254,118 +321,115 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
             self._assets_grid.addWidget(QtWidgets.QLabel("No PNG+alpha assets found."), 0, 0)
 
     def _render_final(self) -> None:
-        if not _ensure_pillow():
+        if not has_pillow():
             self._final_label.setText("Final preview requires Pillow (PIL).")
             return
         self._prepare_asset_bitmaps()
-        if not self._asset_bitmaps:
+        if not self._asset_bitmaps and self._svg_layers is None:
             self._final_label.setText("No PNG+alpha assets found.")
             return
         self._start_time = time.time()
         self._last_frame_time = self._start_time
         self._frame_timer.start()
 
+    def _rebuild_anim_plan(self) -> None:
+        self._preview_size_px = self._resolve_size_px()
+        self._anim_plan = compile_plan(
+            self._spec_layers(),
+            self._current_spec.get("fx", {}) if self._current_spec else {},
+            layer_index=self._layer_index_map(),
+            anim_kinds=self._svg_layers.anim_kinds if self._svg_layers else None,
+        )
+
     def _animate_frame(self) -> None:
-        if not self._current_spec:
+        plan = self._anim_plan
+        if not self._current_spec or plan is None:
             self._frame_timer.stop()
             return
-        size_px = self._resolve_size_px()
+        size_px = self._preview_size_px
         if size_px <= 0:
             return
-        scale = 320 / size_px
 
         now = time.time()
         self._last_frame_time = now
         elapsed = now - self._start_time
 
+        if has_numpy():
+            qimg = self._compose_numpy(plan, elapsed, size_px)
+        else:
+            qimg = self._compose_pil(plan, elapsed, size_px)
+        self._final_label.setPixmap(QtGui.QPixmap.fromImage(qimg))
+
+    def _layer_bitmap(self, state: LayerState, size_px: int) -> "Image.Image" | None:
+        base = self._asset_bitmaps.get(state.asset)
+        if base is None and self._svg_layers is not None:
+            # Not drawn until the worker has rasterized it.
+            fallback = self._get_svg_raster(size_px, state.svg_index)
+            if fallback is not None:
+                base = load_pil_image(fallback)
+                if base is not None:
+                    self._asset_bitmaps[state.asset] = base
+        return base
+
+    def _compose_numpy(self, plan: AnimationPlan, elapsed: float, size_px: int) -> QtGui.QImage:
+        scale = max(1, round(PREVIEW_SIZE_PX / size_px))
+        compositor = self._compositor
+        if compositor is None or compositor.size_px != size_px or compositor.scale != scale:
+            compositor = Compositor(size_px, scale=scale)
+            self._compositor = compositor
+        composite_states(
+            compositor,
+            self._sprite_arrays,
+            plan.evaluate(elapsed),
+            lambda state: self._layer_bitmap(state, size_px),
+        )
+
+        frame = compositor.frame()
+        self._frame_bytes = frame
+        height, width = frame.shape[:2]
+        return QtGui.QImage(
+            frame.data,
+            width,
+            height,
+            width * 4,
+            QtGui.QImage.Format.Format_RGBA8888_Premultiplied,
+        )
+
+    def _compose_pil(self, plan: AnimationPlan, elapsed: float, size_px: int) -> QtGui.QImage:
         from PIL import Image
 
+        scale = PREVIEW_SIZE_PX / size_px
         canvas = Image.new("RGBA", (int(size_px), int(size_px)), (0, 0, 0, 0))
-        layers = self._spec_layers()
-        assets = {asset["asset_key"]: asset for asset in self._spec_assets()}
-        layer_map = self._layer_index_map()
-        fx = self._current_spec.get("fx", {})
 
-        for layer in layers:
-            base = self._asset_bitmaps.get(layer["asset"])
-            if base is None:
-                idx = layer_map.get(layer["asset"])
-                if idx is not None:
-                    fallback = self._get_svg_raster(size_px, idx)
-                    if fallback is not None:
-                        base = _load_pil_image(fallback)
+        for state in plan.evaluate(elapsed):
+            base = self._layer_bitmap(state, size_px)
             if base is None:
                 continue
-            img = base
-            offset_x = 0.0
-            offset_y = 0.0
-            opacity = 1.0
-            rotation = 0.0
-
-            for key in layer.get("fx", []):
-                value = fx.get(key, {})
-                if not isinstance(value, dict):
-                    continue
-                idx = layer_map.get(layer["asset"])
-                anim_types = self._svg_anim_map.get(idx, set())
-                if key == "ROTATE" and "rotate" not in anim_types and idx is not None:
-                    continue
-                if key in {"FALL", "FLOW_X"} and "translate" not in anim_types and idx is not None:
-                    continue
-                if key in {"TWINKLE", "FLASH", "CROSSFADE"} and "opacity" not in anim_types and idx is not None:
-                    continue
-
-                period_ms = float(value.get("period_ms", 0) or 0)
-                period = period_ms / 1000.0 if period_ms > 0 else 0.0
-                amp_x = float(value.get("amp_x", 0) or 0)
-                amp_y = float(value.get("amp_y", 0) or 0)
-                opa_min = float(value.get("opa_min", 0) or 0) / 255.0
-                opa_max = float(value.get("opa_max", 255) or 255) / 255.0
-                if key == "ROTATE" and period > 0:
-                    rotation = (elapsed / period) * 360.0
-                elif key == "FALL" and period > 0:
-                    fall_dy = float(value.get("fall_dy", 0) or 0)
-                    offset_y = (elapsed / period) * fall_dy
-                elif key == "FLOW_X" and period > 0:
-                    offset_x = (elapsed / period) * amp_x
-                elif key == "JITTER":
-                    offset_x += random.uniform(-amp_x, amp_x)
-                    offset_y += random.uniform(-amp_y, amp_y)
-                elif key == "DRIFT" and period > 0:
-                    offset_x += math.sin(elapsed * 2 * math.pi / period) * amp_x
-                    offset_y += math.cos(elapsed * 2 * math.pi / period) * amp_y
-                elif key == "TWINKLE" and period > 0:
-                    wave = 0.5 + 0.5 * math.sin(elapsed * 2 * math.pi / period)
-                    opacity *= opa_min + wave * (opa_max - opa_min)
-                elif key == "FLASH" and period > 0:
-                    phase = elapsed % period
-                    opacity *= opa_max if phase < (period / 2) else opa_min
-                elif key == "CROSSFADE" and period > 0:
-                    wave = 0.5 + 0.5 * math.cos(elapsed * 2 * math.pi / period)
-                    opacity *= opa_min + wave * (opa_max - opa_min)
-
-            img, pivot_offset = _apply_transform_with_pivot(
-                img,
-                rotation,
-                opacity,
-                float(img.width / 2),
-                float(img.height / 2),
+            pivot_x, pivot_y = layer_pivot(state, base.width, base.height, size_px)
+            img, pivot_offset = self._sprites.transform(
+                state.asset,
+                base,
+                state.rotation,
+                state.opacity,
+                pivot_x,
+                pivot_y,
             )
-            pivot_x = float(img.width / 2)
-            pivot_y = float(img.height / 2)
-            draw_x = int(offset_x + pivot_x - pivot_offset[0])
-            draw_y = int(offset_y + pivot_y - pivot_offset[1])
+            draw_x = int(round(state.offset_x + pivot_x - pivot_offset[0]))
+            draw_y = int(round(state.offset_y + pivot_y - pivot_offset[1]))
+            if draw_x < 0 or draw_y < 0:
+                # alpha_composite() rejects negative destinations: clip instead.
+                img = img.crop((max(0, -draw_x), max(0, -draw_y), img.width, img.height))
+                draw_x, draw_y = max(0, draw_x), max(0, draw_y)
             canvas.alpha_composite(img, (draw_x, draw_y))
 
         frame = canvas.resize((int(size_px * scale), int(size_px * scale)))
         self._frame_bytes = frame.tobytes("raw", "RGBA")
-        qimg = QtGui.QImage(
+        return QtGui.QImage(
             self._frame_bytes,
             frame.width,
             frame.height,
             QtGui.QImage.Format.Format_RGBA8888,
         )
-        self._final_label.setPixmap(QtGui.QPixmap.fromImage(qimg))
 
     def _resolve_assets_root(self) -> Path:
         if self._current_path is not None:
@@ -374,331 +438,122 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
             return self._current_svg.parent
         return Path.cwd()
 
-    def _default_asset_path(self, asset_key: str, size_px: int) -> str:
-        return f"{asset_key}_{size_px}.png"
-
     def _spec_layers(self) -> list[dict]:
-        if not self._current_spec:
-            return []
-        layers = self._current_spec.get("layers", [])
-        normalized = []
-        for layer in layers:
-            asset_key = layer.get("asset") or layer.get("asset_key")
-            if not asset_key:
-                continue
-            normalized.append(
-                {
-                    "id": layer.get("id") or asset_key,
-                    "asset": asset_key,
-                    "fx": list(layer.get("fx", [])),
-                }
-            )
-        return normalized
+        return spec_layers(self._current_spec)
 
     def _spec_assets(self) -> list[dict]:
-        if not self._current_spec:
-            return []
-        if "assets" in self._current_spec:
-            return list(self._current_spec.get("assets", []))
-        size_px = self._resolve_size_px()
-        assets: dict[str, dict] = {}
-        for layer in self._spec_layers():
-            key = layer["asset"]
-            if key in assets:
-                continue
-            assets[key] = {
-                "asset_key": key,
-                "size_px": size_px,
-                "path": self._default_asset_path(key, size_px),
-            }
-        return list(assets.values())
+        return spec_assets(self._current_spec, self._resolve_size_px())
 
     def _resolve_size_px(self) -> int:
         if not self._current_spec:
-            return 64
+            return DEFAULT_SIZE_PX
         size_px = int(self._current_spec.get("size_px", 0) or 0)
         if size_px > 0:
             return size_px
+        if self._pack is not None:
+            sizes = [
+                size
+                for layer in self._spec_layers()
+                for size in self._pack.image_sizes(layer["asset"])
+            ]
+            if sizes:
+                return max(sizes)
         if self._current_svg:
-            inferred = self._infer_svg_size(self._current_svg)
+            inferred = infer_svg_size(self._current_svg)
             if inferred:
                 return inferred
-        return 64
-
-    @staticmethod
-    def _infer_svg_size(svg_path: Path) -> int | None:
-        try:
-            tree = ET.parse(svg_path)
-        except ET.ParseError:
-            return None
-        root = tree.getroot()
-        width = root.attrib.get("width")
-        height = root.attrib.get("height")
-        for raw in (width, height):
-            if raw is None:
-                continue
-            cleaned = raw.strip()
-            if cleaned.endswith("px"):
-                cleaned = cleaned[:-2]
-            try:
-                return int(float(cleaned))
-            except ValueError:
-                continue
-        view_box = root.attrib.get("viewBox")
-        if view_box:
-            parts = view_box.replace(",", " ").split()
-            if len(parts) == 4:
-                try:
-                    return int(float(parts[2]))
-                except ValueError:
-                    return None
-        return None
+        return DEFAULT_SIZE_PX
 
     def _load_asset_pixmap(
         self, root: Path, asset: dict, layer_index: int | None
     ) -> QtGui.QPixmap | None:
+        if self._pack is not None:
+            return self._pack_pixmap(asset["asset_key"])
         path = root / asset.get("path", "")
         if path.exists():
             data = path.read_bytes()
-            if _png_has_alpha(data):
+            if png_has_alpha(data):
                 pixmap = QtGui.QPixmap()
                 pixmap.loadFromData(data)
                 return pixmap
-        data = self._get_svg_raster(
-            int(asset.get("size_px", 0)) or self._resolve_size_px(),
-            layer_index,
-        )
+        size_px = int(asset.get("size_px", 0)) or self._resolve_size_px()
+        data = self._get_svg_raster(size_px, layer_index)
         if data is None:
+            if self._rasterizer.is_pending(size_px, layer_index):
+                return self._placeholder_pixmap(size_px)
             return None
         pixmap = QtGui.QPixmap()
         pixmap.loadFromData(data)
         return pixmap
 
+    def _pack_pixmap(self, asset_key: str) -> QtGui.QPixmap | None:
+        assert self._pack is not None
+        size = nearest_size(self._pack.image_sizes(asset_key), self._resolve_size_px())
+        image = self._pack.image(asset_key, size) if size is not None else None
+        if image is None:
+            return None
+        data = image.tobytes("raw", "RGBA")
+        qimg = QtGui.QImage(
+            data, image.width, image.height, image.width * 4, QtGui.QImage.Format.Format_RGBA8888
+        )
+        return QtGui.QPixmap.fromImage(qimg.copy())
+
     def _prepare_asset_bitmaps(self) -> None:
-        assets_root = self._resolve_assets_root()
-        assets = self._spec_assets()
-        self._asset_bitmaps.clear()
-        layer_map = self._layer_index_map()
-        for asset in assets:
-            path = assets_root / asset.get("path", "")
-            if path.exists():
-                data = path.read_bytes()
-                if _png_has_alpha(data):
-                    image = _load_pil_image(data)
-                    if image is not None:
-                        self._asset_bitmaps[asset["asset_key"]] = image
-                    continue
-            idx = layer_map.get(asset["asset_key"])
-            fallback = self._get_svg_raster(
-                int(asset.get("size_px", 0)) or self._resolve_size_px(),
-                idx,
+        self._sprites.clear()
+        self._sprite_arrays.clear()
+        if self._pack is not None:
+            self._asset_bitmaps = load_pack_bitmaps(
+                self._pack, self._current_spec or {}, self._resolve_size_px()
             )
-            if fallback is None:
-                continue
-            image = _load_pil_image(fallback)
-            if image is not None:
-                self._asset_bitmaps[asset["asset_key"]] = image
+            return
+        # Disk PNGs only; missing layers are rasterized in the background by
+        # ``_layer_bitmap`` and picked up by the next animation frame.
+        self._asset_bitmaps = load_asset_bitmaps(
+            self._current_spec or {},
+            self._resolve_assets_root(),
+            self._resolve_size_px(),
+        )
 
     def _get_svg_raster(self, size_px: int, index: int | None) -> bytes | None:
-        if not self._current_svg:
-            return None
-        key = (size_px, index)
-        cached = self._svg_raster_cache.get(key)
-        if cached:
-            return cached
-        if index is None:
-            png_bytes = _render_svg_png(self._current_svg, size_px)
-        else:
-            png_bytes = self._render_svg_element(index, size_px)
-        if png_bytes is None:
-            return None
-        self._svg_raster_cache[key] = png_bytes
-        return png_bytes
+        """Cached raster, or None while a worker renders it (see ``_on_raster_ready``)."""
+        return self._rasterizer.request(size_px, index)
 
-    def _prepare_svg_layers(self, svg_path: Path) -> None:
-        try:
-            tree = ET.parse(svg_path)
-        except ET.ParseError:
-            self._svg_root = None
-            self._svg_paths = []
+    @staticmethod
+    def _placeholder_pixmap(size_px: int) -> QtGui.QPixmap:
+        pixmap = QtGui.QPixmap(size_px, size_px)
+        pixmap.fill(QtGui.QColor(220, 220, 220))
+        return pixmap
+
+    def _on_raster_ready(self, size_px: int, index: object) -> None:
+        # Coalesce a burst of finished layers into one grid rebuild.
+        if self._assets_refresh_queued:
             return
-        root = tree.getroot()
-        parents = {child: parent for parent in root.iter() for child in list(parent)}
-        id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
-        drawable = {
-            "path",
-            "circle",
-            "rect",
-            "ellipse",
-            "line",
-            "polyline",
-            "polygon",
-            "g",
-            "use",
-        }
-        paths: list[tuple[int, ...]] = []
-        anim_map: dict[int, set[str]] = {}
-
-        def _strip_ns(tag: str) -> str:
-            return tag.split("}", 1)[1] if "}" in tag else tag
-
-        def _path_to(elem: ET.Element) -> tuple[int, ...]:
-            parts = []
-            current = elem
-            while current is not root:
-                parent = parents[current]
-                parts.append(list(parent).index(current))
-                current = parent
-            return tuple(reversed(parts))
-
-        def _is_in_defs(elem: ET.Element) -> bool:
-            current = elem
-            while current is not None:
-                if _strip_ns(current.tag) == "defs":
-                    return True
-                current = parents.get(current)
-            return False
-
-        def _use_href(elem: ET.Element) -> str | None:
-            href = elem.attrib.get("href")
-            if href is None:
-                href = elem.attrib.get("{http://www.w3.org/1999/xlink}href")
-            if href is None:
-                href = elem.attrib.get("xlink:href")
-            if href is None:
-                return None
-            return href.lstrip("#")
-
-        def _is_drawable_target(elem: ET.Element, visited: set[ET.Element]) -> bool:
-            if elem in visited:
-                return False
-            visited.add(elem)
-            tag = _strip_ns(elem.tag)
-            if tag not in drawable:
-                return False
-            if tag == "use":
-                ref = _use_href(elem)
-                if not ref:
-                    return False
-                target = id_map.get(ref)
-                if target is None:
-                    return False
-                return _is_drawable_target(target, visited)
-            if tag == "g":
-                for child in list(elem):
-                    if _is_drawable_target(child, visited):
-                        return True
-                return False
-            if tag == "path":
-                return bool(elem.attrib.get("d"))
-            if tag == "circle":
-                return "r" in elem.attrib
-            if tag == "ellipse":
-                return "rx" in elem.attrib and "ry" in elem.attrib
-            if tag == "rect":
-                return "width" in elem.attrib and "height" in elem.attrib
-            if tag == "line":
-                return all(k in elem.attrib for k in ("x1", "y1", "x2", "y2"))
-            if tag in {"polyline", "polygon"}:
-                return "points" in elem.attrib
-            return True
-
-        def _is_drawable_element(elem: ET.Element) -> bool:
-            if _is_in_defs(elem):
-                return False
-            tag = _strip_ns(elem.tag)
-            if tag not in drawable:
-                return False
-            if tag == "use":
-                ref = _use_href(elem)
-                if not ref:
-                    return False
-                target = id_map.get(ref)
-                if target is None:
-                    return False
-                return _is_drawable_target(target, set())
-            if tag == "g":
-                for child in list(elem):
-                    if _is_drawable_element(child):
-                        return True
-                return False
-            if tag == "path":
-                return bool(elem.attrib.get("d"))
-            if tag == "circle":
-                return "r" in elem.attrib
-            if tag == "ellipse":
-                return "rx" in elem.attrib and "ry" in elem.attrib
-            if tag == "rect":
-                return "width" in elem.attrib and "height" in elem.attrib
-            if tag == "line":
-                return all(k in elem.attrib for k in ("x1", "y1", "x2", "y2"))
-            if tag in {"polyline", "polygon"}:
-                return "points" in elem.attrib
-            return True
-
-        for elem in root.iter():
-            tag = _strip_ns(elem.tag)
-            if tag == "defs":
-                continue
-            if tag in drawable and _is_drawable_element(elem):
-                index = len(paths)
-                paths.append(_path_to(elem))
-                anim_map[index] = self._element_anim_types(elem)
-        self._svg_root = root
-        self._svg_paths = paths
-        self._svg_anim_map = anim_map
-
-    def _element_anim_types(self, elem: ET.Element) -> set[str]:
-        types: set[str] = set()
-        for child in list(elem):
-            tag = child.tag.split("}", 1)[-1]
-            if tag == "animateTransform":
-                t = child.attrib.get("type")
-                if t == "rotate":
-                    types.add("rotate")
-                elif t == "translate":
-                    types.add("translate")
-            elif tag == "animate":
-                if child.attrib.get("attributeName") == "opacity":
-                    types.add("opacity")
-        return types
-
-    def _render_svg_element(self, index: int, size_px: int) -> bytes | None:
-        if self._svg_root is None or index >= len(self._svg_paths):
-            return None
-        root_copy = ET.fromstring(ET.tostring(self._svg_root))
-        target_path = self._svg_paths[index]
-
-        def _strip_ns(tag: str) -> str:
-            return tag.split("}", 1)[1] if "}" in tag else tag
-
-        def _filter(node: ET.Element, depth: int) -> None:
-            for idx, child in list(enumerate(list(node))):
-                tag = _strip_ns(child.tag)
-                if tag == "defs":
-                    continue
-                if depth < len(target_path) and idx == target_path[depth]:
-                    _filter(child, depth + 1)
-                else:
-                    node.remove(child)
-
-        _filter(root_copy, 0)
-        svg_bytes = ET.tostring(root_copy, encoding="utf-8")
-        return _render_svg_bytes(svg_bytes, size_px)
+        if self._tabs.tabText(self._tabs.currentIndex()).lower() != "assets":
+            return
+        self._assets_refresh_queued = True
+        QtCore.QTimer.singleShot(50, self._flush_raster_updates)
+
+    def _flush_raster_updates(self) -> None:
+        self._assets_refresh_queued = False
+        if self._tabs.tabText(self._tabs.currentIndex()).lower() == "assets":
+            self._render_assets()
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:  # noqa: N802 - Qt override
+        self._frame_timer.stop()
+        self._rasterizer.shutdown()
+        self._close_pack()
+        super().closeEvent(event)
 
     def _layer_index_map(self) -> dict[str, int]:
-        if not self._svg_paths or not self._current_spec:
+        if self._svg_layers is None or not self._current_spec:
             return {}
-        layers = self._spec_layers()
-        if len(layers) != len(self._svg_paths):
-            return {}
-        return {layer["asset"]: idx for idx, layer in enumerate(layers)}
+        return self._svg_layers.layer_index_map(self._spec_layers())
 
     def _update_dependencies(self) -> None:
         entries = [
-            ("Pillow", "OK" if _ensure_pillow() else "missing"),
-            ("cairosvg", "OK" if _has_cairosvg() else "missing"),
-            ("rsvg-convert", "OK" if _has_rsvg() else "missing"),
+            ("Pillow", "OK" if has_pillow() else "missing"),
+            ("cairosvg", "OK" if has_cairosvg() else "missing"),
+            ("rsvg-convert", "OK" if has_rsvg() else "missing"),
         ]
         missing = [(name, status) for name, status in entries if status != "OK"]
         if not missing:
@@ -717,147 +572,6 @@ class WxSpecQtGui(QtWidgets.QMainWindow):
                 widget.deleteLater()
 
 
-def _render_svg_png(svg_path: Path, size_px: int) -> bytes | None:
-    png = _render_svg_with_cairosvg(svg_path.read_bytes(), size_px)
-    if png is not None:
-        return png
-    return _render_svg_with_rsvg(svg_path.read_bytes(), size_px)
-
-def _render_svg_bytes(svg_bytes: bytes, size_px: int) -> bytes | None:
-    png = _render_svg_with_cairosvg(svg_bytes, size_px)
-    if png is not None:
-        return png
-    return _render_svg_with_rsvg(svg_bytes, size_px)
-
-
-def _render_svg_with_cairosvg(svg_bytes: bytes, size_px: int) -> bytes | None:
-    try:
-        import cairosvg  # type: ignore
-    except Exception:
-        return None
-    return cairosvg.svg2png(bytestring=svg_bytes, output_width=size_px, output_height=size_px)
-
-
-def _render_svg_with_rsvg(svg_bytes: bytes, size_px: int) -> bytes | None:
-    try:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            svg_path = Path(tmp_dir) / "preview.svg"
-            output_path = Path(tmp_dir) / "preview.png"
-            svg_path.write_bytes(svg_bytes)
-            result = subprocess.run(
-                [
-                    "rsvg-convert",
-                    "-w",
-                    str(size_px),
-                    "-h",
-                    str(size_px),
-                    "-o",
-                    str(output_path),
-                    str(svg_path),
-                ],
-                check=False,
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                return None
-            return output_path.read_bytes()
-    except FileNotFoundError:
-        return None
-
-
-def _png_has_alpha(data: bytes) -> bool:
-    if not data.startswith(b"\x89PNG\r\n\x1a\n"):
-        return False
-    if len(data) < 33:
-        return False
-    if data[12:16] != b"IHDR":
-        return False
-    color_type = data[25]
-    return color_type in (4, 6)
-
-
-def _ensure_pillow() -> bool:
-    try:
-        import PIL  # noqa: F401
-    except Exception:
-        return False
-    return True
-
-
-def _load_pil_image(data: bytes) -> "Image.Image" | None:
-    try:
-        from PIL import Image
-    except Exception:
-        return None
-    try:
-        return Image.open(io.BytesIO(data)).convert("RGBA")
-    except Exception:
-        return None
-
-
-def _apply_transform(image: "Image.Image", rotation: float, opacity: float) -> "Image.Image":
-    from PIL import Image
-
-    out = image
-    if rotation:
-        out = out.rotate(-rotation, expand=True, resample=Image.BICUBIC)
-    if opacity < 1.0:
-        alpha = out.getchannel("A")
-        alpha = alpha.point(lambda a: max(0, min(255, int(a * opacity))))
-        out.putalpha(alpha)
-    return out
-
-
-def _apply_transform_with_pivot(
-    image: "Image.Image", rotation: float, opacity: float, pivot_x: float, pivot_y: float
-) -> tuple["Image.Image", tuple[float, float]]:
-    from PIL import Image
-
-    out = image
-    if rotation:
-        out = out.rotate(
-            -rotation,
-            expand=True,
-            resample=Image.BICUBIC,
-            center=(pivot_x, pivot_y),
-        )
-    if opacity < 1.0:
-        alpha = out.getchannel("A")
-        alpha = alpha.point(lambda a: max(0, min(255, int(a * opacity))))
-        out.putalpha(alpha)
-
-    if not rotation:
-        return out, (pivot_x, pivot_y)
-
-    rad = math.radians(rotation)
-    cos_a = math.cos(rad)
-    sin_a = math.sin(rad)
-    corners = [
-        (-pivot_x, -pivot_y),
-        (image.width - pivot_x, -pivot_y),
-        (-pivot_x, image.height - pivot_y),
-        (image.width - pivot_x, image.height - pivot_y),
-    ]
-    rotated = [(x * cos_a - y * sin_a, x * sin_a + y * cos_a) for x, y in corners]
-    min_x = min(x for x, _ in rotated)
-    min_y = min(y for _, y in rotated)
-    pivot_offset = (pivot_x - min_x, pivot_y - min_y)
-    return out, pivot_offset
-
-
-def _has_cairosvg() -> bool:
-    try:
-        import cairosvg  # type: ignore  # noqa: F401
-    except Exception:
-        return False
-    return True
-
-
-def _has_rsvg() -> bool:
-    return shutil.which("rsvg-convert") is not None
-
-
 def main() -> int:
     os.environ.setdefault(
         "QTWEBENGINE_CHROMIUM_FLAGS", "--disable-vulkan --disable-gpu"
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Iterable
+import xml.etree.ElementTree as ET
 
-from pipeline.assets.naming import normalize_asset_key
+from pipeline.assets.naming import default_asset_path, normalize_asset_key
+from pipeline.fx.contracts import fields_with_unit
 from pipeline.hash import fnv1a32
-from pipeline.spec.model import Components, LayerSpec, Spec
-from pipeline.svg.parse import SvgDocument, parse_svg
+from pipeline.spec.model import Asset, Components, LayerSpec, Spec
+from pipeline.svg.parse import SvgDocument, Viewport, parse_svg_root, pivot_px
 from pipeline.wxspec import validate_spec
 
+PX_FIELDS = fields_with_unit("px")
+
 
 def _derive_spec_name(svg: SvgDocument, svg_path: Path, explicit: str | None) -> str:
     raw = explicit or svg.spec_id or svg_path.stem
@@ -29,21 +35,55 @@ def _unique_layer_id(base: str, used: set[str]) -> str:
         index += 1
 
 
-def _layers_from_svg(svg: SvgDocument) -> list[LayerSpec]:
-    layers: list[LayerSpec] = []
+@dataclass(slots=True)
+class _LayerTable:
+    """Spec layers in z order, with the z -> layer index lookup of the FX stage.
+
+    ``offsets`` holds each layer's shared-asset shift in SVG user units; it
+    is scaled and rounded per export size (``_sized_spec``).
+    """
+
+    layers: list[LayerSpec] = field(default_factory=list)
+    z_index: dict[int, int] = field(default_factory=dict)
+    offsets: list[tuple[float, float] | None] = field(default_factory=list)
+
+
+def _layers_from_svg(svg: SvgDocument) -> _LayerTable:
+    table = _LayerTable()
     used_ids: set[str] = set()
     for raw in sorted(svg.layers, key=lambda layer: layer.z):
         base_id = normalize_asset_key(raw.asset_key)
         asset_key = normalize_asset_key(raw.asset_ref or raw.asset_key)
         layer_id = _unique_layer_id(base_id, used_ids)
-        layers.append(
-            LayerSpec(
-                layer_id=layer_id,
-                asset=asset_key,
-                fx=[],
-            )
-        )
-    return layers
+        # Duplicate z: FX target the first layer drawn at that z.
+        table.z_index.setdefault(raw.z, len(table.layers))
+        # A shared asset is rasterized where its first layer sits: keep the shift.
+        shifted = raw.asset_ref is not None and (raw.x, raw.y) != (0, 0)
+        table.layers.append(LayerSpec(layer_id=layer_id, asset=asset_key, fx=[]))
+        table.offsets.append((raw.x, raw.y) if shifted else None)
+    return table
+
+
+def _assign_fx(table: _LayerTable, svg_fx: dict) -> dict:
+    """Attach every SVG fx entry to its target layers; return the spec fx table."""
+    layers = table.layers
+    fx = {}
+    for key, raw in svg_fx.items():
+        if not isinstance(raw, dict):
+            continue
+        fx[key] = {k: v for k, v in raw.items() if k not in {"enabled", "target_z"}}
+        target_z = raw.get("target_z")
+        if target_z is None and len(layers) == 1:
+            indices = [0]
+        else:
+            targets = target_z if isinstance(target_z, list) else [target_z]
+            indices = [table.z_index[z] for z in targets if z in table.z_index]
+        for index in indices:
+            if key not in layers[index].fx:
+                layers[index].fx.append(key)
+    # Only configured FX some layer uses, in first-use order.
+    used_fx = dict.fromkeys(fx_key for layer in layers for fx_key in layer.fx)
+    return {key: fx[key] for key in used_fx if key in fx}
 
 
 def _default_layer_for_svg(spec_name: str) -> list[LayerSpec]:
@@ -56,60 +96,155 @@ def _default_layer_for_svg(spec_name: str) -> list[LayerSpec]:
     ]
 
 
+def shared_asset_count(spec: Spec) -> int:
+    """Layers that reuse another layer's asset (assets saved by signature dedup)."""
+    return len(spec.layers) - len({layer.asset for layer in spec.layers})
+
+
+def _svg_viewport(root: ET.Element, size_px: int) -> Viewport | None:
+    """User space -> ``size_px`` mapping; None when it is the identity or unknown."""
+    try:
+        viewport = Viewport(root, size_px)
+    except ValueError:
+        return None
+    if (viewport.sx, viewport.sy, viewport.min_x, viewport.min_y) == (1.0, 1.0, 0.0, 0.0):
+        return None
+    return viewport
+
+
+def scale_fx(fx: dict, viewport: Viewport | None) -> dict:
+    """Copy of ``fx`` with its px fields moved from SVG user units to ``viewport.size_px``.
+
+    Pivots are positions and follow the §6.2 rule of
+    ``assets-naming-and-packing.md``; the other px fields are lengths.
+    """
+    if viewport is None:
+        return {key: dict(params) for key, params in fx.items()}
+    scaled = {}
+    for key, params in fx.items():
+        params = dict(params)
+        for name in PX_FIELDS:
+            value = params.get(name)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            axis = name[-1]
+            if name.startswith("pivot_"):
+                params[name] = pivot_px(viewport.normalized(axis, value), viewport.size_px)
+            else:
+                params[name] = max(0, int(round(viewport.length(axis, value))))
+        scaled[key] = params
+    return scaled
+
+
+def _scale_offset(
+    offset: tuple[float, float] | None, viewport: Viewport | None
+) -> tuple[int, int] | None:
+    """Shared-asset ``offset`` moved from SVG user units to ``viewport.size_px`` pixels."""
+    if offset is None:
+        return None
+    dx, dy = offset
+    if viewport is not None:
+        dx, dy = viewport.length("x", dx), viewport.length("y", dy)
+    scaled = (int(round(dx)), int(round(dy)))
+    return scaled if scaled != (0, 0) else None
+
+
+def _map_document(
+    svg: SvgDocument, name: str
+) -> tuple[Spec, list[tuple[float, float] | None]]:
+    """The spec of ``svg`` with FX parameters in SVG user units, and its layer offsets."""
+    table = _layers_from_svg(svg)
+    if not table.layers:
+        table.layers = _default_layer_for_svg(name)
+    if not table.layers:
+        raise ValueError("no layers found in SVG")
+    fx = _assign_fx(table, svg.fx)
+    offsets = table.offsets or [None] * len(table.layers)
+    spec = Spec(
+        spec_id=fnv1a32(name),
+        name=name,
+        components=Components(
+            decor="NONE",
+            cover="NONE",
+            particles="NONE",
+            atmos="NONE",
+            event="NONE",
+        ),
+        layers=table.layers,
+        fx=fx,
+    )
+    return spec, offsets
+
+
+def _sized_spec(
+    base: Spec,
+    offsets: list[tuple[float, float] | None],
+    root: ET.Element,
+    size_px: int,
+) -> Spec:
+    viewport = _svg_viewport(root, size_px)
+    spec = replace(
+        base,
+        layers=[
+            replace(layer, fx=list(layer.fx), offset=_scale_offset(offset, viewport))
+            for layer, offset in zip(base.layers, offsets)
+        ],
+        fx=scale_fx(base.fx, viewport),
+    )
+    validate_spec(spec)
+    return spec
+
+
 def map_svg_to_spec(
     svg_path: Path,
     *,
     spec_id: str | None = None,
     size_px: int | None = None,
 ) -> Spec:
-    svg = parse_svg(svg_path)
+    root = ET.parse(svg_path).getroot()
+    svg = parse_svg_root(root)
     resolved_name = _derive_spec_name(svg, svg_path, spec_id)
     resolved_size = size_px or svg.width or svg.height
     if resolved_size is None:
         raise ValueError("size_px not provided and SVG size not found")
+    base, offsets = _map_document(svg, resolved_name)
+    return _sized_spec(base, offsets, root, resolved_size)
 
-    layers = _layers_from_svg(svg)
-    if not layers:
-        layers = _default_layer_for_svg(resolved_name)
-    if not layers:
-        raise ValueError("no layers found in SVG")
 
-    fx = {}
-    fx_targets = {}
-    for key, raw in svg.fx.items():
-        if not isinstance(raw, dict):
-            continue
-        target_z = raw.get("target_z")
-        fx_targets[key] = target_z
-        cleaned = {k: v for k, v in raw.items() if k not in {"enabled", "target_z"}}
-        fx[key] = cleaned
-
-    if fx_targets:
-        for key, target_z in fx_targets.items():
-            if target_z is None and len(layers) == 1:
-                layers[0].fx.append(key)
-                continue
-            for raw_layer in svg.layers:
-                if raw_layer.z == target_z:
-                    index = sorted(svg.layers, key=lambda layer: layer.z).index(raw_layer)
-                    layers[index].fx.append(key)
-                    break
+@dataclass(slots=True)
+class SizedMapping:
+    """Specs of one SVG at several sizes, sharing the parsed document.
 
-    used_fx = {fx_key for layer in layers for fx_key in layer.fx}
-    fx = {key: fx.get(key, {}) for key in used_fx}
+    Rendering their assets is ``pipeline.mapping_raster.rasterize_sizes``.
+    """
 
-    spec = Spec(
-        spec_id=fnv1a32(resolved_name),
-        name=resolved_name,
-        components=Components(
-            decor="NONE",
-            cover="NONE",
-            particles="NONE",
-            atmos="NONE",
-            event="NONE",
-        ),
-        layers=layers,
-        fx=fx,
-    )
-    validate_spec(spec)
-    return spec
+    root: ET.Element
+    specs: dict[int, Spec]
+
+
+def map_svg_to_sizes(
+    svg_path: Path,
+    sizes: Iterable[int],
+    *,
+    spec_id: str | None = None,
+) -> SizedMapping:
+    """``map_svg_to_spec`` at every size of ``sizes`` from a single parse.
+
+    Each spec lists its ``<asset>_<size>.png`` assets and carries px FX
+    parameters scaled to its size.
+    """
+    sizes = list(dict.fromkeys(sizes))
+    if not sizes:
+        raise ValueError("at least one size_px is required")
+    root = ET.parse(svg_path).getroot()
+    svg = parse_svg_root(root)
+    base, offsets = _map_document(svg, _derive_spec_name(svg, svg_path, spec_id))
+    specs = {}
+    for size_px in sizes:
+        spec = _sized_spec(base, offsets, root, size_px)
+        spec.assets = [
+            Asset(asset_key=key, size_px=size_px, path=default_asset_path(key, size_px))
+            for key in dict.fromkeys(layer.asset for layer in spec.layers)
+        ]
+        specs[size_px] = spec
+    return SizedMapping(root=root, specs=specs)
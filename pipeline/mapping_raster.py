@@ -0,0 +1,60 @@
+"""Render the assets of a multi-size mapping (``map_svg_to_sizes``)."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+
+from pipeline.mapping import SizedMapping
+from pipeline.preview.source import SvgLayerSource
+from pipeline.raster import render_svg_bytes
+
+
+def asset_elements(mapping: SizedMapping, source: SvgLayerSource | None = None) -> dict[str, int]:
+    """Asset key -> drawable element index (a shared asset is its first layer)."""
+    source = source or SvgLayerSource(mapping.root)
+    layers = next(iter(mapping.specs.values())).layers
+    if len(layers) != len(source):
+        raise ValueError("cannot rasterize: spec layers do not match the SVG's auto layers")
+    elements: dict[str, int] = {}
+    for index, layer in enumerate(layers):
+        elements.setdefault(layer.asset, index)
+    return elements
+
+
+def _render_task(task: tuple[bytes, int]) -> bytes | None:
+    svg_bytes, size_px = task
+    return render_svg_bytes(svg_bytes, size_px)
+
+
+def rasterize_sizes(
+    mapping: SizedMapping, output_dir: Path, *, workers: int | None = 1
+) -> list[Path]:
+    """Write every asset of every size under ``output_dir``; a missing rasterizer raises.
+
+    Each asset's reduced SVG is serialized once and rendered at all sizes,
+    in a process pool of ``workers`` (default ``os.cpu_count()``).
+    """
+    source = SvgLayerSource(mapping.root)
+    elements = asset_elements(mapping, source)
+    layer_svgs = {asset: source.layer_svg(index) for asset, index in elements.items()}
+    jobs = [
+        (output_dir / asset.path, (layer_svgs[asset.asset_key], size_px))
+        for size_px, spec in mapping.specs.items()
+        for asset in spec.assets
+    ]
+    tasks = [task for _, task in jobs]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < 2:
+        pngs = [_render_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pngs = list(pool.map(_render_task, tasks))
+    if any(png is None for png in pngs):
+        raise RuntimeError("no SVG rasterizer available (cairosvg or rsvg-convert)")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for (path, _), png in zip(jobs, pngs):
+        path.write_bytes(png)
+    return [path for path, _ in jobs]
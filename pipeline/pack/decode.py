@@ -0,0 +1,185 @@
+"""Decode WXPK image blobs (``LVGL_BIN``, ``PNG``, ``RAW_RGBA8888``) to RGBA.
+
+``LVGL_BIN`` is the ``.bin`` output of LVGL's image converter. Both header
+layouts are accepted: the v8 4-byte bitfield header (``cf`` in the low 5
+bits, then 11-bit width and height) and the v9 12-byte header starting
+with the ``0x19`` magic. Pixel data is little-endian as on the device;
+16-bit colour is RGB565 without byte swap.
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+from typing import TYPE_CHECKING
+
+from pipeline.wxpk import WXPK_C_LVGL_BIN, WXPK_C_PNG, WXPK_C_RAW_RGBA8888
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+# LVGL v8 ``lv_img_cf_t``.
+LV8_CF_TRUE_COLOR = 4
+LV8_CF_TRUE_COLOR_ALPHA = 5
+LV8_CF_ALPHA_8BIT = 14
+
+# LVGL v9 ``lv_color_format_t``.
+LV9_MAGIC = 0x19
+LV9_CF_A8 = 0x0E
+LV9_CF_RGB888 = 0x0F
+LV9_CF_ARGB8888 = 0x10
+LV9_CF_XRGB8888 = 0x11
+LV9_CF_RGB565 = 0x12
+LV9_CF_RGB565A8 = 0x14
+
+_LV9_HEADER = struct.Struct("<BBHHHHH")
+
+
+def _alpha_plane(alpha: bytes, width: int, height: int) -> "Image.Image":
+    from PIL import Image
+
+    return Image.frombytes("L", (width, height), alpha)
+
+
+def _alpha_only(alpha: bytes, width: int, height: int) -> "Image.Image":
+    from PIL import Image
+
+    # A8 images are drawn with the recolor style, black by default.
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    image.putalpha(_alpha_plane(alpha, width, height))
+    return image
+
+
+def _rgb565(data: bytes, width: int, height: int, stride: int | None = None) -> "Image.Image":
+    from PIL import Image
+
+    return Image.frombuffer("RGB", (width, height), data, "raw", "BGR;16", stride or 0, 1).convert(
+        "RGBA"
+    )
+
+
+def _bgra(data: bytes, width: int, height: int, stride: int | None = None) -> "Image.Image":
+    from PIL import Image
+
+    return Image.frombuffer("RGBA", (width, height), data, "raw", "BGRA", stride or 0, 1).copy()
+
+
+def _bgrx(data: bytes, width: int, height: int, stride: int | None = None) -> "Image.Image":
+    from PIL import Image
+
+    return Image.frombuffer("RGB", (width, height), data, "raw", "BGRX", stride or 0, 1).convert(
+        "RGBA"
+    )
+
+
+def _check_length(data: bytes, needed: int, what: str) -> None:
+    if len(data) < needed:
+        raise ValueError(f"truncated {what}: {len(data)} < {needed} bytes")
+
+
+def _decode_lvgl_v8(blob: bytes) -> "Image.Image":
+    (word,) = struct.unpack_from("<I", blob, 0)
+    cf = word & 0x1F
+    width = (word >> 10) & 0x7FF
+    height = (word >> 21) & 0x7FF
+    if width == 0 or height == 0:
+        raise ValueError("LVGL image has zero size")
+    data = blob[4:]
+    pixels = width * height
+    if cf == LV8_CF_ALPHA_8BIT:
+        _check_length(data, pixels, "A8 image")
+        return _alpha_only(bytes(data[:pixels]), width, height)
+    if cf == LV8_CF_TRUE_COLOR:
+        # The colour depth is a build option; infer it from the payload size.
+        if len(data) >= pixels * 4:
+            return _bgrx(data, width, height)
+        _check_length(data, pixels * 2, "RGB565 image")
+        return _rgb565(data, width, height)
+    if cf == LV8_CF_TRUE_COLOR_ALPHA:
+        if len(data) >= pixels * 4:
+            return _bgra(data, width, height)
+        _check_length(data, pixels * 3, "RGB565+A8 image")
+        # Interleaved per pixel: RGB565 (2 bytes) then A8.
+        raw = bytes(data[: pixels * 3])
+        color = bytearray(pixels * 2)
+        color[0::2] = raw[0::3]
+        color[1::2] = raw[1::3]
+        image = _rgb565(bytes(color), width, height)
+        image.putalpha(_alpha_plane(raw[2::3], width, height))
+        return image
+    raise ValueError(f"unsupported LVGL v8 colour format {cf}")
+
+
+def _decode_lvgl_v9(blob: bytes) -> "Image.Image":
+    _check_length(blob, _LV9_HEADER.size, "LVGL v9 header")
+    _, cf, _flags, width, height, stride, _ = _LV9_HEADER.unpack_from(blob, 0)
+    if width == 0 or height == 0:
+        raise ValueError("LVGL image has zero size")
+    data = blob[_LV9_HEADER.size :]
+    if cf == LV9_CF_A8:
+        stride = stride or width
+        _check_length(data, stride * height, "A8 image")
+        rows = b"".join(bytes(data[row * stride : row * stride + width]) for row in range(height))
+        return _alpha_only(rows, width, height)
+    if cf == LV9_CF_ARGB8888:
+        _check_length(data, (stride or width * 4) * height, "ARGB8888 image")
+        return _bgra(data, width, height, stride)
+    if cf == LV9_CF_XRGB8888:
+        _check_length(data, (stride or width * 4) * height, "XRGB8888 image")
+        return _bgrx(data, width, height, stride)
+    if cf == LV9_CF_RGB888:
+        from PIL import Image
+
+        _check_length(data, (stride or width * 3) * height, "RGB888 image")
+        return Image.frombuffer(
+            "RGB", (width, height), data, "raw", "BGR", stride or 0, 1
+        ).convert("RGBA")
+    if cf == LV9_CF_RGB565:
+        _check_length(data, (stride or width * 2) * height, "RGB565 image")
+        return _rgb565(data, width, height, stride)
+    if cf == LV9_CF_RGB565A8:
+        # Planar: the RGB565 plane, then an A8 plane with its own (halved) stride.
+        stride = stride or width * 2
+        color_size = stride * height
+        alpha_stride = stride // 2
+        _check_length(data, color_size + alpha_stride * height, "RGB565A8 image")
+        image = _rgb565(data, width, height, stride)
+        alpha = b"".join(
+            bytes(data[color_size + row * alpha_stride : color_size + row * alpha_stride + width])
+            for row in range(height)
+        )
+        image.putalpha(_alpha_plane(alpha, width, height))
+        return image
+    raise ValueError(f"unsupported LVGL v9 colour format 0x{cf:02X}")
+
+
+def decode_lvgl_bin(blob: bytes) -> "Image.Image":
+    """Decode an LVGL ``.bin`` image (v8 or v9 header) to RGBA."""
+    _check_length(blob, 4, "LVGL header")
+    if blob[0] == LV9_MAGIC:
+        return _decode_lvgl_v9(blob)
+    return _decode_lvgl_v8(blob)
+
+
+def decode_raw_rgba(blob: bytes, size_px: int) -> "Image.Image":
+    """A square ``size_px`` RGBA8888 bitmap."""
+    from PIL import Image
+
+    if size_px <= 0:
+        raise ValueError("RAW_RGBA8888 needs size_px > 0")
+    _check_length(blob, size_px * size_px * 4, "RGBA8888 image")
+    return Image.frombytes("RGBA", (size_px, size_px), bytes(blob[: size_px * size_px * 4]))
+
+
+def decode_image(codec: int, blob: bytes, size_px: int) -> "Image.Image":
+    """Decode one ``WXPK_T_IMG`` blob to an RGBA ``PIL.Image``."""
+    if codec == WXPK_C_LVGL_BIN:
+        return decode_lvgl_bin(blob)
+    if codec == WXPK_C_PNG:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(blob)) as image:
+            return image.convert("RGBA")
+    if codec == WXPK_C_RAW_RGBA8888:
+        return decode_raw_rgba(blob, size_px)
+    raise ValueError(f"unsupported image codec {codec}")
@@ -0,0 +1,185 @@
+"""Indexed, lazily-decoding WXPK reader.
+
+The header and TOC are parsed once into a dict keyed like the runtime
+lookup, ``(key_hash, type, size_px)``. Blobs are sliced out of the pack
+without copying (the file is memory-mapped by ``PackReader.open``), their
+CRC is checked on first access, and decoded images are kept in a
+byte-bounded LRU so a theme can be browsed or animated without decoding
+every asset up front.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+from pathlib import Path
+import threading
+from typing import TYPE_CHECKING, Iterable
+import zlib
+
+from pipeline.hash import fnv1a32
+from pipeline.pack.decode import decode_image
+from pipeline.pack.timers import TIMER_TABLE_KEY
+from pipeline.pack.toc import TocEntry
+from pipeline.util.cache import LruCache
+from pipeline.wxpk import (
+    WXPK_T_IMG,
+    WXPK_T_JSON_INDEX,
+    WXPK_T_JSON_SPEC,
+    PackHeader,
+    parse_header,
+    parse_toc,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+DECODED_CACHE_BYTES = 32 << 20
+
+TocKey = tuple[int, int, int]
+
+
+def _image_weight(image: "Image.Image") -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+class PackReader:
+    """Random access to the entries of one WXPK pack."""
+
+    def __init__(
+        self,
+        data: bytes | bytearray | memoryview | mmap.mmap,
+        *,
+        cache_bytes: int = DECODED_CACHE_BYTES,
+    ) -> None:
+        self._data = data
+        self._view = memoryview(data)
+        self.header: PackHeader = parse_header(self._view)
+        self.entries: list[TocEntry] = parse_toc(self._view, self.header)
+        self._index: dict[TocKey, TocEntry] = {}
+        self._sizes: dict[int, list[int]] = {}
+        for entry in self.entries:
+            if entry.offset + entry.length > len(self._view):
+                raise ValueError(f"blob out of bounds for key 0x{entry.key_hash:08X}")
+            self._index[(entry.key_hash, entry.type_code, entry.size_px)] = entry
+            if entry.type_code == WXPK_T_IMG:
+                self._sizes.setdefault(entry.key_hash, []).append(entry.size_px)
+        for sizes in self._sizes.values():
+            sizes.sort()
+        self._verified: set[TocKey] = set()
+        self._lock = threading.Lock()
+        self._images: LruCache[TocKey, "Image.Image"] = LruCache(cache_bytes, weigh=_image_weight)
+
+    @classmethod
+    def open(cls, path: Path, *, cache_bytes: int = DECODED_CACHE_BYTES) -> "PackReader":
+        """Memory-map ``path`` read-only; call ``close`` (or use ``with``) when done."""
+        with Path(path).open("rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped, cache_bytes=cache_bytes)
+        except Exception:
+            mapped.close()
+            raise
+
+    def close(self) -> None:
+        self._images.clear()
+        self._view.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def find(self, key_hash: int, type_code: int, size_px: int = 0) -> TocEntry | None:
+        return self._index.get((key_hash, type_code, size_px))
+
+    def blob(self, entry: TocEntry) -> memoryview:
+        """Zero-copy view of ``entry``'s blob; raises ValueError on a CRC mismatch."""
+        view = self._view[entry.offset : entry.offset + entry.length]
+        key = (entry.key_hash, entry.type_code, entry.size_px)
+        if key not in self._verified:
+            if zlib.crc32(view) & 0xFFFFFFFF != entry.crc32:
+                raise ValueError(f"CRC mismatch for key 0x{entry.key_hash:08X}")
+            with self._lock:
+                self._verified.add(key)
+        return view
+
+    def _json(self, key_hash: int, type_code: int) -> dict | None:
+        entry = self.find(key_hash, type_code)
+        if entry is None:
+            return None
+        return json.loads(self.blob(entry).tobytes().decode("utf-8"))
+
+    def spec_ids(self) -> list[int]:
+        return [entry.key_hash for entry in self.entries if entry.type_code == WXPK_T_JSON_SPEC]
+
+    def spec(self, spec_id: int) -> dict | None:
+        return self._json(spec_id, WXPK_T_JSON_SPEC)
+
+    def spec_by_name(self, name: str) -> dict | None:
+        """Look up a spec by name (``spec_id`` is the FNV-1a hash of the name)."""
+        return self.spec(fnv1a32(name))
+
+    def specs(self) -> Iterable[dict]:
+        for spec_id in self.spec_ids():
+            spec = self.spec(spec_id)
+            if spec is not None:
+                yield spec
+
+    def timer_table(self) -> dict | None:
+        return self._json(TIMER_TABLE_KEY, WXPK_T_JSON_INDEX)
+
+    def image_sizes(self, asset: str | int) -> list[int]:
+        key_hash = fnv1a32(asset) if isinstance(asset, str) else asset
+        return list(self._sizes.get(key_hash, ()))
+
+    def image(self, asset: str | int, size_px: int) -> "Image.Image | None":
+        """Decoded RGBA image of ``asset`` (key or hash) at ``size_px``, or None if absent.
+
+        The returned image is shared with the cache; copy it before mutating.
+        """
+        key_hash = fnv1a32(asset) if isinstance(asset, str) else asset
+        key = (key_hash, WXPK_T_IMG, size_px)
+        cached = self._images.get(key)
+        if cached is not None:
+            return cached
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        image = decode_image(entry.codec, self.blob(entry), size_px)
+        self._images.put(key, image)
+        return image
+
+
+def nearest_size(sizes: list[int], size_px: int) -> int | None:
+    """``size_px`` if available, else the smallest larger size, else the largest."""
+    if not sizes:
+        return None
+    if size_px in sizes:
+        return size_px
+    larger = [size for size in sizes if size > size_px]
+    return min(larger) if larger else max(sizes)
+
+
+def load_pack_bitmaps(
+    reader: PackReader, spec: dict, size_px: int
+) -> dict[str, "Image.Image"]:
+    """Decoded bitmap of every layer asset of ``spec``, resized to ``size_px`` when needed."""
+    bitmaps: dict[str, "Image.Image"] = {}
+    for layer in spec.get("layers", []):
+        key = layer.get("asset")
+        if not key or key in bitmaps:
+            continue
+        size = nearest_size(reader.image_sizes(key), size_px)
+        if size is None:
+            continue
+        image = reader.image(key, size)
+        if image is None:
+            continue
+        if image.size != (size_px, size_px):
+            image = image.resize((size_px, size_px))
+        bitmaps[key] = image
+    return bitmaps
@@ -0,0 +1,97 @@
+"""Shared-timeline table stored as the pack's ``WXPK_T_JSON_INDEX`` entry.
+
+Every periodic FX of every spec in a pack is grouped by
+``(fx, period_ms, easing)``. The runtime ticks one timer per group and fans
+the current phase out to the group's members (spec, layer index, phase
+offsets), instead of running one ``lv_anim`` per layer.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+from typing import Iterable
+
+from pipeline.fx.contracts import FX_EASING
+from pipeline.hash import fnv1a32
+from pipeline.spec.model import FX_KEYS, Spec, fx_type
+
+TIMER_TABLE_VERSION = 1
+TIMER_TABLE_NAME = "wx_timers"
+TIMER_TABLE_KEY = fnv1a32(TIMER_TABLE_NAME)
+
+
+@dataclass(frozen=True, slots=True)
+class TimerMember:
+    spec_id: int
+    layer: int
+    phase_ms: tuple[int, ...] = ()
+
+    def to_dict(self) -> dict:
+        data: dict = {"spec_id": self.spec_id, "layer": self.layer}
+        if self.phase_ms:
+            data["phase_ms"] = list(self.phase_ms)
+        return data
+
+
+@dataclass(slots=True)
+class TimerGroup:
+    fx: str
+    period_ms: int
+    easing: str
+    members: list[TimerMember] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "fx": self.fx,
+            "period_ms": self.period_ms,
+            "easing": self.easing,
+            "members": [member.to_dict() for member in self.members],
+        }
+
+
+def _fx_params(value: object) -> dict:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()  # type: ignore[no-any-return]
+    if isinstance(value, dict):
+        return value
+    return {}
+
+
+def build_timer_groups(specs: Iterable[Spec]) -> list[TimerGroup]:
+    """Group the periodic FX of ``specs``; order is FX_KEYS order, then period."""
+    groups: dict[tuple[str, int, str], TimerGroup] = {}
+    for spec in specs:
+        for layer_index, layer in enumerate(spec.layers):
+            for key in layer.fx:
+                kind = fx_type(key)
+                easing = FX_EASING.get(kind)
+                if easing is None:
+                    continue
+                params = _fx_params(spec.fx.get(key, {}))
+                period = params.get("period_ms")
+                if not isinstance(period, int) or period <= 0:
+                    continue
+                group_key = (kind, period, easing)
+                group = groups.get(group_key)
+                if group is None:
+                    group = groups[group_key] = TimerGroup(kind, period, easing)
+                phases = params.get("phase_ms") or ()
+                group.members.append(
+                    TimerMember(int(spec.spec_id), layer_index, tuple(phases))
+                )
+    order = {key: index for index, key in enumerate(FX_KEYS)}
+    return sorted(groups.values(), key=lambda group: (order[group.fx], group.period_ms))
+
+
+def timer_table(specs: Iterable[Spec]) -> dict:
+    groups = build_timer_groups(specs)
+    return {
+        "version": TIMER_TABLE_VERSION,
+        "timers": [group.to_dict() for group in groups],
+    }
+
+
+def timer_table_bytes(specs: Iterable[Spec]) -> bytes:
+    """Compact UTF-8 JSON of the timer table (the blob written to the pack)."""
+    return json.dumps(timer_table(specs), separators=(",", ":")).encode("utf-8")
@@ -0,0 +1 @@
+"""Headless preview rendering helpers."""
@@ -0,0 +1,241 @@
+"""Deterministic offline rendering of a spec's animation to RGBA frames.
+
+Frame ``i`` is evaluated at ``t = i / fps`` with its own
+``random.Random(seed, i)`` stream, so a frame's pixels do not depend on
+which worker renders it or in what order. Compositing is the same path as
+the Qt preview (``RotationCache`` + ``Compositor``), so golden hashes taken
+here also pin the preview's FX semantics.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import os
+from pathlib import Path
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Mapping
+
+from pipeline.fx.timeline import AnimationPlan, LayerState, compile_plan
+from pipeline.preview.compose import Compositor, premultiply, unpremultiply
+from pipeline.preview.source import SvgLayerSource, spec_assets, spec_layers
+from pipeline.preview.sprites import RotationCache
+from pipeline.raster import load_pil_image, png_has_alpha
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+_FRAME_SEED_STRIDE = 1_000_003
+
+
+def frame_rng(seed: int, index: int) -> random.Random:
+    """Independent RNG for frame ``index`` of a run seeded with ``seed``."""
+    return random.Random(seed * _FRAME_SEED_STRIDE + index)
+
+
+def layer_pivot(
+    state: LayerState, width: int, height: int, size_px: int | None = None
+) -> tuple[float, float]:
+    """Rotation pivot of ``state`` in image pixels (the image centre by default).
+
+    The spec pivot is in ``size_px`` pixels; it is scaled to the image,
+    which may be rasterized at another size.
+    """
+    scale_x = width / size_px if size_px else 1.0
+    scale_y = height / size_px if size_px else 1.0
+    pivot_x = state.pivot_x * scale_x if state.pivot_x is not None else width / 2
+    pivot_y = state.pivot_y * scale_y if state.pivot_y is not None else height / 2
+    return float(pivot_x), float(pivot_y)
+
+
+def composite_states(
+    compositor: Compositor,
+    sprites: RotationCache,
+    states: Iterable[LayerState],
+    bitmap_for: Callable[[LayerState], "Image.Image | None"],
+) -> None:
+    """Draw layer states into ``compositor``; ``sprites`` must convert with ``premultiply``."""
+    compositor.clear()
+    for state in states:
+        base = bitmap_for(state)
+        if base is None:
+            continue
+        pivot_x, pivot_y = layer_pivot(state, base.width, base.height, compositor.size_px)
+        sprite, pivot = sprites.rotated(state.asset, base, state.rotation, pivot_x, pivot_y)
+        # Place the sprite so its pivot lands where the unrotated pivot was.
+        draw_x = int(round(state.offset_x + pivot_x - pivot[0]))
+        draw_y = int(round(state.offset_y + pivot_y - pivot[1]))
+        compositor.blit(sprite, draw_x, draw_y, state.opacity)
+
+
+def load_asset_bitmaps(
+    spec: dict,
+    assets_root: Path,
+    size_px: int,
+    svg: SvgLayerSource | None = None,
+    layer_index: Mapping[str, int] | None = None,
+) -> dict[str, "Image.Image"]:
+    """Load each asset as RGBA: a PNG with alpha on disk, else its SVG layer raster."""
+    layer_index = layer_index or {}
+    bitmaps: dict[str, "Image.Image"] = {}
+    for asset in spec_assets(spec, size_px):
+        key = asset["asset_key"]
+        path = assets_root / asset.get("path", "")
+        if path.exists():
+            data = path.read_bytes()
+            if png_has_alpha(data):
+                image = load_pil_image(data)
+                if image is not None:
+                    bitmaps[key] = image
+                continue
+        if svg is None:
+            continue
+        fallback = svg.raster(int(asset.get("size_px", 0)) or size_px, layer_index.get(key))
+        if fallback is None:
+            continue
+        image = load_pil_image(fallback)
+        if image is not None:
+            bitmaps[key] = image
+    return bitmaps
+
+
+@dataclass(slots=True)
+class RenderedFrame:
+    index: int
+    digest: str
+    compose_ms: float
+    rgba: bytes | None = None
+
+
+class FrameRenderer:
+    """Render frames of one spec at a fixed size; not thread-safe (buffers are reused)."""
+
+    def __init__(
+        self,
+        spec: dict,
+        bitmaps: Mapping[str, "Image.Image"],
+        size_px: int,
+        *,
+        scale: int = 1,
+        fps: float = 30.0,
+        seed: int = 0,
+        layer_index: Mapping[str, int] | None = None,
+        anim_kinds: Mapping[int, set[str]] | None = None,
+    ) -> None:
+        if fps <= 0:
+            raise ValueError("fps must be > 0")
+        self.fps = fps
+        self.seed = seed
+        self._bitmaps = dict(bitmaps)
+        self._plan: AnimationPlan = compile_plan(
+            spec_layers(spec),
+            spec.get("fx", {}),
+            layer_index=layer_index,
+            anim_kinds=anim_kinds,
+        )
+        self._sprites = RotationCache(convert=premultiply)
+        self._compositor = Compositor(size_px, scale=scale)
+
+    def _bitmap_for(self, state: LayerState) -> "Image.Image | None":
+        return self._bitmaps.get(state.asset)
+
+    def render(self, index: int) -> tuple[bytes, float]:
+        """Return straight-alpha RGBA bytes of frame ``index`` and its compose time (ms)."""
+        start = time.perf_counter()
+        states = self._plan.evaluate(index / self.fps, rng=frame_rng(self.seed, index))
+        composite_states(self._compositor, self._sprites, states, self._bitmap_for)
+        frame = unpremultiply(self._compositor.frame())
+        compose_ms = (time.perf_counter() - start) * 1000.0
+        return frame.tobytes(), compose_ms
+
+    @property
+    def frame_size(self) -> int:
+        return self._compositor.size_px * self._compositor.scale
+
+    def render_frame(
+        self, index: int, *, out_dir: Path | None = None, keep_rgba: bool = False
+    ) -> RenderedFrame:
+        rgba, compose_ms = self.render(index)
+        if out_dir is not None:
+            write_png(out_dir / frame_filename(index), rgba, self.frame_size)
+        digest = hashlib.sha256(rgba).hexdigest()
+        return RenderedFrame(index, digest, compose_ms, rgba if keep_rgba else None)
+
+
+def frame_filename(index: int) -> str:
+    return f"frame_{index:05d}.png"
+
+
+def write_png(path: Path, rgba: bytes, size: int) -> None:
+    from PIL import Image
+
+    Image.frombytes("RGBA", (size, size), rgba).save(path)
+
+
+_worker_renderer: FrameRenderer | None = None
+
+
+def _init_worker(args: tuple, kwargs: dict) -> None:
+    global _worker_renderer
+    _worker_renderer = FrameRenderer(*args, **kwargs)
+
+
+def _render_in_worker(
+    indices: list[int], out_dir: Path | None, keep_rgba: bool
+) -> list[RenderedFrame]:
+    assert _worker_renderer is not None
+    return [
+        _worker_renderer.render_frame(index, out_dir=out_dir, keep_rgba=keep_rgba)
+        for index in indices
+    ]
+
+
+def render_frames(
+    renderer_args: tuple,
+    renderer_kwargs: dict,
+    frames: int,
+    *,
+    workers: int | None = None,
+    chunk_size: int = 8,
+    out_dir: Path | None = None,
+    keep_rgba: bool = False,
+) -> Iterator[RenderedFrame]:
+    """Yield frames ``0..frames-1`` in order, rendered by ``workers`` processes.
+
+    ``renderer_args``/``renderer_kwargs`` build one ``FrameRenderer`` per
+    worker (they must be picklable). ``workers <= 1`` renders in-process.
+    """
+    if frames <= 0:
+        return
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, max(1, frames // chunk_size))
+    if workers <= 1:
+        renderer = FrameRenderer(*renderer_args, **renderer_kwargs)
+        for index in range(frames):
+            yield renderer.render_frame(index, out_dir=out_dir, keep_rgba=keep_rgba)
+        return
+
+    chunks = [list(range(start, min(frames, start + chunk_size))) for start in range(0, frames, chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(renderer_args, renderer_kwargs),
+    ) as pool:
+        for batch in pool.map(
+            _render_in_worker,
+            chunks,
+            [out_dir] * len(chunks),
+            [keep_rgba] * len(chunks),
+        ):
+            yield from batch
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
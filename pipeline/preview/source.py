@@ -0,0 +1,309 @@
+"""Preview inputs: spec layer/asset lists and per-layer SVG rasters."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+from pathlib import Path
+import threading
+from typing import Callable
+import xml.etree.ElementTree as ET
+
+from pipeline.assets.naming import default_asset_path
+from pipeline.raster import render_svg_bytes
+from pipeline.svg.parse import SvgAnimation, drawable_elements, element_animations
+from pipeline.util.cache import LruCache
+
+DEFAULT_SIZE_PX = 64
+RASTER_CACHE_BYTES = 32 << 20
+
+
+def _strip_ns(tag: str) -> str:
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def element_anim_kinds(elem: ET.Element) -> set[str]:
+    """SMIL animation kinds ("rotate", "translate", "opacity") declared on ``elem``."""
+    kinds: set[str] = set()
+    for child in list(elem):
+        tag = _strip_ns(child.tag)
+        if tag == "animateTransform":
+            kind = child.attrib.get("type")
+            if kind in ("rotate", "translate"):
+                kinds.add(kind)
+        elif tag == "animate":
+            if child.attrib.get("attributeName") == "opacity":
+                kinds.add("opacity")
+    return kinds
+
+
+def infer_svg_size(svg_path: Path) -> int | None:
+    """Square size from the root ``width``/``height`` or ``viewBox`` width."""
+    try:
+        root = ET.parse(svg_path).getroot()
+    except ET.ParseError:
+        return None
+    for raw in (root.attrib.get("width"), root.attrib.get("height")):
+        if raw is None:
+            continue
+        cleaned = raw.strip()
+        if cleaned.endswith("px"):
+            cleaned = cleaned[:-2]
+        try:
+            return int(float(cleaned))
+        except ValueError:
+            continue
+    view_box = root.attrib.get("viewBox")
+    if view_box:
+        parts = view_box.replace(",", " ").split()
+        if len(parts) == 4:
+            try:
+                return int(float(parts[2]))
+            except ValueError:
+                return None
+    return None
+
+
+def spec_layers(spec: dict | None) -> list[dict]:
+    """Spec layers normalized to ``{"id", "asset", "fx", "offset"}``; layers without an asset are dropped."""
+    if not spec:
+        return []
+    normalized = []
+    for layer in spec.get("layers", []):
+        asset_key = layer.get("asset") or layer.get("asset_key")
+        if not asset_key:
+            continue
+        normalized.append(
+            {
+                "id": layer.get("id") or asset_key,
+                "asset": asset_key,
+                "fx": list(layer.get("fx", [])),
+                "offset": tuple(layer.get("offset") or (0, 0)),
+            }
+        )
+    return normalized
+
+
+def spec_assets(spec: dict | None, size_px: int) -> list[dict]:
+    """Spec assets, or one default-named asset per layer when the spec lists none."""
+    if not spec:
+        return []
+    if "assets" in spec:
+        return list(spec.get("assets", []))
+    assets: dict[str, dict] = {}
+    for layer in spec_layers(spec):
+        key = layer["asset"]
+        if key in assets:
+            continue
+        assets[key] = {
+            "asset_key": key,
+            "size_px": size_px,
+            "path": default_asset_path(key, size_px),
+        }
+    return list(assets.values())
+
+
+class SvgLayerSource:
+    """Drawable elements of one SVG document, rasterized on demand.
+
+    Element ``i`` is the auto-layer ``z=i`` that ``parse_svg`` would emit,
+    so spec layers map onto it by position when the counts agree. Rasters
+    are kept in a byte-bounded LRU keyed by ``(size_px, index)``.
+    """
+
+    def __init__(self, root: ET.Element, *, max_bytes: int = RASTER_CACHE_BYTES) -> None:
+        parents = {child: parent for parent in root.iter() for child in list(parent)}
+        elements = drawable_elements(root, parents)
+        self._root = root
+        self._svg_bytes = ET.tostring(root, encoding="utf-8")
+        self.paths = [self._path_to(elem, parents) for elem in elements]
+        self.anim_kinds = {index: element_anim_kinds(elem) for index, elem in enumerate(elements)}
+        self._rasters: LruCache[tuple[int, int | None], bytes] = LruCache(max_bytes, weigh=len)
+        self._animations: dict[int, list[SvgAnimation]] | None = None
+
+    @classmethod
+    def load(cls, svg_path: Path) -> "SvgLayerSource | None":
+        try:
+            root = ET.parse(svg_path).getroot()
+        except ET.ParseError:
+            return None
+        return cls(root)
+
+    def _path_to(
+        self, elem: ET.Element, parents: dict[ET.Element, ET.Element]
+    ) -> tuple[int, ...]:
+        parts = []
+        current = elem
+        while current is not self._root:
+            parent = parents[current]
+            parts.append(list(parent).index(current))
+            current = parent
+        return tuple(reversed(parts))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def animations(self) -> dict[int, list[SvgAnimation]]:
+        """Looping SMIL animations by layer index (parsed on first use)."""
+        if self._animations is None:
+            self._animations = element_animations(self._root)
+        return self._animations
+
+    def descendants(self, index: int) -> tuple[int, ...]:
+        """Indices of the layers nested inside layer ``index`` (a ``<g>``)."""
+        prefix = self.paths[index]
+        depth = len(prefix)
+        end = index + 1
+        # Document order: a subtree is the contiguous run that shares its path.
+        while end < len(self.paths) and self.paths[end][:depth] == prefix:
+            end += 1
+        return tuple(range(index + 1, end))
+
+    def layer_index_map(self, layers: list[dict]) -> dict[str, int]:
+        """Map spec layer assets to element indices (empty unless counts match).
+
+        A shared asset maps to its first layer, the one it is rasterized from.
+        """
+        if not self.paths or len(layers) != len(self.paths):
+            return {}
+        mapping: dict[str, int] = {}
+        for index, layer in enumerate(layers):
+            mapping.setdefault(layer["asset"], index)
+        return mapping
+
+    def layer_svg(self, index: int) -> bytes | None:
+        """The document with every element except layer ``index`` (and ``<defs>``) removed."""
+        return self.layers_svg((index,))
+
+    def layers_svg(self, indices: tuple[int, ...]) -> bytes | None:
+        """The document reduced to layers ``indices`` (and ``<defs>``), in document order."""
+        if not indices or any(index < 0 or index >= len(self.paths) for index in indices):
+            return None
+        root_copy = ET.fromstring(self._svg_bytes)
+        targets = [self.paths[index] for index in indices]
+
+        def _filter(node: ET.Element, prefix: tuple[int, ...]) -> None:
+            depth = len(prefix)
+            for idx, child in list(enumerate(list(node))):
+                if _strip_ns(child.tag) == "defs":
+                    continue
+                path = prefix + (idx,)
+                if any(target[: depth + 1] == path for target in targets):
+                    _filter(child, path)
+                else:
+                    node.remove(child)
+
+        _filter(root_copy, ())
+        return ET.tostring(root_copy, encoding="utf-8")
+
+    def bake(self, size_px: int, indices: tuple[int, ...]) -> bytes | None:
+        """PNG of layers ``indices`` rendered together (not cached)."""
+        svg_bytes = self.layers_svg(indices)
+        if svg_bytes is None:
+            return None
+        return render_svg_bytes(svg_bytes, size_px)
+
+    def cached(self, size_px: int, index: int | None = None) -> bytes | None:
+        """The raster of ``raster(size_px, index)`` if already rendered, without rendering."""
+        return self._rasters.get((size_px, index))
+
+    def raster(self, size_px: int, index: int | None = None) -> bytes | None:
+        """PNG of layer ``index`` (or the whole document) at ``size_px``."""
+        key = (size_px, index)
+        cached = self._rasters.get(key)
+        if cached is not None:
+            return cached
+        svg_bytes = self._svg_bytes if index is None else self.layer_svg(index)
+        if svg_bytes is None:
+            return None
+        png_bytes = render_svg_bytes(svg_bytes, size_px)
+        if png_bytes is None:
+            return None
+        self._rasters.put(key, png_bytes)
+        return png_bytes
+
+
+RasterKey = tuple[int, int | None]
+
+
+class BackgroundRasterizer:
+    """Render ``SvgLayerSource`` rasters on worker threads.
+
+    ``request`` returns a raster already in the source's cache, or schedules
+    it and returns None; ``on_ready(size_px, index)`` is then called from the
+    worker thread once the raster is cached. Requests for a key already in
+    flight are coalesced, and a key whose raster failed is not retried until
+    the next ``set_source`` or ``cancel``, which also drop queued work and
+    silence results of the previous source.
+    """
+
+    def __init__(
+        self,
+        on_ready: Callable[[int, int | None], None],
+        *,
+        max_workers: int | None = None,
+    ) -> None:
+        self._on_ready = on_ready
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="wx-raster",
+        )
+        self._lock = threading.Lock()
+        self._source: SvgLayerSource | None = None
+        self._pending: dict[RasterKey, Future] = {}
+        self._failed: set[RasterKey] = set()
+        self._generation = 0
+
+    @property
+    def source(self) -> SvgLayerSource | None:
+        return self._source
+
+    def set_source(self, source: SvgLayerSource | None) -> None:
+        self.cancel()
+        self._source = source
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._generation += 1
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._failed.clear()
+        # Outside the lock: cancelling runs done-callbacks synchronously.
+        for future in pending:
+            future.cancel()
+
+    def is_pending(self, size_px: int, index: int | None = None) -> bool:
+        with self._lock:
+            return (size_px, index) in self._pending
+
+    def request(self, size_px: int, index: int | None = None) -> bytes | None:
+        source = self._source
+        if source is None:
+            return None
+        cached = source.cached(size_px, index)
+        if cached is not None:
+            return cached
+        key = (size_px, index)
+        with self._lock:
+            if key in self._pending or key in self._failed:
+                return None
+            generation = self._generation
+            future = self._pool.submit(source.raster, size_px, index)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._finished(key, generation, done))
+        return None
+
+    def _finished(self, key: RasterKey, generation: int, future: Future) -> None:
+        with self._lock:
+            if generation != self._generation or future.cancelled():
+                return
+            self._pending.pop(key, None)
+            failed = future.exception() is not None or future.result() is None
+            if failed:
+                self._failed.add(key)
+        if not failed:
+            self._on_ready(*key)
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.cancel()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,203 @@
+"""Rotated sprite cache and opacity lookup tables for preview compositing."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from pipeline.util.cache import LruCache
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+# lv_img_set_angle() works in 0.1 degree units.
+LVGL_ANGLE_STEP_DEG = 0.1
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+@lru_cache(maxsize=256)
+def _opacity_lut_for_level(level: int) -> tuple[int, ...]:
+    return tuple(alpha * level // 255 for alpha in range(256))
+
+
+def opacity_lut(opacity: float) -> tuple[int, ...]:
+    """Return the 256-entry alpha table for ``opacity`` (0..1), shared per level."""
+    level = max(0, min(255, int(round(opacity * 255))))
+    return _opacity_lut_for_level(level)
+
+
+def angle_steps(rotation: float, step_deg: float) -> int:
+    """Quantize ``rotation`` degrees to a step index in ``[0, 360 / step_deg)``."""
+    total = int(round(360.0 / step_deg))
+    return int(round((rotation % 360.0) / step_deg)) % total
+
+
+def _rotated_corners(
+    width: int, height: int, rotation: float, pivot_x: float, pivot_y: float
+) -> list[tuple[float, float]]:
+    """Image corners relative to the pivot, rotated clockwise by ``rotation`` degrees."""
+    rad = math.radians(rotation)
+    cos_a = math.cos(rad)
+    sin_a = math.sin(rad)
+    corners = [
+        (-pivot_x, -pivot_y),
+        (width - pivot_x, -pivot_y),
+        (-pivot_x, height - pivot_y),
+        (width - pivot_x, height - pivot_y),
+    ]
+    return [(x * cos_a - y * sin_a, x * sin_a + y * cos_a) for x, y in corners]
+
+
+def pivot_offset(
+    width: int, height: int, rotation: float, pivot_x: float, pivot_y: float
+) -> tuple[float, float]:
+    """Position of the pivot inside the bounding box of the rotated image."""
+    rotated = _rotated_corners(width, height, rotation, pivot_x, pivot_y)
+    return -min(x for x, _ in rotated), -min(y for _, y in rotated)
+
+
+def rotate_about(
+    image: "Image.Image", rotation: float, pivot_x: float, pivot_y: float
+) -> tuple["Image.Image", tuple[float, float]]:
+    """Rotate ``image`` clockwise about the pivot into its full bounding box.
+
+    Returns the rotated image and the pivot's position in it.
+    """
+    from PIL import Image
+
+    rotated = _rotated_corners(image.width, image.height, rotation, pivot_x, pivot_y)
+    min_x = min(x for x, _ in rotated)
+    min_y = min(y for _, y in rotated)
+    # Trim float noise so exact right angles keep the source size.
+    width = max(1, math.ceil(round(max(x for x, _ in rotated) - min_x, 6)))
+    height = max(1, math.ceil(round(max(y for _, y in rotated) - min_y, 6)))
+    rad = math.radians(rotation)
+    cos_a = math.cos(rad)
+    sin_a = math.sin(rad)
+    # Inverse map: output (u, v) -> source (x, y), the pivot sitting at (-min_x, -min_y).
+    data = (
+        cos_a,
+        sin_a,
+        cos_a * min_x + sin_a * min_y + pivot_x,
+        -sin_a,
+        cos_a,
+        -sin_a * min_x + cos_a * min_y + pivot_y,
+    )
+    out = image.transform((width, height), Image.AFFINE, data, resample=Image.BICUBIC)
+    return out, (-min_x, -min_y)
+
+
+def apply_opacity(image: "Image.Image", opacity: float) -> "Image.Image":
+    """Return a copy of ``image`` with its alpha scaled through the lookup table."""
+    if opacity >= 1.0:
+        return image
+    alpha = image.getchannel("A").point(opacity_lut(opacity))
+    out = image.copy()
+    out.putalpha(alpha)
+    return out
+
+
+def _sprite_bytes(item: tuple[Any, tuple[float, float]]) -> int:
+    sprite = item[0]
+    nbytes = getattr(sprite, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return sprite.width * sprite.height * 4
+
+
+class RotationCache:
+    """Bounded LRU of pre-rotated sprites keyed by quantized angle.
+
+    Angles are snapped to ``step_deg`` (LVGL's 0.1 degree by default), so a
+    rotating layer only ever rotates each distinct step once. With
+    ``convert`` (e.g. ``compose.premultiply``) the cache stores converted
+    sprites, unrotated ones included, instead of PIL images.
+    """
+
+    def __init__(
+        self,
+        *,
+        step_deg: float = LVGL_ANGLE_STEP_DEG,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        convert: Callable[["Image.Image"], Any] | None = None,
+    ) -> None:
+        if step_deg <= 0:
+            raise ValueError("step_deg must be > 0")
+        self.step_deg = step_deg
+        self._convert = convert
+        self._cache: LruCache[tuple, tuple[Any, tuple[float, float]]] = LruCache(
+            max_bytes, weigh=_sprite_bytes
+        )
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def rotated(
+        self,
+        key: str,
+        image: "Image.Image",
+        rotation: float,
+        pivot_x: float,
+        pivot_y: float,
+    ) -> tuple[Any, tuple[float, float]]:
+        """Return ``image`` rotated about the pivot and the pivot's new offset."""
+        steps = angle_steps(rotation, self.step_deg)
+        if steps == 0 and self._convert is None:
+            return image, (pivot_x, pivot_y)
+        cache_key = (key, image.size, pivot_x, pivot_y, steps)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if steps == 0:
+            item = (image, (pivot_x, pivot_y))
+        else:
+            item = rotate_about(image, steps * self.step_deg, pivot_x, pivot_y)
+        if self._convert is not None:
+            item = (self._convert(item[0]), item[1])
+        self._cache.put(cache_key, item)
+        return item
+
+    def transform(
+        self,
+        key: str,
+        image: "Image.Image",
+        rotation: float,
+        opacity: float,
+        pivot_x: float,
+        pivot_y: float,
+    ) -> tuple["Image.Image", tuple[float, float]]:
+        """Rotate (cached) then fade ``image``; the cached sprite is never modified.
+
+        Only valid without ``convert``: converted sprites are faded by the
+        compositor instead.
+        """
+        out, offset = self.rotated(key, image, rotation, pivot_x, pivot_y)
+        return apply_opacity(out, opacity), offset
+
+    def prewarm(
+        self,
+        key: str,
+        image: "Image.Image",
+        pivot_x: float,
+        pivot_y: float,
+        angles: Iterable[float] | None = None,
+    ) -> threading.Thread:
+        """Fill the cache for ``angles`` (default: every step) on a daemon thread."""
+        if angles is None:
+            total = int(round(360.0 / self.step_deg))
+            angles = [index * self.step_deg for index in range(total)]
+        angle_list = list(angles)
+
+        def _run() -> None:
+            for angle in angle_list:
+                self.rotated(key, image, angle, pivot_x, pivot_y)
+
+        thread = threading.Thread(target=_run, name=f"prewarm-{key}", daemon=True)
+        thread.start()
+        return thread
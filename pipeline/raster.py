@@ -1,3 +1,103 @@
 """Rasterization helpers."""
 
-# TODO: implement SVG -> PNG raster for required sizes.
+from __future__ import annotations
+
+import io
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+
+def render_svg_png(svg_path: Path, size_px: int) -> bytes | None:
+    return render_svg_bytes(svg_path.read_bytes(), size_px)
+
+
+def render_svg_bytes(svg_bytes: bytes, size_px: int) -> bytes | None:
+    """Rasterize SVG bytes to a ``size_px`` square PNG (cairosvg, then rsvg-convert)."""
+    png = _render_svg_with_cairosvg(svg_bytes, size_px)
+    if png is not None:
+        return png
+    return _render_svg_with_rsvg(svg_bytes, size_px)
+
+
+def _render_svg_with_cairosvg(svg_bytes: bytes, size_px: int) -> bytes | None:
+    try:
+        import cairosvg  # type: ignore
+    except Exception:
+        return None
+    return cairosvg.svg2png(bytestring=svg_bytes, output_width=size_px, output_height=size_px)
+
+
+def _render_svg_with_rsvg(svg_bytes: bytes, size_px: int) -> bytes | None:
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            svg_path = Path(tmp_dir) / "preview.svg"
+            output_path = Path(tmp_dir) / "preview.png"
+            svg_path.write_bytes(svg_bytes)
+            result = subprocess.run(
+                [
+                    "rsvg-convert",
+                    "-w",
+                    str(size_px),
+                    "-h",
+                    str(size_px),
+                    "-o",
+                    str(output_path),
+                    str(svg_path),
+                ],
+                check=False,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                return None
+            return output_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def png_has_alpha(data: bytes) -> bool:
+    if not data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return False
+    if len(data) < 33:
+        return False
+    if data[12:16] != b"IHDR":
+        return False
+    color_type = data[25]
+    return color_type in (4, 6)
+
+
+def has_pillow() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def load_pil_image(data: bytes) -> "Image.Image" | None:
+    try:
+        from PIL import Image
+    except Exception:
+        return None
+    try:
+        return Image.open(io.BytesIO(data)).convert("RGBA")
+    except Exception:
+        return None
+
+
+def has_cairosvg() -> bool:
+    try:
+        import cairosvg  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def has_rsvg() -> bool:
+    return shutil.which("rsvg-convert") is not None
@@ -0,0 +1,156 @@
+"""Merge runs of static layers into baked layers.
+
+Auto-layering turns every drawable element into a layer, so static
+neighbours end up as separate assets the device blends one by one every
+frame. A run of consecutive layers without FX draws the same pixels as
+one layer holding their composite, so each run of at least ``min_run``
+static layers is replaced by a single baked layer at the run's position;
+animated layers and the z-order are untouched.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Mapping
+
+from pipeline.spec.model import LayerSpec, Spec
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+
+@dataclass(frozen=True, slots=True)
+class BakedLayer:
+    """One baked layer and the input layers (indices, z order) it replaces."""
+
+    layer_id: str
+    asset: str
+    sources: tuple[int, ...]
+    source_assets: tuple[str, ...]
+    # Each source layer's ``offset`` in spec px, ``(0, 0)`` when it has none.
+    source_offsets: tuple[tuple[int, int], ...] = ()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.layer_id,
+            "asset": self.asset,
+            "sources": list(self.sources),
+            "source_assets": list(self.source_assets),
+            "source_offsets": [list(offset) for offset in self.source_offsets],
+        }
+
+
+@dataclass(slots=True)
+class FlattenResult:
+    spec: Spec
+    baked: list[BakedLayer] = field(default_factory=list)
+    layers_before: int = 0
+    assets_before: int = 0
+
+    @property
+    def layers_saved(self) -> int:
+        return self.layers_before - len(self.spec.layers)
+
+    @property
+    def assets_saved(self) -> int:
+        return self.assets_before - len({layer.asset for layer in self.spec.layers})
+
+    def to_dict(self) -> dict:
+        return {
+            "spec": self.spec.name,
+            "layers_saved": self.layers_saved,
+            "assets_saved": self.assets_saved,
+            "baked": [baked.to_dict() for baked in self.baked],
+        }
+
+
+def _static_runs(layers: list[LayerSpec], min_run: int) -> list[tuple[int, int]]:
+    """``[start, end)`` index ranges of consecutive FX-less layers, ``min_run`` or longer."""
+    runs = []
+    start = None
+    for index, layer in enumerate(layers):
+        if not layer.fx:
+            if start is None:
+                start = index
+            continue
+        if start is not None and index - start >= min_run:
+            runs.append((start, index))
+        start = None
+    if start is not None and len(layers) - start >= min_run:
+        runs.append((start, len(layers)))
+    return runs
+
+
+def flatten_static_layers(spec: Spec, *, min_run: int = 2) -> FlattenResult:
+    """Replace every run of ``min_run`` or more static layers by one baked layer.
+
+    Baked assets are named ``<spec>_flat_<n>`` in z order; their pixels are
+    the composite of the run's assets (see ``bake_images``).
+    """
+    if min_run < 2:
+        raise ValueError("min_run must be >= 2")
+    layers = list(spec.layers)
+    result = FlattenResult(
+        spec=spec,
+        layers_before=len(layers),
+        assets_before=len({layer.asset for layer in layers}),
+    )
+    runs = _static_runs(layers, min_run)
+    if not runs:
+        return result
+
+    used_ids = {layer.layer_id for layer in layers}
+    merged: list[LayerSpec] = []
+    cursor = 0
+    for number, (start, end) in enumerate(runs):
+        merged.extend(layers[cursor:start])
+        run_ids = {layer.layer_id for layer in layers[start:end]}
+        layer_id = f"flat_{number}"
+        while layer_id in used_ids and layer_id not in run_ids:
+            layer_id += "_"
+        used_ids.add(layer_id)
+        baked = BakedLayer(
+            layer_id=layer_id,
+            asset=f"{spec.name}_flat_{number}",
+            sources=tuple(range(start, end)),
+            source_assets=tuple(layer.asset for layer in layers[start:end]),
+            source_offsets=tuple(layer.offset or (0, 0) for layer in layers[start:end]),
+        )
+        result.baked.append(baked)
+        merged.append(LayerSpec(layer_id=baked.layer_id, asset=baked.asset, fx=[]))
+        cursor = end
+    merged.extend(layers[cursor:])
+    result.spec = replace(spec, layers=merged)
+    return result
+
+
+def bake_images(
+    baked: list[BakedLayer], bitmaps: Mapping[str, "Image.Image"]
+) -> dict[str, "Image.Image"]:
+    """Composite each baked layer's source assets in z order.
+
+    Baked layers with a missing source bitmap are skipped. Like the preview,
+    each source is drawn at its layer offset from the icon origin; the baked
+    layer itself has none, so pixels left or above the origin are dropped.
+    """
+    from PIL import Image
+
+    images: dict[str, Image.Image] = {}
+    for layer in baked:
+        sources = [bitmaps.get(asset) for asset in layer.source_assets]
+        if any(source is None for source in sources):
+            continue
+        offsets = layer.source_offsets or ((0, 0),) * len(sources)
+        placed = list(zip(sources, offsets))
+        right = max(dx + source.width for source, (dx, _) in placed)  # type: ignore[union-attr]
+        bottom = max(dy + source.height for source, (_, dy) in placed)  # type: ignore[union-attr]
+        canvas = Image.new("RGBA", (max(right, 1), max(bottom, 1)), (0, 0, 0, 0))
+        for source, (dx, dy) in placed:
+            rgba = source.convert("RGBA")  # type: ignore[union-attr]
+            if dx + rgba.width <= 0 or dy + rgba.height <= 0:
+                continue
+            canvas.alpha_composite(
+                rgba, dest=(max(dx, 0), max(dy, 0)), source=(max(-dx, 0), max(-dy, 0))
+            )
+        images[layer.asset] = canvas
+    return images
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 import re
-from typing import Dict, Iterable, List, Optional
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from pipeline.assets.naming import normalize_asset_key
+from pipeline.fx.contracts import FIELD_CONTRACTS
 from pipeline.hash import fnv1a32
 
 SPEC_VERSION = 1
@@ -28,6 +30,11 @@ FX_KEYS = (
     "NEEDLE",
 )
 
+FX_PARAM_FIELDS = tuple(FIELD_CONTRACTS)
+
+# Spec fx entries are keyed by instance: "ROTATE" or "ROTATE.<name>".
+_FX_INSTANCE_RE = re.compile(r"^([A-Z_]+)(?:\.([a-z0-9_]+))?$")
+
 
 def spec_id_for_name(name: str) -> int:
     """Return deterministic spec_id for a normalized name."""
@@ -35,7 +42,23 @@ def spec_id_for_name(name: str) -> int:
     return fnv1a32(normalized)
 
 
-@dataclass
+def fx_type(key: str) -> str:
+    """FX type of an fx instance key (``"ROTATE.rays"`` -> ``"ROTATE"``)."""
+    return key.split(".", 1)[0]
+
+
+def is_fx_key(key: str) -> bool:
+    """True for a known FX type, optionally with a ``.<name>`` instance suffix."""
+    match = _FX_INSTANCE_RE.match(key)
+    return match is not None and match.group(1) in FX_KEYS
+
+
+def intern_key(key: str) -> str:
+    """Normalize and intern a key so repeated keys share one string object."""
+    return sys.intern(normalize_asset_key(key))
+
+
+@dataclass(slots=True)
 class Asset:
     asset_key: str
     size_px: int
@@ -44,7 +67,7 @@ class Asset:
     asset_hash: int | None = None
 
     def __post_init__(self) -> None:
-        self.asset_key = normalize_asset_key(self.asset_key)
+        self.asset_key = intern_key(self.asset_key)
         if self.type not in ASSET_TYPES:
             raise ValueError(f"invalid asset type: {self.type!r}")
         computed = fnv1a32(self.asset_key)
@@ -63,7 +86,7 @@ class Asset:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Components:
     decor: str
     cover: str
@@ -87,27 +110,54 @@ class Components:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class LayerSpec:
     layer_id: str
     asset: str
     fx: List[str] = field(default_factory=list)
+    # Invalidation rectangle (x, y, w, h) in spec px, relative to the icon origin.
+    dirty: Optional[Tuple[int, int, int, int]] = None
+    # Where a shared asset is drawn (dx, dy) in spec px, relative to its own raster.
+    offset: Optional[Tuple[int, int]] = None
 
     def __post_init__(self) -> None:
-        self.layer_id = normalize_asset_key(self.layer_id)
-        self.asset = normalize_asset_key(self.asset)
+        self.layer_id = intern_key(self.layer_id)
+        self.asset = intern_key(self.asset)
         if not _LAYER_ID_RE.match(self.layer_id):
             raise ValueError(f"invalid layer id: {self.layer_id!r}")
+        if self.dirty is not None:
+            if (
+                not isinstance(self.dirty, (list, tuple))
+                or len(self.dirty) != 4
+                or not all(isinstance(v, int) for v in self.dirty)
+            ):
+                raise ValueError("layer dirty must be [x, y, w, h] ints")
+            if self.dirty[2] <= 0 or self.dirty[3] <= 0:
+                raise ValueError("layer dirty w/h must be > 0")
+            self.dirty = tuple(self.dirty)
+        if self.offset is not None:
+            if (
+                not isinstance(self.offset, (list, tuple))
+                or len(self.offset) != 2
+                or not all(isinstance(v, int) for v in self.offset)
+            ):
+                raise ValueError("layer offset must be [x, y] ints")
+            self.offset = tuple(self.offset)
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             "id": self.layer_id,
             "asset": self.asset,
             "fx": list(self.fx),
         }
+        if self.dirty is not None:
+            data["dirty"] = list(self.dirty)
+        if self.offset is not None:
+            data["offset"] = list(self.offset)
+        return data
 
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     version: int = SPEC_VERSION
     created_by: str | None = None
@@ -122,6 +172,50 @@ class Metadata:
         return data
 
 
+@dataclass(frozen=True, slots=True)
+class FxParams:
+    """Typed, immutable FX parameter record (compact form of an fx dict)."""
+
+    period_ms: int | None = None
+    pivot_x: int | None = None
+    pivot_y: int | None = None
+    angle_from: int | None = None
+    angle_to: int | None = None
+    angle_now: int | None = None
+    smooth_ms: int | None = None
+    fall_dx: int | None = None
+    fall_dy: int | None = None
+    amp_x: int | None = None
+    amp_y: int | None = None
+    opa_min: int | None = None
+    opa_max: int | None = None
+    phase_ms: Tuple[int, ...] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FxParams":
+        if not isinstance(data, dict):
+            raise TypeError("invalid fx value type")
+        for name in data:
+            if name not in FX_PARAM_FIELDS:
+                raise ValueError(f"unknown fx field: {name}")
+        values = dict(data)
+        phase = values.get("phase_ms")
+        if isinstance(phase, list):
+            values["phase_ms"] = tuple(phase)
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        data = {}
+        for item in fields(self):
+            value = getattr(self, item.name)
+            if value is None:
+                continue
+            if item.name == "phase_ms":
+                value = list(value)
+            data[item.name] = value
+        return data
+
+
 def _fx_to_dict(fx_value: object) -> dict:
     if hasattr(fx_value, "to_dict"):
         return fx_value.to_dict()  # type: ignore[no-any-return]
@@ -130,7 +224,7 @@ def _fx_to_dict(fx_value: object) -> dict:
     raise TypeError("invalid fx value type")
 
 
-@dataclass
+@dataclass(slots=True)
 class Spec:
     spec_id: Optional[int]
     name: str
@@ -164,5 +258,22 @@ class Spec:
         }
 
 
+def compact_spec(spec: Spec) -> Spec:
+    """Return a copy of ``spec`` whose fx entries are typed ``FxParams`` records."""
+    fx = {
+        key: value if isinstance(value, FxParams) else FxParams.from_dict(_fx_to_dict(value))
+        for key, value in spec.fx.items()
+    }
+    return Spec(
+        spec_id=spec.spec_id,
+        name=spec.name,
+        components=spec.components,
+        assets=list(spec.assets),
+        layers=list(spec.layers),
+        fx=fx,
+        metadata=spec.metadata,
+    )
+
+
 def asset_keys(assets: Iterable[Asset]) -> List[str]:
     return [asset.asset_key for asset in assets]
@@ -0,0 +1,449 @@
+"""``overlays.json`` v1.0 generator (see ``Docs/overlays.json.md``).
+
+Built on the ``parse`` tree: drawable elements give the z order, looping
+SMIL animations (``element_animations``) give one overlay per animated
+shape, and everything no animation moves is listed as ``static``. Shape
+geometry and animation values are remapped from the viewBox to the
+target size, after folding in the ``<use>`` x/y and ``translate``
+transforms that place the shape; a shape under any other transform cannot
+be flattened that way and is listed in ``skipped`` instead. The output
+only depends on the SVG and the options: lists follow document order and
+keys a fixed order.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from pathlib import Path
+import xml.etree.ElementTree as ET
+
+from pipeline.svg.parse import (
+    PATH_ARITY,
+    PATH_TOKEN_RE,
+    SvgAnimation,
+    drawable_elements,
+    element_animations,
+    Viewport,
+    element_chain,
+    paint_href,
+    parse_length,
+    presentation,
+    resolve_paint_id,
+    translate_offset,
+    use_href,
+)
+from pipeline.svg.split import z_order_for
+
+OVERLAYS_VERSION = "1.0"
+OVERLAY_TAGS = frozenset(
+    {"line", "circle", "rect", "image", "ellipse", "polygon", "polyline", "path"}
+)
+GRADIENT_TAGS = frozenset({"linearGradient", "radialGradient"})
+
+_PALETTE_PROPS = ("fill", "stroke", "stop-color")
+_NOT_COLORS = frozenset({"none", "transparent", "inherit", "currentcolor"})
+# Attribute -> (axis, is_position); positions also move by the viewBox origin.
+_GEOMETRY = {
+    "x": ("x", True),
+    "x1": ("x", True),
+    "x2": ("x", True),
+    "cx": ("x", True),
+    "y": ("y", True),
+    "y1": ("y", True),
+    "y2": ("y", True),
+    "cy": ("y", True),
+    "width": ("x", False),
+    "rx": ("x", False),
+    "r": ("x", False),
+    "stroke-width": ("x", False),
+    "height": ("y", False),
+    "ry": ("y", False),
+}
+_STOP_PROPS = ("offset", "stop-color", "stop-opacity")
+
+
+def _strip_ns(tag: str) -> str:
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def _num(value: float) -> int | float:
+    rounded = round(value, 3) + 0.0
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+def _fmt(value: float) -> str:
+    return str(_num(value))
+
+
+def _placement(nodes: list[ET.Element]) -> tuple[float, float] | None:
+    """Total ``translate`` and ``<use>`` x/y of ``nodes``; None under any other transform."""
+    dx = dy = 0.0
+    for node in nodes:
+        offset = translate_offset(node.attrib.get("transform"))
+        if offset is None:
+            return None
+        dx += offset[0]
+        dy += offset[1]
+        if _strip_ns(node.tag) == "use":
+            dx += parse_length(node.attrib.get("x")) or 0.0
+            dy += parse_length(node.attrib.get("y")) or 0.0
+    return dx, dy
+
+
+def remap_path(d: str, viewport: Viewport, offset: tuple[float, float] = (0.0, 0.0)) -> str:
+    """Path data shifted by ``offset`` and remapped to the viewport.
+
+    Commands and implicit repeats are kept.
+    """
+    out: list[str] = []
+    command: str | None = None
+    count = 0
+    first_segment = True
+    for token in PATH_TOKEN_RE.findall(d):
+        if token.isalpha():
+            if command is not None and count:
+                first_segment = False
+            command, count = token, 0
+            out.append(token)
+            continue
+        if command is None or command in "Zz":
+            raise ValueError(f"invalid path data: {d!r}")
+        lower = command.lower()
+        arity = PATH_ARITY[lower]
+        slot = count % arity
+        if count and slot == 0:
+            first_segment = False
+        count += 1
+        value = float(token)
+        # A leading "m" is absolute: it is relative to the origin.
+        relative = command.islower() and not (lower == "m" and first_segment)
+        if lower == "a":
+            if slot in (2, 3, 4):
+                out.append(_fmt(value))
+                continue
+            axis = "x" if slot in (0, 5) else "y"
+            relative = relative or slot < 2
+        elif lower in "hv":
+            axis = "x" if lower == "h" else "y"
+        else:
+            axis = "x" if slot % 2 == 0 else "y"
+        if relative:
+            mapped = viewport.length(axis, value)
+        else:
+            mapped = viewport.position(axis, value + offset[0 if axis == "x" else 1])
+        out.append(_fmt(mapped))
+    return " ".join(out)
+
+
+def _remap_points(raw: str, viewport: Viewport, offset: tuple[float, float]) -> str:
+    numbers = [float(token) for token in PATH_TOKEN_RE.findall(raw) if not token.isalpha()]
+    mapped = [
+        viewport.position("x", value + offset[0])
+        if index % 2 == 0
+        else viewport.position("y", value + offset[1])
+        for index, value in enumerate(numbers)
+    ]
+    return " ".join(_fmt(value) for value in mapped)
+
+
+class _PaintResolver:
+    """``url(#id)`` -> id of the gradient holding the stops, memoized per id."""
+
+    def __init__(self, id_map: dict[str, ET.Element]) -> None:
+        self._id_map = id_map
+        self._resolved: dict[str, str | None] = {}
+
+    def resolve(self, paint: str | None) -> tuple[str, str | None] | None:
+        ref = paint_href(paint)
+        if not ref:
+            return None
+        if ref not in self._resolved:
+            self._resolved[ref] = resolve_paint_id(paint, self._id_map)
+        return ref, self._resolved[ref]
+
+
+def _collect_palette(root: ET.Element) -> list[str]:
+    colors: dict[str, None] = {}
+    for elem in root.iter():
+        style = presentation(elem)
+        for prop in _PALETTE_PROPS:
+            value = style.get(prop, "").strip().lower()
+            if value and value not in _NOT_COLORS and not value.startswith("url("):
+                colors.setdefault(value)
+    return list(colors)
+
+
+def _collect_gradients(root: ET.Element, paints: _PaintResolver) -> list[dict]:
+    by_id = {
+        elem.attrib["id"]: elem
+        for elem in root.iter()
+        if _strip_ns(elem.tag) in GRADIENT_TAGS and "id" in elem.attrib
+    }
+    gradients = []
+    for gradient_id, elem in by_id.items():
+        resolved = paints.resolve(f"url(#{gradient_id})")
+        ref = resolved[1] if resolved and resolved[1] in by_id else gradient_id
+        attrs = {
+            name: value
+            for name, value in elem.attrib.items()
+            if name != "id" and name != "href" and not name.endswith("}href")
+        }
+        stops = []
+        for stop in by_id[ref]:
+            if _strip_ns(stop.tag) != "stop":
+                continue
+            style = presentation(stop)
+            stops.append({prop: style[prop] for prop in _STOP_PROPS if prop in style})
+        gradients.append(
+            {
+                "id": gradient_id,
+                "gradient_ref": ref,
+                "type": _strip_ns(elem.tag),
+                "attrs": attrs,
+                "stops": stops,
+            }
+        )
+    return gradients
+
+
+def _paint_attrs(chain: list[ET.Element], paints: _PaintResolver, viewport: Viewport) -> dict:
+    """fill / stroke / stroke-width inherited along ``chain`` (nearest first)."""
+    styles = [presentation(node) for node in chain]
+    attrs: dict = {}
+    for prop in ("fill", "stroke", "stroke-width"):
+        value = next((style[prop] for style in styles if prop in style), None)
+        if value is None:
+            continue
+        if prop == "stroke-width":
+            width = parse_length(value)
+            attrs[prop] = _num(viewport.length("x", width)) if width is not None else value
+            continue
+        attrs[prop] = value
+        resolved = paints.resolve(value)
+        if resolved is not None and "gradient_id" not in attrs:
+            attrs["gradient_id"], attrs["gradient_ref"] = resolved[0], resolved[1] or resolved[0]
+    return attrs
+
+
+def _shape_attrs(
+    elem: ET.Element,
+    chain: list[ET.Element],
+    paints: _PaintResolver,
+    viewport: Viewport,
+    offset: tuple[float, float],
+) -> dict:
+    shape = chain[0]
+    attrs: dict = {}
+    for name, raw in shape.attrib.items():
+        if name in _GEOMETRY and name != "stroke-width":
+            axis, is_position = _GEOMETRY[name]
+            value = parse_length(raw)
+            if value is None:
+                continue
+            if is_position:
+                mapped = viewport.position(axis, value + offset[0 if axis == "x" else 1])
+            else:
+                mapped = viewport.length(axis, value)
+            attrs[name] = _num(mapped)
+        elif name == "d":
+            attrs["d"] = remap_path(raw, viewport, offset)
+        elif name == "points":
+            attrs["points"] = _remap_points(raw, viewport, offset)
+    attrs.update(_paint_attrs(chain, paints, viewport))
+    opacity = presentation(elem).get("opacity")
+    if opacity is not None:
+        attrs["opacity"] = opacity
+    href = use_href(elem)
+    if href:
+        attrs["href"] = href
+    return attrs
+
+
+def _anim_values(
+    animation: SvgAnimation, viewport: Viewport, offset: tuple[float, float]
+) -> list:
+    """Keyframe values remapped to the viewport; rotate centres move by ``offset``."""
+    values: list = []
+    for _, numbers in animation.keyframes:
+        if animation.kind == "rotate":
+            angle, cx, cy = (list(numbers) + [0.0, 0.0])[:3]
+            values.append(
+                [
+                    _num(angle),
+                    _num(viewport.position("x", cx + offset[0])),
+                    _num(viewport.position("y", cy + offset[1])),
+                ]
+            )
+        elif animation.kind == "translate":
+            dx, dy = (list(numbers) + [0.0])[:2]
+            values.append([_num(viewport.length("x", dx)), _num(viewport.length("y", dy))])
+        elif animation.kind == "scale":
+            values.append([_num(number) for number in numbers])
+        else:
+            values.append(_num(numbers[0]))
+    return values
+
+
+def _unique_id(base: str, used: set[str]) -> str:
+    candidate = base
+    suffix = 1
+    while candidate in used:
+        suffix += 1
+        candidate = f"{base}_{suffix}"
+    used.add(candidate)
+    return candidate
+
+
+def build_overlays(
+    root: ET.Element,
+    *,
+    size_px: int | None = None,
+    allow_path_overlay: bool = True,
+    strict: bool = False,
+) -> dict:
+    """The ``overlays.json`` document of one parsed SVG.
+
+    Animated ``<g>`` overlay each of their shapes; targets that are not
+    shapes (or paths, unless ``allow_path_overlay``) are left out, and
+    shapes placed by a non-``translate`` transform go to ``skipped``.
+    ``strict`` rejects both those shapes and a base drawn between overlays
+    (``base_position == "mixed"``).
+    """
+    viewport = Viewport(root, size_px)
+    parents = {child: parent for parent in root.iter() for child in list(parent)}
+    id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
+    paints = _PaintResolver(id_map)
+    elements = drawable_elements(root, parents, id_map)
+    element_z = {elem: index for index, elem in enumerate(elements)}
+    animations = element_animations(root, parents, id_map)
+
+    def _leaves(index: int) -> list[int]:
+        return [
+            element_z[child]
+            for child in elements[index].iter()
+            if child in element_z and not any(sub in element_z for sub in list(child))
+        ]
+
+    def _ancestors(elem: ET.Element) -> list[ET.Element]:
+        nodes = []
+        parent = parents.get(elem)
+        while parent is not None:
+            nodes.append(parent)
+            parent = parents.get(parent)
+        return nodes
+
+    # Leaf -> (animation, translation of the animated element's ancestors).
+    moving: dict[int, list[tuple[SvgAnimation, tuple[float, float] | None]]] = {}
+    for index in sorted(animations):
+        frame = _placement(_ancestors(elements[index]))
+        for leaf in _leaves(index):
+            moving.setdefault(leaf, []).extend((item, frame) for item in animations[index])
+
+    used_ids: set[str] = set()
+    static: list[dict] = []
+    overlays: list[dict] = []
+    skipped: list[dict] = []
+    for index, elem in enumerate(elements):
+        if any(child in element_z for child in list(elem)):
+            continue  # groups paint nothing of their own
+        chain = element_chain(elem, parents, id_map)
+        if chain is None:
+            continue
+        tag = _strip_ns(chain[0].tag)
+        base_id = elem.attrib.get("id") or f"{tag}_{index}"
+        if index not in moving:
+            attrs = _paint_attrs(chain, paints, viewport)
+            attrs.pop("stroke-width", None)
+            element_id = _unique_id(base_id, used_ids)
+            static.append({"id": element_id, "tag": tag, "z": index, "attrs": attrs})
+            continue
+        if tag not in OVERLAY_TAGS or (tag == "path" and not allow_path_overlay):
+            continue
+        offset = _placement(chain)
+        if offset is None or any(frame is None for _, frame in moving[index]):
+            if strict:
+                raise ValueError(f"{base_id}: overlay placed by a non-translate transform")
+            skipped.append({"id": base_id, "z": index, "reason": "transform"})
+            continue
+        attrs = _shape_attrs(elem, chain, paints, viewport, offset)
+        for animation, frame in moving[index]:
+            overlay_id = _unique_id(base_id, used_ids)
+            overlays.append(
+                {
+                    "id": overlay_id,
+                    "type": animation.kind,
+                    "z": index,
+                    "z_rel": 0,
+                    "target": {"tag": tag, "attrs": dict(attrs, id=overlay_id)},
+                    "anim": {
+                        "kind": animation.kind,
+                        "dur_ms": _num(animation.dur_ms),
+                        "begin_ms": _num(animation.begin_ms),
+                        "repeat": "indefinite",
+                        "values": _anim_values(animation, viewport, frame),
+                    },
+                }
+            )
+
+    z_order = z_order_for([item["z"] for item in static], [item["z"] for item in overlays])
+    if strict and z_order.base_position == "mixed":
+        raise ValueError("static elements are drawn between overlays (base_position mixed)")
+    for overlay in overlays:
+        overlay["z_rel"] = overlay["z"] - z_order.overlays_z_offset
+    try:
+        opacity = float(presentation(root).get("opacity", "1"))
+    except ValueError:
+        opacity = 1.0
+    return {
+        "version": OVERLAYS_VERSION,
+        "size": {"w": viewport.size_px, "h": viewport.size_px},
+        "palette": _collect_palette(root),
+        "gradients": _collect_gradients(root, paints),
+        "static": static,
+        "alpha": max(0, min(255, int(round(opacity * 255)))),
+        "z_order": z_order.to_dict(),
+        "overlays": overlays,
+        "skipped": skipped,
+    }
+
+
+def dumps_overlays(document: dict) -> str:
+    return json.dumps(document, indent=2, ensure_ascii=False) + "\n"
+
+
+def write_overlays(svg_path: Path, output: Path, **options) -> dict:
+    document = build_overlays(ET.parse(svg_path).getroot(), **options)
+    output.write_text(dumps_overlays(document), encoding="utf-8")
+    return document
+
+
+def _overlay_task(task: tuple[str, str, dict]) -> tuple[str, int, str | None]:
+    svg_path, output, options = task
+    try:
+        document = write_overlays(Path(svg_path), Path(output), **options)
+    except (ET.ParseError, ValueError) as exc:
+        return svg_path, 0, str(exc)
+    return svg_path, len(document["overlays"]), None
+
+
+def write_overlays_dir(
+    source: Path, output_dir: Path, *, workers: int | None = 1, **options
+) -> list[tuple[str, int, str | None]]:
+    """``<stem>.overlays.json`` for every SVG of ``source``, in name order.
+
+    Returns ``(svg, overlay count, error)`` per file; failures do not stop
+    the batch.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (str(path), str(output_dir / f"{path.stem}.overlays.json"), options)
+        for path in sorted(source.glob("*.svg"))
+    ]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) < 2:
+        return [_overlay_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_overlay_task, tasks))
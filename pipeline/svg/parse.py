@@ -2,13 +2,36 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
 from pathlib import Path
 import xml.etree.ElementTree as ET
 import re
 
-from pipeline.spec.model import FX_KEYS
+from pipeline.fx.contracts import FIELD_CONTRACTS, PHASE_MS_MAX_ITEMS
+from pipeline.spec.model import fx_type, is_fx_key
+
+
+DRAWABLE_TAGS = frozenset(
+    {
+        "path",
+        "circle",
+        "rect",
+        "ellipse",
+        "line",
+        "polyline",
+        "polygon",
+        "g",
+        "use",
+    }
+)
+
+# Opacity segments shorter than this read as a flash rather than a twinkle.
+FLASH_SEGMENT_MS = 200.0
+# Closed translate loops slower than this drift; faster ones jitter.
+DRIFT_MIN_PERIOD_MS = 6000.0
+
+_ANIMATION_KINDS = frozenset({"rotate", "translate", "scale"})
 
 
 @dataclass
@@ -16,8 +39,8 @@ class SvgLayer:
     z: int
     asset_key: str
     asset_ref: str | None
-    x: int
-    y: int
+    x: float
+    y: float
     w: int | None
     h: int | None
     pivot_x: int | None
@@ -25,6 +48,18 @@ class SvgLayer:
     opacity: int
 
 
+@dataclass
+class SvgAnimation:
+    """One looping SMIL animation resolved to the layer it moves."""
+
+    target_z: int | None
+    kind: str
+    dur_ms: float
+    begin_ms: float
+    keyframes: list[tuple[float, tuple[float, ...]]]
+    discrete: bool = False
+
+
 @dataclass
 class SvgDocument:
     width: int | None
@@ -32,6 +67,7 @@ class SvgDocument:
     layers: list[SvgLayer]
     fx: dict
     spec_id: str | None
+    animations: list[SvgAnimation] = field(default_factory=list)
 
 
 def _parse_int(value: str | None) -> int | None:
@@ -84,7 +120,7 @@ def _is_in_defs(elem: ET.Element, parents: dict[ET.Element, ET.Element]) -> bool
     return False
 
 
-def _use_href(elem: ET.Element) -> str | None:
+def use_href(elem: ET.Element) -> str | None:
     href = elem.attrib.get("href")
     if href is None:
         href = elem.attrib.get("{http://www.w3.org/1999/xlink}href")
@@ -95,7 +131,7 @@ def _use_href(elem: ET.Element) -> str | None:
     return href.lstrip("#")
 
 
-def _paint_href(value: str | None) -> str | None:
+def paint_href(value: str | None) -> str | None:
     if not value:
         return None
     raw = value.strip()
@@ -107,8 +143,8 @@ def _paint_href(value: str | None) -> str | None:
     return ref.strip()
 
 
-def _resolve_paint_id(paint: str | None, id_map: dict[str, ET.Element]) -> str | None:
-    ref = _paint_href(paint)
+def resolve_paint_id(paint: str | None, id_map: dict[str, ET.Element]) -> str | None:
+    ref = paint_href(paint)
     if not ref:
         return None
     current = id_map.get(ref)
@@ -118,44 +154,323 @@ def _resolve_paint_id(paint: str | None, id_map: dict[str, ET.Element]) -> str |
         if not current_id or current_id in visited:
             break
         visited.add(current_id)
-        href = _use_href(current)
+        href = use_href(current)
         if not href:
             return current_id
         current = id_map.get(href)
     return ref
 
 
-def _signature_for_element(
-    elem: ET.Element,
-    id_map: dict[str, ET.Element],
-) -> tuple | None:
-    tag = _strip_ns(elem.tag)
-    if tag == "line":
+PATH_TOKEN_RE = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+PATH_ARITY = {"m": 2, "l": 2, "t": 2, "h": 1, "v": 1, "c": 6, "s": 4, "q": 4, "a": 7, "z": 0}
+_NUMBER_RE = re.compile(r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+_TRANSLATE_RE = re.compile(r"^\s*translate\(\s*([^,\s)]+)(?:[\s,]+([^\s)]+))?\s*\)\s*$")
+
+# Presentation properties that change how a shape rasterizes; inherited
+# from the nearest element of the chain that sets them.
+_PAINT_PROPS = (
+    "fill",
+    "fill-opacity",
+    "fill-rule",
+    "stroke",
+    "stroke-width",
+    "stroke-opacity",
+    "stroke-linecap",
+    "stroke-linejoin",
+    "stroke-miterlimit",
+    "stroke-dasharray",
+    "stroke-dashoffset",
+)
+
+Point = tuple[float, float]
+
+
+def _round(value: float) -> float:
+    return round(value, 3) + 0.0
+
+
+def _float_attr(elem: ET.Element, name: str, default: str = "0") -> float:
+    raw = elem.attrib.get(name, default).strip()
+    if raw.endswith("px"):
+        raw = raw[:-2]
+    return float(raw)
+
+
+class Viewport:
+    """viewBox -> ``size_px`` mapping (independent X/Y scales)."""
+
+    def __init__(self, root: ET.Element, size_px: int | None) -> None:
+        parts = root.attrib.get("viewBox", "").replace(",", " ").split()
         try:
-            x1 = float(elem.attrib.get("x1", "0"))
-            y1 = float(elem.attrib.get("y1", "0"))
-            x2 = float(elem.attrib.get("x2", "0"))
-            y2 = float(elem.attrib.get("y2", "0"))
+            box = [float(part) for part in parts] if len(parts) == 4 else []
         except ValueError:
+            box = []
+        if not box or box[2] <= 0 or box[3] <= 0:
+            width = parse_length(root.attrib.get("width"))
+            height = parse_length(root.attrib.get("height")) or width
+            if not width or not height:
+                raise ValueError("SVG has neither a viewBox nor a width/height")
+            box = [0.0, 0.0, width, height]
+        self.min_x, self.min_y, self.width, self.height = box
+        self.size_px = size_px or int(parse_length(root.attrib.get("width")) or self.width)
+        self.sx = self.size_px / self.width
+        self.sy = self.size_px / self.height
+
+    def position(self, axis: str, value: float) -> float:
+        if axis == "x":
+            return (value - self.min_x) * self.sx
+        return (value - self.min_y) * self.sy
+
+    def length(self, axis: str, value: float) -> float:
+        return value * (self.sx if axis == "x" else self.sy)
+
+    def normalized(self, axis: str, value: float) -> float:
+        """User-space coordinate as a 0..1 fraction of the viewBox."""
+        if axis == "x":
+            return (value - self.min_x) / self.width
+        return (value - self.min_y) / self.height
+
+
+def pivot_px(norm: float, size_px: int) -> int:
+    """Canonical normalized -> pixel conversion (§6.2)."""
+    return int(round(norm * (size_px - 1)))
+
+
+def parse_length(raw: str | None) -> float | None:
+    """A plain or ``px`` length, None when missing or not a number."""
+    if raw is None:
+        return None
+    cleaned = raw.strip()
+    if cleaned.endswith("px"):
+        cleaned = cleaned[:-2]
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def translate_offset(transform: str | None) -> Point | None:
+    """Offset of a plain ``translate(...)`` transform; None for any other transform."""
+    if not transform or not transform.strip():
+        return (0.0, 0.0)
+    match = _TRANSLATE_RE.match(transform)
+    if match is None:
+        return None
+    try:
+        return float(match.group(1)), float(match.group(2) or 0)
+    except ValueError:
+        return None
+
+
+def _normalized_path(d: str) -> tuple[tuple, Point] | None:
+    """Path segments with every coordinate relative to the previous point.
+
+    The first moveto is dropped (it only positions the shape) and returned
+    as the anchor, so the same outline drawn anywhere yields the same tuple.
+    """
+    tokens = PATH_TOKEN_RE.findall(d)
+    segments: list[tuple] = []
+    cx = cy = start_x = start_y = 0.0
+    anchor: Point | None = None
+    command: str | None = None
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.isalpha():
+            command = token
+            index += 1
+            if command in "Zz":
+                segments.append(("z",))
+                cx, cy = start_x, start_y
+                continue
+        elif command is None or command in "Zz":
+            return None
+        lower = command.lower()
+        arity = PATH_ARITY[lower]
+        args = tokens[index : index + arity]
+        if len(args) < arity or any(arg.isalpha() for arg in args):
             return None
-        dx = round(x2 - x1, 3)
-        dy = round(y2 - y1, 3)
-        stroke_width = elem.attrib.get("stroke-width")
-        stroke_linecap = elem.attrib.get("stroke-linecap")
-        stroke_miter = elem.attrib.get("stroke-miterlimit")
-        paint_id = _resolve_paint_id(elem.attrib.get("stroke"), id_map)
-        return (
-            "line",
-            dx,
-            dy,
-            stroke_width,
-            stroke_linecap,
-            stroke_miter,
-            paint_id,
+        index += arity
+        values = [float(arg) for arg in args]
+        relative = command.islower()
+        # H/V are stored as plain linetos so "h-4" and "L18 16" compare equal.
+        if lower == "h":
+            x = values[0] + (cx if relative else 0.0)
+            segment: tuple = ("l", _round(x - cx), 0.0)
+            cx = x
+        elif lower == "v":
+            y = values[0] + (cy if relative else 0.0)
+            segment = ("l", 0.0, _round(y - cy))
+            cy = y
+        else:
+            # Arcs: radii, rotation and flags are not coordinates.
+            first_point = 5 if lower == "a" else 0
+            parts: list[float] = [_round(value) for value in values[:first_point]]
+            x, y = cx, cy
+            for offset in range(first_point, arity, 2):
+                x = values[offset] + (cx if relative else 0.0)
+                y = values[offset + 1] + (cy if relative else 0.0)
+                parts.extend((_round(x - cx), _round(y - cy)))
+            segment = (lower, *parts)
+            cx, cy = x, y
+        if lower == "m":
+            if anchor is None:
+                anchor = (cx, cy)
+                segment = ("m",)
+            start_x, start_y = cx, cy
+            # Extra pairs after a moveto are implicit linetos.
+            command = "l" if relative else "L"
+        segments.append(segment)
+    if anchor is None:
+        return None
+    return tuple(segments), anchor
+
+
+def _normalized_points(raw: str) -> tuple[tuple, Point] | None:
+    values = [float(value) for value in _NUMBER_RE.findall(raw)]
+    if len(values) < 2 or len(values) % 2:
+        return None
+    x0, y0 = values[0], values[1]
+    relative = tuple(
+        (_round(values[i] - x0), _round(values[i + 1] - y0)) for i in range(2, len(values), 2)
+    )
+    return relative, (x0, y0)
+
+
+def _shape_geometry(elem: ET.Element) -> tuple[tuple, Point] | None:
+    """Translation-free geometry of a basic shape and the point it is anchored at."""
+    tag = _strip_ns(elem.tag)
+    if tag == "line":
+        x1, y1 = _float_attr(elem, "x1"), _float_attr(elem, "y1")
+        dx = _float_attr(elem, "x2") - x1
+        dy = _float_attr(elem, "y2") - y1
+        return ("line", _round(dx), _round(dy)), (x1, y1)
+    if tag == "circle":
+        return ("circle", _round(_float_attr(elem, "r"))), (
+            _float_attr(elem, "cx"),
+            _float_attr(elem, "cy"),
         )
+    if tag == "ellipse":
+        geometry = ("ellipse", _round(_float_attr(elem, "rx")), _round(_float_attr(elem, "ry")))
+        return geometry, (_float_attr(elem, "cx"), _float_attr(elem, "cy"))
+    if tag == "rect":
+        rx = elem.attrib.get("rx")
+        ry = elem.attrib.get("ry")
+        geometry = (
+            "rect",
+            _round(_float_attr(elem, "width")),
+            _round(_float_attr(elem, "height")),
+            _round(float(rx or ry or 0)),
+            _round(float(ry or rx or 0)),
+        )
+        return geometry, (_float_attr(elem, "x"), _float_attr(elem, "y"))
+    if tag in ("polyline", "polygon"):
+        points = _normalized_points(elem.attrib.get("points", ""))
+        if points is None:
+            return None
+        return (tag, points[0]), points[1]
+    if tag == "path":
+        path = _normalized_path(elem.attrib.get("d", ""))
+        if path is None:
+            return None
+        return ("path", path[0]), path[1]
     return None
 
 
+def presentation(elem: ET.Element) -> dict[str, str]:
+    """Presentation attributes of ``elem``, with inline ``style`` declarations winning."""
+    values = dict(elem.attrib)
+    for declaration in elem.attrib.get("style", "").split(";"):
+        if ":" in declaration:
+            name, value = declaration.split(":", 1)
+            values[name.strip()] = value.strip()
+    return values
+
+
+def element_chain(
+    elem: ET.Element,
+    parents: dict[ET.Element, ET.Element],
+    id_map: dict[str, ET.Element],
+) -> list[ET.Element] | None:
+    """The shape drawn by ``elem`` followed by the elements it inherits from, nearest first.
+
+    A ``<use>`` chain is followed to its shape; the shape then inherits from
+    the ``<use>`` elements (innermost first) and the ancestors of ``elem``.
+    """
+    uses: list[ET.Element] = []
+    current = elem
+    while _strip_ns(current.tag) == "use":
+        if current in uses:
+            return None
+        uses.append(current)
+        target = id_map.get(use_href(current) or "")
+        if target is None:
+            return None
+        current = target
+    chain = [current, *reversed(uses)]
+    ancestor = parents.get(elem)
+    while ancestor is not None:
+        chain.append(ancestor)
+        ancestor = parents.get(ancestor)
+    return chain
+
+
+def _element_signature(
+    elem: ET.Element,
+    parents: dict[ET.Element, ET.Element],
+    id_map: dict[str, ET.Element],
+) -> tuple[tuple, Point] | None:
+    """Translation-invariant signature of what ``elem`` draws, and its anchor point.
+
+    Only elements placed by ``use`` x/y and ``translate`` chains are signed:
+    any other transform would also move the anchor, so such elements never
+    share an asset.
+    """
+    chain = element_chain(elem, parents, id_map)
+    if chain is None:
+        return None
+    try:
+        shape = _shape_geometry(chain[0])
+    except ValueError:
+        return None
+    if shape is None:
+        return None
+    geometry, (anchor_x, anchor_y) = shape
+
+    styles = [presentation(node) for node in chain]
+    paint: list[object] = []
+    for prop in _PAINT_PROPS:
+        value = next((style[prop] for style in styles if prop in style), None)
+        if prop in ("fill", "stroke"):
+            # Gradient clones that only re-reference another gradient share one id.
+            paint_id = resolve_paint_id(value, id_map)
+            if paint_id is not None:
+                value = f"url(#{paint_id})"
+        paint.append(value)
+
+    opacity = 1.0
+    try:
+        for node, style in zip(chain, styles):
+            if "opacity" in style:
+                opacity *= float(style["opacity"])
+            if _strip_ns(node.tag) == "use":
+                anchor_x += _float_attr(node, "x")
+                anchor_y += _float_attr(node, "y")
+            transform = style.get("transform")
+            if not transform:
+                continue
+            match = _TRANSLATE_RE.match(transform)
+            if match is None:
+                return None
+            anchor_x += float(match.group(1))
+            anchor_y += float(match.group(2) or 0)
+    except ValueError:
+        return None
+
+    signature = (geometry, tuple(paint), _round(opacity))
+    return signature, (anchor_x, anchor_y)
+
+
 def _is_drawable_target(
     elem: ET.Element,
     drawable_tags: set[str],
@@ -169,7 +484,7 @@ def _is_drawable_target(
     if tag not in drawable_tags:
         return False
     if tag == "use":
-        ref = _use_href(elem)
+        ref = use_href(elem)
         if not ref:
             return False
         target = id_map.get(ref)
@@ -208,7 +523,7 @@ def _is_drawable_element(
     if tag not in drawable_tags:
         return False
     if tag == "use":
-        ref = _use_href(elem)
+        ref = use_href(elem)
         if not ref:
             return False
         target = id_map.get(ref)
@@ -235,6 +550,23 @@ def _is_drawable_element(
     return True
 
 
+def drawable_elements(
+    root: ET.Element,
+    parents: dict[ET.Element, ET.Element] | None = None,
+    id_map: dict[str, ET.Element] | None = None,
+) -> list[ET.Element]:
+    """Return drawable elements in document order; the index is the auto-layer z."""
+    if parents is None:
+        parents = {child: parent for parent in root.iter() for child in list(parent)}
+    if id_map is None:
+        id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
+    return [
+        elem
+        for elem in root.iter()
+        if _is_drawable_element(elem, parents, DRAWABLE_TAGS, id_map)
+    ]
+
+
 def _parse_duration_ms(value: str | None) -> float | None:
     if value is None:
         return None
@@ -249,71 +581,6 @@ def _parse_duration_ms(value: str | None) -> float | None:
         raise ValueError(f"invalid duration: {value!r}") from exc
 
 
-def _parse_values_pair(values: str) -> tuple[str, str] | None:
-    parts = [part.strip() for part in values.split(";") if part.strip()]
-    if len(parts) < 2:
-        return None
-    return parts[0], parts[1]
-
-
-def _parse_rotate_delta(
-    values: str | None, from_value: str | None, to_value: str | None
-) -> tuple[float | None, tuple[int, int] | None]:
-    def _parse_rotate(value: str) -> tuple[float, tuple[int, int] | None]:
-        parts = value.replace(",", " ").split()
-        if not parts:
-            raise ValueError("invalid rotate value")
-        angle = float(parts[0])
-        pivot = None
-        if len(parts) >= 3:
-            pivot = (int(float(parts[1])), int(float(parts[2])))
-        return angle, pivot
-
-    if values:
-        pair = _parse_values_pair(values)
-        if not pair:
-            return None, None
-        first, second = pair
-        try:
-            start, pivot_a = _parse_rotate(first)
-            end, pivot_b = _parse_rotate(second)
-            pivot = pivot_a or pivot_b
-            return abs(end - start), pivot
-        except (IndexError, ValueError) as exc:
-            raise ValueError("invalid rotate values") from exc
-    if from_value and to_value:
-        try:
-            start, pivot_a = _parse_rotate(from_value)
-            end, pivot_b = _parse_rotate(to_value)
-            pivot = pivot_a or pivot_b
-            return abs(end - start), pivot
-        except ValueError as exc:
-            raise ValueError("invalid rotate from/to") from exc
-    return None, None
-
-
-def _parse_translate_delta(values: str | None, from_value: str | None, to_value: str | None) -> tuple[float, float] | None:
-    def _parse_pair(value: str) -> tuple[float, float]:
-        parts = value.replace(",", " ").split()
-        if len(parts) < 2:
-            raise ValueError("invalid translate pair")
-        return float(parts[0]), float(parts[1])
-
-    if values:
-        pair = _parse_values_pair(values)
-        if not pair:
-            return None
-        first, second = pair
-        x0, y0 = _parse_pair(first)
-        x1, y1 = _parse_pair(second)
-        return x1 - x0, y1 - y0
-    if from_value and to_value:
-        x0, y0 = _parse_pair(from_value)
-        x1, y1 = _parse_pair(to_value)
-        return x1 - x0, y1 - y0
-    return None
-
-
 def _find_target_z(
     elem: ET.Element,
     parents: dict[ET.Element, ET.Element],
@@ -335,9 +602,11 @@ def _find_target_z(
 
 def _parse_fx(root: ET.Element) -> dict:
     fx = {}
-    for key in FX_KEYS:
-        raw = root.attrib.get(f"data-wx-fx-{key}")
-        if not raw:
+    for name, raw in root.attrib.items():
+        if not name.startswith("data-wx-fx-") or not raw:
+            continue
+        key = name[len("data-wx-fx-") :]
+        if not is_fx_key(key):
             continue
         try:
             fx[key] = json.loads(raw)
@@ -346,72 +615,310 @@ def _parse_fx(root: ET.Element) -> dict:
     return fx
 
 
-def _parse_fx_from_animations(
+def _parse_begin_ms(value: str | None) -> float:
+    """First clock offset of ``begin``; event and syncbase values start at 0."""
+    if not value:
+        return 0.0
+    for part in value.split(";"):
+        try:
+            parsed = _parse_duration_ms(part)
+        except ValueError:
+            continue
+        if parsed is not None:
+            return parsed
+    return 0.0
+
+
+def _is_looping(elem: ET.Element) -> bool:
+    if elem.attrib.get("repeatDur", "").strip() == "indefinite":
+        return True
+    count = elem.attrib.get("repeatCount", "").strip()
+    if count == "indefinite":
+        return True
+    try:
+        return float(count) > 1.0
+    except ValueError:
+        return False
+
+
+def _parse_numbers(value: str) -> tuple[float, ...]:
+    try:
+        return tuple(float(part) for part in value.replace(",", " ").split())
+    except ValueError as exc:
+        raise ValueError(f"invalid animation value: {value!r}") from exc
+
+
+def _parse_keyframes(elem: ET.Element) -> list[tuple[float, tuple[float, ...]]]:
+    """``(key time 0..1, numbers)`` from ``values``/``keyTimes`` or ``from``/``to``/``by``."""
+    values = elem.attrib.get("values")
+    if values:
+        frames = [_parse_numbers(part) for part in values.split(";") if part.strip()]
+        key_times = elem.attrib.get("keyTimes")
+        if key_times:
+            try:
+                times = [float(part) for part in key_times.split(";") if part.strip()]
+            except ValueError as exc:
+                raise ValueError(f"invalid keyTimes: {key_times!r}") from exc
+            if len(times) != len(frames):
+                raise ValueError("keyTimes must have one entry per values item")
+        elif len(frames) > 1:
+            times = [index / (len(frames) - 1) for index in range(len(frames))]
+        else:
+            times = [0.0] * len(frames)
+        return list(zip(times, frames))
+    start = elem.attrib.get("from")
+    end = elem.attrib.get("to")
+    by = elem.attrib.get("by")
+    if end is None and by is None:
+        return []
+    first = _parse_numbers(start) if start else ()
+    if end is not None:
+        last = _parse_numbers(end)
+    else:
+        delta = _parse_numbers(by or "")
+        base = first + (0.0,) * (len(delta) - len(first))
+        last = tuple(a + b for a, b in zip(base, delta))
+    if not first:
+        first = (0.0,) * len(last)
+    return [(0.0, first), (1.0, last)]
+
+
+def _animation_kind(elem: ET.Element) -> str | None:
+    tag = _strip_ns(elem.tag)
+    attribute = elem.attrib.get("attributeName")
+    if tag == "animateTransform":
+        kind = elem.attrib.get("type", "translate")
+        # gradientTransform & co. animate paint, not the layer.
+        if attribute not in (None, "transform") or kind not in _ANIMATION_KINDS:
+            return None
+        return kind
+    if tag == "animate" and attribute in ("opacity", "fill-opacity", "stroke-opacity"):
+        return "opacity"
+    return None
+
+
+def _parse_animation(
+    elem: ET.Element,
+    parents: dict[ET.Element, ET.Element],
+    element_z: dict[ET.Element, int],
+    id_map: dict[str, ET.Element],
+) -> SvgAnimation | None:
+    kind = _animation_kind(elem)
+    if kind is None or not _is_looping(elem):
+        return None
+    dur = elem.attrib.get("dur")
+    dur_ms = None if dur == "indefinite" else _parse_duration_ms(dur)
+    if not dur_ms or dur_ms <= 0:
+        return None
+    keyframes = _parse_keyframes(elem)
+    if len(keyframes) < 2 or any(not numbers for _, numbers in keyframes):
+        return None
+    target = id_map.get(use_href(elem) or "", elem)
+    return SvgAnimation(
+        target_z=_find_target_z(target, parents, element_z),
+        kind=kind,
+        dur_ms=dur_ms,
+        begin_ms=_parse_begin_ms(elem.attrib.get("begin")),
+        keyframes=keyframes,
+        discrete=elem.attrib.get("calcMode") == "discrete",
+    )
+
+
+def _angle_tenths(degrees: float) -> int:
+    return int(round(degrees * 10.0)) % 3600
+
+
+def _rotate_fx(animation: SvgAnimation) -> tuple[str, dict]:
+    angles = [numbers[0] for _, numbers in animation.keyframes]
+    span = angles[-1] - angles[0]
+    params: dict = {}
+    if abs(span) >= 360.0 and abs(span) == max(angles) - min(angles):
+        # Full turns: several per cycle shorten the period.
+        params["period_ms"] = int(round(animation.dur_ms * 360.0 / abs(span)))
+    else:
+        params["period_ms"] = int(round(animation.dur_ms))
+        # Increasing sweep angle_from -> angle_to, wrapping through 0 when
+        # angle_to < angle_from (the contract keeps both in 0..3600).
+        sweep = int(round((max(angles) - min(angles)) * 10.0))
+        if sweep >= 3600:
+            params["angle_from"], params["angle_to"] = 0, 3600
+        else:
+            params["angle_from"] = _angle_tenths(min(angles))
+            params["angle_to"] = (params["angle_from"] + sweep) % 3600
+    pivot = next((numbers[1:3] for _, numbers in animation.keyframes if len(numbers) >= 3), None)
+    if pivot is not None and min(pivot) >= 0:
+        params["pivot_x"] = int(round(pivot[0]))
+        params["pivot_y"] = int(round(pivot[1]))
+    return "ROTATE", params
+
+
+def _translate_fx(animation: SvgAnimation) -> tuple[str, dict]:
+    points = [(numbers[0], numbers[1] if len(numbers) > 1 else 0.0) for _, numbers in animation.keyframes]
+    period_ms = int(round(animation.dur_ms))
+    dx = points[-1][0] - points[0][0]
+    dy = points[-1][1] - points[0][1]
+    if abs(dx) < 0.5 and abs(dy) < 0.5:
+        # Back where it started: an oscillation around the rest position.
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        key = "DRIFT" if animation.dur_ms > DRIFT_MIN_PERIOD_MS else "JITTER"
+        return key, {
+            "period_ms": period_ms,
+            "amp_x": int(round((max(xs) - min(xs)) / 2.0)),
+            "amp_y": int(round((max(ys) - min(ys)) / 2.0)),
+        }
+    if abs(dy) >= abs(dx):
+        params = {"period_ms": period_ms, "fall_dy": int(round(abs(dy)))}
+        if int(round(abs(dx))):
+            params["fall_dx"] = int(round(abs(dx)))
+        return "FALL", params
+    return "FLOW_X", {"period_ms": period_ms, "amp_x": int(round(abs(dx)))}
+
+
+def _opacity_range(animation: SvgAnimation) -> dict:
+    levels = [min(max(numbers[0], 0.0), 1.0) for _, numbers in animation.keyframes]
+    return {
+        "opa_min": int(round(min(levels) * 255.0)),
+        "opa_max": int(round(max(levels) * 255.0)),
+    }
+
+
+def _opacity_fx(animation: SvgAnimation) -> tuple[str, dict]:
+    params = {"period_ms": int(round(animation.dur_ms)), **_opacity_range(animation)}
+    frames = animation.keyframes
+    changes = [
+        (t1 - t0) * animation.dur_ms
+        for (t0, a), (t1, b) in zip(frames, frames[1:])
+        if a[0] != b[0]
+    ]
+    if animation.discrete or (changes and min(changes) < FLASH_SEGMENT_MS):
+        return "FLASH", params
+    return "TWINKLE", params
+
+
+def _target_fx(animations: list[SvgAnimation]) -> list[tuple[str, dict, float]]:
+    """FX of one target: ``(key, params, begin_ms)``; a fading fall keeps its opacity."""
+    result: list[tuple[str, dict, float]] = []
+    fades = [animation for animation in animations if animation.kind == "opacity"]
+    for animation in animations:
+        if animation.kind == "rotate":
+            key, params = _rotate_fx(animation)
+        elif animation.kind == "translate":
+            key, params = _translate_fx(animation)
+            fade = next((item for item in fades if item.dur_ms == animation.dur_ms), None)
+            if key == "FALL" and fade is not None:
+                params.update(_opacity_range(fade))
+                fades.remove(fade)
+        elif animation.kind == "scale":
+            key = "CROSSFADE"
+            params = {"period_ms": int(round(animation.dur_ms)), "opa_min": 0, "opa_max": 255}
+        else:
+            continue
+        result.append((key, params, animation.begin_ms))
+    for animation in fades:
+        key, params = _opacity_fx(animation)
+        result.append((key, params, animation.begin_ms))
+    return result
+
+
+def _collect_animations(
     root: ET.Element,
     parents: dict[ET.Element, ET.Element],
     element_z: dict[ET.Element, int],
-    existing_fx: dict,
-) -> dict:
-    fx = dict(existing_fx)
+    id_map: dict[str, ET.Element],
+) -> list[SvgAnimation]:
+    animations = []
     for elem in root.iter():
-        tag = _strip_ns(elem.tag)
-        if tag == "animateTransform":
-            transform_type = elem.attrib.get("type")
-            duration_ms = _parse_duration_ms(elem.attrib.get("dur"))
-            target_z = _find_target_z(elem, parents, element_z)
-            if transform_type == "rotate" and "ROTATE" not in fx:
-                delta, pivot = _parse_rotate_delta(
-                    elem.attrib.get("values"),
-                    elem.attrib.get("from"),
-                    elem.attrib.get("to"),
-                )
-                if duration_ms and duration_ms > 0 and delta is not None:
-                    rotate_fx = {
-                        "period_ms": int(round(duration_ms)),
-                        "target_z": target_z or 0,
-                    }
-                    if pivot is not None:
-                        rotate_fx["pivot_x"] = pivot[0]
-                        rotate_fx["pivot_y"] = pivot[1]
-                    fx["ROTATE"] = rotate_fx
-            elif transform_type == "translate":
-                delta = _parse_translate_delta(
-                    elem.attrib.get("values"),
-                    elem.attrib.get("from"),
-                    elem.attrib.get("to"),
-                )
-                if duration_ms and duration_ms > 0 and delta is not None:
-                    dx, dy = delta
-                    if abs(dy) >= abs(dx):
-                        if "FALL" not in fx:
-                            fx["FALL"] = {
-                                "period_ms": int(round(duration_ms)),
-                                "target_z": target_z or 0,
-                                "fall_dy": int(round(abs(dy))),
-                            }
-                    else:
-                        if "FLOW_X" not in fx:
-                            fx["FLOW_X"] = {
-                                "period_ms": int(round(duration_ms)),
-                                "target_z": target_z or 0,
-                                "amp_x": int(round(abs(dx))),
-                    }
-        elif tag == "animate":
-            if elem.attrib.get("attributeName") == "opacity" and "TWINKLE" not in fx:
-                duration_ms = _parse_duration_ms(elem.attrib.get("dur"))
-                target_z = _find_target_z(elem, parents, element_z)
-                if duration_ms and duration_ms > 0:
-                    fx["TWINKLE"] = {
-                        "period_ms": int(round(duration_ms)),
-                        "target_z": target_z or 0,
-                    }
+        animation = _parse_animation(elem, parents, element_z, id_map)
+        if animation is not None:
+            animations.append(animation)
+    return animations
+
+
+def element_animations(
+    root: ET.Element,
+    parents: dict[ET.Element, ET.Element] | None = None,
+    id_map: dict[str, ET.Element] | None = None,
+) -> dict[int, list[SvgAnimation]]:
+    """Looping SMIL animations keyed by the drawable index (auto-layer z) they move."""
+    if parents is None:
+        parents = {child: parent for parent in root.iter() for child in list(parent)}
+    if id_map is None:
+        id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
+    elements = drawable_elements(root, parents, id_map)
+    element_z = {elem: index for index, elem in enumerate(elements)}
+    by_index: dict[int, list[SvgAnimation]] = {}
+    for animation in _collect_animations(root, parents, element_z, id_map):
+        if animation.target_z is not None and 0 <= animation.target_z < len(elements):
+            by_index.setdefault(animation.target_z, []).append(animation)
+    return by_index
+
+
+def _instance_key(fx_key: str, members: list[tuple[int, int]], fx: dict) -> str:
+    key = f"{fx_key}.z{members[0][0]}"
+    suffix = 1
+    while key in fx:
+        suffix += 1
+        key = f"{fx_key}.z{members[0][0]}_{suffix}"
+    return key
+
+
+def _parse_fx_from_animations(animations: list[SvgAnimation], existing_fx: dict) -> dict:
+    """Merge per-target FX into fx instances with ``target_z`` lists.
+
+    Targets that share a type and parameters (phase aside) share an entry;
+    ``begin`` offsets become ``phase_ms`` in z order. The parameter set used
+    by the most targets keeps the bare type key, the others become
+    ``TYPE.z<first z>`` instances, as do targets past ``PHASE_MS_MAX_ITEMS``.
+    Types configured explicitly on the root are left alone.
+    """
+    explicit = {fx_type(key) for key in existing_fx}
+    by_target: dict[int | None, list[SvgAnimation]] = {}
+    for animation in animations:
+        by_target.setdefault(animation.target_z, []).append(animation)
+
+    # type -> params (frozen) -> [(z, phase_ms)]
+    groups: dict[str, dict[tuple, list[tuple[int, int]]]] = {}
+    for target_z, target_animations in by_target.items():
+        for key, params, begin_ms in _target_fx(target_animations):
+            if key in explicit:
+                continue
+            period = params["period_ms"]
+            phase = int(round(begin_ms)) % period if period > 0 else 0
+            frozen = tuple((name, params[name]) for name in FIELD_CONTRACTS if name in params)
+            members = groups.setdefault(key, {}).setdefault(frozen, [])
+            members.append((target_z or 0, phase))
+
+    fx = dict(existing_fx)
+    for key, candidates in groups.items():
+        ranked = sorted(
+            candidates.items(), key=lambda item: (-len(item[1]), min(z for z, _ in item[1]))
+        )
+        for rank, (frozen, members) in enumerate(ranked):
+            members.sort()
+            chunks = [members]
+            if len(members) > PHASE_MS_MAX_ITEMS and any(phase for _, phase in members):
+                chunks = [
+                    members[start : start + PHASE_MS_MAX_ITEMS]
+                    for start in range(0, len(members), PHASE_MS_MAX_ITEMS)
+                ]
+            for index, chunk in enumerate(chunks):
+                entry = dict(frozen)
+                entry["target_z"] = [z for z, _ in chunk]
+                phases = [phase for _, phase in chunk]
+                if any(phases):
+                    entry["phase_ms"] = phases
+                primary = rank == 0 and index == 0
+                fx[key if primary else _instance_key(key, chunk, fx)] = entry
     return fx
 
 
 def parse_svg(path: Path) -> SvgDocument:
-    tree = ET.parse(path)
-    root = tree.getroot()
+    return parse_svg_root(ET.parse(path).getroot())
+
 
+def parse_svg_root(root: ET.Element) -> SvgDocument:
+    """``parse_svg`` on an already parsed document (left unmodified)."""
     spec_id = root.attrib.get("data-wx-id") or root.attrib.get("id")
 
     width = _parse_int(root.attrib.get("width"))
@@ -456,27 +963,14 @@ def parse_svg(path: Path) -> SvgDocument:
         layers.append(layer)
         element_z[elem] = int(z)
 
+    id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
     if not has_explicit_layers:
-        drawable_tags = {
-            "path",
-            "circle",
-            "rect",
-            "ellipse",
-            "line",
-            "polyline",
-            "polygon",
-            "g",
-            "use",
-        }
-        id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
-        signature_map: dict[tuple, str] = {}
+        signature_map: dict[tuple, tuple[str, Point]] = {}
         index = 0
-        for elem in root.iter():
-            if not _is_drawable_element(elem, parents, drawable_tags, id_map):
-                continue
+        for elem in drawable_elements(root, parents, id_map):
             tag = _strip_ns(elem.tag)
             if tag == "use":
-                ref_id = _use_href(elem)
+                ref_id = use_href(elem)
                 if ref_id and ref_id in id_map:
                     asset_key = _auto_asset_key(ref_id, index)
                 else:
@@ -484,19 +978,24 @@ def parse_svg(path: Path) -> SvgDocument:
             else:
                 asset_key = _auto_asset_key(elem.attrib.get("id"), index)
             asset_ref = None
-            signature = _signature_for_element(elem, id_map)
-            if signature is not None:
+            offset_x = offset_y = 0.0
+            signed = _element_signature(elem, parents, id_map)
+            if signed is not None:
+                signature, (anchor_x, anchor_y) = signed
                 existing = signature_map.get(signature)
-                if existing:
-                    asset_ref = existing
+                if existing is not None:
+                    # Same drawing as an earlier layer: share its asset, placed at an offset.
+                    asset_ref, (ref_x, ref_y) = existing
+                    offset_x = anchor_x - ref_x
+                    offset_y = anchor_y - ref_y
                 else:
-                    signature_map[signature] = asset_key
+                    signature_map[signature] = (asset_key, (anchor_x, anchor_y))
             layer = SvgLayer(
                 z=index,
                 asset_key=asset_key,
                 asset_ref=asset_ref,
-                x=0,
-                y=0,
+                x=offset_x,
+                y=offset_y,
                 w=None,
                 h=None,
                 pivot_x=None,
@@ -507,5 +1006,13 @@ def parse_svg(path: Path) -> SvgDocument:
             element_z[elem] = index
             index += 1
     fx = _parse_fx(root)
-    fx = _parse_fx_from_animations(root, parents, element_z, fx)
-    return SvgDocument(width=width, height=height, layers=layers, fx=fx, spec_id=spec_id)
+    animations = _collect_animations(root, parents, element_z, id_map)
+    fx = _parse_fx_from_animations(animations, fx)
+    return SvgDocument(
+        width=width,
+        height=height,
+        layers=layers,
+        fx=fx,
+        spec_id=spec_id,
+        animations=animations,
+    )
@@ -0,0 +1,371 @@
+"""Rotation pivot solver for ROTATE layers.
+
+A pivot is kept normalized to the icon frame, ``(x, y)`` in ``0..1``, and
+converted per export size with the canonical rule of
+``assets-naming-and-packing.md`` §6.2: ``round(norm * (size_px - 1))``.
+The declared pivot (``data-wx-pivot-x/y`` on the element, else the SMIL
+``rotate`` centre carried by the ROTATE params) wins; otherwise the pivot
+is detected from the rotating element's geometry (bounding box centre) or,
+failing that, from the alpha-weighted centroid of its raster. Declared
+pivots that diverge from the detected one are reported, since they show
+up as wobble on the device.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Iterable, Mapping
+import xml.etree.ElementTree as ET
+
+from pipeline.spec.model import Spec, fx_type
+from pipeline.svg.parse import (
+    PATH_ARITY,
+    PATH_TOKEN_RE,
+    Viewport,
+    drawable_elements,
+    parse_length,
+    pivot_px,
+    translate_offset,
+    use_href,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from PIL import Image
+
+# Declared and detected pivots further apart than this (px, at the largest
+# export size) raise a warning.
+DEFAULT_TOLERANCE_PX = 2
+
+Box = tuple[float, float, float, float]
+Norm = tuple[float, float]
+
+
+def _px(norm: Norm | None, size_px: int) -> tuple[int, int] | None:
+    if norm is None:
+        return None
+    return pivot_px(norm[0], size_px), pivot_px(norm[1], size_px)
+
+
+@dataclass(frozen=True, slots=True)
+class PivotEstimate:
+    layer_id: str
+    fx_key: str
+    declared: Norm | None
+    detected: Norm | None
+    method: str | None = None
+
+    @property
+    def pivot(self) -> Norm | None:
+        return self.declared or self.detected
+
+    def at(self, size_px: int) -> tuple[int, int] | None:
+        return _px(self.pivot, size_px)
+
+    def divergence_px(self, size_px: int) -> int | None:
+        if self.declared is None or self.detected is None:
+            return None
+        return max(
+            abs(pivot_px(a, size_px) - pivot_px(b, size_px))
+            for a, b in zip(self.declared, self.detected)
+        )
+
+    def to_dict(self, sizes: Iterable[int]) -> dict:
+        return {
+            "layer": self.layer_id,
+            "fx": self.fx_key,
+            "declared": [round(value, 4) for value in self.declared] if self.declared else None,
+            "detected": [round(value, 4) for value in self.detected] if self.detected else None,
+            "method": self.method,
+            "px": {str(size): list(self.at(size) or ()) for size in sizes},
+        }
+
+
+@dataclass(slots=True)
+class PivotReport:
+    estimates: list[PivotEstimate] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def for_fx(self) -> dict[str, PivotEstimate]:
+        """First resolved estimate per ROTATE fx key."""
+        by_key: dict[str, PivotEstimate] = {}
+        for estimate in self.estimates:
+            if estimate.pivot is not None:
+                by_key.setdefault(estimate.fx_key, estimate)
+        return by_key
+
+    def to_dict(self, sizes: Iterable[int]) -> dict:
+        sizes = list(sizes)
+        return {
+            "pivots": [estimate.to_dict(sizes) for estimate in self.estimates],
+            "warnings": list(self.warnings),
+        }
+
+
+def _union(boxes: Iterable[Box | None]) -> Box | None:
+    found = [box for box in boxes if box is not None]
+    if not found:
+        return None
+    return (
+        min(box[0] for box in found),
+        min(box[1] for box in found),
+        max(box[2] for box in found),
+        max(box[3] for box in found),
+    )
+
+
+def _points_box(points: list[tuple[float, float]]) -> Box | None:
+    if not points:
+        return None
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _path_points(d: str) -> list[tuple[float, float]]:
+    """Absolute end and control points of a path (arcs contribute their end points)."""
+    points: list[tuple[float, float]] = []
+    command: str | None = None
+    args: list[float] = []
+    cx = cy = start_x = start_y = 0.0
+    for token in PATH_TOKEN_RE.findall(d) + ["Z"]:
+        if not token.isalpha():
+            if command is None or command in "Zz":
+                return []
+            args.append(float(token))
+            lower = command.lower()
+            if len(args) < PATH_ARITY[lower]:
+                continue
+            relative = command.islower()
+            if lower == "h":
+                cx = args[0] + (cx if relative else 0.0)
+            elif lower == "v":
+                cy = args[0] + (cy if relative else 0.0)
+            else:
+                first = 5 if lower == "a" else 0
+                base_x, base_y = cx, cy
+                for offset in range(first, len(args), 2):
+                    x = args[offset] + (base_x if relative else 0.0)
+                    y = args[offset + 1] + (base_y if relative else 0.0)
+                    if offset + 2 < len(args):
+                        points.append((x, y))
+                    else:
+                        cx, cy = x, y
+            points.append((cx, cy))
+            if lower == "m":
+                start_x, start_y = cx, cy
+                command = "l" if relative else "L"
+            args = []
+            continue
+        if command in ("Z", "z"):
+            cx, cy = start_x, start_y
+        command = token
+    return points
+
+
+def _number(elem: ET.Element, name: str) -> float:
+    return parse_length(elem.attrib.get(name)) or 0.0
+
+
+def element_box(
+    elem: ET.Element, id_map: Mapping[str, ET.Element], _seen: frozenset = frozenset()
+) -> Box | None:
+    """User-space bounding box of ``elem`` (its own translate applied).
+
+    None for empty shapes and for transforms other than ``translate``.
+    """
+    if elem in _seen:
+        return None
+    offset = translate_offset(elem.attrib.get("transform"))
+    if offset is None:
+        return None
+    tag = elem.tag.split("}", 1)[-1]
+    box: Box | None
+    if tag == "circle":
+        r = _number(elem, "r")
+        cx, cy = _number(elem, "cx"), _number(elem, "cy")
+        box = (cx - r, cy - r, cx + r, cy + r)
+    elif tag == "ellipse":
+        rx, ry = _number(elem, "rx"), _number(elem, "ry")
+        cx, cy = _number(elem, "cx"), _number(elem, "cy")
+        box = (cx - rx, cy - ry, cx + rx, cy + ry)
+    elif tag == "rect":
+        x, y = _number(elem, "x"), _number(elem, "y")
+        box = (x, y, x + _number(elem, "width"), y + _number(elem, "height"))
+    elif tag == "line":
+        box = _points_box(
+            [(_number(elem, "x1"), _number(elem, "y1")), (_number(elem, "x2"), _number(elem, "y2"))]
+        )
+    elif tag in ("polyline", "polygon"):
+        numbers = [float(token) for token in PATH_TOKEN_RE.findall(elem.attrib.get("points", ""))]
+        box = _points_box(list(zip(numbers[0::2], numbers[1::2])))
+    elif tag == "path":
+        box = _points_box(_path_points(elem.attrib.get("d", "")))
+    elif tag == "use":
+        target = id_map.get(use_href(elem) or "")
+        inner = element_box(target, id_map, _seen | {elem}) if target is not None else None
+        x, y = _number(elem, "x"), _number(elem, "y")
+        box = (inner[0] + x, inner[1] + y, inner[2] + x, inner[3] + y) if inner else None
+    elif tag == "g":
+        box = _union(element_box(child, id_map, _seen | {elem}) for child in elem)
+    else:
+        box = None
+    if box is None or box[2] < box[0] or box[3] < box[1]:
+        return None
+    dx, dy = offset
+    return box[0] + dx, box[1] + dy, box[2] + dx, box[3] + dy
+
+
+def geometry_pivot(
+    elem: ET.Element,
+    parents: Mapping[ET.Element, ET.Element],
+    id_map: Mapping[str, ET.Element],
+    viewport: Viewport,
+) -> Norm | None:
+    """Normalized bounding-box centre of ``elem``; ancestors may only translate."""
+    box = element_box(elem, id_map)
+    if box is None:
+        return None
+    dx = dy = 0.0
+    ancestor = parents.get(elem)
+    while ancestor is not None:
+        offset = translate_offset(ancestor.attrib.get("transform"))
+        if offset is None:
+            return None
+        dx += offset[0]
+        dy += offset[1]
+        ancestor = parents.get(ancestor)
+    return (
+        viewport.normalized("x", (box[0] + box[2]) / 2 + dx),
+        viewport.normalized("y", (box[1] + box[3]) / 2 + dy),
+    )
+
+
+def raster_pivot(image: "Image.Image") -> Norm | None:
+    """Normalized alpha-weighted centroid of ``image`` (None when fully transparent)."""
+    alpha = image.convert("RGBA").getchannel("A")
+    width, height = alpha.size
+    if np is not None:
+        weights = np.asarray(alpha, dtype=np.float64)
+        total = weights.sum()
+        if total <= 0:
+            return None
+        cx = float((weights.sum(axis=0) * np.arange(width)).sum() / total)
+        cy = float((weights.sum(axis=1) * np.arange(height)).sum() / total)
+    else:
+        data = alpha.tobytes()
+        total = sum(data)
+        if total <= 0:
+            return None
+        cx = sum((index % width) * value for index, value in enumerate(data)) / total
+        cy = sum((index // width) * value for index, value in enumerate(data)) / total
+    return cx / max(1, width - 1), cy / max(1, height - 1)
+
+
+def _declared_pivot(
+    elem: ET.Element | None, params: dict, viewport: Viewport, spec_size_px: int
+) -> Norm | None:
+    """``data-wx-pivot-*`` (SVG user units), else the ROTATE params (spec pixels)."""
+    if elem is not None:
+        raw_x = parse_length(elem.attrib.get("data-wx-pivot-x"))
+        raw_y = parse_length(elem.attrib.get("data-wx-pivot-y"))
+        if raw_x is not None and raw_y is not None:
+            return viewport.normalized("x", raw_x), viewport.normalized("y", raw_y)
+    px_x, px_y = params.get("pivot_x"), params.get("pivot_y")
+    if px_x is None or px_y is None:
+        return None
+    span = max(1, spec_size_px - 1)
+    return float(px_x) / span, float(px_y) / span
+
+
+def _layer_elements(spec: Spec, elements: list[ET.Element]) -> list[ET.Element | None]:
+    """The SVG element of each spec layer: by position for auto layers, else ``data-wx-asset``."""
+    if len(elements) == len(spec.layers):
+        return list(elements)
+    by_asset: dict[str, ET.Element] = {}
+    for elem in elements:
+        asset = elem.attrib.get("data-wx-asset")
+        if asset:
+            by_asset.setdefault(asset, elem)
+    return [by_asset.get(layer.asset) for layer in spec.layers]
+
+
+def solve_pivots(
+    root: ET.Element,
+    spec: Spec,
+    *,
+    sizes: Iterable[int] = (),
+    bitmaps: Mapping[str, "Image.Image"] | None = None,
+    tolerance_px: int = DEFAULT_TOLERANCE_PX,
+    spec_size_px: int | None = None,
+) -> PivotReport:
+    """Pivot estimate for every layer with a ROTATE fx.
+
+    ``bitmaps`` (asset key -> raster) back the centroid fallback when the
+    geometry gives no answer. Divergence is checked at the largest of
+    ``sizes`` (default: the SVG size). ROTATE ``pivot_x/y`` are pixels of
+    a ``spec_size_px`` icon (default: the SVG size, as ``map_svg_to_spec``).
+    """
+    viewport = Viewport(root, None)
+    spec_size_px = spec_size_px or viewport.size_px
+    check_px = max(sizes, default=viewport.size_px)
+    parents = {child: parent for parent in root.iter() for child in list(parent)}
+    id_map = {elem.attrib["id"]: elem for elem in root.iter() if "id" in elem.attrib}
+    elements = _layer_elements(spec, drawable_elements(root, parents, id_map))
+    bitmaps = bitmaps or {}
+    report = PivotReport()
+    for layer, elem in zip(spec.layers, elements):
+        for key in layer.fx:
+            if fx_type(key) != "ROTATE":
+                continue
+            params = spec.fx.get(key)
+            params = params if isinstance(params, dict) else {}
+            detected = method = None
+            if elem is not None:
+                detected = geometry_pivot(elem, parents, id_map, viewport)
+                method = "geometry" if detected is not None else None
+            if detected is None and layer.asset in bitmaps:
+                detected = raster_pivot(bitmaps[layer.asset])
+                method = "raster" if detected is not None else None
+            estimate = PivotEstimate(
+                layer_id=layer.layer_id,
+                fx_key=key,
+                declared=_declared_pivot(elem, params, viewport, spec_size_px),
+                detected=detected,
+                method=method,
+            )
+            report.estimates.append(estimate)
+            divergence = estimate.divergence_px(check_px)
+            if divergence is not None and divergence > tolerance_px:
+                report.warnings.append(
+                    f"layer {layer.layer_id}: declared pivot {estimate.at(check_px)} and "
+                    f"{method} pivot {_px(detected, check_px)} differ by {divergence} px "
+                    f"at {check_px} px"
+                )
+    shared: dict[str, set[tuple[int, int]]] = {}
+    for estimate in report.estimates:
+        at = estimate.at(check_px)
+        if at is not None:
+            shared.setdefault(estimate.fx_key, set()).add(at)
+    for key, pivots in shared.items():
+        if len(pivots) > 1:
+            report.warnings.append(
+                f"fx {key}: layers sharing it rotate about different pivots {sorted(pivots)}"
+            )
+    return report
+
+
+def apply_pivots(spec: Spec, report: PivotReport, size_px: int) -> Spec:
+    """Copy of ``spec`` whose ROTATE entries carry the solved pivot in ``size_px`` pixels."""
+    fx = dict(spec.fx)
+    for key, estimate in report.for_fx().items():
+        at = estimate.at(size_px)
+        params = fx.get(key)
+        if at is None or not isinstance(params, dict):
+            continue
+        fx[key] = dict(params, pivot_x=at[0], pivot_y=at[1])
+    return replace(spec, fx=fx)
@@ -0,0 +1,217 @@
+"""Split an SVG into one static base and its animated overlays.
+
+Auto-layering makes the device blend every drawable element each frame.
+Elements that no looping SMIL animation moves (directly or through an
+animated ancestor) draw the same pixels forever, so they are composited
+once into a base raster per export size and only the animated subtrees
+stay overlays: the runtime blends one base plus a few overlays. The
+``z_order`` block follows ``Docs/overlays.json.md``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Sequence
+
+from pipeline.preview.source import SvgLayerSource
+from pipeline.spec.model import LayerSpec, Spec
+
+
+@dataclass(frozen=True, slots=True)
+class Overlay:
+    """One overlay raster: element ``z`` plus the elements drawn with it."""
+
+    z: int
+    indices: tuple[int, ...]
+    animated: bool = True
+
+    def to_dict(self) -> dict:
+        return {"z": self.z, "indices": list(self.indices), "animated": self.animated}
+
+
+@dataclass(frozen=True, slots=True)
+class ZOrder:
+    base_z_min: int | None
+    base_z_max: int | None
+    overlays_z_min: int | None
+    overlays_z_max: int | None
+    base_position: str
+    base_draw_order: str
+    overlays_z_offset: int
+
+    def to_dict(self) -> dict:
+        return {
+            "base_z_min": self.base_z_min,
+            "base_z_max": self.base_z_max,
+            "overlays_z_min": self.overlays_z_min,
+            "overlays_z_max": self.overlays_z_max,
+            "base_position": self.base_position,
+            "base_draw_order": self.base_draw_order,
+            "overlays_z_offset": self.overlays_z_offset,
+        }
+
+
+@dataclass(slots=True)
+class BaseSplit:
+    elements: int
+    base: tuple[int, ...]
+    overlays: list[Overlay] = field(default_factory=list)
+    z_order: ZOrder | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "elements": self.elements,
+            "base": list(self.base),
+            "overlays": [overlay.to_dict() for overlay in self.overlays],
+            "z_order": self.z_order.to_dict() if self.z_order else None,
+        }
+
+
+def z_order_for(base: Sequence[int], drawn: Sequence[int]) -> ZOrder:
+    """``z_order`` block for static z ``base`` and overlay z ``drawn``."""
+    base_min = min(base) if base else None
+    base_max = max(base) if base else None
+    over_min = min(drawn) if drawn else None
+    over_max = max(drawn) if drawn else None
+    if not drawn:
+        position, order = "all_static", "before"
+    elif not base:
+        position, order = "none", "before"
+    elif base_max < over_min:  # type: ignore[operator]
+        position, order = "below", "before"
+    elif base_min > over_max:  # type: ignore[operator]
+        position, order = "above", "after"
+    else:
+        position, order = "mixed", "mixed"
+    return ZOrder(
+        base_z_min=base_min,
+        base_z_max=base_max,
+        overlays_z_min=over_min,
+        overlays_z_max=over_max,
+        base_position=position,
+        base_draw_order=order,
+        overlays_z_offset=over_min if over_min is not None else 0,
+    )
+
+
+def split_base(
+    source: SvgLayerSource, *, animated: Iterable[int] = (), strict: bool = False
+) -> BaseSplit:
+    """Classify ``source``'s elements and group them into a base and overlays.
+
+    An element is animated when a looping SMIL animation targets it or one
+    of its ancestors, or when its index is in ``animated`` (layers the spec
+    animates through explicit FX). Each outermost animated element becomes
+    an overlay holding its whole subtree. Static elements drawn above an
+    overlay cannot live in a single base: ``strict`` rejects that
+    (``mixed``), otherwise each run of them becomes a static overlay and the
+    base keeps what lies below the first overlay.
+    """
+    count = len(source)
+    seeds = set(source.animations()) | {index for index in animated if 0 <= index < count}
+    covered: set[int] = set()
+    roots: list[Overlay] = []
+    for index in sorted(seeds):
+        if index in covered:
+            continue
+        subtree = (index,) + source.descendants(index)
+        covered.update(subtree)
+        roots.append(Overlay(z=index, indices=subtree))
+
+    # Groups paint nothing of their own: their children carry the pixels and
+    # keep the group's attributes when rendered (``layers_svg``).
+    static = tuple(
+        index
+        for index in range(count)
+        if index not in covered and not source.descendants(index)
+    )
+    z_order = z_order_for(static, [index for root in roots for index in root.indices])
+    if z_order.base_position != "mixed":
+        return BaseSplit(elements=count, base=static, overlays=roots, z_order=z_order)
+    if strict:
+        raise ValueError("static elements are drawn between overlays (base_position mixed)")
+
+    first = z_order.overlays_z_min
+    base = tuple(index for index in static if index < first)  # type: ignore[operator]
+    overlays: list[Overlay] = []
+    run: list[int] = []
+    by_z = {overlay.z: overlay for overlay in roots}
+    static_set = set(static)
+    for index in range(first, count):  # type: ignore[arg-type]
+        if index not in static_set:
+            if run:
+                overlays.append(Overlay(z=run[0], indices=tuple(run), animated=False))
+                run = []
+            if index in by_z:
+                overlays.append(by_z[index])
+            continue
+        run.append(index)
+    if run:
+        overlays.append(Overlay(z=run[0], indices=tuple(run), animated=False))
+    z_order = z_order_for(base, [index for item in overlays for index in item.indices])
+    return BaseSplit(elements=count, base=base, overlays=overlays, z_order=z_order)
+
+
+def _unique(base: str, used: set[str]) -> str:
+    candidate = base
+    while candidate in used:
+        candidate += "_"
+    used.add(candidate)
+    return candidate
+
+
+def split_spec(spec: Spec, split: BaseSplit) -> tuple[Spec, dict[str, tuple[int, ...]]]:
+    """``spec`` reduced to one base layer plus its overlay layers.
+
+    ``spec`` must have one layer per element (auto layers). Returns the new
+    spec and the raster plan: asset key -> element indices to render
+    together. An overlay keeps its root layer's id and asset and gathers the
+    FX of every layer it draws; static runs become ``<spec>_split_<n>``.
+    Overlays are rendered in place, so they drop any shared-asset offset, and
+    one whose asset another overlay already claimed gets ``<asset>_<n>``.
+    """
+    if len(spec.layers) != split.elements:
+        raise ValueError("spec layers do not match the SVG's auto layers")
+    used_ids = {layer.layer_id for layer in spec.layers}
+    used_assets = {layer.asset for layer in spec.layers}
+    plan: dict[str, tuple[int, ...]] = {}
+    overlay_layers: list[LayerSpec] = []
+    for number, overlay in enumerate(split.overlays):
+        root = spec.layers[overlay.z]
+        if overlay.animated or len(overlay.indices) == 1:
+            fx = list(dict.fromkeys(key for i in overlay.indices for key in spec.layers[i].fx))
+            layer = replace(root, fx=fx)
+        else:
+            layer_id = _unique(f"split_{number}", used_ids)
+            layer = LayerSpec(layer_id=layer_id, asset=f"{spec.name}_split_{number}", fx=[])
+        asset = layer.asset
+        if asset in plan:
+            asset = _unique(f"{asset}_{number}", used_assets)
+        used_assets.add(asset)
+        plan[asset] = overlay.indices
+        overlay_layers.append(replace(layer, asset=asset, offset=None))
+
+    layers = overlay_layers
+    if split.base:
+        base = LayerSpec(
+            layer_id=_unique("base", used_ids), asset=f"{spec.name}_base", fx=[]
+        )
+        plan[base.asset] = split.base
+        position = split.z_order.base_position if split.z_order else "below"
+        layers = layers + [base] if position == "above" else [base] + layers
+    used_fx = dict.fromkeys(key for layer in layers for key in layer.fx)
+    fx = {key: spec.fx[key] for key in used_fx if key in spec.fx}
+    return replace(spec, layers=layers, fx=fx), plan
+
+
+def render_split(
+    source: SvgLayerSource, plan: dict[str, tuple[int, ...]], size_px: int
+) -> dict[str, bytes]:
+    """PNG per planned asset at ``size_px``; a missing rasterizer raises."""
+    rasters: dict[str, bytes] = {}
+    for asset, indices in plan.items():
+        png = source.bake(size_px, indices)
+        if png is None:
+            raise RuntimeError("no SVG rasterizer available (cairosvg or rsvg-convert)")
+        rasters[asset] = png
+    return rasters
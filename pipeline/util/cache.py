@@ -0,0 +1,69 @@
+"""Thread-safe, size-bounded LRU cache."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def _unit_weight(_: object) -> int:
+    return 1
+
+
+class LruCache(Generic[K, V]):
+    """LRU cache bounded by the total ``weigh(value)`` of its entries.
+
+    With the default weight every entry counts as 1, so ``max_weight`` is an
+    entry count; pass e.g. ``len`` for byte payloads to bound memory instead.
+    """
+
+    def __init__(self, max_weight: int, weigh: Callable[[V], int] = _unit_weight) -> None:
+        if max_weight <= 0:
+            raise ValueError("max_weight must be > 0")
+        self._max_weight = max_weight
+        self._weigh = weigh
+        self._weight = 0
+        self._items: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key: K, value: V) -> None:
+        weight = self._weigh(value)
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._weight -= previous[1]
+            if weight > self._max_weight:
+                return
+            self._items[key] = (value, weight)
+            self._weight += weight
+            while self._weight > self._max_weight:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._weight -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._weight = 0
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,121 @@
+"""JSON-lines helpers: lazy reading, incremental writing, byte-offset index."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable, Iterator
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+
+def index_path_for(path: Path) -> Path:
+    """Return the sidecar index path for a JSONL file (``<name>.jsonl.idx``)."""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def iter_jsonl_lines(path: Path) -> Iterator[tuple[int, str]]:
+    """Yield ``(line_no, text)`` for each non-blank line, without decoding it."""
+    with path.open("r", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            if line.strip():
+                yield line_no, line
+
+
+def iter_jsonl(path: Path) -> Iterator[object]:
+    """Decode a JSONL file lazily, one record at a time."""
+    for line_no, line in iter_jsonl_lines(path):
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}:{line_no}: invalid JSON line") from exc
+
+
+class JsonlWriter:
+    """Append records to a JSONL file one line at a time.
+
+    When ``key`` is given, the byte offset and length of every record are
+    tracked under ``key(record)`` and written to the sidecar index on close.
+    """
+
+    def __init__(self, path: Path, *, key: Callable[[dict], str] | None = None) -> None:
+        self._path = path
+        self._key = key
+        self._handle = path.open("wb")
+        self._offset = 0
+        self._entries: dict[str, tuple[int, int]] = {}
+
+    def write(self, record: dict) -> int:
+        """Write one record and return its byte offset."""
+        raw = json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+        offset = self._offset
+        self._handle.write(raw)
+        self._offset += len(raw)
+        if self._key is not None:
+            name = self._key(record)
+            if name in self._entries:
+                raise ValueError(f"duplicate JSONL key: {name}")
+            self._entries[name] = (offset, len(raw))
+        return offset
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        self._handle.close()
+        if self._key is not None:
+            _write_index(self._path, self._entries)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _write_index(path: Path, entries: dict[str, tuple[int, int]]) -> None:
+    stat = path.stat()
+    data = {
+        "version": INDEX_VERSION,
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "entries": {name: [offset, length] for name, (offset, length) in entries.items()},
+    }
+    index_path_for(path).write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+def build_jsonl_index(path: Path, key: Callable[[dict], str]) -> dict[str, tuple[int, int]]:
+    """Scan a JSONL file once and write its sidecar offset index."""
+    entries: dict[str, tuple[int, int]] = {}
+    offset = 0
+    with path.open("rb") as handle:
+        for raw in handle:
+            if raw.strip():
+                entries[key(json.loads(raw))] = (offset, len(raw))
+            offset += len(raw)
+    _write_index(path, entries)
+    return entries
+
+
+def load_jsonl_index(path: Path) -> dict[str, tuple[int, int]] | None:
+    """Return the sidecar index, or None when missing or stale."""
+    index_path = index_path_for(path)
+    if not index_path.exists():
+        return None
+    data = json.loads(index_path.read_text(encoding="utf-8"))
+    stat = path.stat()
+    if (
+        data.get("version") != INDEX_VERSION
+        or data.get("bytes") != stat.st_size
+        or data.get("mtime_ns") != stat.st_mtime_ns
+    ):
+        return None
+    return {name: (int(entry[0]), int(entry[1])) for name, entry in data["entries"].items()}
+
+
+def read_jsonl_record(path: Path, offset: int, length: int) -> object:
+    """Decode the single record stored at ``offset`` without reading the rest."""
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        raw = handle.read(length)
+    return json.loads(raw)
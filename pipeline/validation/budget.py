@@ -0,0 +1,291 @@
+"""Per-frame device cost estimates for specs and screen budget checks.
+
+The model follows how LVGL redraws an animated icon: every FX instance
+invalidates the union of its old and new area each frame, every layer
+overlapping an invalidated area is blended again (all assets carry alpha),
+and layers animated by ``ROTATE``/``NEEDLE`` go through the software
+transform for their share of that area. Icons are square and their layers
+share the same origin, since wx.spec has no layer positions.
+
+The numbers are upper bounds meant to rank specs and catch regressions;
+calibrate ``DeviceProfile`` against a device trace before trusting the
+absolute microseconds.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from typing import Dict, Iterable, List, Mapping
+
+from pipeline.config import DEFAULT_SIZES_PX
+from pipeline.spec.model import Asset, Spec, fx_type
+
+ROTATING_FX = frozenset({"ROTATE", "NEEDLE"})
+MOVING_FX = frozenset({"FALL", "FLOW_X", "JITTER", "DRIFT"})
+FADING_FX = frozenset({"TWINKLE", "FLASH", "CROSSFADE"})
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceProfile:
+    """Per-pixel and per-animation costs of the target (defaults: ESP32-S3, 16-bit color)."""
+
+    color_depth: int = 16
+    blend_ns_per_px: float = 100.0
+    rotate_ns_per_px: float = 400.0
+    anim_us: float = 5.0
+
+    def __post_init__(self) -> None:
+        if self.color_depth not in (16, 32):
+            raise ValueError("color_depth must be 16 or 32")
+
+    def decoded_bytes_per_px(self, asset_type: str) -> int:
+        if asset_type in ("mask", "alpha"):
+            return 1
+        # RGB565 + A8 at 16-bit depth, ARGB8888 at 32-bit.
+        return 3 if self.color_depth == 16 else 4
+
+
+@dataclass(frozen=True, slots=True)
+class ScreenBudget:
+    """Limits for everything animated on one screen; ``None`` disables a limit."""
+
+    fps: float = 30.0
+    cpu_share: float = 0.5
+    max_dirty_px: int | None = None
+    max_blend_px: int | None = None
+    max_rotated_px: int | None = None
+    max_ram_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.fps <= 0:
+            raise ValueError("fps must be > 0")
+        if not 0 < self.cpu_share <= 1:
+            raise ValueError("cpu_share must be in (0, 1]")
+
+    @property
+    def frame_us(self) -> float:
+        """CPU time available for drawing per frame."""
+        return 1_000_000.0 / self.fps * self.cpu_share
+
+
+@dataclass(slots=True)
+class LayerCost:
+    layer_id: str
+    asset: str
+    size_px: int
+    instances: int
+    dirty_px: int
+    rotated: bool
+
+
+@dataclass(slots=True)
+class SpecCost:
+    name: str
+    layers: List[LayerCost] = field(default_factory=list)
+    dirty_px: int = 0
+    blend_px: int = 0
+    rotated_px: int = 0
+    anims: int = 0
+    ram_bytes: int = 0
+    frame_us: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "dirty_px": self.dirty_px,
+            "blend_px": self.blend_px,
+            "rotated_px": self.rotated_px,
+            "anims": self.anims,
+            "ram_bytes": self.ram_bytes,
+            "frame_us": round(self.frame_us, 1),
+            "layers": [
+                {
+                    "id": layer.layer_id,
+                    "asset": layer.asset,
+                    "size_px": layer.size_px,
+                    "instances": layer.instances,
+                    "dirty_px": layer.dirty_px,
+                    "rotated": layer.rotated,
+                }
+                for layer in self.layers
+            ],
+        }
+
+
+def _fx_params(value: object) -> Mapping[str, object]:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()  # type: ignore[no-any-return]
+    if isinstance(value, dict):
+        return value
+    return {}
+
+
+def _int_param(params: Mapping[str, object], name: str) -> int:
+    value = params.get(name)
+    return value if isinstance(value, int) else 0
+
+
+def _instances(params: Mapping[str, object]) -> int:
+    phases = params.get("phase_ms")
+    if isinstance(phases, (list, tuple)) and phases:
+        return len(phases)
+    return 1
+
+
+def _step_px(key: str, params: Mapping[str, object], frame_ms: float) -> tuple[float, float]:
+    """Largest per-frame displacement of one instance of a moving FX."""
+    period = _int_param(params, "period_ms")
+    if key == "JITTER":
+        # Random offsets: two successive frames can be 2 * amp apart.
+        return 2.0 * _int_param(params, "amp_x"), 2.0 * _int_param(params, "amp_y")
+    if key == "FALL":
+        dx, dy = _int_param(params, "fall_dx"), _int_param(params, "fall_dy")
+    elif key == "FLOW_X":
+        dx, dy = _int_param(params, "amp_x"), 0
+    else:  # DRIFT: sinusoid, peak speed is 2*pi*amp per period.
+        dx = 2 * math.pi * _int_param(params, "amp_x")
+        dy = 2 * math.pi * _int_param(params, "amp_y")
+    if period <= 0:
+        return float(dx), float(dy)
+    scale = min(1.0, frame_ms / period)
+    return dx * scale, dy * scale
+
+
+def _layer_dirty_px(
+    size_px: int, fx: Iterable[str], spec_fx: Mapping[str, object], frame_ms: float
+) -> tuple[int, bool]:
+    """Per-instance invalidated area of one layer and whether it rotates."""
+    area = size_px * size_px
+    dirty = 0
+    rotated = False
+    for key in fx:
+        params = _fx_params(spec_fx.get(key, {}))
+        kind = fx_type(key)
+        if kind in ROTATING_FX:
+            # Bounding box of the rotated square, worst case at 45 degrees.
+            dirty = max(dirty, 2 * area)
+            rotated = True
+        elif kind in MOVING_FX:
+            step_x, step_y = _step_px(kind, params, frame_ms)
+            union = (size_px + min(step_x, size_px)) * (size_px + min(step_y, size_px))
+            dirty = max(dirty, int(math.ceil(union)))
+        elif kind in FADING_FX:
+            dirty = max(dirty, area)
+    return dirty, rotated
+
+
+def _asset_sizes(assets: Iterable[Asset]) -> Dict[str, Asset]:
+    largest: Dict[str, Asset] = {}
+    for asset in assets:
+        current = largest.get(asset.asset_key)
+        if current is None or asset.size_px > current.size_px:
+            largest[asset.asset_key] = asset
+    return largest
+
+
+def estimate_spec_cost(
+    spec: Spec,
+    assets: Iterable[Asset] = (),
+    *,
+    size_px: int | None = None,
+    fps: float = 30.0,
+    profile: DeviceProfile | None = None,
+) -> SpecCost:
+    """Estimate one spec's per-frame cost.
+
+    Layer sizes come from ``size_px`` when given, else from the spec's own
+    assets or ``assets`` (largest size per key), else the first default size.
+    """
+    profile = profile or DeviceProfile()
+    by_key = _asset_sizes(list(spec.assets) + list(assets))
+    frame_ms = 1000.0 / fps
+    cost = SpecCost(name=spec.name)
+
+    dirty_rects: List[int] = []
+    layer_areas: List[tuple[int, bool]] = []
+    decoded: Dict[str, int] = {}
+    for layer in spec.layers:
+        asset = by_key.get(layer.asset)
+        layer_size = size_px or (asset.size_px if asset else DEFAULT_SIZES_PX[0])
+        asset_type = asset.type if asset else "image"
+        decoded[layer.asset] = layer_size * layer_size * profile.decoded_bytes_per_px(asset_type)
+
+        instances = 1
+        anims = 0
+        for key in layer.fx:
+            params = _fx_params(spec.fx.get(key, {}))
+            instances = max(instances, _instances(params))
+            anims += _instances(params)
+        dirty, rotated = _layer_dirty_px(layer_size, layer.fx, spec.fx, frame_ms)
+        if dirty and layer.dirty is not None:
+            # A precomputed rect is what the runtime invalidates every tick.
+            dirty = layer.dirty[2] * layer.dirty[3]
+        if dirty:
+            dirty_rects.extend([dirty] * instances)
+        cost.anims += anims
+        layer_areas.append((layer_size * layer_size * (2 if rotated else 1), rotated))
+        cost.layers.append(
+            LayerCost(
+                layer_id=layer.layer_id,
+                asset=layer.asset,
+                size_px=layer_size,
+                instances=instances,
+                dirty_px=dirty * instances,
+                rotated=rotated,
+            )
+        )
+
+    cost.dirty_px = sum(dirty_rects)
+    for rect in dirty_rects:
+        for area, rotated in layer_areas:
+            covered = min(rect, area)
+            cost.blend_px += covered
+            if rotated:
+                cost.rotated_px += covered
+    cost.ram_bytes = sum(decoded.values())
+    cost.frame_us = (
+        cost.blend_px * profile.blend_ns_per_px / 1000.0
+        + cost.rotated_px * profile.rotate_ns_per_px / 1000.0
+        + cost.anims * profile.anim_us
+    )
+    return cost
+
+
+def screen_totals(costs: Iterable[SpecCost]) -> SpecCost:
+    """Sum spec costs of icons shown together on one screen."""
+    total = SpecCost(name="screen")
+    for cost in costs:
+        total.dirty_px += cost.dirty_px
+        total.blend_px += cost.blend_px
+        total.rotated_px += cost.rotated_px
+        total.anims += cost.anims
+        total.ram_bytes += cost.ram_bytes
+        total.frame_us += cost.frame_us
+    return total
+
+
+def budget_errors(cost: SpecCost, budget: ScreenBudget) -> List[str]:
+    """Return every budget limit ``cost`` exceeds."""
+    errors: List[str] = []
+    if cost.frame_us > budget.frame_us:
+        errors.append(
+            f"{cost.name}: frame cost {cost.frame_us:.0f} us exceeds "
+            f"{budget.frame_us:.0f} us at {budget.fps:g} fps"
+        )
+    limits = (
+        ("dirty_px", cost.dirty_px, budget.max_dirty_px),
+        ("blend_px", cost.blend_px, budget.max_blend_px),
+        ("rotated_px", cost.rotated_px, budget.max_rotated_px),
+        ("ram_bytes", cost.ram_bytes, budget.max_ram_bytes),
+    )
+    for label, value, limit in limits:
+        if limit is not None and value > limit:
+            errors.append(f"{cost.name}: {label} {value} exceeds {limit}")
+    return errors
+
+
+def validate_budget(cost: SpecCost, budget: ScreenBudget) -> None:
+    errors = budget_errors(cost, budget)
+    if errors:
+        raise ValueError("; ".join(errors))
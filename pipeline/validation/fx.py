@@ -2,89 +2,107 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
-
-from pipeline.spec.model import FX_KEYS
-
-_ALLOWED_FIELDS = {
-    "period_ms",
-    "pivot_x",
-    "pivot_y",
-    "angle_from",
-    "angle_to",
-    "angle_now",
-    "smooth_ms",
-    "fall_dx",
-    "fall_dy",
-    "amp_x",
-    "amp_y",
-    "opa_min",
-    "opa_max",
-    "phase_ms",
-}
+from typing import Any, Callable, Dict, List
+
+from pipeline.fx.contracts import (
+    FIELD_CONTRACTS,
+    FX_INSTANCE_MAX,
+    FX_KEY_MAX_LEN,
+    PHASE_MS_MAX_ITEMS,
+    FieldContract,
+)
+from pipeline.spec.model import is_fx_key
+
+# check(fx_key, field, value, errors) appends one message per violation.
+FieldCheck = Callable[[str, str, Any, List[str]], None]
 
 
-def _fx_to_dict(value: Any) -> Dict[str, Any]:
+def _fx_to_dict(value: Any) -> Dict[str, Any] | None:
     if hasattr(value, "to_dict"):
         return value.to_dict()  # type: ignore[no-any-return]
     if isinstance(value, dict):
         return value
-    raise TypeError("invalid fx entry type")
+    return None
 
 
-def _expect_int(value: Any, name: str) -> int:
-    if not isinstance(value, int):
-        raise ValueError(f"fx field {name} must be int")
-    return value
+def _range_message(rule: FieldContract) -> str:
+    if rule.maximum is not None:
+        return f"must be {rule.minimum}..{rule.maximum}"
+    return f"must be >= {rule.minimum}"
 
 
-def _expect_float(value: Any, name: str) -> float:
-    if not isinstance(value, (int, float)):
-        raise ValueError(f"fx field {name} must be float")
-    return float(value)
+def _compile_int(rule: FieldContract) -> FieldCheck:
+    minimum = rule.minimum
+    maximum = rule.maximum
+    range_message = _range_message(rule)
 
+    def check(key: str, field: str, value: Any, errors: List[str]) -> None:
+        if not isinstance(value, int):
+            errors.append(f"fx field {key}.{field} must be int")
+        elif (minimum is not None and value < minimum) or (
+            maximum is not None and value > maximum
+        ):
+            errors.append(f"fx {key}.{field} {range_message}")
 
-def validate_fx(fx: Dict[str, Any]) -> None:
-    for key in fx:
-        if key not in FX_KEYS:
-            raise ValueError(f"unknown fx key: {key}")
+    return check
 
-        fx_dict = _fx_to_dict(fx[key])
-        for field, value in fx_dict.items():
-            if field not in _ALLOWED_FIELDS:
-                raise ValueError(f"fx {key} unknown field: {field}")
-            if field == "phase_ms":
-                if not isinstance(value, list):
-                    raise ValueError(f"fx {key}.phase_ms must be list")
-                if len(value) > 6:
-                    raise ValueError("fx phase_ms length must be <= 6")
-                for idx, item in enumerate(value):
-                    if not isinstance(item, int) or item < 0:
-                        raise ValueError(f"fx {key}.phase_ms[{idx}] must be int >= 0")
-                continue
 
-            if field in {"opa_min", "opa_max"}:
-                val = _expect_int(value, f"{key}.{field}")
-                if not (0 <= val <= 255):
-                    raise ValueError(f"fx {key}.{field} must be 0..255")
-                continue
+def _compile_int_list(rule: FieldContract) -> FieldCheck:
+    minimum = rule.minimum if rule.minimum is not None else 0
 
-            if field in {"angle_from", "angle_to", "angle_now"}:
-                val = _expect_int(value, f"{key}.{field}")
-                if not (0 <= val <= 3600):
-                    raise ValueError(f"fx {key}.{field} must be 0..3600")
-                continue
+    def check(key: str, field: str, value: Any, errors: List[str]) -> None:
+        if not isinstance(value, (list, tuple)):
+            errors.append(f"fx {key}.{field} must be list")
+            return
+        if len(value) > PHASE_MS_MAX_ITEMS:
+            errors.append(f"fx {field} length must be <= {PHASE_MS_MAX_ITEMS}")
+        for idx, item in enumerate(value):
+            if not isinstance(item, int) or item < minimum:
+                errors.append(f"fx {key}.{field}[{idx}] must be int >= {minimum}")
 
-            if field in {"period_ms", "pivot_x", "pivot_y", "smooth_ms"}:
-                val = _expect_int(value, f"{key}.{field}")
-                if val < 0:
-                    raise ValueError(f"fx {key}.{field} must be >= 0")
-                continue
+    return check
 
-            if field in {"fall_dx", "fall_dy", "amp_x", "amp_y"}:
-                val = _expect_int(value, f"{key}.{field}")
-                if val < 0:
-                    raise ValueError(f"fx {key}.{field} must be >= 0")
+
+_COMPILERS: Dict[str, Callable[[FieldContract], FieldCheck]] = {
+    "int": _compile_int,
+    "int_list": _compile_int_list,
+}
+
+# Compiled once at import: field name -> validator closure.
+_FIELD_CHECKS: Dict[str, FieldCheck] = {
+    name: _COMPILERS[rule.kind](rule) for name, rule in FIELD_CONTRACTS.items()
+}
+
+
+def fx_errors(fx: Dict[str, Any]) -> List[str]:
+    """Return every contract violation found in an fx mapping."""
+    errors: List[str] = []
+    checks = _FIELD_CHECKS
+    instances = 0
+    for key, entry in fx.items():
+        if not is_fx_key(key):
+            errors.append(f"unknown fx key: {key}")
+            continue
+        if len(key) > FX_KEY_MAX_LEN:
+            errors.append(f"fx key too long (max {FX_KEY_MAX_LEN}): {key}")
+        if "." in key:
+            instances += 1
+        fx_dict = _fx_to_dict(entry)
+        if fx_dict is None:
+            errors.append(f"fx {key} invalid entry type")
+            continue
+        for field, value in fx_dict.items():
+            check = checks.get(field)
+            if check is None:
+                errors.append(f"fx {key} unknown field: {field}")
                 continue
+            check(key, field, value, errors)
+    if instances > FX_INSTANCE_MAX:
+        errors.append(f"too many named fx instances: {instances} > {FX_INSTANCE_MAX}")
+    return errors
 
-            _expect_float(value, f"{key}.{field}")
+
+def validate_fx(fx: Dict[str, Any]) -> None:
+    errors = fx_errors(fx)
+    if errors:
+        raise ValueError("; ".join(errors))
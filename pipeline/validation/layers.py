@@ -2,19 +2,37 @@
 
 from __future__ import annotations
 
-from typing import Iterable, Set
+from typing import Iterable, List, Set
 
-from pipeline.spec.model import FX_KEYS, LayerSpec
+from pipeline.spec.model import LayerSpec, fx_type, is_fx_key
 
 
-def validate_layers(layers: Iterable[LayerSpec], fx_keys: Set[str]) -> None:
+def layer_errors(layers: Iterable[LayerSpec], fx_keys: Set[str]) -> List[str]:
+    """Return every layer violation (duplicate ids, unknown or unconfigured fx).
+
+    A layer may use one instance per fx type: the runtime keeps one slot each.
+    """
+    errors: List[str] = []
     ids_seen = set()
     for layer in layers:
         if layer.layer_id in ids_seen:
-            raise ValueError(f"duplicate layer id: {layer.layer_id}")
+            errors.append(f"duplicate layer id: {layer.layer_id}")
         ids_seen.add(layer.layer_id)
+        types_seen = set()
         for fx_key in layer.fx:
-            if fx_key not in FX_KEYS:
-                raise ValueError(f"layer fx unknown: {fx_key}")
+            if not is_fx_key(fx_key):
+                errors.append(f"layer fx unknown: {fx_key}")
+                continue
             if fx_key not in fx_keys:
-                raise ValueError(f"layer fx missing spec config: {fx_key}")
+                errors.append(f"layer fx missing spec config: {fx_key}")
+            kind = fx_type(fx_key)
+            if kind in types_seen:
+                errors.append(f"layer {layer.layer_id} uses several {kind} instances")
+            types_seen.add(kind)
+    return errors
+
+
+def validate_layers(layers: Iterable[LayerSpec], fx_keys: Set[str]) -> None:
+    errors = layer_errors(layers, fx_keys)
+    if errors:
+        raise ValueError("; ".join(errors))
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from pathlib import Path
 import zlib
 
+from pipeline.pack.timers import TIMER_TABLE_KEY, timer_table_bytes
 from pipeline.pack.toc import TOC_ENTRY_SIZE, TocEntry
 from pipeline.spec.model import Asset, Spec
 from pipeline.wxspec import dumps_spec, validate_spec
@@ -29,6 +30,11 @@ WXPK_C_PNG = 2
 WXPK_C_RAW_RGBA8888 = 3
 
 _ASSET_DEFAULT_CODEC = WXPK_C_LVGL_BIN
+_ASSET_SUFFIX_CODECS = {
+    ".png": WXPK_C_PNG,
+    ".rgba": WXPK_C_RAW_RGBA8888,
+    ".raw": WXPK_C_RAW_RGBA8888,
+}
 
 
 @dataclass
@@ -78,12 +84,28 @@ def _json_bytes(spec: Spec) -> bytes:
 
 
 def _asset_codec(asset: Asset) -> int:
-    return _ASSET_DEFAULT_CODEC
-
-
-def build_pack(specs: list[Spec], assets: list[Asset], payloads: dict[str, bytes]) -> bytes:
+    """Codec from the payload file suffix; LVGL ``.bin`` (or anything else) by default."""
+    return _ASSET_SUFFIX_CODECS.get(Path(asset.path).suffix.lower(), _ASSET_DEFAULT_CODEC)
+
+
+def build_pack(
+    specs: list[Spec],
+    assets: list[Asset],
+    payloads: dict[tuple[str, int], bytes],
+    *,
+    shared_timers: bool = False,
+) -> bytes:
+    """Build a WXPK v1 pack; ``shared_timers`` adds the timer table index entry.
+
+    ``payloads`` maps ``(asset_key, size_px)`` to the asset bytes: one key
+    usually ships at several sizes.
+    """
     if not specs:
         raise ValueError("specs list is empty")
+    slots = [(asset.asset_key, asset.size_px) for asset in assets]
+    if len(set(slots)) != len(slots):
+        duplicate = next(slot for slot in slots if slots.count(slot) > 1)
+        raise ValueError(f"asset {duplicate[0]!r} listed twice at {duplicate[1]} px")
 
     for spec in specs:
         validate_spec(spec)
@@ -92,14 +114,14 @@ def build_pack(specs: list[Spec], assets: list[Asset], payloads: dict[str, bytes
     blobs: list[bytes] = []
 
     toc_offset = HEADER_SIZE
-    toc_count = len(assets) + len(specs)
+    toc_count = len(assets) + len(specs) + (1 if shared_timers else 0)
     blobs_offset = _align_up(toc_offset + toc_count * TOC_ENTRY_SIZE, 4)
     current_offset = blobs_offset
 
     for asset in assets:
-        payload = payloads.get(asset.asset_key)
+        payload = payloads.get((asset.asset_key, asset.size_px))
         if payload is None:
-            raise KeyError(f"missing payload for asset {asset.asset_key!r}")
+            raise KeyError(f"missing payload for asset {asset.asset_key!r} at {asset.size_px} px")
         codec = _asset_codec(asset)
         crc32 = zlib.crc32(payload) & 0xFFFFFFFF
         toc_entries.append(
@@ -135,6 +157,23 @@ def build_pack(specs: list[Spec], assets: list[Asset], payloads: dict[str, bytes
         blobs.append(json_data)
         current_offset = _align_up(current_offset + len(json_data), 4)
 
+    if shared_timers:
+        table = timer_table_bytes(specs)
+        toc_entries.append(
+            TocEntry(
+                key_hash=TIMER_TABLE_KEY,
+                type_code=WXPK_T_JSON_INDEX,
+                codec=WXPK_C_NONE,
+                size_px=0,
+                offset=current_offset,
+                length=len(table),
+                crc32=zlib.crc32(table) & 0xFFFFFFFF,
+                meta=0,
+            )
+        )
+        blobs.append(table)
+        current_offset = _align_up(current_offset + len(table), 4)
+
     header = PackHeader(
         magic=MAGIC,
         version=VERSION,
@@ -163,12 +202,14 @@ def build_pack(specs: list[Spec], assets: list[Asset], payloads: dict[str, bytes
     return bytes(output)
 
 
-def build_pack_from_files(specs: list[Spec], assets: list[Asset], root: Path) -> bytes:
-    payloads: dict[str, bytes] = {}
+def build_pack_from_files(
+    specs: list[Spec], assets: list[Asset], root: Path, *, shared_timers: bool = False
+) -> bytes:
+    payloads: dict[tuple[str, int], bytes] = {}
     for asset in assets:
         payload_path = root / asset.path
-        payloads[asset.asset_key] = payload_path.read_bytes()
-    return build_pack(specs, assets, payloads)
+        payloads[(asset.asset_key, asset.size_px)] = payload_path.read_bytes()
+    return build_pack(specs, assets, payloads, shared_timers=shared_timers)
 
 
 def parse_header(data: bytes) -> PackHeader:
@@ -223,3 +264,13 @@ def extract_json_spec(data: bytes, spec_id: int) -> dict:
     json_raw = data[entry.offset : entry.offset + entry.length]
     json_text = json_raw.decode("utf-8")
     return json.loads(json_text)
+
+
+def extract_timer_table(data: bytes) -> dict | None:
+    """Return the shared-timer table of a pack, or None if it was built without one."""
+    header = parse_header(data)
+    entries = parse_toc(data, header)
+    entry = find_entry(entries, TIMER_TABLE_KEY, WXPK_T_JSON_INDEX, 0)
+    if entry is None:
+        return None
+    return json.loads(data[entry.offset : entry.offset + entry.length].decode("utf-8"))
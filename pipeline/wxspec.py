@@ -5,26 +5,43 @@ from __future__ import annotations
 import json
 from typing import Iterable
 
-from pipeline.spec.model import Components, FX_KEYS, LayerSpec, Metadata, Spec, spec_id_for_name
-from pipeline.validation.fx import validate_fx
-from pipeline.validation.layers import validate_layers
-
-
-def validate_spec(spec: Spec) -> None:
+from pipeline.spec.model import (
+    Components,
+    FxParams,
+    LayerSpec,
+    Metadata,
+    Spec,
+    is_fx_key,
+    spec_id_for_name,
+)
+from pipeline.validation.fx import fx_errors
+from pipeline.validation.layers import layer_errors
+
+
+def spec_errors(spec: Spec) -> list[str]:
+    """Return every violation found in ``spec`` instead of stopping at the first."""
+    errors: list[str] = []
     if spec.spec_id is None:
-        raise ValueError("spec_id is required")
-    if spec.spec_id != spec_id_for_name(spec.name):
-        raise ValueError("spec_id does not match name")
+        errors.append("spec_id is required")
+    elif spec.spec_id != spec_id_for_name(spec.name):
+        errors.append("spec_id does not match name")
     if not spec.layers:
-        raise ValueError("spec layers list is empty")
+        errors.append("spec layers list is empty")
     if spec.metadata.version != 1:
-        raise ValueError("metadata.version must be 1")
+        errors.append("metadata.version must be 1")
     if spec.metadata.confidence is not None:
         if not (0.0 <= spec.metadata.confidence <= 1.0):
-            raise ValueError("metadata.confidence must be 0..1")
+            errors.append("metadata.confidence must be 0..1")
 
-    validate_fx(spec.fx)
-    validate_layers(spec.layers, fx_keys=set(spec.fx.keys()))
+    errors.extend(fx_errors(spec.fx))
+    errors.extend(layer_errors(spec.layers, fx_keys=set(spec.fx.keys())))
+    return errors
+
+
+def validate_spec(spec: Spec) -> None:
+    errors = spec_errors(spec)
+    if errors:
+        raise ValueError("; ".join(errors))
 
 
 def spec_to_dict(spec: Spec) -> dict:
@@ -41,37 +58,64 @@ def dumps_spec_list(specs: Iterable[Spec], *, indent: int = 2) -> str:
     return json.dumps(data, indent=indent, sort_keys=False)
 
 
-def parse_spec_dict(data: dict) -> Spec:
-    required = {"spec_id", "name", "components", "layers", "fx", "metadata"}
-    if not required.issubset(set(data.keys())):
-        raise ValueError("missing required keys in spec")
+_REQUIRED_KEYS = ("spec_id", "name", "components", "layers", "fx", "metadata")
+_COMPONENT_KEYS = ("decor", "cover", "particles", "atmos", "event")
 
+
+def parse_spec_dict(data: dict, *, compact: bool = False) -> Spec:
+    """Build a validated Spec; ``compact`` stores fx entries as ``FxParams``.
+
+    Structural problems are collected and reported together in one ValueError.
+    """
+    missing = [key for key in _REQUIRED_KEYS if key not in data]
+    if missing:
+        raise ValueError(f"missing required keys in spec: {', '.join(missing)}")
+
+    errors: list[str] = []
+    component = None
     components = data["components"]
-    component = Components(
-        decor=components["decor"],
-        cover=components["cover"],
-        particles=components["particles"],
-        atmos=components["atmos"],
-        event=components["event"],
-    )
+    missing_components = [key for key in _COMPONENT_KEYS if key not in components]
+    if missing_components:
+        errors.append(f"missing components: {', '.join(missing_components)}")
+    else:
+        try:
+            component = Components(**{key: components[key] for key in _COMPONENT_KEYS})
+        except ValueError as exc:
+            errors.append(str(exc))
 
     layers = []
-    for layer_data in data["layers"]:
-        layers.append(
-            LayerSpec(
-                layer_id=layer_data["id"],
-                asset=layer_data["asset"],
-                fx=list(layer_data.get("fx", [])),
+    for index, layer_data in enumerate(data["layers"]):
+        try:
+            layers.append(
+                LayerSpec(
+                    layer_id=layer_data["id"],
+                    asset=layer_data["asset"],
+                    fx=list(layer_data.get("fx", [])),
+                    dirty=layer_data.get("dirty"),
+                    offset=layer_data.get("offset"),
+                )
             )
-        )
+        except KeyError as exc:
+            errors.append(f"layer[{index}] missing key: {exc.args[0]}")
+        except ValueError as exc:
+            errors.append(f"layer[{index}]: {exc}")
 
     fx = {}
-    fx_data = data["fx"]
-    for key, value in fx_data.items():
-        if key not in FX_KEYS:
-            raise ValueError(f"unknown fx key: {key}")
+    for key, value in data["fx"].items():
+        if not is_fx_key(key):
+            errors.append(f"unknown fx key: {key}")
+            continue
+        if compact:
+            try:
+                value = FxParams.from_dict(value)
+            except (TypeError, ValueError) as exc:
+                errors.append(f"fx {key}: {exc}")
+                continue
         fx[key] = value
 
+    if errors:
+        raise ValueError("; ".join(errors))
+
     metadata = data["metadata"]
     meta = Metadata(
         version=metadata.get("version", 0),
@@ -35,6 +35,15 @@ typedef struct {
 
 #define WX_FX_MASK(id) (1u << (id))
 
+/* Named fx instance ("ROTATE.rays"): extra parameter set of an fx type. */
+typedef struct {
+    uint32_t key_hash; /* fnv1a32 of the full fx key */
+    uint8_t fx_id;
+    wx_fx_spec_t params;
+} wx_fx_instance_t;
+
+#define WX_FX_INSTANCE_MAX 8u
+
 #ifdef __cplusplus
 }
 #endif
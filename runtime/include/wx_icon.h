@@ -56,6 +56,16 @@ typedef enum {
 typedef struct {
     char asset_key[32];
     uint8_t fx_mask;
+    /* Per fx type: 0 uses spec.fx[id], n > 0 uses spec.fx_instances[n - 1]. */
+    uint8_t fx_instance[WX_FX_COUNT];
+    /* Invalidation rect relative to the icon origin; dirty_w == 0 means whole icon. */
+    int16_t dirty_x;
+    int16_t dirty_y;
+    uint16_t dirty_w;
+    uint16_t dirty_h;
+    /* Draw offset of a shared asset, in px relative to its own raster. */
+    int16_t offset_x;
+    int16_t offset_y;
 } wx_layer_spec_t;
 
 #define WX_LAYER_MAX 8u
@@ -70,6 +80,8 @@ typedef struct {
     uint8_t layer_count;
     wx_layer_spec_t layers[WX_LAYER_MAX];
     wx_fx_spec_t fx[WX_FX_COUNT];
+    uint8_t fx_instance_count;
+    wx_fx_instance_t fx_instances[WX_FX_INSTANCE_MAX];
     uint32_t confidence_x1000;
 } wx_icon_spec_t;
 
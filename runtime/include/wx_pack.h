@@ -34,6 +34,9 @@ enum {
     WXPK_T_JSON_ALL = 4,
 };
 
+/* key_hash of the shared-timer table (WXPK_T_JSON_INDEX): fnv1a32("wx_timers"). */
+#define WXPK_TIMERS_KEY 0xF3C60CF5u
+
 int wx_pack_find_entry(
     const wx_pack_view_t* view,
     uint32_t key_hash,
@@ -131,6 +131,29 @@ static int json_fx_id(const char* value) {
     return -1;
 }
 
+static uint32_t json_fnv1a32(const char* value) {
+    uint32_t hash = 0x811C9DC5u;
+    while (*value) {
+        hash ^= (uint8_t)*value++;
+        hash *= 0x01000193u;
+    }
+    return hash;
+}
+
+/* fx type of an fx key: the part before an optional ".<name>" suffix. */
+static int json_fx_type_id(const char* key, const char** suffix) {
+    char type_buf[16];
+    const char* dot = strchr(key, '.');
+    size_t len = dot ? (size_t)(dot - key) : strlen(key);
+    if (len >= sizeof(type_buf)) {
+        return -1;
+    }
+    memcpy(type_buf, key, len);
+    type_buf[len] = '\0';
+    *suffix = dot;
+    return json_fx_id(type_buf);
+}
+
 static int json_parse_components(
     const char* json,
     const jsmntok_t* tokens,
@@ -320,16 +343,27 @@ static int json_parse_fx(
     int end = tokens[obj_index].end;
     while (i < token_count && tokens[i].start < end) {
         const jsmntok_t* key_tok = &tokens[i];
-        char key_buf[16];
+        char key_buf[32];
+        const char* suffix = NULL;
         int value_index = i + 1;
         if (json_copy_string(json, key_tok, key_buf, sizeof(key_buf)) != 0) {
             return -1;
         }
-        int fx_id = json_fx_id(key_buf);
+        int fx_id = json_fx_type_id(key_buf, &suffix);
         if (fx_id < 0 || fx_id >= WX_FX_COUNT) {
             return -1;
         }
-        if (json_parse_fx_entry(json, tokens, token_count, value_index, &out_spec->fx[fx_id]) != 0) {
+        wx_fx_spec_t* out_fx = &out_spec->fx[fx_id];
+        if (suffix) {
+            if (out_spec->fx_instance_count >= WX_FX_INSTANCE_MAX) {
+                return -1;
+            }
+            wx_fx_instance_t* instance = &out_spec->fx_instances[out_spec->fx_instance_count++];
+            instance->key_hash = json_fnv1a32(key_buf);
+            instance->fx_id = (uint8_t)fx_id;
+            out_fx = &instance->params;
+        }
+        if (json_parse_fx_entry(json, tokens, token_count, value_index, out_fx) != 0) {
             return -1;
         }
         i = json_token_skip(tokens, token_count, value_index);
@@ -337,6 +371,69 @@ static int json_parse_fx(
     return 0;
 }
 
+/* Slot of a layer fx reference: 0 for a bare type, else instance index + 1. */
+static int json_fx_slot(const wx_icon_spec_t* spec, const char* key, int fx_id) {
+    uint32_t key_hash = json_fnv1a32(key);
+    for (uint8_t i = 0; i < spec->fx_instance_count; i++) {
+        if (spec->fx_instances[i].key_hash == key_hash && spec->fx_instances[i].fx_id == fx_id) {
+            return i + 1;
+        }
+    }
+    return -1;
+}
+
+static int json_parse_dirty(
+    const char* json,
+    const jsmntok_t* tokens,
+    int token_count,
+    int array_index,
+    wx_layer_spec_t* out_layer
+) {
+    int values[4];
+    if (tokens[array_index].type != JSMN_ARRAY || tokens[array_index].size != 4) {
+        return -1;
+    }
+    int i = array_index + 1;
+    for (int idx = 0; idx < 4; idx++) {
+        if (i >= token_count || json_parse_int(json, &tokens[i], &values[idx]) != 0) {
+            return -1;
+        }
+        i = json_token_skip(tokens, token_count, i);
+    }
+    /* dirty_w == 0 is reserved for "whole icon": an explicit rect has area. */
+    if (values[2] <= 0 || values[3] <= 0) {
+        return -1;
+    }
+    out_layer->dirty_x = (int16_t)values[0];
+    out_layer->dirty_y = (int16_t)values[1];
+    out_layer->dirty_w = (uint16_t)values[2];
+    out_layer->dirty_h = (uint16_t)values[3];
+    return 0;
+}
+
+static int json_parse_offset(
+    const char* json,
+    const jsmntok_t* tokens,
+    int token_count,
+    int array_index,
+    wx_layer_spec_t* out_layer
+) {
+    int values[2];
+    if (tokens[array_index].type != JSMN_ARRAY || tokens[array_index].size != 2) {
+        return -1;
+    }
+    int i = array_index + 1;
+    for (int idx = 0; idx < 2; idx++) {
+        if (i >= token_count || json_parse_int(json, &tokens[i], &values[idx]) != 0) {
+            return -1;
+        }
+        i = json_token_skip(tokens, token_count, i);
+    }
+    out_layer->offset_x = (int16_t)values[0];
+    out_layer->offset_y = (int16_t)values[1];
+    return 0;
+}
+
 static int json_parse_layers(
     const char* json,
     const jsmntok_t* tokens,
@@ -368,6 +465,23 @@ static int json_parse_layers(
         }
 
         out_spec->layers[out_count].fx_mask = 0;
+        memset(out_spec->layers[out_count].fx_instance, 0, sizeof(out_spec->layers[out_count].fx_instance));
+        out_spec->layers[out_count].dirty_x = 0;
+        out_spec->layers[out_count].dirty_y = 0;
+        out_spec->layers[out_count].dirty_w = 0;
+        out_spec->layers[out_count].dirty_h = 0;
+        int dirty_index = json_find_key(json, tokens, token_count, i, "dirty");
+        if (dirty_index >= 0 &&
+            json_parse_dirty(json, tokens, token_count, dirty_index, &out_spec->layers[out_count]) != 0) {
+            return -1;
+        }
+        out_spec->layers[out_count].offset_x = 0;
+        out_spec->layers[out_count].offset_y = 0;
+        int offset_index = json_find_key(json, tokens, token_count, i, "offset");
+        if (offset_index >= 0 &&
+            json_parse_offset(json, tokens, token_count, offset_index, &out_spec->layers[out_count]) != 0) {
+            return -1;
+        }
         int fx_index = json_find_key(json, tokens, token_count, i, "fx");
         if (fx_index >= 0) {
             if (tokens[fx_index].type != JSMN_ARRAY) {
@@ -376,14 +490,22 @@ static int json_parse_layers(
             int fx_end = tokens[fx_index].end;
             int fx_tok = fx_index + 1;
             while (fx_tok < token_count && tokens[fx_tok].start < fx_end) {
-                char fx_buf[16];
+                char fx_buf[32];
+                const char* suffix = NULL;
                 if (json_copy_string(json, &tokens[fx_tok], fx_buf, sizeof(fx_buf)) != 0) {
                     return -1;
                 }
-                int fx_id = json_fx_id(fx_buf);
+                int fx_id = json_fx_type_id(fx_buf, &suffix);
                 if (fx_id < 0) {
                     return -1;
                 }
+                if (suffix) {
+                    int slot = json_fx_slot(out_spec, fx_buf, fx_id);
+                    if (slot < 0) {
+                        return -1;
+                    }
+                    out_spec->layers[out_count].fx_instance[fx_id] = (uint8_t)slot;
+                }
                 out_spec->layers[out_count].fx_mask |= (uint8_t)WX_FX_MASK(fx_id);
                 fx_tok = json_token_skip(tokens, token_count, fx_tok);
             }
@@ -426,6 +548,14 @@ int wx_json_parse_spec(const char* json, size_t length, wx_icon_spec_t* out_spec
         return -1;
     }
 
+    /* fx first: layer references to named instances resolve against them. */
+    int fx_index = json_find_key(json, tokens, count, 0, "fx");
+    if (fx_index >= 0 && tokens[fx_index].type == JSMN_OBJECT) {
+        if (json_parse_fx(json, tokens, count, fx_index, out_spec) != 0) {
+            return -1;
+        }
+    }
+
     int layers_index = json_find_key(json, tokens, count, 0, "layers");
     if (layers_index < 0) {
         return -1;
@@ -434,13 +564,6 @@ int wx_json_parse_spec(const char* json, size_t length, wx_icon_spec_t* out_spec
         return -1;
     }
 
-    int fx_index = json_find_key(json, tokens, count, 0, "fx");
-    if (fx_index >= 0 && tokens[fx_index].type == JSMN_OBJECT) {
-        if (json_parse_fx(json, tokens, count, fx_index, out_spec) != 0) {
-            return -1;
-        }
-    }
-
     int meta_index = json_find_key(json, tokens, count, 0, "metadata");
     if (meta_index >= 0 && tokens[meta_index].type == JSMN_OBJECT) {
         int ver_index = json_find_key(json, tokens, count, meta_index, "version");
@@ -0,0 +1,33 @@
+"""Spec builders shared by the test modules."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from pipeline.spec.model import Spec, spec_id_for_name
+from pipeline.wxspec import parse_spec_dict
+
+COMPONENT_SLOTS = ("decor", "cover", "particles", "atmos", "event")
+
+
+def spec_dict(name: str, layers: Sequence[dict | str] = (), fx: dict | None = None) -> dict:
+    """Spec JSON with every component ``NONE`` and metadata version 1.
+
+    A string layer is a static layer named after its asset.
+    """
+    return {
+        "spec_id": spec_id_for_name(name),
+        "name": name,
+        "components": {slot: "NONE" for slot in COMPONENT_SLOTS},
+        "layers": [
+            {"id": layer, "asset": layer, "fx": []} if isinstance(layer, str) else layer
+            for layer in layers
+        ],
+        "fx": dict(fx or {}),
+        "metadata": {"version": 1},
+    }
+
+
+def make_spec(name: str, layers: Sequence[dict | str] = (), fx: dict | None = None) -> Spec:
+    """Validated ``Spec`` of ``spec_dict(name, layers, fx)``."""
+    return parse_spec_dict(spec_dict(name, layers, fx))
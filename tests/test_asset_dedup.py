@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pipeline.assets.dedup import (
+    MAX_FANOUT,
+    _candidate_pairs,
+    find_duplicates,
+    raster_fingerprint,
+)
+from pipeline.cli import main
+from pipeline.preview.compose import has_numpy
+from pipeline.raster import has_pillow
+from tests.helpers import spec_dict
+
+
+def _cloud(shift: int = 0, speckle: bool = False, color: tuple = (255, 255, 255, 255), size: int = 64):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    scale = size / 64
+    ImageDraw.Draw(image).ellipse(
+        ((10 + shift) * scale, 20 * scale, (50 + shift) * scale, 45 * scale), fill=color
+    )
+    if speckle:
+        # A couple of anti-aliasing differences from another export.
+        image.putpixel((30, 20), (250, 250, 250, 120))
+        image.putpixel((12, 30), (255, 255, 255, 40))
+    return image
+
+
+def _dot(x: int, y: int, shade: int):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+    ImageDraw.Draw(image).ellipse((x, y, x + 3, y + 3), fill=(shade, shade, 255, 255))
+    return image
+
+
+@unittest.skipUnless(has_numpy() and has_pillow(), "NumPy and Pillow required")
+class AssetDedupTests(unittest.TestCase):
+    def test_near_duplicates_merge_onto_most_used_key(self) -> None:
+        prints = [
+            raster_fingerprint(_cloud(), "cloud_a", 64, 100),
+            raster_fingerprint(_cloud(speckle=True), "cloud_b", 64, 120),
+            raster_fingerprint(_cloud(), "cloud_c", 64, 100),
+            raster_fingerprint(_cloud(shift=12), "cloud_far", 64, 100),
+            raster_fingerprint(_cloud(color=(0, 0, 0, 255)), "cloud_dark", 64, 100),
+        ]
+        report = find_duplicates(prints, usage={"cloud_b": 3, "cloud_a": 1})
+        self.assertEqual(report.mapping, {"cloud_a": "cloud_b", "cloud_c": "cloud_b"})
+        self.assertEqual(report.saved_bytes, 200)
+        self.assertEqual(find_duplicates(prints, tolerance=0.0).mapping, {"cloud_c": "cloud_a"})
+
+    def test_keys_must_match_at_every_shared_size(self) -> None:
+        prints = [
+            raster_fingerprint(_cloud(), "sun", 64),
+            raster_fingerprint(_cloud(), "moon", 64),
+            raster_fingerprint(_cloud(size=96), "sun", 96),
+            raster_fingerprint(_cloud(shift=20, size=96), "moon", 96),
+        ]
+        self.assertEqual(find_duplicates(prints).merges, [])
+
+    def test_merge_target_covers_every_source_size(self) -> None:
+        prints = [
+            raster_fingerprint(_cloud(size=32), "cloud_a", 32, 50),
+            raster_fingerprint(_cloud(), "cloud_a", 64, 100),
+            raster_fingerprint(_cloud(), "cloud_b", 64, 120),
+            raster_fingerprint(_cloud(), "cloud_c", 64, 130),
+            raster_fingerprint(_cloud(size=96), "cloud_c", 96, 150),
+        ]
+        # cloud_a and cloud_c only share 64 px: neither can absorb the other.
+        report = find_duplicates(prints, usage={"cloud_b": 5})
+        self.assertEqual(report.mapping, {"cloud_b": "cloud_a"})
+        self.assertEqual(report.merges[0].sizes, (64,))
+        self.assertEqual(report.saved_bytes, 120)
+
+    def test_sparse_particles_stay_bounded(self) -> None:
+        # 2000 particle sprites: their dHashes are almost all zero bits.
+        dots = [
+            (x, y, shade) for shade in range(0, 250, 50) for y in range(60) for x in range(2, 58, 8)
+        ]
+        prints = [
+            raster_fingerprint(_dot(*dot), f"dot_{index}", 64)
+            for index, dot in enumerate(dots[:2000])
+        ]
+        pairs = _candidate_pairs(prints, 4)
+        self.assertLessEqual(len(pairs), len(prints) * MAX_FANOUT)
+        for first, second in pairs:
+            for a, b in zip(prints[first].bbox, prints[second].bbox):
+                self.assertLessEqual(abs(a - b), 1)
+        report = find_duplicates(prints)
+        self.assertEqual(report.rasters, 2000)
+
+    def test_cli_applies_merges_to_specs_and_manifest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _cloud().save(root / "cloud_64.png")
+            _cloud(speckle=True).save(root / "cloud_alt_64.png")
+            _cloud(shift=12).save(root / "haze_64.png")
+            entries = [
+                {"asset_key": key, "size_px": 64, "path": f"{key}_64.png"}
+                for key in ("cloud", "cloud_alt", "haze")
+            ]
+            manifest = root / "manifest.json"
+            manifest.write_text(json.dumps({"assets": entries}), encoding="utf-8")
+            specs = root / "specs"
+            specs.mkdir()
+            for name, assets in (("overcast", ["cloud", "haze"]), ("drizzle", ["cloud_alt"])):
+                (specs / f"{name}.json").write_text(json.dumps(spec_dict(name, assets)), encoding="utf-8")
+
+            argv = ["wx-pipeline", "dedup-assets", "--manifest", str(manifest)]
+            argv += ["--specs", str(specs), "--workers", "1", "--output", str(root / "out")]
+            argv += ["--manifest-output", str(root / "merged.json")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+
+            drizzle = json.loads((root / "out" / "drizzle.json").read_text())
+            self.assertEqual(drizzle["layers"][0]["asset"], "cloud")
+            kept = json.loads((root / "merged.json").read_text())["assets"]
+            self.assertEqual([entry["asset_key"] for entry in kept], ["cloud", "haze"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from pipeline.spec.model import Asset
+from pipeline.validation.budget import (
+    DeviceProfile,
+    ScreenBudget,
+    budget_errors,
+    estimate_spec_cost,
+    screen_totals,
+    validate_budget,
+)
+from tests.helpers import make_spec
+
+
+class BudgetTests(unittest.TestCase):
+    def test_rotation_and_static_layers(self) -> None:
+        spec = make_spec(
+            "sun",
+            [
+                {"id": "core", "asset": "sun_core", "fx": []},
+                {"id": "rays", "asset": "sun_rays", "fx": ["ROTATE"]},
+            ],
+            {"ROTATE": {"period_ms": 30000}},
+        )
+        cost = estimate_spec_cost(spec, size_px=10)
+        self.assertEqual(cost.dirty_px, 200)
+        # The rotated box is redrawn over both layers; only the rays rotate.
+        self.assertEqual(cost.blend_px, 100 + 200)
+        self.assertEqual(cost.rotated_px, 200)
+        self.assertEqual(cost.anims, 1)
+        self.assertEqual(cost.ram_bytes, 2 * 100 * 3)
+
+    def test_particles_and_manifest_sizes(self) -> None:
+        spec = make_spec(
+            "rain",
+            [{"id": "drops", "asset": "raindrop", "fx": ["FALL"]}],
+            {"FALL": {"period_ms": 1000, "fall_dy": 300, "phase_ms": [0, 200, 400]}},
+        )
+        assets = [
+            Asset(asset_key="raindrop", size_px=8, path="a.png", type="alpha"),
+            Asset(asset_key="raindrop", size_px=16, path="b.png", type="alpha"),
+        ]
+        cost = estimate_spec_cost(spec, assets, fps=10, profile=DeviceProfile(color_depth=32))
+        self.assertEqual(cost.layers[0].size_px, 16)
+        self.assertEqual(cost.layers[0].instances, 3)
+        # 300 px per second at 10 fps moves 30 px per frame, capped at the sprite size.
+        self.assertEqual(cost.dirty_px, 3 * 16 * 32)
+        self.assertEqual(cost.anims, 3)
+        self.assertEqual(cost.ram_bytes, 16 * 16)
+
+    def test_screen_budget(self) -> None:
+        spec = make_spec(
+            "star",
+            [{"id": "star", "asset": "star", "fx": ["TWINKLE"]}],
+            {"TWINKLE": {"period_ms": 3000}},
+        )
+        cost = estimate_spec_cost(spec, size_px=64)
+        total = screen_totals([cost, cost])
+        self.assertEqual(total.blend_px, 2 * 64 * 64)
+        self.assertEqual(budget_errors(total, ScreenBudget()), [])
+        errors = budget_errors(total, ScreenBudget(max_blend_px=4096, max_ram_bytes=1))
+        self.assertEqual(len(errors), 2)
+        with self.assertRaises(ValueError):
+            validate_budget(total, ScreenBudget(fps=1000, cpu_share=0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
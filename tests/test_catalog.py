@@ -0,0 +1,96 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pipeline.catalog import (
+    iter_manifest_assets,
+    iter_specs,
+    load_specs,
+    read_catalog_spec,
+    write_manifest_catalog,
+    write_spec_catalog,
+)
+from pipeline.hash import fnv1a32
+from pipeline.spec.model import Asset
+from pipeline.util.jsonl import index_path_for, load_jsonl_index
+from pipeline.wxspec import parse_spec_dict
+from tests.helpers import spec_dict
+
+
+def _spec_dict(name: str) -> dict:
+    layers = [{"id": "sun", "asset": "sun", "fx": ["ROTATE"]}]
+    return spec_dict(name, layers, {"ROTATE": {"period_ms": 10000}})
+
+
+class CatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_directory_collects_failures_per_file(self) -> None:
+        (self.root / "a.json").write_text(json.dumps(_spec_dict("clear_day")), encoding="utf-8")
+        (self.root / "b.json").write_text("{not json", encoding="utf-8")
+        bad = _spec_dict("rain")
+        bad["spec_id"] = 1
+        (self.root / "c.json").write_text(json.dumps(bad), encoding="utf-8")
+
+        specs, failures = load_specs(self.root, workers=1)
+
+        self.assertEqual([spec.name for spec in specs], ["clear_day"])
+        self.assertEqual(
+            sorted(Path(source).name for source in failures), ["b.json", "c.json"]
+        )
+        self.assertIn("spec_id does not match name", failures[str(self.root / "c.json")])
+
+    def test_jsonl_catalog_with_worker_pool(self) -> None:
+        names = [f"icon_{index}" for index in range(20)]
+        catalog = self.root / "catalog.jsonl"
+        lines = [json.dumps(_spec_dict(name)) for name in names]
+        lines.insert(5, "[]")
+        catalog.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        results = list(iter_specs(catalog, workers=2, batch_size=3))
+
+        self.assertEqual(len(results), 21)
+        self.assertEqual([r.spec.name for r in results if r.ok], names)
+        failed = [r for r in results if not r.ok]
+        self.assertEqual(failed[0].source, f"{catalog}:6")
+
+    def test_spec_catalog_round_trip_and_seek(self) -> None:
+        catalog = self.root / "catalog.jsonl"
+        specs = (parse_spec_dict(_spec_dict(f"icon_{index}")) for index in range(50))
+        self.assertEqual(write_spec_catalog(specs, catalog), 50)
+        self.assertTrue(index_path_for(catalog).exists())
+
+        spec = read_catalog_spec(catalog, "icon_37")
+        self.assertEqual(spec.spec_id, fnv1a32("icon_37"))
+        self.assertEqual(len(list(iter_specs(catalog, workers=1))), 50)
+        with self.assertRaises(KeyError):
+            read_catalog_spec(catalog, "missing")
+
+    def test_stale_index_is_rebuilt(self) -> None:
+        catalog = self.root / "catalog.jsonl"
+        write_spec_catalog([parse_spec_dict(_spec_dict("clear_day"))], catalog)
+        with catalog.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(_spec_dict("rain")) + "\n")
+        self.assertIsNone(load_jsonl_index(catalog))
+        self.assertEqual(read_catalog_spec(catalog, "rain").name, "rain")
+
+    def test_manifest_jsonl_round_trip(self) -> None:
+        manifest = self.root / "manifest.jsonl"
+        assets = [
+            Asset(asset_key="sun", size_px=64, path="base/64/sun.bin"),
+            Asset(asset_key="sun", size_px=96, path="base/96/sun.bin"),
+        ]
+        write_manifest_catalog(assets, manifest)
+        loaded = list(iter_manifest_assets(manifest))
+        self.assertEqual([a.to_dict() for a in loaded], [a.to_dict() for a in assets])
+        self.assertIn("sun:96", load_jsonl_index(manifest))
+
+
+if __name__ == "__main__":
+    unittest.main()
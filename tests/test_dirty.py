@@ -0,0 +1,116 @@
+import unittest
+
+from pipeline.fx.dirty import annotate_dirty_rects, layer_dirty_rect
+from pipeline.raster import has_pillow
+from pipeline.spec.model import LayerSpec, spec_id_for_name
+from pipeline.wxspec import parse_spec_dict
+
+
+class DirtyRectModelTests(unittest.TestCase):
+    def test_layer_dirty_round_trip_and_validation(self) -> None:
+        layer = LayerSpec(layer_id="drop", asset="drop", fx=["FALL"], dirty=[1, 2, 3, 4])
+        self.assertEqual(layer.dirty, (1, 2, 3, 4))
+        self.assertEqual(layer.to_dict()["dirty"], [1, 2, 3, 4])
+        self.assertNotIn("dirty", LayerSpec(layer_id="a", asset="a").to_dict())
+        with self.assertRaises(ValueError):
+            LayerSpec(layer_id="a", asset="a", dirty=[0, 0, -1, 4])
+        with self.assertRaises(ValueError):
+            LayerSpec(layer_id="a", asset="a", dirty=[0, 0, 0, 0])
+        with self.assertRaises(ValueError):
+            LayerSpec(layer_id="a", asset="a", dirty=5)
+
+
+@unittest.skipUnless(has_pillow(), "Pillow not installed")
+class DirtyRectTests(unittest.TestCase):
+    def _image(self, box: tuple[int, int, int, int], size: int = 64) -> "object":
+        from PIL import Image
+
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        image.paste((255, 255, 255, 255), box)
+        return image
+
+    def test_static_and_fading_layers(self) -> None:
+        image = self._image((10, 20, 30, 25))
+        self.assertIsNone(layer_dirty_rect(image, [], {}))
+        self.assertEqual(layer_dirty_rect(image, ["TWINKLE"], {}), (10, 20, 20, 5))
+
+    def test_empty_layers_get_no_rect(self) -> None:
+        # A zero-area rect would read as the whole icon on the device.
+        empty = self._image((0, 0, 0, 0))
+        self.assertIsNone(layer_dirty_rect(empty, ["TWINKLE"], {}))
+        drop = self._image((10, 30, 12, 34))
+        self.assertIsNone(layer_dirty_rect(drop, ["TWINKLE"], {}, offset=(100, 0)))
+
+    def test_fall_and_jitter_travel_is_clipped(self) -> None:
+        image = self._image((28, 0, 36, 8))
+        rect = layer_dirty_rect(image, ["FALL"], {"FALL": {"period_ms": 700, "fall_dy": 100}})
+        self.assertEqual(rect, (28, 0, 8, 64))
+        rect = layer_dirty_rect(image, ["JITTER"], {"JITTER": {"amp_x": 2, "amp_y": 1}})
+        self.assertEqual(rect, (26, 0, 12, 9))
+
+    def test_rotation_sweeps_disc_around_pivot(self) -> None:
+        image = self._image((30, 30, 34, 34))
+        rect = layer_dirty_rect(
+            image, ["ROTATE"], {"ROTATE": {"period_ms": 1000, "pivot_x": 32, "pivot_y": 32}}
+        )
+        # Corners are 2*sqrt(2) from the pivot.
+        self.assertEqual(rect, (29, 29, 6, 6))
+        # A quarter-turn needle stays in the lower-right quadrant.
+        needle = self._image((32, 31, 60, 33))
+        rect = layer_dirty_rect(
+            needle,
+            ["NEEDLE"],
+            {"NEEDLE": {"pivot_x": 32, "pivot_y": 32, "angle_from": 0, "angle_to": 900}},
+        )
+        x, y, w, h = rect
+        self.assertLessEqual(x, 30)
+        self.assertGreaterEqual(x + w, 60)
+        self.assertGreaterEqual(y + h, 60)
+        self.assertGreaterEqual(y, 29)
+
+    def test_partial_rotation_wraps_through_zero(self) -> None:
+        needle = self._image((31, 4, 33, 32))
+        rect = layer_dirty_rect(
+            needle,
+            ["NEEDLE"],
+            {"NEEDLE": {"pivot_x": 32, "pivot_y": 32, "angle_from": 3550, "angle_to": 150}},
+        )
+        # The 20 degree swing stays around 12 o'clock, not the long way round.
+        x, y, w, h = rect
+        self.assertLessEqual(y, 4)
+        self.assertLess(y + h, 35)
+        self.assertLess(w, 16)
+
+    def test_annotate_spec(self) -> None:
+        spec = parse_spec_dict(
+            {
+                "spec_id": spec_id_for_name("rain"),
+                "name": "rain",
+                "components": {
+                    "decor": "NONE",
+                    "cover": "NONE",
+                    "particles": "NONE",
+                    "atmos": "NONE",
+                    "event": "NONE",
+                },
+                "layers": [
+                    {"id": "cloud", "asset": "cloud", "fx": []},
+                    {"id": "drop", "asset": "drop", "fx": ["FALL"]},
+                ],
+                "fx": {"FALL": {"period_ms": 700, "fall_dy": 15}},
+                "metadata": {"version": 1},
+            }
+        )
+        bitmaps = {"cloud": self._image((0, 0, 64, 30)), "drop": self._image((10, 30, 12, 34))}
+        self.assertEqual(annotate_dirty_rects(spec, bitmaps), 1)
+        self.assertIsNone(spec.layers[0].dirty)
+        self.assertEqual(spec.layers[1].dirty, (10, 30, 2, 19))
+        self.assertEqual(parse_spec_dict(spec.to_dict()).layers[1].dirty, (10, 30, 2, 19))
+
+        bitmaps["drop"] = self._image((0, 0, 0, 0))
+        self.assertEqual(annotate_dirty_rects(spec, bitmaps), 0)
+        self.assertNotIn("dirty", spec.to_dict()["layers"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
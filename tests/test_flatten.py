@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+from pipeline.cli import main
+from pipeline.preview.source import SvgLayerSource
+from pipeline.raster import has_pillow
+from pipeline.spec.flatten import bake_images, flatten_static_layers
+from pipeline.spec.model import Spec
+from tests.helpers import make_spec
+
+
+def _spec(layers: list[tuple[str, list[str]]]) -> Spec:
+    fx = {"ROTATE": {"period_ms": 1000}, "FALL": {"period_ms": 700, "fall_dy": 10}}
+    return make_spec("storm", [{"id": key, "asset": key, "fx": names} for key, names in layers], fx)
+
+
+class FlattenTests(unittest.TestCase):
+    def test_static_runs_become_baked_layers(self) -> None:
+        spec = _spec(
+            [
+                ("sky", []),
+                ("hill", []),
+                ("sun", ["ROTATE"]),
+                ("cloud", []),
+                ("drop", ["FALL"]),
+                ("fog", []),
+                ("haze", []),
+                ("mist", []),
+            ]
+        )
+        result = flatten_static_layers(spec)
+        self.assertEqual(
+            [(layer.layer_id, layer.fx) for layer in result.spec.layers],
+            [
+                ("flat_0", []),
+                ("sun", ["ROTATE"]),
+                ("cloud", []),
+                ("drop", ["FALL"]),
+                ("flat_1", []),
+            ],
+        )
+        self.assertEqual(result.baked[0].asset, "storm_flat_0")
+        self.assertEqual(result.baked[1].sources, (5, 6, 7))
+        self.assertEqual(result.baked[1].source_assets, ("fog", "haze", "mist"))
+        self.assertEqual((result.layers_saved, result.assets_saved), (3, 3))
+        self.assertEqual(spec.layers[0].layer_id, "sky")
+
+        unchanged = flatten_static_layers(_spec([("sun", ["ROTATE"]), ("cloud", [])]))
+        self.assertEqual(unchanged.baked, [])
+        with self.assertRaises(ValueError):
+            flatten_static_layers(spec, min_run=1)
+
+    @unittest.skipUnless(has_pillow(), "Pillow not installed")
+    def test_bake_images_composites_in_z_order(self) -> None:
+        from PIL import Image
+
+        result = flatten_static_layers(_spec([("sky", []), ("hill", []), ("sun", ["ROTATE"])]))
+        sky = Image.new("RGBA", (4, 4), (0, 0, 255, 255))
+        hill = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+        hill.paste((0, 255, 0, 255), (0, 2, 4, 4))
+        images = bake_images(result.baked, {"sky": sky, "hill": hill})
+        baked = images["storm_flat_0"]
+        self.assertEqual(baked.getpixel((0, 0)), (0, 0, 255, 255))
+        self.assertEqual(baked.getpixel((0, 3)), (0, 255, 0, 255))
+        self.assertEqual(bake_images(result.baked, {"sky": sky}), {})
+
+    @unittest.skipUnless(has_pillow(), "Pillow not installed")
+    def test_bake_images_draws_sources_at_their_offsets(self) -> None:
+        from PIL import Image
+
+        spec = make_spec(
+            "storm",
+            [
+                {"id": "left", "asset": "drop"},
+                {"id": "right", "asset": "drop", "offset": [3, 1]},
+                {"id": "edge", "asset": "drop", "offset": [-1, 0]},
+            ],
+        )
+        result = flatten_static_layers(spec)
+        self.assertEqual(result.baked[0].source_offsets, ((0, 0), (3, 1), (-1, 0)))
+        self.assertEqual(result.baked[0].to_dict()["source_offsets"], [[0, 0], [3, 1], [-1, 0]])
+        drop = Image.new("RGBA", (2, 2), (0, 0, 255, 255))
+        baked = bake_images(result.baked, {"drop": drop})["storm_flat_0"]
+        self.assertEqual(baked.size, (5, 3))
+        self.assertEqual(baked.getpixel((4, 2)), (0, 0, 255, 255))
+        self.assertEqual(baked.getpixel((2, 0)), (0, 0, 0, 0))
+        self.assertEqual(baked.getpixel((0, 1)), (0, 0, 255, 255))
+
+    def test_layers_svg_keeps_only_selected_elements(self) -> None:
+        root = ET.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="8" height="8">'
+            # Drawable order: a, g, b, c, d.
+            '<rect id="a" width="2" height="2"/><g><circle id="b" r="1"/>'
+            '<circle id="c" r="2"/></g><rect id="d" width="4" height="4"/></svg>'
+        )
+        svg = SvgLayerSource(root).layers_svg((0, 3))
+        kept = [elem.attrib.get("id") for elem in ET.fromstring(svg).iter() if "id" in elem.attrib]
+        self.assertEqual(kept, ["a", "c"])
+
+    def test_cli_map_flatten(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="hills" xmlns="http://www.w3.org/2000/svg">
+  <rect id="sky" width="64" height="64" fill="#00f"/>
+  <rect id="hill" y="40" width="64" height="24" fill="#0f0"/>
+  <circle id="sun" cx="32" cy="20" r="8" fill="#ff0">
+    <animateTransform attributeName="transform" type="rotate" values="0 32 20; 360 32 20" dur="4s" repeatCount="indefinite"/>
+  </circle>
+</svg>
+"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "hills.svg").write_text(svg, encoding="utf-8")
+            argv = ["wx-pipeline", "map", "--svg", str(root / "hills.svg")]
+            argv += ["--output", str(root / "hills.json"), "--flatten"]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+            spec = json.loads((root / "hills.json").read_text())
+        self.assertEqual([layer["asset"] for layer in spec["layers"]], ["hills_flat_0", "sun"])
+
+
+if __name__ == "__main__":
+    unittest.main()
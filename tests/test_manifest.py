@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from pipeline.assets.manifest import (
+    build_is_current,
+    load_manifest_entries,
+    scan_asset_tree,
+    write_build_stamp,
+    write_manifest,
+)
+
+
+class ManifestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for rel, payload in (
+            ("base/64/sun_core_64.png", b"png64"),
+            ("base/96/sun_core.bin", b"bin96"),
+            ("dark/64/moon.bin", b"moon"),
+            ("dark/notes/readme.bin", b"skip"),
+        ):
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(payload)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_scan_layout(self) -> None:
+        entries = scan_asset_tree(self.root)
+        self.assertEqual(
+            [(e.theme, e.size_px, e.asset_key) for e in entries],
+            [("base", 64, "sun_core"), ("base", 96, "sun_core"), ("dark", 64, "moon")],
+        )
+        only_dark = scan_asset_tree(self.root, theme="dark")
+        self.assertEqual([e.path for e in only_dark], ["dark/64/moon.bin"])
+
+    def test_manifest_round_trip_reuses_crc(self) -> None:
+        manifest = self.root / "manifest.jsonl"
+        entries = scan_asset_tree(self.root)
+        write_manifest(entries, manifest)
+        loaded = load_manifest_entries(manifest)
+        self.assertEqual([e.to_dict() for e in loaded], [e.to_dict() for e in entries])
+
+        loaded[0].crc32 = 1234
+        rescanned = scan_asset_tree(self.root, previous=loaded)
+        self.assertEqual(rescanned[0].crc32, 1234)
+
+    def test_build_stamp_detects_changes(self) -> None:
+        output = self.root / "out.wxpk"
+        output.write_bytes(b"pack")
+        inputs = [self.root / "base/64/sun_core_64.png", self.root / "dark/64/moon.bin"]
+        self.assertFalse(build_is_current(output, inputs))
+
+        write_build_stamp(output, inputs)
+        self.assertTrue(build_is_current(output, inputs))
+
+        stat = inputs[0].stat()
+        os.utime(inputs[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+        self.assertTrue(build_is_current(output, inputs))
+
+        inputs[1].write_bytes(b"MOON")
+        self.assertFalse(build_is_current(output, inputs))
+        self.assertFalse(build_is_current(output, inputs[:1]))
+
+        inputs[1].write_bytes(b"SUN")
+        write_build_stamp(output, inputs, {"size_px": 64})
+        self.assertTrue(build_is_current(output, inputs, {"size_px": 64}))
+        self.assertFalse(build_is_current(output, inputs, {"size_px": 96}))
+        self.assertFalse(build_is_current(output, inputs))
+
+
+if __name__ == "__main__":
+    unittest.main()
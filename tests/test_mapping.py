@@ -1,9 +1,19 @@
+import json
+import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
+from pipeline.cli import main
+from pipeline.fx.timeline import compile_plan
 from pipeline.hash import fnv1a32
-from pipeline.mapping import map_svg_to_spec
+from pipeline.mapping import map_svg_to_sizes, map_svg_to_spec, shared_asset_count
+from pipeline.mapping_raster import asset_elements, rasterize_sizes
+from pipeline.preview.source import spec_layers
+from pipeline.svg.parse import parse_svg
+from pipeline.wxspec import parse_spec_dict
 
 
 class MappingTests(unittest.TestCase):
@@ -104,6 +114,94 @@ class MappingTests(unittest.TestCase):
         self.assertEqual(spec.fx["ROTATE"]["period_ms"], 10000)
         self.assertIn("ROTATE", spec.layers[0].fx)
 
+    def test_smil_walker_groups_targets_with_phases(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="rain" xmlns="http://www.w3.org/2000/svg">
+  <g data-wx-asset="sun" data-wx-z="0">
+    <animateTransform attributeName="transform" type="rotate" values="0 32 32; 180 32 32; 720 32 32" keyTimes="0; 0.2; 1" dur="8s" repeatCount="indefinite"/>
+    <animateTransform attributeName="gradientTransform" type="rotate" values="0; 90" dur="1s" repeatCount="indefinite"/>
+  </g>
+  <g data-wx-asset="drop_a" data-wx-z="1">
+    <animateTransform attributeName="transform" type="translate" values="0 -5; 0 2; 0 10" dur="0.7s" repeatCount="indefinite"/>
+    <animate attributeName="opacity" values="0;1;1;0" dur="0.7s" repeatCount="indefinite"/>
+  </g>
+  <g data-wx-asset="drop_b" data-wx-z="2">
+    <animateTransform attributeName="transform" type="translate" begin="-0.4s" values="0 -5; 0 10" dur="0.7s" repeatCount="indefinite"/>
+    <animate attributeName="opacity" begin="-0.4s" values="0;1;1;0" dur="0.7s" repeatCount="indefinite"/>
+  </g>
+  <g data-wx-asset="bolt" data-wx-z="3">
+    <animate attributeName="opacity" values="1;0;1" keyTimes="0;0.05;0.1" dur="2s" repeatCount="indefinite"/>
+    <animateTransform attributeName="transform" type="translate" values="0 0; 0 30" dur="1s"/>
+  </g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            svg_doc = parse_svg(path)
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        self.assertEqual(len(svg_doc.animations), 6)
+        # Two full turns per 8 s cycle.
+        self.assertEqual(spec.fx["ROTATE"], {"period_ms": 4000, "pivot_x": 32, "pivot_y": 32})
+        self.assertEqual(
+            spec.fx["FALL"],
+            {"period_ms": 700, "fall_dy": 15, "opa_min": 0, "opa_max": 255, "phase_ms": [0, 300]},
+        )
+        self.assertEqual(spec.fx["FLASH"]["opa_min"], 0)
+        self.assertEqual([layer.fx for layer in spec.layers], [["ROTATE"], ["FALL"], ["FALL"], ["FLASH"]])
+
+    def test_conflicting_animations_become_fx_instances(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="gears" xmlns="http://www.w3.org/2000/svg">
+  <g data-wx-asset="big" data-wx-z="0">
+    <animateTransform attributeName="transform" type="rotate" values="0 32 32; 360 32 32" dur="8s" repeatCount="indefinite"/>
+  </g>
+  <g data-wx-asset="small" data-wx-z="1">
+    <animateTransform attributeName="transform" type="rotate" values="360 48 16; 0 48 16" dur="2s" repeatCount="indefinite"/>
+  </g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        self.assertEqual([layer.fx for layer in spec.layers], [["ROTATE"], ["ROTATE.z1"]])
+        self.assertEqual(spec.fx["ROTATE.z1"], {"period_ms": 2000, "pivot_x": 48, "pivot_y": 16})
+
+    def test_partial_rotation_wraps_through_zero(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="gauge" xmlns="http://www.w3.org/2000/svg">
+  <g data-wx-asset="needle" data-wx-z="0">
+    <rect x="31" y="4" width="2" height="28"/>
+    <animateTransform attributeName="transform" type="rotate" values="-5 32 32; 15 32 32; -5 32 32" dur="3s" repeatCount="indefinite"/>
+  </g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        params = spec.fx["ROTATE"]
+        # -5..15 degrees: an increasing sweep from 355 that wraps through 0.
+        self.assertEqual((params["angle_from"], params["angle_to"]), (3550, 150))
+
+    def test_fx_targets_resolve_through_z_index(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="stack" data-wx-fx-FLASH='{"period_ms": 900, "target_z": [5, 2]}' data-wx-fx-TWINKLE='{"period_ms": 400, "target_z": 7}' xmlns="http://www.w3.org/2000/svg">
+  <g data-wx-asset="top" data-wx-z="7"></g>
+  <g data-wx-asset="mid" data-wx-z="5"></g>
+  <g data-wx-asset="mid_copy" data-wx-z="5"></g>
+  <g data-wx-asset="base" data-wx-z="2"></g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        self.assertEqual([layer.layer_id for layer in spec.layers], ["base", "mid", "mid_copy", "top"])
+        self.assertEqual([layer.fx for layer in spec.layers], [["FLASH"], ["FLASH"], [], ["TWINKLE"]])
+        self.assertEqual(list(spec.fx), ["FLASH", "TWINKLE"])
+
     def test_gradient_clone_reuse(self) -> None:
         svg = """<svg width="64" height="64" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
   <defs>
@@ -128,6 +226,178 @@ class MappingTests(unittest.TestCase):
         self.assertEqual(spec.layers[1].asset, spec.layers[0].asset)
         self.assertEqual(spec.layers[2].asset, spec.layers[0].asset)
 
+    def test_shape_signatures_share_assets(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="rain" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+  <defs><path id="drop" d="M0 0 l2 4 h-4 z" fill="#00f"/></defs>
+  <path id="d1" d="M10 10 l2 4 h-4 z" fill="#00f"/>
+  <path id="d2" d="M20 12 L22 16 L18 16 Z" fill="#00f"/>
+  <use id="d3" xlink:href="#drop" x="40" y="40"/>
+  <path id="red" d="M10 10 l2 4 h-4 z" fill="#f00"/>
+  <circle id="c1" cx="5" cy="5" r="2" style="fill:#fff"/>
+  <circle id="c2" cx="50" cy="5" r="2" fill="#fff"/>
+  <circle id="c3" cx="50" cy="5" r="3" fill="#fff"/>
+  <ellipse id="e1" cx="5" cy="5" rx="2" ry="1"/>
+  <ellipse id="e2" cx="9" cy="9" rx="2" ry="1"/>
+  <polygon id="p1" points="1,1 3,1 2,3"/>
+  <polygon id="p2" points="11 11 13 11 12 13"/>
+  <polyline id="l1" points="1,1 3,1 2,3"/>
+  <rect id="r1" x="1" y="1" width="3" height="2" transform="rotate(45)"/>
+  <rect id="r2" x="9" y="1" width="3" height="2"/>
+  <rect id="r3" x="9" y="9" width="3" height="2" opacity="0.5"/>
+  <g transform="translate(20,0)"><rect id="r4" x="9" y="1" width="3" height="2"/></g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            svg_doc = parse_svg(path)
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        assets = {layer.layer_id: layer.asset for layer in spec.layers}
+        self.assertEqual(assets["d2"], "d1")
+        self.assertEqual(assets["drop"], "d1")
+        self.assertEqual(assets["red"], "red")
+        self.assertEqual(assets["c2"], "c1")
+        self.assertEqual(assets["c3"], "c3")
+        self.assertEqual(assets["e2"], "e1")
+        self.assertEqual(assets["p2"], "p1")
+        self.assertEqual(assets["l1"], "l1")
+        self.assertEqual(assets["r2"], "r2")
+        self.assertEqual(assets["r3"], "r3")
+        self.assertEqual(assets["r4"], "r2")
+        self.assertEqual(shared_asset_count(spec), 6)
+        offsets = {layer.asset_key: (layer.x, layer.y) for layer in svg_doc.layers}
+        self.assertEqual(offsets["d2"], (10, 2))
+        self.assertEqual(offsets["drop"], (30, 30))
+        self.assertEqual(offsets["r4"], (20, 0))
+        self.assertEqual({layer.layer_id: layer.offset for layer in spec.layers}["d2"], (10, 2))
+
+    def test_shared_assets_keep_their_offset(self) -> None:
+        svg = """<svg width="64" height="64" data-wx-id="dots" xmlns="http://www.w3.org/2000/svg">
+  <circle id="a" cx="10" cy="20" r="4"/>
+  <circle id="b" cx="30" cy="20" r="4"/>
+  <circle id="c" cx="50" cy="24" r="4"/>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            spec = map_svg_to_spec(path)
+            large = map_svg_to_sizes(path, [128]).specs[128]
+        finally:
+            path.unlink(missing_ok=True)
+        self.assertEqual([layer.asset for layer in spec.layers], ["a", "a", "a"])
+        self.assertEqual([layer.offset for layer in large.layers], [None, (40, 0), (80, 8)])
+        self.assertEqual([layer.offset for layer in spec.layers], [None, (20, 0), (40, 4)])
+        layers = spec.to_dict()["layers"]
+        self.assertNotIn("offset", layers[0])
+        self.assertEqual(layers[2]["offset"], [40, 4])
+        self.assertEqual(parse_spec_dict(spec.to_dict()).layers[2].offset, (40, 4))
+
+        plan = compile_plan(spec_layers(spec.to_dict()), spec.fx)
+        placed = [(state.offset_x, state.offset_y) for state in plan.evaluate(0.0)]
+        self.assertEqual(placed, [(0, 0), (20, 0), (40, 4)])
+
+    def test_shared_offsets_round_after_scaling(self) -> None:
+        svg = """<svg viewBox="0 0 24 24" width="64" height="64" data-wx-id="dots" xmlns="http://www.w3.org/2000/svg">
+  <circle id="a" cx="4" cy="4" r="1"/>
+  <circle id="b" cx="6.4" cy="4" r="1"/>
+  <g transform="rotate(90 12 12)">
+    <circle id="c" cx="4" cy="20" r="1"/>
+    <circle id="d" cx="8" cy="20" r="1"/>
+  </g>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            spec = map_svg_to_spec(path)
+        finally:
+            path.unlink(missing_ok=True)
+        # 2.4 user units are 6.4 px at 64 px, not round(2.4) * 64 / 24.
+        self.assertEqual(spec.layers[1].asset, "a")
+        self.assertEqual(spec.layers[1].offset, (6, 0))
+        # A rotation would move the anchor too: rotated copies keep their own asset.
+        self.assertEqual([layer.asset for layer in spec.layers[-2:]], ["c", "d"])
+        self.assertEqual([layer.offset for layer in spec.layers[-2:]], [None, None])
+
+    def test_multi_size_mapping_scales_px_params(self) -> None:
+        svg = """<svg viewBox="0 0 64 64" width="64" height="64" data-wx-id="storm" xmlns="http://www.w3.org/2000/svg">
+  <circle id="sun" cx="32" cy="32" r="9">
+    <animateTransform attributeName="transform" type="rotate" values="0 32 32; 360 32 32" dur="8s" repeatCount="indefinite"/>
+  </circle>
+  <path id="drop" d="M10 10 l2 4 h-4 z">
+    <animateTransform attributeName="transform" type="translate" values="0 0; 3 20" dur="1s" repeatCount="indefinite"/>
+  </path>
+  <path id="drop_b" d="M30 10 l2 4 h-4 z"/>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            mapping = map_svg_to_sizes(path, [64, 96, 128, 96])
+            single = map_svg_to_spec(path, size_px=96)
+            with mock.patch("pipeline.mapping_raster.render_svg_bytes", return_value=b"png") as render:
+                with tempfile.TemporaryDirectory() as tmp:
+                    written = rasterize_sizes(mapping, Path(tmp), workers=1)
+                    names = sorted(item.name for item in written)
+        finally:
+            path.unlink(missing_ok=True)
+
+        self.assertEqual(list(mapping.specs), [64, 96, 128])
+        specs = list(mapping.specs.values())
+        pivots = [(spec.fx["ROTATE"]["pivot_x"], spec.fx["ROTATE"]["pivot_y"]) for spec in specs]
+        self.assertEqual(pivots, [(32, 32), (48, 48), (64, 64)])
+        self.assertEqual([spec.fx["FALL"]["fall_dy"] for spec in specs], [20, 30, 40])
+        self.assertEqual([spec.fx["FALL"]["fall_dx"] for spec in specs], [3, 4, 6])
+        self.assertEqual(single.fx, mapping.specs[96].fx)
+        self.assertEqual(
+            [(asset.asset_key, asset.path) for asset in mapping.specs[128].assets],
+            [("sun", "sun_128.png"), ("drop", "drop_128.png")],
+        )
+        self.assertEqual(asset_elements(mapping), {"sun": 0, "drop": 1})
+        self.assertEqual(render.call_count, 6)
+        expected = [f"{key}_{size}.png" for key in ("sun", "drop") for size in (64, 96, 128)]
+        self.assertEqual(names, sorted(expected))
+
+    def test_spec_mapping_does_not_load_the_rasterizer(self) -> None:
+        code = (
+            "import sys, pipeline.mapping; "
+            "print(sorted(m for m in sys.modules if m.startswith('pipeline.preview')"
+            " or m in ('pipeline.raster', 'pipeline.svg.pivot')))"
+        )
+        loaded = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(loaded.strip(), "[]")
+
+    def test_cli_map_sizes_writes_spec_and_manifest_per_size(self) -> None:
+        svg = """<svg width="32" height="32" viewBox="0 0 32 32" data-wx-id="dial" xmlns="http://www.w3.org/2000/svg">
+  <rect id="face" width="32" height="32"/>
+  <path id="needle" d="M15 4 h2 v12 h-2 z">
+    <animateTransform attributeName="transform" type="rotate" values="0 16 16; 360 16 16" dur="4s" repeatCount="indefinite"/>
+  </path>
+</svg>
+"""
+        path = self._write_svg(svg)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                out = Path(tmp)
+                argv = ["wx-pipeline", "map-sizes", "--svg", str(path), "--output-dir", str(out)]
+                argv += ["--size-px", "64", "--size-px", "128"]
+                with mock.patch.object(sys, "argv", argv):
+                    self.assertEqual(main(), 0)
+                spec = json.loads((out / "dial_128.json").read_text())
+                manifest = json.loads((out / "dial_64.manifest.json").read_text())
+                written = sorted(item.name for item in out.iterdir())
+        finally:
+            path.unlink(missing_ok=True)
+        self.assertEqual(
+            written,
+            ["dial_128.json", "dial_128.manifest.json", "dial_64.json", "dial_64.manifest.json"],
+        )
+        rotate = spec["fx"]["ROTATE"]
+        self.assertEqual((rotate["pivot_x"], rotate["pivot_y"]), (64, 64))
+        paths = [asset["path"] for asset in manifest["assets"]]
+        self.assertEqual(paths, ["face_64.png", "needle_64.png"])
+
 
 if __name__ == "__main__":
     unittest.main()
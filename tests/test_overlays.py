@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+from pipeline.cli import main
+from pipeline.svg.overlays import build_overlays, dumps_overlays
+
+_SUN = """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     viewBox="0 0 32 32" width="32" height="32">
+  <defs>
+    <linearGradient id="base"><stop offset="0" stop-color="#FBBF24"/><stop offset="1" style="stop-color:#f59e0b"/></linearGradient>
+    <linearGradient id="mid" xlink:href="#base" x1="0" x2="1"/>
+    <linearGradient id="tip" href="#mid" x1="1"/>
+  </defs>
+  <rect id="sky" width="32" height="32" fill="#00f"/>
+  <circle id="disk" cx="16" cy="16" r="4" fill="url(#tip)"/>
+  <g stroke="#fbbf24" stroke-width="2">
+    <path d="m16 4 v4 M4 16 h4 a2 3 0 0 1 2 2">
+      <animateTransform attributeName="transform" type="rotate" values="0 16 16; 360 16 16" dur="45s" repeatCount="indefinite"/>
+    </path>
+  </g>
+  <line x1="2" y1="30" x2="10" y2="30" stroke="#00F">
+    <animate attributeName="opacity" values="1;0.25;1" dur="2s" begin="-0.5s" repeatCount="indefinite"/>
+  </line>
+</svg>
+"""
+
+
+def _build(svg: str = _SUN, **options) -> dict:
+    return build_overlays(ET.fromstring(svg), **options)
+
+
+class OverlaysTests(unittest.TestCase):
+    def test_document_follows_the_v1_format(self) -> None:
+        document = _build(size_px=64)
+        self.assertEqual(document["version"], "1.0")
+        self.assertEqual(document["size"], {"w": 64, "h": 64})
+        self.assertEqual(document["palette"], ["#fbbf24", "#f59e0b", "#00f"])
+        refs = {item["id"]: item["gradient_ref"] for item in document["gradients"]}
+        self.assertEqual(refs, {"base": "base", "mid": "base", "tip": "base"})
+        self.assertEqual(document["gradients"][2]["stops"][1]["stop-color"], "#f59e0b")
+
+        self.assertEqual(
+            [(item["id"], item["z"]) for item in document["static"]], [("sky", 0), ("disk", 1)]
+        )
+        self.assertEqual(document["static"][1]["attrs"]["gradient_ref"], "base")
+        self.assertEqual(document["z_order"]["base_position"], "below")
+        self.assertEqual(document["z_order"]["overlays_z_offset"], 3)
+
+        rays, blink = document["overlays"]
+        self.assertEqual(
+            (rays["id"], rays["type"], rays["z"], rays["z_rel"]), ("path_3", "rotate", 3, 0)
+        )
+        self.assertEqual(rays["target"]["attrs"]["d"], "m 32 8 v 8 M 8 32 h 8 a 4 6 0 0 1 4 4")
+        self.assertEqual(rays["target"]["attrs"]["stroke-width"], 4)
+        self.assertEqual(rays["anim"]["values"], [[0, 32, 32], [360, 32, 32]])
+        self.assertEqual(rays["anim"]["dur_ms"], 45000)
+        self.assertEqual(blink["target"]["attrs"]["x2"], 20)
+        self.assertEqual(blink["anim"]["begin_ms"], -500)
+        self.assertEqual(blink["anim"]["values"], [1, 0.25, 1])
+
+        self.assertEqual(dumps_overlays(document), dumps_overlays(_build(size_px=64)))
+
+    def test_path_overlays_can_be_disabled_and_mixed_is_strict(self) -> None:
+        document = _build(allow_path_overlay=False)
+        self.assertEqual([item["z"] for item in document["overlays"]], [4])
+
+        mixed = _SUN.replace("</svg>", '<rect id="fog" width="4" height="4"/></svg>')
+        self.assertEqual(_build(mixed)["z_order"]["base_position"], "mixed")
+        with self.assertRaises(ValueError):
+            _build(mixed, strict=True)
+
+    def test_use_and_translate_place_the_overlay(self) -> None:
+        blink = '<animate attributeName="opacity" values="1;0" dur="1s" repeatCount="indefinite"/>'
+        svg = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 32 32" width="32" height="32">
+  <defs><circle id="drop" cx="0" cy="0" r="1" fill="#0af"/></defs>
+  <use id="copy" href="#drop" x="20" y="5">{blink}</use>
+  <g transform="translate(10,0)">
+    <circle id="moved" cx="2" cy="3" r="1" transform="translate(0 4)">{blink}</circle>
+    <path id="wing" d="M1 1 l2 0">{blink}</path>
+  </g>
+  <g transform="translate(4 4)">
+    <rect id="blade" x="1" y="1" width="2" height="2">
+      <animateTransform attributeName="transform" type="rotate" values="0 8 8; 360 8 8" dur="1s" repeatCount="indefinite"/>
+    </rect>
+  </g>
+  <g transform="rotate(90 16 16)"><circle id="turned" cx="4" cy="4" r="1">{blink}</circle></g>
+</svg>
+"""
+        document = _build(svg, size_px=64)
+        attrs = {item["id"]: item["target"]["attrs"] for item in document["overlays"]}
+        self.assertEqual((attrs["copy"]["cx"], attrs["copy"]["cy"]), (40, 10))
+        self.assertEqual((attrs["moved"]["cx"], attrs["moved"]["cy"]), (24, 14))
+        self.assertEqual(attrs["wing"]["d"], "M 22 2 l 4 0")
+        self.assertEqual((attrs["blade"]["x"], attrs["blade"]["y"]), (10, 10))
+        blade = next(item for item in document["overlays"] if item["id"] == "blade")
+        self.assertEqual(blade["anim"]["values"][0], [0, 24, 24])
+        # A rotated shape cannot be flattened to remapped coordinates.
+        self.assertNotIn("turned", attrs)
+        self.assertEqual(document["skipped"], [{"id": "turned", "z": 7, "reason": "transform"}])
+        with self.assertRaises(ValueError):
+            _build(svg, strict=True)
+
+    def test_cli_batch_writes_one_document_per_svg(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sun.svg").write_text(_SUN, encoding="utf-8")
+            (root / "broken.svg").write_text("<svg", encoding="utf-8")
+            argv = ["wx-pipeline", "overlays", "--svg", str(root), "--output", str(root / "out")]
+            argv += ["--workers", "1"]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 1)
+            written = sorted(path.name for path in (root / "out").iterdir())
+            document = json.loads((root / "out" / "sun.overlays.json").read_text())
+        self.assertEqual(written, ["sun.overlays.json"])
+        self.assertEqual(len(document["overlays"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
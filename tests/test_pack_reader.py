@@ -0,0 +1,151 @@
+import io
+from pathlib import Path
+import struct
+import tempfile
+import unittest
+
+from pipeline.assets.manifest import scan_asset_tree
+from pipeline.hash import fnv1a32
+from pipeline.pack.decode import decode_lvgl_bin
+from pipeline.pack.reader import PackReader, load_pack_bitmaps, nearest_size
+from pipeline.raster import has_pillow
+from pipeline.spec.model import Asset
+from pipeline.wxpk import (
+    WXPK_C_PNG,
+    WXPK_C_RAW_RGBA8888,
+    WXPK_T_IMG,
+    build_pack,
+    build_pack_from_files,
+)
+from tests.helpers import make_spec
+
+
+def _rgb565(red: int, green: int, blue: int) -> bytes:
+    return struct.pack("<H", ((red >> 3) << 11) | ((green >> 2) << 5) | (blue >> 3))
+
+
+def _lvgl_v8(cf: int, width: int, height: int, data: bytes) -> bytes:
+    return struct.pack("<I", cf | (width << 10) | (height << 21)) + data
+
+
+def _lvgl_v9(cf: int, width: int, height: int, stride: int, data: bytes) -> bytes:
+    return struct.pack("<BBHHHHH", 0x19, cf, 0, width, height, stride, 0) + data
+
+
+@unittest.skipUnless(has_pillow(), "Pillow not installed")
+class LvglBinDecodeTests(unittest.TestCase):
+    def test_v8_true_color_alpha_rgb565(self) -> None:
+        pixel = _rgb565(255, 0, 0) + bytes([128])
+        image = decode_lvgl_bin(_lvgl_v8(5, 2, 1, pixel + _rgb565(0, 0, 255) + bytes([255])))
+        self.assertEqual(image.mode, "RGBA")
+        self.assertEqual(image.getpixel((0, 0)), (255, 0, 0, 128))
+        self.assertEqual(image.getpixel((1, 0)), (0, 0, 255, 255))
+
+    def test_v8_32bit_and_alpha_only(self) -> None:
+        image = decode_lvgl_bin(_lvgl_v8(5, 1, 1, bytes([10, 20, 30, 40])))
+        self.assertEqual(image.getpixel((0, 0)), (30, 20, 10, 40))
+        image = decode_lvgl_bin(_lvgl_v8(14, 2, 1, bytes([0, 200])))
+        self.assertEqual(image.getpixel((1, 0))[3], 200)
+
+    def test_v9_formats(self) -> None:
+        image = decode_lvgl_bin(_lvgl_v9(0x10, 1, 1, 4, bytes([10, 20, 30, 40])))
+        self.assertEqual(image.getpixel((0, 0)), (30, 20, 10, 40))
+        # RGB565A8 is planar: two colour pixels, then two alpha bytes.
+        data = _rgb565(0, 255, 0) + _rgb565(255, 255, 255) + bytes([7, 9])
+        image = decode_lvgl_bin(_lvgl_v9(0x14, 2, 1, 4, data))
+        self.assertEqual(image.getpixel((0, 0)), (0, 255, 0, 7))
+        self.assertEqual(image.getpixel((1, 0)), (255, 255, 255, 9))
+
+    def test_rejects_unknown_or_truncated(self) -> None:
+        with self.assertRaises(ValueError):
+            decode_lvgl_bin(_lvgl_v8(7, 2, 2, bytes(8)))
+        with self.assertRaises(ValueError):
+            decode_lvgl_bin(_lvgl_v8(5, 4, 4, bytes(3)))
+
+
+@unittest.skipUnless(has_pillow(), "Pillow not installed")
+class PackReaderTests(unittest.TestCase):
+    def _pack(self) -> bytes:
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGBA", (4, 4), (0, 255, 0, 100)).save(buffer, format="PNG")
+        assets = [
+            Asset(asset_key="cloud", size_px=4, path="cloud_4.png"),
+            Asset(asset_key="drop", size_px=2, path="drop_2.rgba"),
+            Asset(asset_key="bolt", size_px=1, path="bolt_1.bin"),
+        ]
+        payloads = {
+            ("cloud", 4): buffer.getvalue(),
+            ("drop", 2): bytes([1, 2, 3, 4]) * 4,
+            ("bolt", 1): _lvgl_v8(5, 1, 1, _rgb565(255, 255, 0) + bytes([255])),
+        }
+        return build_pack([make_spec("storm", ["cloud", "drop", "bolt"])], assets, payloads, shared_timers=True)
+
+    def test_index_codecs_and_lazy_cache(self) -> None:
+        reader = PackReader(self._pack())
+        self.assertEqual(reader.find(fnv1a32("cloud"), WXPK_T_IMG, 4).codec, WXPK_C_PNG)
+        self.assertEqual(reader.find(fnv1a32("drop"), WXPK_T_IMG, 2).codec, WXPK_C_RAW_RGBA8888)
+        self.assertEqual(reader.spec_by_name("storm")["name"], "storm")
+        self.assertEqual(reader.timer_table(), {"version": 1, "timers": []})
+        self.assertEqual(reader.image_sizes("cloud"), [4])
+        self.assertIsNone(reader.image("cloud", 64))
+
+        self.assertEqual(reader.image("cloud", 4).getpixel((0, 0)), (0, 255, 0, 100))
+        self.assertEqual(reader.image("drop", 2).getpixel((1, 1)), (1, 2, 3, 4))
+        self.assertEqual(reader.image("bolt", 1).getpixel((0, 0)), (255, 255, 0, 255))
+        self.assertIs(reader.image("cloud", 4), reader.image("cloud", 4))
+
+        bitmaps = load_pack_bitmaps(reader, reader.spec_by_name("storm"), 4)
+        self.assertEqual(sorted(bitmaps), ["bolt", "cloud", "drop"])
+        self.assertTrue(all(image.size == (4, 4) for image in bitmaps.values()))
+
+    def test_crc_checked_on_first_access(self) -> None:
+        data = bytearray(self._pack())
+        reader = PackReader(bytes(data))
+        entry = reader.find(fnv1a32("drop"), WXPK_T_IMG, 2)
+        data[entry.offset] ^= 0xFF
+        with self.assertRaises(ValueError):
+            PackReader(bytes(data)).image("drop", 2)
+
+    def test_open_memory_maps_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "theme.bin"
+            path.write_bytes(self._pack())
+            with PackReader.open(path) as reader:
+                self.assertEqual(reader.spec_ids(), [fnv1a32("storm")])
+                self.assertEqual(reader.image("drop", 2).size, (2, 2))
+
+    def test_nearest_size(self) -> None:
+        self.assertEqual(nearest_size([64, 96, 128], 96), 96)
+        self.assertEqual(nearest_size([64, 128], 96), 128)
+        self.assertEqual(nearest_size([64], 96), 64)
+        self.assertIsNone(nearest_size([], 96))
+
+
+class PackSizesTests(unittest.TestCase):
+    def test_each_size_keeps_its_own_payload(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for size_px, payload in ((64, b"AAAA64xx"), (96, b"BBBB96xx")):
+                path = root / "base" / str(size_px) / "sun.bin"
+                path.parent.mkdir(parents=True)
+                path.write_bytes(payload)
+            assets = [entry.to_asset() for entry in scan_asset_tree(root)]
+            pack = build_pack_from_files([make_spec("storm", ["sun"])], assets, root)
+        reader = PackReader(pack)
+        self.assertEqual(reader.image_sizes("sun"), [64, 96])
+        blobs = {
+            size_px: bytes(reader.blob(reader.find(fnv1a32("sun"), WXPK_T_IMG, size_px)))
+            for size_px in (64, 96)
+        }
+        self.assertEqual(blobs, {64: b"AAAA64xx", 96: b"BBBB96xx"})
+
+    def test_duplicate_asset_slots_are_rejected(self) -> None:
+        assets = [Asset(asset_key="sun", size_px=64, path="sun_64.bin")] * 2
+        with self.assertRaises(ValueError):
+            build_pack([make_spec("storm", ["sun"])], assets, {("sun", 64): b"data"})
+
+
+if __name__ == "__main__":
+    unittest.main()
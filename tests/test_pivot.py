@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+from pipeline.cli import main
+from pipeline.fx.timeline import compile_plan
+from pipeline.raster import has_pillow
+from pipeline.spec.model import Spec
+from pipeline.svg.pivot import apply_pivots, pivot_px, raster_pivot, solve_pivots
+from tests.helpers import make_spec
+
+# Drawable order: dial, g, needle, rays.
+_GAUGE = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64" width="64" height="64">
+  <circle id="dial" cx="32" cy="32" r="30" fill="#eee"/>
+  <g transform="translate(8 0)">
+    <path id="needle" d="M22 30 h4 v-20 h-4 Z" data-wx-pivot-x="32" data-wx-pivot-y="32"/>
+  </g>
+  <path id="rays" d="m10 10 l20 0 0 20 -20 0 z"/>
+</svg>
+"""
+
+
+def _spec(fx: dict) -> Spec:
+    layers = [
+        "dial",
+        "g",
+        {"id": "needle", "asset": "needle", "fx": ["ROTATE"]},
+        {"id": "rays", "asset": "rays", "fx": ["ROTATE.rays"]},
+    ]
+    return make_spec("gauge", layers, fx)
+
+
+class PivotTests(unittest.TestCase):
+    def test_declared_pivots_win_and_divergence_warns(self) -> None:
+        fx = {"ROTATE": {"period_ms": 1000}, "ROTATE.rays": {"period_ms": 2000}}
+        report = solve_pivots(ET.fromstring(_GAUGE), _spec(fx), sizes=[64, 96, 128])
+        needle, rays = report.estimates
+        # Needle box 30..34 x 10..30 once translated; its declared pivot is the dial centre.
+        self.assertEqual(needle.detected, (0.5, 0.3125))
+        self.assertEqual(needle.method, "geometry")
+        self.assertEqual(needle.at(64), (32, 32))
+        self.assertEqual(rays.declared, None)
+        self.assertEqual([rays.at(size) for size in (64, 96, 128)], [(20, 20), (30, 30), (40, 40)])
+        self.assertEqual(len(report.warnings), 1)
+        self.assertIn("layer needle", report.warnings[0])
+        self.assertIn("at 128 px", report.warnings[0])
+
+        applied = apply_pivots(_spec(fx), report, 96)
+        self.assertEqual(applied.fx["ROTATE"], {"period_ms": 1000, "pivot_x": 48, "pivot_y": 48})
+        self.assertEqual(applied.fx["ROTATE.rays"]["pivot_x"], 30)
+        self.assertEqual(pivot_px(0.5, 128), 64)
+
+        plan = compile_plan([{"asset": "rays", "fx": ["ROTATE.rays"]}], applied.fx)
+        state = plan.evaluate(0.5)[0]
+        self.assertEqual((state.rotation, state.pivot_x, state.pivot_y), (90.0, 30, 30))
+
+    @unittest.skipUnless(has_pillow(), "Pillow not installed")
+    def test_raster_centroid_backs_missing_geometry(self) -> None:
+        from PIL import Image
+
+        image = Image.new("RGBA", (9, 9), (0, 0, 0, 0))
+        image.paste((255, 255, 255, 255), (6, 0, 9, 3))
+        self.assertEqual(raster_pivot(image), (0.875, 0.125))
+        self.assertIsNone(raster_pivot(Image.new("RGBA", (4, 4))))
+
+        svg = _GAUGE.replace('transform="translate(8 0)"', 'transform="rotate(10)"')
+        fx = {"ROTATE": {"period_ms": 1000}, "ROTATE.rays": {"period_ms": 2000}}
+        report = solve_pivots(ET.fromstring(svg), _spec(fx), bitmaps={"needle": image})
+        self.assertEqual(report.estimates[0].method, "raster")
+
+    def test_cli_pivots_writes_spec_and_report(self) -> None:
+        svg = """<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64" data-wx-id="sun">
+  <circle id="core" cx="20" cy="24" r="6" fill="#fc0"/>
+  <path id="rays" d="M20 12 v-4 M20 36 v4 M8 24 h-4 M32 24 h4" stroke="#fc0">
+    <animateTransform attributeName="transform" type="rotate" values="0 32 32; 360 32 32" dur="8s" repeatCount="indefinite"/>
+  </path>
+</svg>
+"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "sun.svg").write_text(svg, encoding="utf-8")
+            argv = ["wx-pipeline", "pivots", "--svg", str(root / "sun.svg"), "--size-px", "96"]
+            argv += ["--size-px", "64", "--output", str(root / "sun.json")]
+            argv += ["--report", str(root / "pivots.json")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print") as printed:
+                self.assertEqual(main(), 0)
+            spec = json.loads((root / "sun.json").read_text())
+            report = json.loads((root / "pivots.json").read_text())
+        self.assertEqual(spec["fx"]["ROTATE"]["pivot_x"], 48)
+        self.assertEqual(report["pivots"][0]["px"], {"96": [48, 48], "64": [32, 32]})
+        self.assertEqual(report["pivots"][0]["detected"], [0.3125, 0.375])
+        self.assertTrue(any("warning:" in str(call) for call in printed.call_args_list))
+
+    def test_params_pivot_is_in_spec_pixels_under_a_scaled_viewbox(self) -> None:
+        svg = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" width="64" height="64" data-wx-id="fan">
+  <path id="blade" d="M10 10 h4 v4 h-4 z">
+    <animateTransform attributeName="transform" type="rotate" values="0 12 12; 360 12 12" dur="2s" repeatCount="indefinite"/>
+  </path>
+</svg>
+"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "fan.svg").write_text(svg, encoding="utf-8")
+            argv = ["wx-pipeline", "pivots", "--svg", str(root / "fan.svg"), "--size-px", "64"]
+            argv += ["--output", str(root / "fan.json")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print") as printed:
+                self.assertEqual(main(), 0)
+            spec = json.loads((root / "fan.json").read_text())
+        # The SMIL centre 12 12 is mapped to 32 px; it must not be re-read as user units.
+        self.assertEqual((spec["fx"]["ROTATE"]["pivot_x"], spec["fx"]["ROTATE"]["pivot_y"]), (32, 32))
+        self.assertFalse(any("warning:" in str(call) for call in printed.call_args_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from pipeline.preview.compose import Compositor, has_numpy, premultiply, unpremultiply
+
+if has_numpy():
+    import numpy as np
+
+
+@unittest.skipUnless(has_numpy(), "NumPy not installed")
+class CompositorTests(unittest.TestCase):
+    def _solid(self, size: int, rgba: tuple[int, int, int, int]) -> "np.ndarray":
+        pixels = np.empty((size, size, 4), dtype=np.uint8)
+        pixels[...] = rgba
+        return premultiply(pixels)
+
+    def test_over_blend_and_clipping(self) -> None:
+        comp = Compositor(4)
+        comp.blit(self._solid(4, (0, 0, 255, 255)), 0, 0)
+        comp.blit(self._solid(2, (255, 0, 0, 128)), 3, -1)
+        frame = comp.frame()
+        self.assertEqual(tuple(frame[0, 0]), (0, 0, 255, 255))
+        self.assertEqual(tuple(frame[0, 3]), (128, 0, 127, 255))
+        self.assertEqual(tuple(frame[1, 3]), (0, 0, 255, 255))
+
+    def test_opacity_and_buffer_reuse(self) -> None:
+        comp = Compositor(2, scale=3)
+        sprite = self._solid(2, (255, 255, 255, 255))
+        comp.blit(sprite, 0, 0, opacity=0.5)
+        first = comp.frame()
+        self.assertEqual(first.shape, (6, 6, 4))
+        self.assertEqual(tuple(first[5, 5]), (128, 128, 128, 128))
+        comp.clear()
+        comp.blit(sprite, 1, 1)
+        second = comp.frame()
+        self.assertIs(first, second)
+        self.assertEqual(tuple(second[0, 0]), (0, 0, 0, 0))
+        self.assertEqual(tuple(second[5, 5]), (255, 255, 255, 255))
+        self.assertTrue(second.flags["C_CONTIGUOUS"])
+
+    def test_unpremultiply_round_trip(self) -> None:
+        pixels = np.array([[[200, 100, 50, 128], [10, 20, 30, 0]]], dtype=np.uint8)
+        restored = unpremultiply(premultiply(pixels))
+        self.assertEqual(tuple(restored[0, 1]), (0, 0, 0, 0))
+        for got, want in zip(restored[0, 0], pixels[0, 0]):
+            self.assertLessEqual(abs(int(got) - int(want)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
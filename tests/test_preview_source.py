@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+
+from pipeline.preview.source import BackgroundRasterizer
+
+
+class _SlowSource:
+    """Stands in for ``SvgLayerSource``: renders only when released."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls: list[tuple[int, int | None]] = []
+        self._done: dict[tuple[int, int | None], bytes] = {}
+
+    def cached(self, size_px: int, index: int | None = None) -> bytes | None:
+        return self._done.get((size_px, index))
+
+    def raster(self, size_px: int, index: int | None = None) -> bytes | None:
+        self.calls.append((size_px, index))
+        self.release.wait(5)
+        self._done[(size_px, index)] = b"png"
+        return b"png"
+
+
+class _BrokenSource:
+    """A source whose layers never render."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[int, int | None]] = []
+
+    def cached(self, size_px: int, index: int | None = None) -> bytes | None:
+        return None
+
+    def raster(self, size_px: int, index: int | None = None) -> bytes | None:
+        self.calls.append((size_px, index))
+        return None
+
+
+class BackgroundRasterizerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ready: list[tuple[int, int | None]] = []
+        self.finished = threading.Event()
+
+        def _on_ready(size_px: int, index: int | None) -> None:
+            self.ready.append((size_px, index))
+            self.finished.set()
+
+        self.rasterizer = BackgroundRasterizer(_on_ready, max_workers=1)
+        self.addCleanup(self.rasterizer.shutdown)
+
+    def test_requests_are_coalesced_and_served_from_cache(self) -> None:
+        source = _SlowSource()
+        self.rasterizer.set_source(source)
+        self.assertIsNone(self.rasterizer.request(64, 2))
+        self.assertIsNone(self.rasterizer.request(64, 2))
+        self.assertTrue(self.rasterizer.is_pending(64, 2))
+        source.release.set()
+        self.assertTrue(self.finished.wait(5))
+        self.assertEqual(source.calls, [(64, 2)])
+        self.assertEqual(self.ready, [(64, 2)])
+        self.assertFalse(self.rasterizer.is_pending(64, 2))
+        self.assertEqual(self.rasterizer.request(64, 2), b"png")
+
+    def test_switching_source_drops_stale_results(self) -> None:
+        old = _SlowSource()
+        self.rasterizer.set_source(old)
+        self.rasterizer.request(64, 0)
+        self.rasterizer.request(64, 1)
+        self.rasterizer.set_source(_SlowSource())
+        self.assertFalse(self.rasterizer.is_pending(64, 0))
+        old.release.set()
+        self.rasterizer.shutdown(wait=True)
+        self.assertEqual(self.ready, [])
+        # The queued second layer never ran.
+        self.assertLessEqual(len(old.calls), 1)
+
+    def test_failed_rasters_are_not_resubmitted(self) -> None:
+        source = _BrokenSource()
+        self.rasterizer.set_source(source)
+        self.assertIsNone(self.rasterizer.request(64, 0))
+        while self.rasterizer.is_pending(64, 0):
+            time.sleep(0.01)
+        for _ in range(20):
+            self.assertIsNone(self.rasterizer.request(64, 0))
+        self.assertFalse(self.rasterizer.is_pending(64, 0))
+        self.assertEqual(source.calls, [(64, 0)])
+        self.assertEqual(self.ready, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
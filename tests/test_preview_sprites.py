@@ -0,0 +1,71 @@
+import unittest
+
+from pipeline.fx.timeline import LayerState
+from pipeline.preview.render import layer_pivot
+from pipeline.preview.sprites import RotationCache, angle_steps, opacity_lut, rotate_about
+from pipeline.util.cache import LruCache
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+
+class SpriteCacheTests(unittest.TestCase):
+    def test_opacity_lut_is_shared_per_level(self) -> None:
+        lut = opacity_lut(0.5)
+        self.assertEqual(len(lut), 256)
+        self.assertEqual((lut[0], lut[255]), (0, 128))
+        self.assertIs(opacity_lut(0.5), lut)
+
+    def test_angle_quantization(self) -> None:
+        self.assertEqual(angle_steps(12.34, 0.1), 123)
+        self.assertEqual(angle_steps(359.99, 0.1), 0)
+        self.assertEqual(angle_steps(-90.0, 1.0), 270)
+
+    def test_lru_cache_bounded_by_weight(self) -> None:
+        cache: LruCache[str, bytes] = LruCache(8, weigh=len)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", b"12")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.weight, 6)
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_rotation_reused_and_source_untouched(self) -> None:
+        image = Image.new("RGBA", (16, 16), (255, 0, 0, 200))
+        cache = RotationCache(step_deg=1.0)
+        first, _ = cache.transform("sun", image, 45.2, 0.5, 8.0, 8.0)
+        second, _ = cache.transform("sun", image, 44.9, 1.0, 8.0, 8.0)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(first.size, second.size)
+        self.assertGreater(first.width, 16)
+        self.assertEqual(image.getpixel((8, 8))[3], 200)
+        self.assertEqual(second.getpixel((first.width // 2, first.height // 2))[3], 200)
+        self.assertEqual(first.getpixel((first.width // 2, first.height // 2))[3], 100)
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_off_centre_shape_rotates_about_the_pivot(self) -> None:
+        image = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
+        image.paste((255, 0, 0, 255), (12, 4, 20, 10))
+        landed = {}
+        for rotation in (90.0, 180.0):
+            sprite, (pivot_x, pivot_y) = rotate_about(image, rotation, 16.0, 16.0)
+            left, top, right, bottom = sprite.getchannel("A").getbbox()
+            # The pivot (16, 16) of the source stays at (16, 16) on screen.
+            dx, dy = round(16 - pivot_x), round(16 - pivot_y)
+            landed[rotation] = (left + dx, top + dy, right + dx, bottom + dy)
+        self.assertEqual(landed[90.0], (22, 12, 28, 20))
+        self.assertEqual(landed[180.0], (12, 22, 20, 28))
+
+    def test_layer_pivot_scales_spec_pixels_to_the_bitmap(self) -> None:
+        state = LayerState(asset="needle", svg_index=None, pivot_x=16, pivot_y=8)
+        self.assertEqual(layer_pivot(state, 64, 64, 32), (32.0, 16.0))
+        self.assertEqual(layer_pivot(state, 32, 32), (16.0, 8.0))
+        centred = LayerState(asset="sun", svg_index=None)
+        self.assertEqual(layer_pivot(centred, 48, 48, 32), (24.0, 24.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
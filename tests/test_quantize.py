@@ -0,0 +1,80 @@
+import unittest
+
+from pipeline.fx.quantize import quantize_specs, shared_periods, snap_ms, snap_phase_ms
+from pipeline.spec.model import FxParams, compact_spec
+from tests.helpers import make_spec
+
+
+def _spec(name: str, fx: dict) -> object:
+    return make_spec(name, [{"id": "main", "asset": "main", "fx": list(fx)}], fx)
+
+
+class QuantizeTests(unittest.TestCase):
+    def test_snap_ms(self) -> None:
+        self.assertEqual(snap_ms(3333, 30), 3330)
+        self.assertEqual(snap_ms(10, 30), 30)
+        self.assertEqual(snap_ms(0, 30), 0)
+        with self.assertRaises(ValueError):
+            snap_ms(100, 0)
+
+    def test_snap_phase_ms(self) -> None:
+        self.assertEqual(snap_phase_ms(10, 30), 0)
+        self.assertEqual(snap_phase_ms(20, 30), 30)
+        self.assertEqual(snap_phase_ms(1666, 30, 3000 / 3333), 1500)
+        self.assertEqual(snap_phase_ms(3320, 30, period_ms=3330), 0)
+
+    def test_shared_periods_prefer_round_values_within_tolerance(self) -> None:
+        mapping = shared_periods([3000, 3100, 3333, 17500, 18000, 700], 30, 0.05)
+        self.assertEqual(mapping[3000], 3000)
+        self.assertEqual(mapping[3100], 3000)
+        self.assertEqual(mapping[3333], 3300)
+        self.assertEqual(mapping[17500], 18000)
+        self.assertEqual(mapping[18000], 18000)
+        self.assertEqual(mapping[700], 690)
+        for before, after in mapping.items():
+            self.assertEqual(after % 30, 0)
+            self.assertLessEqual(abs(after - before), 0.05 * before)
+
+    def test_quantize_theme_reports_deviation(self) -> None:
+        specs = [
+            _spec("star", {"TWINKLE": {"period_ms": 3333}}),
+            compact_spec(
+                _spec("rain", {"FALL": {"period_ms": 3000, "phase_ms": [0, 333, 667]}})
+            ),
+        ]
+        quantized, report = quantize_specs(specs, tick_ms=30, tolerance=0.1)
+        self.assertEqual(quantized[0].fx["TWINKLE"]["period_ms"], 3000)
+        fall = quantized[1].fx["FALL"]
+        self.assertIsInstance(fall, FxParams)
+        self.assertEqual(fall.phase_ms, (0, 330, 660))
+        self.assertEqual(report.timer_count, 1)
+        self.assertEqual(report.max_deviation_ms, 333)
+        self.assertAlmostEqual(report.max_deviation_ratio, 333 / 3333)
+        # The input specs are left untouched.
+        self.assertEqual(specs[0].fx["TWINKLE"]["period_ms"], 3333)
+
+    def test_phases_follow_a_merged_period(self) -> None:
+        specs = [
+            _spec("star", {"TWINKLE": {"period_ms": 3000}}),
+            _spec("rain", {"FALL": {"period_ms": 3333, "phase_ms": [10, 1666, 2500]}}),
+        ]
+        quantized, report = quantize_specs(specs, tick_ms=30, tolerance=0.15)
+        fall = quantized[1].fx["FALL"]
+        self.assertEqual(fall["period_ms"], 3000)
+        # Same fraction of the shorter cycle; a tiny lead rounds to 0.
+        self.assertEqual(fall["phase_ms"], [0, 1500, 2250])
+        self.assertEqual(report.timer_count, 1)
+
+    def test_tick_only(self) -> None:
+        specs = [
+            _spec("star", {"TWINKLE": {"period_ms": 3333}}),
+            _spec("sun", {"ROTATE": {"period_ms": 3000}}),
+        ]
+        quantized, report = quantize_specs(specs, tick_ms=30, tolerance=None)
+        self.assertEqual(quantized[0].fx["TWINKLE"]["period_ms"], 3330)
+        self.assertEqual(report.timer_count, 2)
+        self.assertEqual(report.max_deviation_ms, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
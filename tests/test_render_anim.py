@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pipeline.cli import main
+from pipeline.preview.compose import has_numpy
+from pipeline.preview.render import FrameRenderer, render_frames
+from pipeline.raster import has_pillow
+from pipeline.spec.model import spec_id_for_name
+
+SPEC = {
+    "spec_id": spec_id_for_name("spin"),
+    "name": "spin",
+    "components": {
+        "decor": "NONE",
+        "cover": "NONE",
+        "particles": "NONE",
+        "atmos": "NONE",
+        "event": "NONE",
+    },
+    "layers": [
+        {"id": "sun", "asset": "sun", "fx": ["ROTATE"]},
+        {"id": "dot", "asset": "dot", "fx": ["JITTER"]},
+    ],
+    "fx": {"ROTATE": {"period_ms": 1000}, "JITTER": {"amp_x": 3, "amp_y": 3}},
+    "metadata": {"version": 1},
+}
+
+
+@unittest.skipUnless(has_numpy() and has_pillow(), "NumPy and Pillow required")
+class RenderAnimTests(unittest.TestCase):
+    def _bitmaps(self) -> dict:
+        from PIL import Image
+
+        sun = Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+        sun.paste((255, 200, 0, 255), (4, 2, 12, 6))
+        dot = Image.new("RGBA", (16, 16), (0, 0, 0, 0))
+        dot.paste((0, 0, 255, 200), (7, 7, 9, 9))
+        return {"sun": sun, "dot": dot}
+
+    def _digests(self, seed: int, workers: int) -> list[str]:
+        frames = render_frames(
+            (SPEC, self._bitmaps(), 16),
+            {"fps": 10.0, "seed": seed},
+            12,
+            workers=workers,
+            chunk_size=3,
+        )
+        return [frame.digest for frame in frames]
+
+    def test_frames_are_deterministic_across_workers(self) -> None:
+        serial = self._digests(seed=7, workers=1)
+        self.assertEqual(len(serial), 12)
+        self.assertEqual(serial, self._digests(seed=7, workers=2))
+        self.assertNotEqual(serial, self._digests(seed=8, workers=1))
+        self.assertGreater(len(set(serial)), 1)
+
+    def test_render_is_straight_alpha_rgba(self) -> None:
+        renderer = FrameRenderer(SPEC, self._bitmaps(), 16, scale=2)
+        rgba, compose_ms = renderer.render(0)
+        self.assertEqual(len(rgba), 32 * 32 * 4)
+        self.assertGreaterEqual(compose_ms, 0.0)
+        offset = (2 * 2 * 32 + 10 * 2) * 4
+        self.assertEqual(tuple(rgba[offset : offset + 4]), (255, 200, 0, 255))
+
+    def test_rotated_frames_land_around_the_pivot(self) -> None:
+        spec = dict(SPEC, layers=SPEC["layers"][:1], fx={"ROTATE": {"period_ms": 1000}})
+        # Quarter turns: frame i is at t = i / 4 s, i.e. i * 90 degrees.
+        renderer = FrameRenderer(spec, self._bitmaps(), 16, fps=4.0)
+        boxes = []
+        for index in range(4):
+            rgba, _ = renderer.render(index)
+            opaque = [i // 4 for i in range(3, len(rgba), 4) if rgba[i] > 127]
+            xs = [pixel % 16 for pixel in opaque]
+            ys = [pixel // 16 for pixel in opaque]
+            boxes.append((min(xs), min(ys), max(xs) + 1, max(ys) + 1))
+        # The sun bar (4, 2)-(12, 6) turning clockwise about the centre (8, 8).
+        self.assertEqual(boxes, [(4, 2, 12, 6), (10, 4, 14, 12), (4, 10, 12, 14), (2, 4, 6, 12)])
+
+    def test_cli_writes_and_checks_golden_hashes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for key, image in self._bitmaps().items():
+                image.save(root / f"{key}_16.png")
+            spec_path = root / "spin.json"
+            spec_path.write_text(json.dumps(SPEC), encoding="utf-8")
+            golden = root / "golden.json"
+            base = ["wx-pipeline", "render-anim", "--spec", str(spec_path), "--frames", "5", "--size-px", "16"]
+
+            argv = base + ["--workers", "1", "--hashes", str(golden), "--out-dir", str(root / "out")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+            self.assertEqual(len(json.loads(golden.read_text())["frames"]), 5)
+            self.assertEqual(len(list((root / "out").glob("frame_*.png"))), 5)
+
+            argv = base + ["--workers", "1", "--check-hashes", str(golden), "--raw", str(root / "f.rgba")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+            self.assertEqual((root / "f.rgba").stat().st_size, 5 * 16 * 16 * 4)
+
+            for extra, message in (
+                (["--seed", "3"], "golden seed 0 != 3"),
+                (["--fps", "12"], "golden fps"),
+                (["--frames", "4"], "golden has 5 frame(s), rendered 4"),
+            ):
+                argv = base + ["--workers", "1", "--check-hashes", str(golden)] + extra
+                with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print") as printed:
+                    self.assertEqual(main(), 1)
+                self.assertIn(message, printed.call_args.args[0])
+
+    def test_cli_renders_from_pack_like_loose_files(self) -> None:
+        from pipeline.spec.model import Asset
+        from pipeline.wxpk import build_pack_from_files
+        from pipeline.wxspec import parse_spec_dict
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            for key, image in self._bitmaps().items():
+                image.save(root / f"{key}_16.png")
+            spec_path = root / "spin.json"
+            spec_path.write_text(json.dumps(SPEC), encoding="utf-8")
+            assets = [Asset(asset_key=key, size_px=16, path=f"{key}_16.png") for key in ("sun", "dot")]
+            pack_path = root / "theme.bin"
+            pack_path.write_bytes(build_pack_from_files([parse_spec_dict(SPEC)], assets, root))
+            golden = root / "golden.json"
+
+            argv = ["wx-pipeline", "render-anim", "--spec", str(spec_path), "--size-px", "16"]
+            argv += ["--frames", "4", "--workers", "1", "--hashes", str(golden)]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+            argv = ["wx-pipeline", "render-anim", "--pack", str(pack_path), "--name", "spin"]
+            argv += ["--frames", "4", "--workers", "1", "--check-hashes", str(golden)]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+                self.assertEqual(main(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import pickle
+import unittest
+
+from pipeline.hash import fnv1a32
+from pipeline.spec.model import (
+    Asset,
+    Components,
+    FxParams,
+    LayerSpec,
+    Metadata,
+    Spec,
+    compact_spec,
+)
+from pipeline.wxspec import parse_spec_dict, spec_to_dict
+
+
+class SpecModelTests(unittest.TestCase):
+    def _spec_dict(self) -> dict:
+        return {
+            "spec_id": fnv1a32("clear_day"),
+            "name": "clear_day",
+            "components": {
+                "decor": "SUN",
+                "cover": "NONE",
+                "particles": "NONE",
+                "atmos": "NONE",
+                "event": "NONE",
+            },
+            "layers": [{"id": "sun", "asset": "sun", "fx": ["ROTATE"]}],
+            "fx": {"ROTATE": {"period_ms": 10000, "pivot_x": 48, "phase_ms": [0, 250]}},
+            "metadata": {"version": 1},
+        }
+
+    def test_slotted_instances(self) -> None:
+        layer = LayerSpec(layer_id="sun", asset="sun", fx=[])
+        asset = Asset(asset_key="sun", size_px=64, path="sun_64.bin")
+        for obj in (layer, asset, Metadata(version=1)):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_asset_keys_interned(self) -> None:
+        first = LayerSpec(layer_id="Sun-Rays".lower(), asset="".join(["sun", "_rays"]), fx=[])
+        second = Asset(asset_key="".join(["sun_", "rays"]), size_px=64, path="x.bin")
+        self.assertIs(first.asset, second.asset_key)
+
+    def test_fx_params_round_trip(self) -> None:
+        params = FxParams.from_dict({"period_ms": 700, "fall_dy": 15, "phase_ms": [0, 100]})
+        self.assertEqual(params.phase_ms, (0, 100))
+        self.assertEqual(params.to_dict(), {"period_ms": 700, "fall_dy": 15, "phase_ms": [0, 100]})
+        with self.assertRaises(ValueError):
+            FxParams.from_dict({"unknown": 1})
+
+    def test_compact_parse_matches_dict_output(self) -> None:
+        data = self._spec_dict()
+        plain = parse_spec_dict(data)
+        compact = parse_spec_dict(data, compact=True)
+        self.assertIsInstance(compact.fx["ROTATE"], FxParams)
+        self.assertEqual(spec_to_dict(compact), spec_to_dict(plain))
+        self.assertEqual(parse_spec_dict(spec_to_dict(compact)).to_dict(), plain.to_dict())
+
+    def test_compact_spec_copy_is_picklable(self) -> None:
+        spec = Spec(
+            spec_id=None,
+            name="clear_day",
+            components=Components("SUN", "NONE", "NONE", "NONE", "NONE"),
+            layers=[LayerSpec(layer_id="sun", asset="sun", fx=["ROTATE"])],
+            fx={"ROTATE": {"period_ms": 10000}},
+        )
+        compact = compact_spec(spec)
+        self.assertIsInstance(compact.fx["ROTATE"], FxParams)
+        self.assertIsInstance(spec.fx["ROTATE"], dict)
+        restored = pickle.loads(pickle.dumps(compact))
+        self.assertEqual(restored.to_dict(), spec.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import xml.etree.ElementTree as ET
+
+from pipeline.cli import main
+from pipeline.preview.source import SvgLayerSource
+from pipeline.spec.model import Components, LayerSpec, Spec, spec_id_for_name
+from pipeline.svg.split import split_base, split_spec
+
+_SPIN = (
+    '<animateTransform attributeName="transform" type="rotate" values="0 8 8; 360 8 8"'
+    ' dur="2s" repeatCount="indefinite"/>'
+)
+
+# Drawable order: sky, sun, g, cloud, drop, fog.
+_STORM = f"""<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" data-wx-id="storm">
+  <rect id="sky" width="16" height="16" fill="#00f"/>
+  <circle id="sun" cx="8" cy="8" r="3" fill="#ff0">{_SPIN}</circle>
+  <g id="rain">
+    <circle id="cloud" cx="8" cy="4" r="3" fill="#fff"/>
+    <line id="drop" x1="8" y1="8" x2="8" y2="10" stroke="#0af">
+      <animateTransform attributeName="transform" type="translate" values="0 0; 0 6" dur="700ms" repeatCount="indefinite"/>
+    </line>
+  </g>
+  <rect id="fog" y="12" width="16" height="4" fill="#ccc"/>
+</svg>
+"""
+
+
+def _source(svg: str) -> SvgLayerSource:
+    return SvgLayerSource(ET.fromstring(svg))
+
+
+class SplitBaseTests(unittest.TestCase):
+    def test_static_content_below_overlays_goes_to_the_base(self) -> None:
+        svg = _STORM.replace('<rect id="fog" y="12" width="16" height="4" fill="#ccc"/>', "")
+        # An animated group carries its subtree; the group itself paints nothing.
+        grouped = svg.replace('<g id="rain">', f'<g id="rain">{_SPIN}')
+        split = split_base(_source(grouped))
+        self.assertEqual(split.base, (0,))
+        self.assertEqual([(o.z, o.indices) for o in split.overlays], [(1, (1,)), (2, (2, 3, 4))])
+        self.assertEqual(split.z_order.base_position, "below")
+        self.assertEqual(split.z_order.overlays_z_offset, 1)
+
+        static = svg.replace(_SPIN, "").replace("repeatCount", "fill")
+        split = split_base(_source(static))
+        self.assertEqual((split.base, split.overlays), ((0, 1, 3, 4), []))
+        self.assertEqual(split.z_order.base_position, "all_static")
+
+    def test_mixed_static_runs_become_static_overlays(self) -> None:
+        with self.assertRaises(ValueError):
+            split_base(_source(_STORM), strict=True)
+        split = split_base(_source(_STORM))
+        self.assertEqual(split.base, (0,))
+        self.assertEqual(
+            [(o.z, o.indices, o.animated) for o in split.overlays],
+            [(1, (1,), True), (3, (3,), False), (4, (4,), True), (5, (5,), False)],
+        )
+        self.assertEqual(split.z_order.base_position, "below")
+        self.assertEqual(split_base(_source(_STORM), animated=[3]).overlays[1].animated, True)
+
+    def test_overlays_sharing_an_asset_keep_their_own_raster(self) -> None:
+        drop = (
+            '<line id="{}" x1="{x}" y1="8" x2="{x}" y2="10" stroke="#0af">'
+            '<animateTransform attributeName="transform" type="translate"'
+            ' values="0 0; 0 6" dur="700ms" repeatCount="indefinite"/></line>'
+        )
+        svg = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16">'
+            '<rect id="sky" width="16" height="16" fill="#00f"/>'
+            + drop.format("drop_a", x=4)
+            + drop.format("drop_b", x=8)
+            + "</svg>"
+        )
+        # Dedup pointed both drops at one asset, the second shifted onto it.
+        spec = Spec(
+            spec_id=spec_id_for_name("rain"),
+            name="rain",
+            components=Components(
+                decor="NONE", cover="NONE", particles="NONE", atmos="NONE", event="NONE"
+            ),
+            layers=[
+                LayerSpec(layer_id="sky", asset="sky"),
+                LayerSpec(layer_id="drop_a", asset="drop", fx=["FALL"]),
+                LayerSpec(layer_id="drop_b", asset="drop", fx=["FALL"], offset=(4, 0)),
+            ],
+            fx={"FALL": {"period_ms": 700, "fall_dy": 6}},
+        )
+        reduced, plan = split_spec(spec, split_base(_source(svg)))
+        self.assertEqual(plan, {"drop": (1,), "drop_1": (2,), "rain_base": (0,)})
+        self.assertEqual(
+            [(layer.layer_id, layer.asset, layer.offset) for layer in reduced.layers],
+            [("base", "rain_base", None), ("drop_a", "drop", None), ("drop_b", "drop_1", None)],
+        )
+
+    def test_cli_split_base_writes_spec_and_rasters_per_size(self) -> None:
+        svg = _STORM.replace('<g id="rain">', f'<g id="rain">{_SPIN}')
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "storm.svg").write_text(svg, encoding="utf-8")
+            argv = ["wx-pipeline", "split-base", "--svg", str(root / "storm.svg")]
+            argv += ["--size-px", "32", "--size-px", "64", "--output", str(root / "storm.json")]
+            argv += ["--assets-dir", str(root / "assets"), "--report", str(root / "split.json")]
+            with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"), mock.patch(
+                "pipeline.preview.source.render_svg_bytes", return_value=b"png"
+            ) as render:
+                self.assertEqual(main(), 0)
+            spec = json.loads((root / "storm.json").read_text())
+            report = json.loads((root / "split.json").read_text())
+            written = sorted(path.name for path in (root / "assets").iterdir())
+        self.assertEqual(
+            [(layer["asset"], layer["fx"]) for layer in spec["layers"]],
+            [
+                ("storm_base", []),
+                ("sun", ["ROTATE"]),
+                ("rain", ["ROTATE", "FALL"]),
+                ("fog", []),
+            ],
+        )
+        self.assertEqual(report["plan"]["storm_base"], [0])
+        self.assertEqual(report["plan"]["rain"], [2, 3, 4])
+        self.assertEqual(report["z_order"]["base_position"], "below")
+        self.assertEqual(render.call_count, 8)
+        self.assertIn("storm_base_64.png", written)
+
+
+if __name__ == "__main__":
+    unittest.main()
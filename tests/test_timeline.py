@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from pipeline.fx.timeline import compile_plan
+
+
+class TimelineTests(unittest.TestCase):
+    def test_rotate_fall_and_static_layers(self) -> None:
+        layers = [
+            {"asset": "sun", "fx": ["ROTATE"]},
+            {"asset": "drop", "fx": ["FALL", "TWINKLE"]},
+            {"asset": "cloud", "fx": []},
+        ]
+        fx = {
+            "ROTATE": {"period_ms": 10000},
+            "FALL": {"period_ms": 1000, "fall_dy": 20},
+            "TWINKLE": {"period_ms": 4000, "opa_min": 0, "opa_max": 255},
+        }
+        plan = compile_plan(layers, fx)
+        self.assertTrue(plan.animated)
+
+        sun, drop, cloud = plan.evaluate(2.0)
+        self.assertAlmostEqual(sun.rotation, 72.0)
+        self.assertAlmostEqual(drop.offset_y, 40.0)
+        self.assertAlmostEqual(drop.opacity, 0.5)
+        self.assertEqual((cloud.offset_x, cloud.rotation, cloud.opacity), (0.0, 0.0, 1.0))
+
+    def test_named_fx_instances_keep_their_own_params(self) -> None:
+        layers = [{"asset": "big", "fx": ["ROTATE"]}, {"asset": "small", "fx": ["ROTATE.small"]}]
+        fx = {"ROTATE": {"period_ms": 4000}, "ROTATE.small": {"period_ms": 1000}}
+        big, small = compile_plan(layers, fx).evaluate(0.5)
+        self.assertAlmostEqual(big.rotation, 45.0)
+        self.assertAlmostEqual(small.rotation, 180.0)
+
+    def test_fx_gated_by_svg_animation_kind(self) -> None:
+        layers = [{"asset": "a", "fx": ["ROTATE"]}, {"asset": "b", "fx": ["ROTATE"]}]
+        fx = {"ROTATE": {"period_ms": 1000}}
+        plan = compile_plan(
+            layers,
+            fx,
+            layer_index={"a": 0, "b": 1},
+            anim_kinds={0: {"rotate"}, 1: {"opacity"}},
+        )
+        first, second = plan.evaluate(0.25)
+        self.assertAlmostEqual(first.rotation, 90.0)
+        self.assertEqual(second.rotation, 0.0)
+        self.assertEqual(second.svg_index, 1)
+
+    def test_jitter_is_deterministic_with_seeded_rng(self) -> None:
+        plan = compile_plan(
+            [{"asset": "dust", "fx": ["JITTER", "DRIFT"]}],
+            {"JITTER": {"amp_x": 2, "amp_y": 2}, "DRIFT": {"period_ms": 8000, "amp_x": 1}},
+        )
+        first = plan.evaluate(1.0, random.Random(7))[0]
+        values = (first.offset_x, first.offset_y)
+        second = plan.evaluate(1.0, random.Random(7))[0]
+        self.assertEqual((second.offset_x, second.offset_y), values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 
 from pipeline.hash import fnv1a32
 from pipeline.spec.model import Components, LayerSpec, Metadata, Spec
-from pipeline.wxspec import validate_spec
+from pipeline.wxspec import spec_errors, validate_spec
 
 
 class ValidationTests(unittest.TestCase):
@@ -52,6 +52,32 @@ class ValidationTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             validate_spec(spec)
 
+    def test_named_fx_instances(self) -> None:
+        spec = self._base_spec()
+        spec.fx["ROTATE.rays"] = {"period_ms": 2000}
+        spec.layers.append(LayerSpec(layer_id="rays", asset="rays", fx=["ROTATE.rays"]))
+        validate_spec(spec)
+
+        spec.fx["ROTATE.Bad"] = {"period_ms": 2000}
+        spec.layers[1].fx = ["ROTATE.rays", "ROTATE"]
+        errors = spec_errors(spec)
+        self.assertIn("unknown fx key: ROTATE.Bad", errors)
+        self.assertIn("layer rays uses several ROTATE instances", errors)
+
+    def test_errors_are_aggregated(self) -> None:
+        spec = self._base_spec()
+        spec.fx["ROTATE"] = {"period_ms": -1, "opa_max": 300, "phase_ms": [0, -5]}
+        spec.layers.append(LayerSpec(layer_id="sun", asset="sun", fx=["FLASH"]))
+        with self.assertRaises(ValueError) as ctx:
+            validate_spec(spec)
+        message = str(ctx.exception)
+        self.assertIn("fx ROTATE.period_ms must be >= 0", message)
+        self.assertIn("fx ROTATE.opa_max must be 0..255", message)
+        self.assertIn("fx ROTATE.phase_ms[1] must be int >= 0", message)
+        self.assertIn("duplicate layer id: sun", message)
+        self.assertIn("layer fx missing spec config: FLASH", message)
+        self.assertEqual(len(spec_errors(spec)), 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -56,7 +56,7 @@ static void test_parse_particles_fx(void) {
         "},"
         "\"layers\":["
         "{\"id\":\"cloud\",\"asset\":\"cloud\",\"fx\":[]},"
-        "{\"id\":\"drop\",\"asset\":\"drop\",\"fx\":[\"FALL\"]}"
+        "{\"id\":\"drop\",\"asset\":\"drop\",\"fx\":[\"FALL\"],\"dirty\":[20,10,12,40]}"
         "],"
         "\"fx\":{"
         "\"FALL\":{\"period_ms\":700,\"fall_dy\":15,\"phase_ms\":[0,200,400]}"
@@ -72,6 +72,11 @@ static void test_parse_particles_fx(void) {
     assert(spec.layer_count == 2);
     assert(strcmp(spec.layers[1].asset_key, "drop") == 0);
     assert(spec.layers[1].fx_mask & WX_FX_MASK(WX_FX_FALL));
+    assert(spec.layers[0].dirty_w == 0);
+    assert(spec.layers[1].dirty_x == 20);
+    assert(spec.layers[1].dirty_y == 10);
+    assert(spec.layers[1].dirty_w == 12);
+    assert(spec.layers[1].dirty_h == 40);
     assert(spec.fx[WX_FX_FALL].period_ms == 700);
     assert(spec.fx[WX_FX_FALL].fall_dy == 15);
     assert(spec.fx[WX_FX_FALL].phase_count == 3);
@@ -80,8 +85,74 @@ static void test_parse_particles_fx(void) {
     assert(spec.fx[WX_FX_FALL].phase_ms[2] == 400);
 }
 
+static void test_parse_fx_instances(void) {
+    const char* json =
+        "{"
+        "\"spec_id\":42,"
+        "\"name\":\"gears\","
+        "\"components\":{"
+        "\"decor\":\"NONE\","
+        "\"cover\":\"NONE\","
+        "\"particles\":\"NONE\","
+        "\"atmos\":\"NONE\","
+        "\"event\":\"NONE\""
+        "},"
+        "\"layers\":["
+        "{\"id\":\"big\",\"asset\":\"gear\",\"fx\":[\"ROTATE\"]},"
+        "{\"id\":\"small\",\"asset\":\"gear\",\"fx\":[\"ROTATE.small\"],\"offset\":[20,-4]}"
+        "],"
+        "\"fx\":{"
+        "\"ROTATE\":{\"period_ms\":8000},"
+        "\"ROTATE.small\":{\"period_ms\":2000}"
+        "},"
+        "\"metadata\":{\"version\":1}"
+        "}";
+
+    wx_icon_spec_t spec;
+    int rc = wx_json_parse_spec(json, strlen(json), &spec);
+    assert(rc == 0);
+    assert(spec.fx[WX_FX_ROTATE].period_ms == 8000);
+    assert(spec.fx_instance_count == 1);
+    assert(spec.fx_instances[0].fx_id == WX_FX_ROTATE);
+    assert(spec.fx_instances[0].params.period_ms == 2000);
+    assert(spec.layers[0].fx_instance[WX_FX_ROTATE] == 0);
+    assert(spec.layers[1].fx_mask & WX_FX_MASK(WX_FX_ROTATE));
+    assert(spec.layers[1].fx_instance[WX_FX_ROTATE] == 1);
+    assert(spec.layers[0].offset_x == 0);
+    assert(spec.layers[1].offset_x == 20);
+    assert(spec.layers[1].offset_y == -4);
+}
+
+static void test_reject_empty_dirty(void) {
+    const char* json =
+        "{"
+        "\"spec_id\":1234,"
+        "\"name\":\"clear_day\","
+        "\"components\":{"
+        "\"decor\":\"SUN\","
+        "\"cover\":\"NONE\","
+        "\"particles\":\"NONE\","
+        "\"atmos\":\"NONE\","
+        "\"event\":\"NONE\""
+        "},"
+        "\"layers\":["
+        "{\"id\":\"sun\",\"asset\":\"sun_core\",\"fx\":[\"ROTATE\"],\"dirty\":[0,0,0,0]}"
+        "],"
+        "\"fx\":{"
+        "\"ROTATE\":{\"period_ms\":45000}"
+        "},"
+        "\"metadata\":{\"version\":1}"
+        "}";
+
+    wx_icon_spec_t spec;
+    /* dirty_w == 0 would read as the whole icon. */
+    assert(wx_json_parse_spec(json, strlen(json), &spec) != 0);
+}
+
 int main(void) {
     test_parse_minimal();
     test_parse_particles_fx();
+    test_parse_fx_instances();
+    test_reject_empty_dirty();
     return 0;
 }
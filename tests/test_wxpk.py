@@ -2,7 +2,7 @@ import unittest
 
 from pipeline.hash import fnv1a32
 from pipeline.pack.toc import TOC_ENTRY_SIZE
-from pipeline.spec.model import Asset, Components, LayerSpec, Metadata, Spec
+from pipeline.spec.model import Asset, LayerSpec, Spec
 from pipeline.wxpk import (
     HEADER_SIZE,
     MAGIC,
@@ -10,30 +10,18 @@ from pipeline.wxpk import (
     WXPK_T_JSON_SPEC,
     build_pack,
     extract_json_spec,
+    extract_timer_table,
     parse_header,
     parse_toc,
 )
+from tests.helpers import make_spec
 
 
 class WxpkPackTests(unittest.TestCase):
     def _make_spec(self) -> Spec:
-        layers = [
-            LayerSpec(layer_id="sun", asset="sun", fx=["ROTATE"])
-        ]
-        fx = {"ROTATE": {"period_ms": 10000, "pivot_x": 0, "pivot_y": 0}}
-        return Spec(
-            spec_id=fnv1a32("clear_day"),
-            name="clear_day",
-            components=Components(
-                decor="NONE",
-                cover="NONE",
-                particles="NONE",
-                atmos="NONE",
-                event="NONE",
-            ),
-            layers=layers,
-            fx=fx,
-            metadata=Metadata(version=1),
+        layers = [{"id": "sun", "asset": "sun", "fx": ["ROTATE"]}]
+        return make_spec(
+            "clear_day", layers, {"ROTATE": {"period_ms": 10000, "pivot_x": 0, "pivot_y": 0}}
         )
 
     @staticmethod
@@ -45,7 +33,7 @@ class WxpkPackTests(unittest.TestCase):
         assets = [
             Asset(asset_key="sun", size_px=96, type="image", path="sun_96.bin"),
         ]
-        payloads = {"sun": b"abcd"}
+        payloads = {("sun", 96): b"abcd"}
         pack = build_pack([spec], assets, payloads)
 
         header = parse_header(pack)
@@ -63,7 +51,7 @@ class WxpkPackTests(unittest.TestCase):
         json_entry = toc_entries[1]
         self.assertEqual(asset_entry.type_code, WXPK_T_IMG)
         self.assertEqual(asset_entry.offset, expected_blobs_offset)
-        self.assertEqual(asset_entry.length, len(payloads["sun"]))
+        self.assertEqual(asset_entry.length, len(payloads[("sun", 96)]))
         expected_json_offset = self._align_up(asset_entry.offset + asset_entry.length)
         self.assertEqual(json_entry.type_code, WXPK_T_JSON_SPEC)
         self.assertEqual(json_entry.offset, expected_json_offset)
@@ -73,7 +61,7 @@ class WxpkPackTests(unittest.TestCase):
         assets = [
             Asset(asset_key="sun", size_px=96, type="image", path="sun_96.bin"),
         ]
-        payloads = {"sun": b"data"}
+        payloads = {("sun", 96): b"data"}
         pack = build_pack([spec], assets, payloads)
 
         json_data = extract_json_spec(pack, spec.spec_id)
@@ -86,27 +74,9 @@ class WxpkPackTests(unittest.TestCase):
             Asset(asset_key="sun", size_px=96, type="image", path="sun_96.bin"),
             Asset(asset_key="cloud", size_px=96, type="image", path="cloud_96.bin"),
         ]
-        layers = [
-            LayerSpec(layer_id="sun", asset="sun", fx=[]),
-            LayerSpec(layer_id="cloud", asset="cloud", fx=[]),
-        ]
-        fx = {}
-        spec = Spec(
-            spec_id=fnv1a32("cloudy"),
-            name="cloudy",
-            components=Components(
-                decor="NONE",
-                cover="NONE",
-                particles="NONE",
-                atmos="NONE",
-                event="NONE",
-            ),
-            layers=layers,
-            fx=fx,
-            metadata=Metadata(version=1),
-        )
+        spec = make_spec("cloudy", ["sun", "cloud"])
 
-        payloads = {"sun": b"a", "cloud": b"bc"}
+        payloads = {("sun", 96): b"a", ("cloud", 96): b"bc"}
         pack = build_pack([spec], assets, payloads)
         header = parse_header(pack)
         toc_entries = parse_toc(pack, header)
@@ -123,6 +93,55 @@ class WxpkPackTests(unittest.TestCase):
         expected_json_offset = self._align_up(second.offset + second.length)
         self.assertEqual(json_entry.offset, expected_json_offset)
 
+    def test_shared_timer_table(self) -> None:
+        sun = self._make_spec()
+        rain = make_spec(
+            "rain",
+            [
+                {"id": "rays", "asset": "sun", "fx": ["ROTATE"]},
+                {"id": "drop", "asset": "drop", "fx": ["FALL"]},
+            ],
+            {
+                "ROTATE": {"period_ms": 10000},
+                "FALL": {"period_ms": 690, "phase_ms": [0, 210]},
+            },
+        )
+        assets = [Asset(asset_key="sun", size_px=96, type="image", path="sun_96.bin")]
+        payloads = {("sun", 96): b"data"}
+        self.assertIsNone(extract_timer_table(build_pack([sun], assets, payloads)))
+
+        pack = build_pack([sun, rain], assets, payloads, shared_timers=True)
+        self.assertEqual(parse_header(pack).toc_count, 4)
+        table = extract_timer_table(pack)
+        self.assertEqual(table["version"], 1)
+        rotate, fall = table["timers"]
+        self.assertEqual(
+            (rotate["fx"], rotate["period_ms"], rotate["easing"]), ("ROTATE", 10000, "linear")
+        )
+        self.assertEqual(
+            rotate["members"],
+            [{"spec_id": sun.spec_id, "layer": 0}, {"spec_id": rain.spec_id, "layer": 0}],
+        )
+        self.assertEqual(
+            fall["members"], [{"spec_id": rain.spec_id, "layer": 1, "phase_ms": [0, 210]}]
+        )
+
+    def test_fx_instances_in_pack_and_timers(self) -> None:
+        sun = self._make_spec()
+        sun.fx["ROTATE.rays"] = {"period_ms": 2000}
+        sun.layers.append(LayerSpec(layer_id="rays", asset="sun", fx=["ROTATE.rays"]))
+        assets = [Asset(asset_key="sun", size_px=96, type="image", path="sun_96.bin")]
+        pack = build_pack([sun], assets, {("sun", 96): b"data"}, shared_timers=True)
+        spec_json = extract_json_spec(pack, sun.spec_id)
+        self.assertEqual(spec_json["layers"][1]["fx"], ["ROTATE.rays"])
+        self.assertEqual(spec_json["fx"]["ROTATE.rays"], {"period_ms": 2000})
+        timers = extract_timer_table(pack)["timers"]
+        self.assertEqual(
+            [(timer["fx"], timer["period_ms"]) for timer in timers],
+            [("ROTATE", 2000), ("ROTATE", 10000)],
+        )
+        self.assertEqual(timers[0]["members"], [{"spec_id": sun.spec_id, "layer": 1}])
+
 
 if __name__ == "__main__":
     unittest.main()